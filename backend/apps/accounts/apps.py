@@ -7,3 +7,11 @@ class AccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.accounts"
     verbose_name = "Accounts"
+
+    def ready(self) -> None:
+        from utils.supabase_auth import connect_profile_cache_signals
+
+        from .stats import connect_signals
+
+        connect_signals()
+        connect_profile_cache_signals()
@@ -0,0 +1,35 @@
+"""Management command that recomputes the AdvocateStats counters."""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts.models import AdvocateStats
+from apps.accounts.stats import invalidate_dashboard_stats, rebuild_advocate_stats
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Recompute AdvocateStats from documents, clients and cases.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--advocate',
+            help='Email of a single advocate to rebuild (default: everyone).',
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['advocate']:
+            users = users.filter(email=options['advocate'])
+            if not users.exists():
+                raise CommandError(f"No user with email {options['advocate']}")
+        else:
+            # Rows of deleted users are removed by cascade; drop any strays all the same
+            AdvocateStats.objects.exclude(advocate__in=User.objects.all()).delete()
+
+        rebuilt = 0
+        for advocate_id in users.values_list('pk', flat=True).iterator():
+            rebuild_advocate_stats(advocate_id)
+            invalidate_dashboard_stats(advocate_id)
+            rebuilt += 1
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {rebuilt} user(s).'))
@@ -0,0 +1,78 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:39
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+STATUSES = ('uploaded', 'ready_to_process', 'in_progress', 'processed', 'finalized')
+
+
+def populate(apps, schema_editor):
+    """Fill AdvocateStats for everyone who already owns clients, cases or documents.
+
+    last_activity_at is the latest updated_at of those rows, as in
+    rebuild_advocate_stats().
+    """
+    AdvocateStats = apps.get_model('accounts', 'AdvocateStats')
+    Client = apps.get_model('clients', 'Client')
+    Case = apps.get_model('cases', 'Case')
+    Document = apps.get_model('documents', 'Document')
+    rows = {}
+
+    def row(advocate_id):
+        return rows.setdefault(advocate_id, AdvocateStats(advocate_id=advocate_id))
+
+    def touch(stats, when):
+        if when and (stats.last_activity_at is None or when > stats.last_activity_at):
+            stats.last_activity_at = when
+
+    counts = {'n': models.Count('pk'), 'last': models.Max('updated_at')}
+    for item in Client.objects.values('advocate_id').annotate(**counts):
+        stats = row(item['advocate_id'])
+        stats.clients_count = item['n']
+        touch(stats, item['last'])
+    for item in Case.objects.values('advocate_id').annotate(**counts):
+        stats = row(item['advocate_id'])
+        stats.cases_count = item['n']
+        touch(stats, item['last'])
+    for item in Document.objects.values('advocate_id', 'status').annotate(**counts):
+        stats = row(item['advocate_id'])
+        stats.documents_count += item['n']
+        if item['status'] in STATUSES:
+            setattr(stats, f"documents_{item['status']}", item['n'])
+        touch(stats, item['last'])
+    AdvocateStats.objects.bulk_create(rows.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('cases', '0003_case_created_at_index'),
+        ('clients', '0002_client_created_at_index'),
+        ('documents', '0010_document_created_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdvocateStats',
+            fields=[
+                ('advocate', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('clients_count', models.IntegerField(default=0)),
+                ('cases_count', models.IntegerField(default=0)),
+                ('documents_count', models.IntegerField(default=0)),
+                ('documents_uploaded', models.IntegerField(default=0)),
+                ('documents_ready_to_process', models.IntegerField(default=0)),
+                ('documents_in_progress', models.IntegerField(default=0)),
+                ('documents_processed', models.IntegerField(default=0)),
+                ('documents_finalized', models.IntegerField(default=0)),
+                ('last_activity_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Advocate stats',
+            },
+        ),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
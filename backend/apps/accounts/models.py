@@ -93,3 +93,35 @@ class Profile(AbstractBaseUser, PermissionsMixin):
     def get_short_name(self) -> str:
         """Return the user's short name."""
         return self.full_name.split(" ")[0] if self.full_name else self.email
+
+
+class AdvocateStats(models.Model):
+    """Denormalized per-advocate counters for dashboards and the admin advocate list.
+
+    Kept current by apps.accounts.stats on every document, client and case
+    write (in the writer's transaction); `manage.py rebuild_advocate_stats`
+    recomputes it from the source tables.
+    """
+
+    advocate = models.OneToOneField(
+        Profile,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+    )
+    clients_count = models.IntegerField(default=0)
+    cases_count = models.IntegerField(default=0)
+    documents_count = models.IntegerField(default=0)
+    documents_uploaded = models.IntegerField(default=0)
+    documents_ready_to_process = models.IntegerField(default=0)
+    documents_in_progress = models.IntegerField(default=0)
+    documents_processed = models.IntegerField(default=0)
+    documents_finalized = models.IntegerField(default=0)
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Advocate stats"
+
+    def __str__(self) -> str:
+        return f"Stats for {self.advocate_id}"
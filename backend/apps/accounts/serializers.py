@@ -62,3 +62,10 @@ class ProfileUpdateSerializer(serializers.ModelSerializer):
         if len(value.strip()) < 2:
             raise serializers.ValidationError('Name must be at least 2 characters.')
         return value
+
+    def update(self, instance, validated_data):
+        """Write only the edited fields, never columns of a possibly stale instance."""
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
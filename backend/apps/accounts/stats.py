@@ -0,0 +1,210 @@
+"""Dashboard statistics backed by the AdvocateStats counters table.
+
+AdvocateStats holds per-advocate counts (clients, cases, documents in
+total and by status) and the time of the last change. Signal receivers
+keep it current as rows are written, inside the writer's transaction:
+
+  - creating or deleting a client, case or document adds or subtracts one;
+  - saving a document with a different status moves one count from the
+    status it was loaded with (Document.from_db) to the new one;
+  - QuerySet.update() sends no signals, so code that changes document
+    status that way calls record_status_change() itself.
+
+Counters are applied as F() expressions, so concurrent writers never lose
+updates. A missing row is rebuilt from the source tables on the next
+write or read, and `manage.py rebuild_advocate_stats` recomputes every
+row (after bulk imports or raw SQL).
+
+Dashboard responses are additionally cached per advocate and for the
+whole system (admins); every counter change drops the affected snapshots.
+"""
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from apps.cases.models import Case
+from apps.clients.models import Client
+from apps.documents.models import Document
+
+from .models import AdvocateStats
+
+DOCUMENT_STATUSES = ('uploaded', 'ready_to_process', 'in_progress', 'processed')
+STATUS_FIELDS = {status: f'documents_{status}' for status, _ in Document.STATUS_CHOICES}
+COUNTER_FIELDS = ['clients_count', 'cases_count', 'documents_count', *STATUS_FIELDS.values()]
+SYSTEM = 'all'
+
+
+def _cache():
+    return caches[settings.DASHBOARD_STATS_CACHE_ALIAS]
+
+
+def _cache_key(scope) -> str:
+    return f'dashboard-stats:{scope}'
+
+
+def rebuild_advocate_stats(advocate_id) -> Optional[AdvocateStats]:
+    """Recompute one advocate's counters from the source tables.
+
+    Returns:
+        The saved row, or None if the advocate does not exist.
+    """
+    if not get_user_model().objects.filter(pk=advocate_id).exists():
+        return None
+    documents = Document.objects.filter(advocate_id=advocate_id).aggregate(
+        documents_count=Count('pk'),
+        last_document=Max('updated_at'),
+        **{field: Count('pk', filter=Q(status=status)) for status, field in STATUS_FIELDS.items()},
+    )
+    clients = Client.objects.filter(advocate_id=advocate_id).aggregate(
+        clients_count=Count('pk'), last_client=Max('updated_at'),
+    )
+    cases = Case.objects.filter(advocate_id=advocate_id).aggregate(
+        cases_count=Count('pk'), last_case=Max('updated_at'),
+    )
+    changes = [
+        documents.pop('last_document'), clients.pop('last_client'), cases.pop('last_case'),
+    ]
+    values = {**documents, **clients, **cases}
+    values['last_activity_at'] = max((when for when in changes if when), default=None)
+    with transaction.atomic():
+        stats, _ = AdvocateStats.objects.update_or_create(advocate_id=advocate_id, defaults=values)
+    return stats
+
+
+def _apply(advocate_id, rebuild_missing: bool = True, **deltas: int) -> None:
+    """Add deltas to an advocate's counters and drop their cached snapshots."""
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if changes:
+        updated = AdvocateStats.objects.filter(advocate_id=advocate_id).update(
+            **changes, last_activity_at=timezone.now(),
+        )
+        # Never rebuild while deleting: the advocate itself may be going away
+        if not updated and rebuild_missing:
+            rebuild_advocate_stats(advocate_id)
+    invalidate_dashboard_stats(advocate_id)
+
+
+def record_status_change(advocate_id, from_status: str, to_status: str) -> None:
+    """Move one document between status counters (for writes that bypass signals)."""
+    if from_status == to_status:
+        return
+    deltas = {STATUS_FIELDS[from_status]: -1} if from_status in STATUS_FIELDS else {}
+    deltas[STATUS_FIELDS[to_status]] = deltas.get(STATUS_FIELDS[to_status], 0) + 1
+    _apply(advocate_id, **deltas)
+
+
+def _get_row(advocate_id) -> Optional[AdvocateStats]:
+    stats = AdvocateStats.objects.filter(advocate_id=advocate_id).first()
+    return stats or rebuild_advocate_stats(advocate_id)
+
+
+def compute_stats(advocate_id=None) -> dict:
+    """Read counts for one advocate, or totals for everyone, from AdvocateStats.
+
+    Args:
+        advocate_id: The advocate to read; None sums every row and adds
+            advocate totals.
+    """
+    if advocate_id is None:
+        counters = AdvocateStats.objects.aggregate(**{field: Sum(field) for field in COUNTER_FIELDS})
+        counters = {field: value or 0 for field, value in counters.items()}
+    else:
+        row = _get_row(advocate_id)
+        counters = {field: getattr(row, field, 0) for field in COUNTER_FIELDS}
+    stats = {
+        'total_clients': counters['clients_count'],
+        'total_cases': counters['cases_count'],
+        'total_documents': counters['documents_count'],
+        'documents_by_status': {status: counters[STATUS_FIELDS[status]] for status in DOCUMENT_STATUSES},
+    }
+    if advocate_id is None:
+        stats.update(get_user_model().objects.filter(role='advocate').aggregate(
+            total_advocates=Count('pk'),
+            active_advocates=Count('pk', filter=Q(is_active=True)),
+        ))
+    return stats
+
+
+def get_dashboard_stats(advocate_id=None) -> dict:
+    """Return cached stats for an advocate (or the system, for None), computing them on a miss."""
+    ttl = settings.DASHBOARD_STATS_CACHE_TTL
+    if ttl <= 0:
+        return compute_stats(advocate_id)
+    key = _cache_key(SYSTEM if advocate_id is None else advocate_id)
+    stats = _cache().get(key)
+    if stats is None:
+        stats = compute_stats(advocate_id)
+        _cache().set(key, stats, ttl)
+    return stats
+
+
+def invalidate_dashboard_stats(advocate_id: Optional[object] = None) -> None:
+    """Drop the cached stats of an advocate and the system-wide snapshot.
+
+    Runs now and again once the current transaction commits, so a read
+    that races the transaction cannot keep pre-commit numbers cached.
+    """
+    keys = [_cache_key(SYSTEM)]
+    if advocate_id is not None:
+        keys.append(_cache_key(advocate_id))
+
+    def drop() -> None:
+        _cache().delete_many(keys)
+
+    drop()
+    transaction.on_commit(drop)
+
+
+def _document_saved(sender, instance: Document, created: bool, update_fields=None, **kwargs) -> None:
+    previous = getattr(instance, '_loaded_status', None)
+    instance._loaded_status = instance.status
+    if created:
+        _apply(instance.advocate_id, documents_count=1, **{STATUS_FIELDS[instance.status]: 1})
+    elif update_fields is not None and 'status' not in update_fields:
+        return
+    elif previous is not None:
+        record_status_change(instance.advocate_id, previous, instance.status)
+    else:
+        # Status was not loaded (deferred field): recount this advocate
+        rebuild_advocate_stats(instance.advocate_id)
+        invalidate_dashboard_stats(instance.advocate_id)
+
+
+def _document_deleted(sender, instance: Document, **kwargs) -> None:
+    status_field = STATUS_FIELDS.get(instance.__dict__.get('status'))
+    deltas = {status_field: -1} if status_field else {}
+    _apply(instance.advocate_id, rebuild_missing=False, documents_count=-1, **deltas)
+
+
+def _counter_receivers(field: str):
+    def saved(sender, instance, created: bool, **kwargs) -> None:
+        if created:
+            _apply(instance.advocate_id, **{field: 1})
+
+    def deleted(sender, instance, **kwargs) -> None:
+        _apply(instance.advocate_id, rebuild_missing=False, **{field: -1})
+
+    return saved, deleted
+
+
+def _advocate_changed(sender, instance, **kwargs) -> None:
+    invalidate_dashboard_stats(None)
+
+
+def connect_signals() -> None:
+    """Connect the counter receivers (called from AccountsConfig.ready)."""
+    post_save.connect(_document_saved, sender=Document, dispatch_uid='advocate-stats-document-save')
+    post_delete.connect(_document_deleted, sender=Document, dispatch_uid='advocate-stats-document-delete')
+    for model, field in ((Client, 'clients_count'), (Case, 'cases_count')):
+        saved, deleted = _counter_receivers(field)
+        post_save.connect(saved, sender=model, weak=False, dispatch_uid=f'advocate-stats-{field}-save')
+        post_delete.connect(deleted, sender=model, weak=False, dispatch_uid=f'advocate-stats-{field}-delete')
+    user_model = get_user_model()
+    post_save.connect(_advocate_changed, sender=user_model, dispatch_uid='dashboard-stats-save-user')
+    post_delete.connect(_advocate_changed, sender=user_model, dispatch_uid='dashboard-stats-delete-user')
@@ -0,0 +1,132 @@
+"""Tests for the AdvocateStats counters table."""
+import importlib
+from datetime import timedelta
+
+import pytest
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.models import AdvocateStats
+from apps.cases.models import Case
+from apps.clients.models import Client
+from apps.documents.models import Document
+
+User = get_user_model()
+
+
+@pytest.fixture
+def advocate(db):
+    return User.objects.create_user(email="advocate@test.com", password="TestPass123!", full_name="Advocate")
+
+
+@pytest.fixture
+def case(advocate):
+    client = Client.objects.create(advocate=advocate, full_name="Client A", email="a@test.com")
+    return Case.objects.create(client=client, advocate=advocate, title="Case 1", case_number="C-001")
+
+
+def _document(case, name="doc.pdf", status="uploaded"):
+    return Document.objects.create(
+        case=case, advocate=case.advocate, name=name, file_path=f"a/c/{name}", file_type="pdf",
+        file_size_bytes=1, mime_type="application/pdf", status=status,
+    )
+
+
+def _counts(advocate):
+    stats = AdvocateStats.objects.get(advocate=advocate)
+    return {
+        "clients": stats.clients_count, "cases": stats.cases_count, "documents": stats.documents_count,
+        "uploaded": stats.documents_uploaded, "processed": stats.documents_processed,
+    }
+
+
+class TestAdvocateStatsCounters:
+    """Counters follow writes to documents, clients and cases."""
+
+    def test_creates_count_up(self, advocate, case):
+        _document(case, "a.pdf")
+        _document(case, "b.pdf", status="processed")
+
+        assert _counts(advocate) == {"clients": 1, "cases": 1, "documents": 2, "uploaded": 1, "processed": 1}
+        assert AdvocateStats.objects.get(advocate=advocate).last_activity_at is not None
+
+    def test_status_change_moves_one_count(self, advocate, case, django_assert_num_queries):
+        """A status change costs one counter UPDATE and no extra reads."""
+        document = Document.objects.get(pk=_document(case).pk)
+        document.status = "processed"
+        with django_assert_num_queries(2):  # document UPDATE + counters UPDATE
+            document.save(update_fields=["status"])
+
+        assert _counts(advocate)["uploaded"] == 0
+        assert _counts(advocate)["processed"] == 1
+
+    def test_unrelated_saves_leave_counters_alone(self, advocate, case, django_assert_num_queries):
+        document = _document(case)
+        document.processed_html_path = "a/c/doc.html"
+        with django_assert_num_queries(1):
+            document.save(update_fields=["processed_html_path"])
+
+    def test_cascading_delete_counts_down(self, advocate, case):
+        """Deleting a client removes its cases and documents from the counters."""
+        _document(case)
+        case.client.delete()
+
+        assert _counts(advocate) == {"clients": 0, "cases": 0, "documents": 0, "uploaded": 0, "processed": 0}
+
+    def test_deleting_the_advocate_removes_the_row(self, advocate, case):
+        _document(case)
+        advocate.delete()
+
+        assert not AdvocateStats.objects.exists()
+
+    def test_rebuild_command_fixes_drift(self, advocate, case):
+        """Counters changed outside the ORM are corrected by rebuild_advocate_stats."""
+        _document(case)
+        AdvocateStats.objects.filter(advocate=advocate).update(documents_count=99, clients_count=0)
+
+        call_command("rebuild_advocate_stats")
+
+        assert _counts(advocate) == {"clients": 1, "cases": 1, "documents": 1, "uploaded": 1, "processed": 0}
+
+    def test_missing_row_is_rebuilt_on_read(self, advocate, case):
+        _document(case)
+        AdvocateStats.objects.all().delete()
+        client = APIClient()
+        client.force_authenticate(user=advocate)
+
+        assert client.get("/api/dashboard/stats/").json()["total_documents"] == 1
+        assert AdvocateStats.objects.filter(advocate=advocate).exists()
+
+    def test_migration_backfills_last_activity(self, advocate, case):
+        """The initial populate sets last_activity_at from the latest client, case or document change."""
+        latest = timezone.now() - timedelta(days=3)
+        Document.objects.filter(pk=_document(case).pk).update(updated_at=latest)
+        Client.objects.update(updated_at=latest - timedelta(days=1))
+        Case.objects.update(updated_at=latest - timedelta(days=2))
+        AdvocateStats.objects.all().delete()
+
+        importlib.import_module("apps.accounts.migrations.0002_advocate_stats").populate(apps, None)
+
+        assert AdvocateStats.objects.get(advocate=advocate).last_activity_at == latest
+
+
+class TestAdminAdvocatesList:
+    """The admin advocate list reads its counts from AdvocateStats."""
+
+    def test_counts_without_joining_documents(self, advocate, case, django_assert_num_queries):
+        for n in range(3):
+            _document(case, f"doc{n}.pdf")
+        admin = User.objects.create_user(
+            email="admin@test.com", password="TestPass123!", full_name="Admin", role="admin", is_staff=True,
+        )
+        client = APIClient()
+        client.force_authenticate(user=admin)
+
+        with django_assert_num_queries(1):
+            response = client.get("/api/admin/advocates/")
+
+        row = response.json()["results"][0]
+        assert (row["documents_count"], row["clients_count"]) == (3, 1)
@@ -119,3 +119,52 @@ class TestDashboardStats:
         assert data["total_cases"] == 0
         assert data["total_documents"] == 0
         assert data["documents_by_status"]["uploaded"] == 0
+
+
+@pytest.mark.django_db
+class TestDashboardStatsCache:
+    """Stats are aggregated per table, cached, and dropped on writes."""
+
+    def test_one_query_then_cached(self, api_client, sample_data, django_assert_num_queries):
+        """Counts come from the advocate's AdvocateStats row; repeat loads hit the cache."""
+        with django_assert_num_queries(1):
+            api_client.get("/api/dashboard/stats/")
+        with django_assert_num_queries(0):
+            response = api_client.get("/api/dashboard/stats/")
+        assert response.json()["total_documents"] == 3
+
+    def test_status_change_invalidates(self, api_client, sample_data):
+        """Saving a document with a new status is reflected on the next load."""
+        api_client.get("/api/dashboard/stats/")
+        document = Document.objects.get(name="doc1.jpg")
+        document.status = "processed"
+        document.save(update_fields=["status", "updated_at"])
+
+        data = api_client.get("/api/dashboard/stats/").json()
+        assert data["documents_by_status"]["uploaded"] == 0
+        assert data["documents_by_status"]["processed"] == 2
+
+    def test_new_client_and_case_invalidate(self, api_client, user, sample_data):
+        """Creating clients and cases updates the advocate's snapshot."""
+        api_client.get("/api/dashboard/stats/")
+        client = Client.objects.create(advocate=user, full_name="Client C", email="c@test.com")
+        Case.objects.create(client=client, advocate=user, title="Case 3", case_number="C-004")
+
+        data = api_client.get("/api/dashboard/stats/").json()
+        assert (data["total_clients"], data["total_cases"]) == (3, 3)
+
+    def test_admin_stats_share_the_system_snapshot(self, sample_data, other_user):
+        """Admin totals cover every advocate and follow deactivations."""
+        admin = User.objects.create_user(
+            email="admin@test.com", password="TestPass123!", full_name="Admin", role="admin", is_staff=True,
+        )
+        client = APIClient()
+        client.force_authenticate(user=admin)
+
+        data = client.get("/api/admin/stats/").json()
+        assert (data["total_advocates"], data["active_advocates"]) == (2, 2)
+        assert (data["total_clients"], data["total_cases"], data["total_documents"]) == (3, 3, 3)
+
+        other_user.is_active = False
+        other_user.save(update_fields=["is_active"])
+        assert client.get("/api/admin/stats/").json()["active_advocates"] == 1
@@ -1,13 +1,18 @@
 """Tests for Supabase JWT authentication backend."""
+import json
 import time
 import uuid
+from unittest import mock
 
 import jwt
 import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
 from django.contrib.auth import get_user_model
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.test import APIClient
 
 from conftest import TEST_JWT_SECRET
+from utils.supabase_auth import JWKSCache, SupabaseJWTAuthentication, VerifiedTokenCache, token_cache
 
 User = get_user_model()
 
@@ -159,3 +164,191 @@ class TestSupabaseJWTAuthentication:
         client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
         response = client.get("/api/auth/me/")
         assert response.status_code == 401
+
+
+def _es256_key(kid: str):
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    jwk = json.loads(jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key()))
+    return private_key, {**jwk, "kid": kid, "alg": "ES256", "use": "sig"}
+
+
+def _es256_token(private_key, kid: str, user_id: str) -> str:
+    now = int(time.time())
+    return jwt.encode(
+        {"sub": user_id, "aud": "authenticated", "iat": now, "exp": now + 3600},
+        private_key, algorithm="ES256", headers={"kid": kid},
+    )
+
+
+class TestVerificationCaches:
+    """Tests for the JWKS cache and the verified-token cache."""
+
+    def test_verified_token_is_cached(self, jwt_secret, make_jwt):
+        """A second request with the same token skips signature verification."""
+        token = make_jwt(user_id=str(uuid.uuid4()))
+
+        first = SupabaseJWTAuthentication._decode_token(token, jwt_secret)
+        with mock.patch("utils.supabase_auth.jwt.decode") as decode:
+            second = SupabaseJWTAuthentication._decode_token(token, jwt_secret)
+
+        decode.assert_not_called()
+        assert second == first
+
+    def test_secret_change_misses_cache(self, jwt_secret, make_jwt):
+        """Cached payloads are tied to the key they were verified with."""
+        token = make_jwt(user_id=str(uuid.uuid4()))
+        SupabaseJWTAuthentication._decode_token(token, jwt_secret)
+
+        with pytest.raises(AuthenticationFailed):
+            SupabaseJWTAuthentication._decode_token(token, "rotated-secret")
+
+    def test_entries_expire_with_token(self):
+        """Entries are dropped at the token's exp."""
+        cache = VerifiedTokenCache(max_entries=10, max_age=300)
+        cache.set("k", {"sub": "x", "exp": time.time() + 1})
+        assert cache.get("k") is not None
+        with mock.patch("utils.supabase_auth.time.time", return_value=time.time() + 2):
+            assert cache.get("k") is None
+
+    def test_lru_is_bounded(self):
+        """The least recently used entry is evicted past max_entries."""
+        cache = VerifiedTokenCache(max_entries=2)
+        exp = time.time() + 60
+        cache.set("a", {"exp": exp})
+        cache.set("b", {"exp": exp})
+        cache.get("a")
+        cache.set("c", {"exp": exp})
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+
+    def test_jwks_fetched_once_and_refreshed_on_unknown_kid(self):
+        """Keys are reused across tokens; a rotated kid triggers one refetch."""
+        key1, jwk1 = _es256_key("k1")
+        key2, jwk2 = _es256_key("k2")
+        responses = [
+            mock.Mock(json=mock.Mock(return_value={"keys": [jwk1]})),
+            mock.Mock(json=mock.Mock(return_value={"keys": [jwk1, jwk2]})),
+        ]
+        cache = JWKSCache("https://proj.supabase.co/auth/v1/.well-known/jwks.json", ttl=600, min_refresh_interval=0)
+        with mock.patch("utils.supabase_auth.httpx.get", side_effect=responses) as get:
+            cache.get_signing_key("k1")
+            cache.get_signing_key("k1")
+            assert get.call_count == 1
+            cache.get_signing_key("k2")
+            assert get.call_count == 2
+
+    def test_es256_request_uses_process_wide_jwks(self, settings, advocate_profile):
+        """Repeated ES256-authenticated requests fetch the JWKS only once."""
+        settings.SUPABASE_URL = f"https://{uuid.uuid4().hex}.supabase.co"
+        private_key, jwk = _es256_key("kid-1")
+        with mock.patch(
+            "utils.supabase_auth.httpx.get",
+            return_value=mock.Mock(json=mock.Mock(return_value={"keys": [jwk]})),
+        ) as get:
+            for _ in range(3):
+                token = _es256_token(private_key, "kid-1", str(advocate_profile.id))
+                token_cache.clear()
+                client = APIClient()
+                client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+                assert client.get("/api/auth/me/").status_code == 200
+
+        assert get.call_count == 1
+
+
+@pytest.fixture
+def shared_profile_cache(settings, tmp_path):
+    """A cache shared between processes (file-based), as in production."""
+    settings.CACHES = {
+        **settings.CACHES,
+        "profiles": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path / "profiles"),
+        },
+    }
+    settings.PROFILE_CACHE_ALIAS = "profiles"
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("shared_profile_cache")
+class TestProfileCache:
+    """Tests for the per-user profile cache used by JWT authentication."""
+
+    def test_second_request_skips_profile_query(self, jwt_api_client, django_assert_num_queries):
+        """After the first request the profile comes from the cache."""
+        jwt_api_client.get("/api/auth/me/")
+
+        with django_assert_num_queries(0):
+            response = jwt_api_client.get("/api/auth/me/")
+
+        assert response.status_code == 200
+
+    def test_any_save_invalidates(self, jwt_api_client, advocate_profile):
+        """A role or is_active change saved anywhere (admin, shell, another worker) applies at once."""
+        assert jwt_api_client.get("/api/auth/me/").status_code == 200
+
+        profile = User.objects.get(pk=advocate_profile.pk)
+        profile.role = "admin"
+        profile.save(update_fields=["role"])
+        assert jwt_api_client.get("/api/auth/me/").json()["role"] == "admin"
+
+        profile.is_active = False
+        profile.save(update_fields=["is_active"])
+        assert jwt_api_client.get("/api/auth/me/").status_code == 401
+
+    def test_per_process_cache_is_not_used(self, settings, jwt_api_client, advocate_profile):
+        """A locmem cache cannot be invalidated across workers, so profiles are read every time."""
+        settings.PROFILE_CACHE_ALIAS = "default"
+        jwt_api_client.get("/api/auth/me/")
+
+        User.objects.filter(pk=advocate_profile.pk).update(is_active=False)  # no signal
+
+        assert jwt_api_client.get("/api/auth/me/").status_code == 401
+
+    def test_profile_edit_does_not_undo_deactivation(self, advocate_profile, admin_profile):
+        """Saving a profile edit on a stale cached instance leaves is_active alone."""
+        from apps.accounts.serializers import ProfileUpdateSerializer
+        from utils.supabase_auth import get_cached_profile
+
+        cached = get_cached_profile(advocate_profile.pk)
+        admin = APIClient()
+        admin.force_authenticate(user=admin_profile)
+        admin.patch(f"/api/admin/advocates/{advocate_profile.id}/", {"is_active": False}, format="json")
+
+        serializer = ProfileUpdateSerializer(cached, data={"full_name": "Adv. Renamed"}, partial=True)
+        assert serializer.is_valid()
+        serializer.save()
+
+        advocate_profile.refresh_from_db()
+        assert advocate_profile.full_name == "Adv. Renamed"
+        assert advocate_profile.is_active is False
+
+    def test_profile_update_is_visible_immediately(self, jwt_api_client):
+        """PATCH /api/me/ invalidates the cached profile."""
+        jwt_api_client.get("/api/auth/me/")
+
+        jwt_api_client.patch("/api/me/", {"full_name": "Adv. Renamed"}, format="json")
+        response = jwt_api_client.get("/api/auth/me/")
+
+        assert response.json()["full_name"] == "Adv. Renamed"
+
+    def test_deactivation_blocks_cached_user(self, jwt_api_client, advocate_profile, admin_profile):
+        """An advocate disabled by an admin is rejected on their next request."""
+        assert jwt_api_client.get("/api/auth/me/").status_code == 200
+        admin = APIClient()
+        admin.force_authenticate(user=admin_profile)
+
+        response = admin.patch(
+            f"/api/admin/advocates/{advocate_profile.id}/", {"is_active": False}, format="json",
+        )
+
+        assert response.status_code == 200
+        assert jwt_api_client.get("/api/auth/me/").status_code == 401
+
+    def test_zero_ttl_disables_cache(self, settings, jwt_api_client, advocate_profile):
+        """PROFILE_CACHE_TTL=0 reads the profile on every request."""
+        settings.PROFILE_CACHE_TTL = 0
+        jwt_api_client.get("/api/auth/me/")
+        User.objects.filter(pk=advocate_profile.pk).update(full_name="Changed Directly")
+
+        assert jwt_api_client.get("/api/auth/me/").json()["full_name"] == "Changed Directly"
@@ -1,6 +1,7 @@
 """Account views for authentication."""
 from django.contrib.auth import login, logout, get_user_model
-from django.db.models import Count, Q
+from django.db.models import Q
+from django.db.models.functions import Coalesce
 from django.views.decorators.csrf import ensure_csrf_cookie
 from rest_framework import status
 from rest_framework.decorators import (
@@ -12,9 +13,7 @@ from rest_framework.response import Response
 from .serializers import (
     LoginSerializer, UserSerializer, ProfileUpdateSerializer, AdvocateListSerializer,
 )
-from apps.clients.models import Client
-from apps.cases.models import Case
-from apps.documents.models import Document
+from .stats import get_dashboard_stats
 
 User = get_user_model()
 
@@ -70,38 +69,24 @@ def update_profile_view(request):
 def dashboard_stats_view(request):
     """Return dashboard statistics. Admin sees system-wide; advocate sees own data."""
     user = request.user
-    if user.role == 'admin':
-        total_clients = Client.objects.count()
-        total_cases = Case.objects.count()
-        docs_qs = Document.objects.all()
-    else:
-        total_clients = Client.objects.filter(advocate=user).count()
-        total_cases = Case.objects.filter(advocate=user).count()
-        docs_qs = Document.objects.filter(advocate=user)
-    total_documents = docs_qs.count()
-    documents_by_status = {
-        "uploaded": docs_qs.filter(status="uploaded").count(),
-        "ready_to_process": docs_qs.filter(status="ready_to_process").count(),
-        "in_progress": docs_qs.filter(status="in_progress").count(),
-        "processed": docs_qs.filter(status="processed").count(),
-    }
+    stats = get_dashboard_stats(None if user.role == 'admin' else user.pk)
     return Response({
-        "total_clients": total_clients,
-        "total_cases": total_cases,
-        "total_documents": total_documents,
-        "documents_by_status": documents_by_status,
+        "total_clients": stats["total_clients"],
+        "total_cases": stats["total_cases"],
+        "total_documents": stats["total_documents"],
+        "documents_by_status": stats["documents_by_status"],
     })
 
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def admin_advocates_list(request):
-    """List all advocate users with aggregate counts."""
+    """List all advocate users with their counts from AdvocateStats."""
     advocates = (
         User.objects.filter(role='advocate')
         .annotate(
-            documents_count=Count('documents', distinct=True),
-            clients_count=Count('clients', distinct=True),
+            documents_count=Coalesce('stats__documents_count', 0),
+            clients_count=Coalesce('stats__clients_count', 0),
         )
         .order_by('-created_at')
     )
@@ -138,23 +123,12 @@ def admin_toggle_advocate(request, pk):
 @permission_classes([IsAdminUser])
 def admin_stats_view(request):
     """Return system-wide admin statistics."""
-    total_advocates = User.objects.filter(role='advocate').count()
-    active_advocates = User.objects.filter(role='advocate', is_active=True).count()
-    total_clients = Client.objects.count()
-    total_cases = Case.objects.count()
-    docs_qs = Document.objects.all()
-    total_documents = docs_qs.count()
-    documents_by_status = {
-        "uploaded": docs_qs.filter(status="uploaded").count(),
-        "ready_to_process": docs_qs.filter(status="ready_to_process").count(),
-        "in_progress": docs_qs.filter(status="in_progress").count(),
-        "processed": docs_qs.filter(status="processed").count(),
-    }
+    stats = get_dashboard_stats(None)
     return Response({
-        "total_advocates": total_advocates,
-        "active_advocates": active_advocates,
-        "total_clients": total_clients,
-        "total_cases": total_cases,
-        "total_documents": total_documents,
-        "documents_by_status": documents_by_status,
+        "total_advocates": stats["total_advocates"],
+        "active_advocates": stats["active_advocates"],
+        "total_clients": stats["total_clients"],
+        "total_cases": stats["total_cases"],
+        "total_documents": stats["total_documents"],
+        "documents_by_status": stats["documents_by_status"],
     })
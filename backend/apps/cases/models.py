@@ -35,6 +35,7 @@ class Case(models.Model):
         indexes = [
             models.Index(fields=['advocate', '-created_at']),
             models.Index(fields=['client']),
+            models.Index(fields=['-created_at']),  # admin-wide keyset pagination
         ]
 
     def __str__(self) -> str:
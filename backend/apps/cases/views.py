@@ -6,6 +6,8 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from utils.pagination import OptInCursorPagination
+
 from .models import Case, CaseEvent
 from .serializers import CaseSerializer, CaseCreateSerializer
 
@@ -43,6 +45,7 @@ class CaseViewSet(viewsets.ModelViewSet):
     search_fields = ['title', 'case_number']
     ordering_fields = ['title', 'created_at', 'status']
     ordering = ['-created_at']
+    pagination_class = OptInCursorPagination
 
     def get_queryset(self):
         """Return cases. Admin sees all; advocates see own."""
@@ -25,6 +25,7 @@ class Client(models.Model):
         indexes = [
             models.Index(fields=['advocate', '-created_at']),
             models.Index(fields=['email']),
+            models.Index(fields=['-created_at']),  # admin-wide keyset pagination
         ]
 
     def __str__(self):
@@ -4,6 +4,8 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from utils.pagination import OptInCursorPagination
+
 from .models import Client
 from .serializers import ClientSerializer, ClientDetailSerializer, ClientCreateSerializer
 
@@ -16,6 +18,7 @@ class ClientViewSet(viewsets.ModelViewSet):
     search_fields = ['full_name', 'email', 'phone']
     ordering_fields = ['full_name', 'created_at']
     ordering = ['-created_at']
+    pagination_class = OptInCursorPagination
     
     def get_queryset(self):
         """Return non-deleted clients. Admin sees all; advocates see own."""
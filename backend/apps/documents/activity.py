@@ -0,0 +1,172 @@
+"""Buffered writes for DocumentActivityLog.
+
+Activity logs are written as a side effect of chat, callbacks and document
+actions; a chat message alone logs two rows for each of up to five case
+documents. Instead of one INSERT per row, log_activity() collects rows in
+the active buffer and the buffer writes them with a single bulk_create
+when it closes:
+
+  - ActivityLogMiddleware opens a buffer per request, so rows logged
+    while handling a request are written once the view returns;
+  - `with activity_log_buffer():` does the same for code that runs outside
+    a request or after the response has started (the SSE chat stream).
+    Nested buffers join the outermost one.
+
+Buffered rows are written when the buffer closes, but a row logged inside
+an atomic block follows that block: it is registered with
+transaction.on_commit, and if the block (or the transaction around it)
+rolls back before the buffer closes, Django discards the callback and the
+row is dropped. Rows whose transaction committed, or is still open when
+the buffer closes, are written. Without an open buffer, log_activity()
+writes immediately (under a savepoint of any open transaction, so those
+rows roll back with it). Logging is best-effort: a failed write is logged
+and never raised.
+
+Usage:
+    from apps.documents.activity import activity_log_buffer, log_activity
+
+    with activity_log_buffer():
+        for doc in docs:
+            log_activity(doc, 'chat_sent', 'Chat: ...', actor=user.email)
+"""
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator, Optional, Union
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import transaction
+
+from .models import Document, DocumentActivityLog
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingEntry:
+    """A buffered row logged inside a transaction; kept unless that transaction rolls back."""
+
+    def __init__(self, entry: DocumentActivityLog) -> None:
+        self.entry = entry
+        self.committed = False
+        self.connection = transaction.get_connection()
+        transaction.on_commit(self)
+
+    def __call__(self) -> None:
+        self.committed = True
+
+    def kept(self) -> bool:
+        # Rolling back a savepoint or transaction removes the on_commit
+        # callbacks registered inside it; a callback still queued means its
+        # transaction is open, and the row is written in it.
+        return self.committed or any(callback[1] is self for callback in self.connection.run_on_commit)
+
+
+_buffer: ContextVar[Optional[list[Union[DocumentActivityLog, _PendingEntry]]]] = ContextVar(
+    'activity_log_buffer', default=None,
+)
+
+
+def log_activity(
+    document: Union[Document, int],
+    event_type: str,
+    message: str,
+    detail: str = '',
+    actor: str = 'system',
+) -> None:
+    """Record a DocumentActivityLog row, buffered when a buffer is open.
+
+    Args:
+        document: The Document or its id.
+        event_type: One of DocumentActivityLog.EVENT_TYPES.
+        message: User-facing summary.
+        detail: Optional extra detail.
+        actor: Who performed the action (email, 'n8n', 'system', ...).
+    """
+    entry = DocumentActivityLog(
+        document_id=getattr(document, 'pk', document),
+        event_type=event_type,
+        message=message,
+        detail=detail,
+        actor=actor,
+    )
+    entries = _buffer.get()
+    if entries is None:
+        _write([entry])
+    elif transaction.get_connection().in_atomic_block:
+        entries.append(_PendingEntry(entry))
+    else:
+        entries.append(entry)
+
+
+def _flush(entries: list[Union[DocumentActivityLog, _PendingEntry]]) -> None:
+    """Write a closed buffer, dropping rows whose transaction rolled back."""
+    rows = []
+    for entry in entries:
+        if not isinstance(entry, _PendingEntry):
+            rows.append(entry)
+        elif entry.kept():
+            rows.append(entry.entry)
+    _write(rows)
+
+
+def _write(entries: list[DocumentActivityLog]) -> None:
+    if not entries:
+        return
+    try:
+        # Savepoint: a failed write must not break the caller's transaction
+        with transaction.atomic():
+            DocumentActivityLog.objects.bulk_create(entries)
+    except Exception:
+        logger.exception(
+            "[ACTIVITY] Failed to write %d activity log(s) for documents %s",
+            len(entries), sorted({entry.document_id for entry in entries}),
+        )
+
+
+def _open() -> Optional[tuple[list[Union[DocumentActivityLog, _PendingEntry]], Token]]:
+    """Start a buffer, or return None if one is already open."""
+    if _buffer.get() is not None:
+        return None
+    entries: list[Union[DocumentActivityLog, _PendingEntry]] = []
+    return entries, _buffer.set(entries)
+
+
+@contextmanager
+def activity_log_buffer() -> Iterator[None]:
+    """Buffer log_activity() calls and write them in one bulk_create on exit."""
+    opened = _open()
+    try:
+        yield
+    finally:
+        if opened is not None:
+            entries, token = opened
+            _buffer.reset(token)
+            _flush(entries)
+
+
+class ActivityLogMiddleware:
+    """Buffer activity logs for the duration of each request (sync and async)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with activity_log_buffer():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        opened = _open()
+        try:
+            return await self.get_response(request)
+        finally:
+            if opened is not None:
+                entries, token = opened
+                _buffer.reset(token)
+                await sync_to_async(_flush)(entries)
@@ -0,0 +1,34 @@
+"""Management command to abort stale resumable uploads and free their parts."""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.documents.models import UploadSession
+from utils.storage import get_storage_backend
+
+
+class Command(BaseCommand):
+    help = 'Abort resumable uploads with no progress for the given number of hours.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=24,
+            help='Abort active sessions idle for longer than this (default 24).',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        stale = UploadSession.objects.filter(status='active', updated_at__lt=cutoff)
+        backend = get_storage_backend()
+
+        aborted = 0
+        for session in stale.iterator():
+            backend.abort_resumable(session.upload_token)
+            session.status = 'aborted'
+            session.save(update_fields=['status', 'updated_at'])
+            aborted += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Aborted {aborted} stale upload session(s).'))
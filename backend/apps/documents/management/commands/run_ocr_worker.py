@@ -0,0 +1,79 @@
+"""Management command that runs queued OCR dispatch jobs."""
+import logging
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from apps.documents.ocr_queue import claim_jobs, run_job
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Claim queued OCR jobs and dispatch them to n8n.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.OCR_QUEUE_CONCURRENCY,
+            help='Jobs this worker runs at once (default OCR_QUEUE_CONCURRENCY).',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no runnable jobs are left instead of polling.',
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(options['concurrency'], 1)
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        stop = threading.Event()
+
+        def _request_stop(signum, frame):
+            self.stdout.write('Stopping after in-flight jobs finish...')
+            stop.set()
+
+        signal.signal(signal.SIGTERM, _request_stop)
+        signal.signal(signal.SIGINT, _request_stop)
+
+        self.stdout.write(f'OCR worker {worker_id} started (concurrency={concurrency}).')
+        done = 0
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='ocr') as pool:
+            while not stop.is_set():
+                free = concurrency - len(in_flight)
+                jobs = claim_jobs(worker_id, free) if free else []
+                for job in jobs:
+                    in_flight.add(pool.submit(self._run, job, worker_id))
+                if not in_flight:
+                    if options['once']:
+                        break
+                    stop.wait(settings.OCR_QUEUE_POLL_INTERVAL)
+                    continue
+                finished, in_flight = wait(
+                    in_flight, timeout=settings.OCR_QUEUE_POLL_INTERVAL, return_when=FIRST_COMPLETED,
+                )
+                done += len(finished)
+            finished, _ = wait(in_flight)
+            done += len(finished)
+
+        self.stdout.write(self.style.SUCCESS(f'OCR worker {worker_id} ran {done} job(s).'))
+
+    @staticmethod
+    def _run(job, worker_id: str) -> None:
+        """Run one job on a pool thread with its own DB connection."""
+        close_old_connections()
+        try:
+            run_job(job, worker_id)
+        except Exception:
+            # The lease expires and the job is retried by the next claim
+            logger.exception("[OCR_QUEUE] job=%s crashed in worker %s", job.id, worker_id)
+        finally:
+            connection.close()
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0008_ocrjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='checksum_sha256',
+            field=models.CharField(blank=True, help_text='SHA-256 of the original file (hex)', max_length=64),
+        ),
+    ]
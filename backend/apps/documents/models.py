@@ -1,4 +1,6 @@
 """Document models for Legal Aid App."""
+import uuid
+
 from django.conf import settings
 from django.db import models
 
@@ -42,6 +44,7 @@ class Document(models.Model):
     file_type = models.CharField(max_length=10, choices=FILE_TYPE_CHOICES)
     file_size_bytes = models.BigIntegerField()
     mime_type = models.CharField(max_length=100)
+    checksum_sha256 = models.CharField(max_length=64, blank=True, help_text='SHA-256 of the original file (hex)')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploaded')
     notes = models.TextField(blank=True)
     processed_output_path = models.TextField(blank=True, null=True)
@@ -61,11 +64,19 @@ class Document(models.Model):
             models.Index(fields=['advocate', '-created_at']),
             models.Index(fields=['case']),
             models.Index(fields=['status']),
+            models.Index(fields=['-created_at']),  # admin-wide keyset pagination
         ]
 
     def __str__(self) -> str:
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded status so saves can tell which status a document left."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
     def can_transition_to(self, new_status: str) -> bool:
         """Check if the document can transition to the given status."""
         return new_status in self.VALID_TRANSITIONS.get(self.status, [])
@@ -245,3 +256,105 @@ class DocumentActivityLog(models.Model):
 
     def __str__(self) -> str:
         return f"{self.document.name} — {self.event_type}: {self.message[:60]}"
+
+
+class UploadSession(models.Model):
+    """A resumable (chunked) document upload in progress.
+
+    Parts are appended at `offset` until it reaches `total_size`; the
+    session is then completed into a Document. `upload_token` is the
+    storage backend's handle for the partial upload.
+    """
+
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('completed', 'Completed'),
+        ('aborted', 'Aborted'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    advocate = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+    )
+    case = models.ForeignKey(
+        'cases.Case',
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+    )
+    name = models.CharField(max_length=255)
+    filename = models.CharField(max_length=255)
+    mime_type = models.CharField(max_length=100)
+    notes = models.TextField(blank=True)
+    total_size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    storage_path = models.TextField(help_text='Target storage path for the assembled file')
+    upload_token = models.TextField(help_text='Storage backend handle for the partial upload')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='active')
+    document = models.OneToOneField(
+        Document,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload_session',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['advocate', 'status']),
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.filename} ({self.offset}/{self.total_size})"
+
+    @property
+    def is_complete(self) -> bool:
+        """Whether every byte has been received."""
+        return self.offset >= self.total_size
+
+
+class OCRJob(models.Model):
+    """A queued request to send a document through the n8n OCR pipeline.
+
+    Jobs are claimed by `run_ocr_worker` processes. A running job holds a
+    lease until `locked_until`; if the worker dies the lease expires and
+    another worker picks the job up again (visibility timeout).
+    """
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.CASCADE,
+        related_name='ocr_jobs',
+    )
+    advocate_email = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    available_at = models.DateTimeField(help_text='Not claimable before this time (retry backoff)')
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True, help_text='Lease expiry for a running job')
+    detail = models.TextField(blank=True, help_text='Last error, or how the job finished')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+            models.Index(fields=['status', 'locked_until']),
+        ]
+
+    def __str__(self) -> str:
+        return f"OCR job {self.id} for {self.document_id} ({self.status})"
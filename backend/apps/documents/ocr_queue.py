@@ -0,0 +1,222 @@
+"""Durable queue for dispatching documents to the n8n OCR pipeline.
+
+`update_status` used to call n8n inline, holding a gunicorn worker for up
+to two minutes per document. It now enqueues an OCRJob and returns;
+`python manage.py run_ocr_worker` claims jobs and runs the dispatch.
+
+Claiming runs in one transaction under a queue-wide lock (a PostgreSQL
+advisory lock), so any number of worker processes can share the table
+without double-running a job, and the live-lease count and the claims made
+against it cannot interleave with another worker's. A claimed job holds a
+lease for OCR_QUEUE_VISIBILITY_TIMEOUT seconds; if its worker dies, the
+lease expires and the job becomes claimable again. At most
+OCR_QUEUE_MAX_RUNNING jobs hold a live lease at once across all workers.
+
+Usage:
+    from apps.documents.ocr_queue import enqueue_ocr
+
+    enqueue_ocr(document, advocate_email=request.user.email)
+"""
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.accounts.stats import record_status_change
+from apps.webhooks.outbound import notify_n8n_ready_to_process
+
+from .models import Document, DocumentStatusHistory, OCRJob
+
+logger = logging.getLogger(__name__)
+
+# Key of the transaction-scoped advisory lock that serialises claim_jobs
+CLAIM_LOCK_KEY = 0x0C12_0001
+
+
+def enqueue_ocr(document: Document, advocate_email: str = '') -> OCRJob:
+    """Queue a document for OCR, reusing a job that is still waiting to run."""
+    job = OCRJob.objects.filter(document=document, status='queued').first()
+    if job:
+        return job
+    job = OCRJob.objects.create(
+        document=document,
+        advocate_email=advocate_email,
+        max_attempts=settings.OCR_QUEUE_MAX_ATTEMPTS,
+        available_at=timezone.now(),
+    )
+    logger.info("[OCR_QUEUE] enqueued job=%s doc_id=%s", job.id, document.id)
+    return job
+
+
+def claim_jobs(worker_id: str, limit: int) -> list[OCRJob]:
+    """Lease up to `limit` runnable jobs for this worker.
+
+    Runnable jobs are queued jobs past their backoff and running jobs whose
+    lease has expired. Expired jobs that are out of attempts are failed
+    instead of being re-run. The running count is read under the claim
+    lock, so concurrent workers never lease more than OCR_QUEUE_MAX_RUNNING.
+    """
+    with transaction.atomic():
+        _lock_claims()
+        now = timezone.now()
+        live = OCRJob.objects.filter(status='running', locked_until__gt=now).count()
+        slots = min(limit, settings.OCR_QUEUE_MAX_RUNNING - live)
+        if slots <= 0:
+            return []
+
+        # skip_locked passes over rows a worker is finishing or requeueing right now
+        candidates = OCRJob.objects.select_for_update(skip_locked=True).filter(
+            Q(status='queued', available_at__lte=now) | Q(status='running', locked_until__lte=now),
+        ).order_by('available_at')[:slots * 2]
+
+        lease_until = now + timedelta(seconds=settings.OCR_QUEUE_VISIBILITY_TIMEOUT)
+        claimed: list[OCRJob] = []
+        for job in candidates:
+            if len(claimed) >= slots:
+                break
+            if job.status == 'running' and job.attempts >= job.max_attempts:
+                _fail(job, 'Lease expired on final attempt (worker lost)', expected_worker=job.locked_by)
+                continue
+            won = OCRJob.objects.filter(
+                pk=job.pk, status=job.status, locked_until=job.locked_until, attempts=job.attempts,
+            ).update(
+                status='running',
+                locked_by=worker_id,
+                locked_until=lease_until,
+                attempts=F('attempts') + 1,
+                updated_at=now,
+            )
+            if won:
+                if job.status == 'running':
+                    logger.warning("[OCR_QUEUE] reclaimed expired job=%s from %s", job.id, job.locked_by)
+                job.refresh_from_db()
+                claimed.append(job)
+    return claimed
+
+
+def _lock_claims() -> None:
+    """Serialise claimers until the surrounding transaction ends.
+
+    SQLite needs no lock here: it admits one writer at a time, and a claimer
+    whose count went stale fails to write instead of overshooting.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [CLAIM_LOCK_KEY])
+
+
+def run_job(job: OCRJob, worker_id: str) -> None:
+    """Dispatch one claimed job to n8n and record the outcome."""
+    document = Document.objects.select_related('case', 'case__client').get(pk=job.document_id)
+    if document.status != 'in_progress':
+        logger.info(
+            "[OCR_QUEUE] job=%s skipped: doc_id=%s is now %s", job.id, document.id, document.status,
+        )
+        _finish(job, worker_id, 'succeeded', f'Skipped: document is {document.status}')
+        return
+    if not os.environ.get('N8N_OUTBOUND_WEBHOOK_URL', ''):
+        _finish(job, worker_id, 'succeeded', 'Skipped: N8N_OUTBOUND_WEBHOOK_URL not configured')
+        return
+
+    client_name = document.case.client.full_name if document.case.client else ''
+    logger.info(
+        "[DOC_N8N_SEND] job=%s attempt=%d doc_id=%s name='%s' file_path=%s case=%s client=%s",
+        job.id, job.attempts, document.id, document.name, document.file_path,
+        document.case.title, client_name or 'N/A',
+    )
+    try:
+        result = notify_n8n_ready_to_process(
+            document_id=document.id,
+            document_name=document.name,
+            file_path=document.file_path,
+            case_title=document.case.title,
+            advocate_email=job.advocate_email,
+            client_name=client_name,
+            case_id=document.case_id,
+        )
+    except Exception as exc:
+        logger.exception("[OCR_QUEUE] job=%s raised", job.id)
+        result = None
+        error = f'{type(exc).__name__}: {exc}'
+    else:
+        error = 'n8n request failed or timed out'
+
+    logger.info(
+        "[DOC_N8N_RESULT] job=%s doc_id=%s result_type=%s keys=%s",
+        job.id, document.id,
+        type(result).__name__ if result else 'None',
+        list(result.keys()) if isinstance(result, dict) else 'N/A',
+    )
+    if result is None:
+        _retry_or_fail(job, worker_id, error)
+        return
+
+    files_stored = result.get('files_stored', {})
+    with transaction.atomic():
+        if files_stored:
+            # Files came back in the synchronous response — mark as processed
+            updated = Document.objects.filter(pk=document.pk, status='in_progress').update(
+                status='processed', updated_at=timezone.now(),
+            )
+            if updated:
+                record_status_change(document.advocate_id, 'in_progress', 'processed')  # update() sends no signals
+                DocumentStatusHistory.objects.create(
+                    document=document,
+                    from_status='in_progress',
+                    to_status='processed',
+                    changed_by=None,
+                    notes=f'Processed by n8n OCR: {len(files_stored)} file(s) returned directly',
+                )
+            note = f'{len(files_stored)} file(s) stored'
+        else:
+            # n8n acknowledged but returned no files — the async callback will finish it
+            note = 'n8n acknowledged; waiting for async callback'
+        _finish(job, worker_id, 'succeeded', note)
+
+
+def _retry_or_fail(job: OCRJob, worker_id: str, error: str) -> None:
+    """Requeue with exponential backoff, or fail once attempts are used up."""
+    if job.attempts >= job.max_attempts:
+        _fail(job, error, expected_worker=worker_id)
+        return
+    delay = settings.OCR_QUEUE_RETRY_DELAY * 2 ** (job.attempts - 1)
+    OCRJob.objects.filter(pk=job.pk, locked_by=worker_id, status='running').update(
+        status='queued',
+        locked_by='',
+        locked_until=None,
+        available_at=timezone.now() + timedelta(seconds=delay),
+        detail=error,
+        updated_at=timezone.now(),
+    )
+    logger.warning(
+        "[OCR_QUEUE] job=%s attempt %d/%d failed (%s); retrying in %ds",
+        job.id, job.attempts, job.max_attempts, error, delay,
+    )
+
+
+def _fail(job: OCRJob, error: str, expected_worker: str) -> None:
+    """Mark a job failed and note it on the document's history."""
+    updated = OCRJob.objects.filter(pk=job.pk, locked_by=expected_worker, status='running').update(
+        status='failed', locked_until=None, detail=error, updated_at=timezone.now(),
+    )
+    if not updated:
+        return
+    logger.error("[OCR_QUEUE] job=%s failed after %d attempt(s): %s", job.id, job.attempts, error)
+    DocumentStatusHistory.objects.create(
+        document_id=job.document_id,
+        from_status='in_progress',
+        to_status='in_progress',
+        changed_by=None,
+        notes=f'OCR dispatch failed after {job.attempts} attempt(s): {error} — waiting for async callback',
+    )
+
+
+def _finish(job: OCRJob, worker_id: str, job_status: str, note: str) -> None:
+    """Release the lease with a final status, if this worker still holds it."""
+    OCRJob.objects.filter(pk=job.pk, locked_by=worker_id, status='running').update(
+        status=job_status, locked_until=None, detail=note, updated_at=timezone.now(),
+    )
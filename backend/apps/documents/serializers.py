@@ -1,9 +1,17 @@
 """Document serializers for API."""
+import hashlib
 import os
 from typing import Optional
+from urllib.parse import urlencode
 
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Document, DocumentStatusHistory
+
+from utils.sparse_fields import SparseFieldsetMixin
+
+from .models import Document, DocumentStatusHistory, UploadSession
 
 ALLOWED_MIME_TYPES = {
     'image/jpeg': 'image',
@@ -12,6 +20,49 @@ ALLOWED_MIME_TYPES = {
 }
 MAX_FILE_SIZE = 20 * 1024 * 1024  # 20MB
 
+# Artifact kind (as used in /api/documents/<id>/artifact/<kind>/) -> Document path field
+ARTIFACT_PATH_FIELDS = {
+    'file': 'file_path',
+    'processed_html': 'processed_html_path',
+    'processed_json': 'processed_json_path',
+    'processed_report': 'processed_report_path',
+    'extracted_pdf': 'extracted_pdf_path',
+    'html_v2': 'html_v2_path',
+    'txt_v2': 'txt_v2_path',
+    'corrections_log': 'corrections_log_path',
+}
+
+# Serializer URL field -> Document path field it is signed from
+STORAGE_URL_FIELDS = {f'{kind}_url': path_field for kind, path_field in ARTIFACT_PATH_FIELDS.items()}
+
+ARTIFACT_URL_MODES = ('signed', 'lazy')
+
+ARTIFACT_TOKEN_SALT = 'apps.documents.artifact-link'
+
+
+def artifact_token(document_id, kind: str) -> str:
+    """Return a signed token granting read access to one artifact of one document."""
+    return signing.dumps({'doc': str(document_id), 'kind': kind}, salt=ARTIFACT_TOKEN_SALT)
+
+
+def artifact_token_grants(token: Optional[str], document_id, kind: str) -> bool:
+    """Return True if token is an unexpired grant for this document and artifact kind."""
+    if not token:
+        return False
+    try:
+        grant = signing.loads(token, salt=ARTIFACT_TOKEN_SALT, max_age=settings.ARTIFACT_LINK_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return isinstance(grant, dict) and grant.get('doc') == str(document_id) and grant.get('kind') == kind
+
+
+def artifact_url_mode(request) -> str:
+    """Return 'signed' or 'lazy' from ?artifact_urls=, else DOCUMENT_ARTIFACT_URLS."""
+    mode = request.query_params.get('artifact_urls') if request is not None else None
+    if mode not in ARTIFACT_URL_MODES:
+        mode = getattr(settings, 'DOCUMENT_ARTIFACT_URLS', 'signed')
+    return mode
+
 
 class DocumentStatusHistorySerializer(serializers.ModelSerializer):
     """Serializer for document status history entries."""
@@ -32,8 +83,28 @@ class DocumentStatusHistorySerializer(serializers.ModelSerializer):
         return 'System'
 
 
-class DocumentSerializer(serializers.ModelSerializer):
-    """Serializer for Document model."""
+class DocumentListSerializer(serializers.ListSerializer):
+    """List serializer that signs every artifact URL on the page in one call."""
+
+    def to_representation(self, data):
+        """Prime the child's URL map for all documents, then serialize."""
+        documents = list(data.all() if hasattr(data, 'all') else data)
+        self.child.prime_storage_urls(documents)
+        return super().to_representation(documents)
+
+
+class DocumentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Serializer for Document model.
+
+    Artifact URLs are signed in bulk: a single document signs all of its
+    paths together, and DocumentListSerializer signs a whole page at once.
+    In lazy mode (see artifact_url_mode) they are instead stable
+    /api/documents/<id>/artifact/<kind>/ links, and no storage calls are
+    made; the link is signed only when followed.
+
+    GET requests can narrow the output with ?fields= / ?omit= (see
+    utils.sparse_fields); only the URL fields left are signed.
+    """
 
     case_id = serializers.IntegerField(source='case.id', read_only=True)
     case_title = serializers.CharField(source='case.title', read_only=True)
@@ -86,6 +157,7 @@ class DocumentSerializer(serializers.ModelSerializer):
             'updated_at',
             'status_history',
         ]
+        list_serializer_class = DocumentListSerializer
         read_only_fields = [
             'id', 'advocate', 'case_id', 'case_title', 'client_name', 'client_id',
             'file_url', 'processed_html_url', 'processed_json_url',
@@ -94,46 +166,116 @@ class DocumentSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'status_history',
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._storage_urls: dict[str, Optional[str]] = {}
+
+    @property
+    def lazy_urls(self) -> bool:
+        """Whether artifact URLs are resolver links rather than signed URLs."""
+        return artifact_url_mode(self.context.get('request')) == 'lazy'
+
+    def prime_storage_urls(self, documents: list) -> None:
+        """Sign every non-empty artifact path of the given documents in one batch."""
+        from utils.storage import get_storage_backend
+
+        if self.lazy_urls:
+            return
+        path_fields = [path for field, path in STORAGE_URL_FIELDS.items() if field in self.fields]
+        paths = {getattr(doc, path_field) for doc in documents for path_field in path_fields}
+        paths.discard(None)
+        paths.discard('')
+        if not paths:
+            self._storage_urls = {}
+            return
+        backend = get_storage_backend()
+        self._storage_urls = backend.get_urls(paths, request=self.context.get('request'))
+
+    def to_representation(self, instance):
+        """Sign this document's URLs together unless a list parent already did."""
+        if not isinstance(self.parent, DocumentListSerializer):
+            self.prime_storage_urls([instance])
+        return super().to_representation(instance)
+
     def _get_storage_url(self, path: Optional[str]) -> Optional[str]:
         """Build a URL for a stored file via the storage backend."""
         from utils.storage import get_storage_backend
 
         if not path:
             return None
+        if path in self._storage_urls:
+            return self._storage_urls[path]
         backend = get_storage_backend()
         return backend.get_url(path, request=self.context.get('request'))
 
+    def _get_artifact_url(self, obj, kind: str) -> Optional[str]:
+        """Return the URL for one artifact: signed, or a resolver link in lazy mode."""
+        path = getattr(obj, ARTIFACT_PATH_FIELDS[kind])
+        if not path or not self.lazy_urls:
+            return self._get_storage_url(path)
+        url = reverse('document-artifact', kwargs={'pk': obj.pk, 'kind': kind})
+        # The token lets browsers follow the link (<a href>, <img src>) without an Authorization header
+        url = f'{url}?{urlencode({"token": artifact_token(obj.pk, kind)})}'
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
     def get_file_url(self, obj) -> Optional[str]:
         """Build full URL for the uploaded file via storage backend."""
-        return self._get_storage_url(obj.file_path)
+        return self._get_artifact_url(obj, 'file')
 
     def get_processed_html_url(self, obj) -> Optional[str]:
         """Build URL for the validated HTML output."""
-        return self._get_storage_url(obj.processed_html_path)
+        return self._get_artifact_url(obj, 'processed_html')
 
     def get_processed_json_url(self, obj) -> Optional[str]:
         """Build URL for the consolidated JSON output."""
-        return self._get_storage_url(obj.processed_json_path)
+        return self._get_artifact_url(obj, 'processed_json')
 
     def get_processed_report_url(self, obj) -> Optional[str]:
         """Build URL for the validation report."""
-        return self._get_storage_url(obj.processed_report_path)
+        return self._get_artifact_url(obj, 'processed_report')
 
     def get_extracted_pdf_url(self, obj) -> Optional[str]:
         """Build URL for the extracted/generated PDF."""
-        return self._get_storage_url(obj.extracted_pdf_path)
+        return self._get_artifact_url(obj, 'extracted_pdf')
 
     def get_html_v2_url(self, obj) -> Optional[str]:
         """Build URL for the v2 HTML (finalized, clean)."""
-        return self._get_storage_url(obj.html_v2_path)
+        return self._get_artifact_url(obj, 'html_v2')
 
     def get_txt_v2_url(self, obj) -> Optional[str]:
         """Build URL for the v2 TXT (for RAG indexing)."""
-        return self._get_storage_url(obj.txt_v2_path)
+        return self._get_artifact_url(obj, 'txt_v2')
 
     def get_corrections_log_url(self, obj) -> Optional[str]:
         """Build URL for the corrections log."""
-        return self._get_storage_url(obj.corrections_log_path)
+        return self._get_artifact_url(obj, 'corrections_log')
+
+
+class DocumentSummarySerializer(DocumentSerializer):
+    """Lightweight document row for tables (?view=summary on the list endpoint).
+
+    Drops status history, storage paths and processed-artifact URLs; only
+    the original file's URL is signed.
+    """
+
+    class Meta(DocumentSerializer.Meta):
+        fields = [
+            'id',
+            'case_id',
+            'case_title',
+            'client_id',
+            'client_name',
+            'name',
+            'file_url',
+            'file_type',
+            'file_size_bytes',
+            'mime_type',
+            'status',
+            'notes',
+            'created_at',
+            'updated_at',
+        ]
 
 
 class DocumentCreateSerializer(serializers.Serializer):
@@ -174,8 +316,18 @@ class DocumentCreateSerializer(serializers.Serializer):
             raise serializers.ValidationError("Advocate is required.")
 
         relative_path = f"{advocate.id}/{case.id}/{uploaded_file.name}"
+        checksum = hashlib.sha256()
+
+        def hashed_chunks():
+            # Hash while streaming to storage instead of reading the file twice
+            for chunk in uploaded_file.chunks():
+                checksum.update(chunk)
+                yield chunk
+
         backend = get_storage_backend()
-        stored_path = backend.upload(uploaded_file, relative_path)
+        stored_path = backend.upload_content(
+            hashed_chunks(), relative_path, content_type=mime_type, size=uploaded_file.size,
+        )
 
         return Document.objects.create(
             case=case,
@@ -185,6 +337,7 @@ class DocumentCreateSerializer(serializers.Serializer):
             file_type=file_type,
             file_size_bytes=uploaded_file.size,
             mime_type=mime_type,
+            checksum_sha256=checksum.hexdigest(),
             notes=validated_data.get('notes', ''),
         )
 
@@ -194,3 +347,80 @@ class DocumentStatusSerializer(serializers.Serializer):
 
     status = serializers.ChoiceField(choices=Document.STATUS_CHOICES)
     notes = serializers.CharField(required=False, allow_blank=True)
+
+
+class UploadSessionCreateSerializer(serializers.Serializer):
+    """Validates the init request for a resumable upload."""
+
+    max_size_setting = 'RESUMABLE_UPLOAD_MAX_SIZE'
+
+    case = serializers.PrimaryKeyRelatedField(
+        queryset=Document._meta.get_field('case').related_model.objects.all(),
+    )
+    filename = serializers.CharField(max_length=255)
+    name = serializers.CharField(max_length=255, required=False)
+    mime_type = serializers.CharField(max_length=100)
+    size = serializers.IntegerField(min_value=1)
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate_case(self, value):
+        """Only allow uploads into the requesting advocate's own cases."""
+        user = self.context['request'].user
+        if user.role != 'admin' and value.advocate_id != user.id:
+            raise serializers.ValidationError('Case not found.')
+        return value
+
+    def validate_filename(self, value):
+        """Strip any directory components from the client-supplied name."""
+        filename = os.path.basename(value.replace('\\', '/'))
+        if not filename:
+            raise serializers.ValidationError('Invalid filename.')
+        return filename
+
+    def validate_mime_type(self, value):
+        """Validate file type against the same allow-list as direct uploads."""
+        if value not in ALLOWED_MIME_TYPES:
+            raise serializers.ValidationError(
+                f'Unsupported file type: {value}. '
+                f'Allowed: {", ".join(ALLOWED_MIME_TYPES.keys())}'
+            )
+        return value
+
+    def validate_size(self, value):
+        """Validate the declared size against the upload cap."""
+        max_size = getattr(settings, self.max_size_setting)
+        if value > max_size:
+            raise serializers.ValidationError(
+                f'File too large: {value} bytes. Maximum is {max_size // (1024 * 1024)}MB.'
+            )
+        return value
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Serializer for resumable upload session state."""
+
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id', 'case', 'name', 'filename', 'mime_type', 'total_size',
+            'offset', 'chunk_size', 'status', 'document', 'created_at', 'updated_at',
+        ]
+        read_only_fields = fields
+
+    def get_chunk_size(self, obj) -> int:
+        """Part size clients should send (Supabase needs fixed-size parts)."""
+        return settings.RESUMABLE_UPLOAD_CHUNK_SIZE
+
+
+class DirectUploadCreateSerializer(UploadSessionCreateSerializer):
+    """Validates a request for a direct-to-storage upload URL."""
+
+    max_size_setting = 'DIRECT_UPLOAD_MAX_SIZE'
+
+
+class DirectUploadConfirmSerializer(serializers.Serializer):
+    """Validates the confirm request after a direct-to-storage upload."""
+
+    upload_id = serializers.CharField()
@@ -0,0 +1,134 @@
+"""Tests for buffered activity-log writes."""
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection, transaction
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+
+from apps.cases.models import Case
+from apps.clients.models import Client
+from apps.documents.activity import activity_log_buffer, log_activity
+from apps.documents.models import Document, DocumentActivityLog
+
+User = get_user_model()
+
+
+@pytest.fixture
+def advocate(db):
+    return User.objects.create_user(email='advocate@legalaid.test', password='Test@123456', full_name='Adv')
+
+
+@pytest.fixture
+def case(advocate):
+    client = Client.objects.create(advocate=advocate, full_name='Asha Rao', email='asha@example.com')
+    case = Case.objects.create(advocate=advocate, client=client, title='Lease Dispute', case_number='LD-1')
+    for n in range(6):
+        Document.objects.create(
+            advocate=advocate, case=case, name=f'doc{n}.pdf', file_path=f'a/c/doc{n}.pdf',
+            file_type='pdf', file_size_bytes=1, mime_type='application/pdf',
+        )
+    return case
+
+
+def _activity_inserts(queries) -> int:
+    table = DocumentActivityLog._meta.db_table
+    return sum(1 for query in queries if query['sql'].startswith(f'INSERT INTO "{table}"'))
+
+
+class TestActivityLogBuffer:
+    """Tests for log_activity() and activity_log_buffer()."""
+
+    def test_buffer_writes_all_rows_in_one_insert(self, case):
+        """Rows logged inside a buffer are written by a single bulk_create on exit."""
+        docs = list(case.documents.all())
+        with CaptureQueriesContext(connection) as queries:
+            with activity_log_buffer():
+                with activity_log_buffer():  # nested buffers join the outer one
+                    for doc in docs:
+                        log_activity(doc, 'chat_sent', 'Chat: hi', actor='advocate@legalaid.test')
+                assert DocumentActivityLog.objects.count() == 0
+                log_activity(docs[0].pk, 'chat_received', 'LIA: hello', actor='LIA')
+
+        assert _activity_inserts(queries.captured_queries) == 1
+        assert DocumentActivityLog.objects.count() == len(docs) + 1
+
+    def test_without_buffer_writes_immediately(self, case):
+        """Outside a buffer each call is written at once."""
+        log_activity(case.documents.first(), 'status_change', 'Status changed')
+
+        assert DocumentActivityLog.objects.count() == 1
+
+    def test_rows_from_a_rolled_back_block_are_dropped(self, case):
+        """A buffered row logged inside an atomic block that rolls back is not written."""
+        doc = case.documents.first()
+        with activity_log_buffer():
+            with transaction.atomic():
+                log_activity(doc, 'status_change', 'Kept')
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    log_activity(doc, 'status_change', 'Rolled back')
+                    raise RuntimeError
+
+        assert list(DocumentActivityLog.objects.filter(document=doc).values_list('message', flat=True)) == ['Kept']
+
+    def test_unbuffered_rows_roll_back_with_the_transaction(self, case):
+        """Without a buffer the row is written in the caller's transaction."""
+        doc = case.documents.first()
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                log_activity(doc, 'status_change', 'Status changed')
+                raise RuntimeError
+
+        assert not DocumentActivityLog.objects.filter(document=doc).exists()
+
+    def test_failed_write_is_not_raised(self, case):
+        """Logging is best-effort: a failed write does not break the caller."""
+        with mock.patch.object(DocumentActivityLog.objects, 'bulk_create', side_effect=DatabaseError('down')):
+            with activity_log_buffer():
+                log_activity(case.documents.first(), 'status_change', 'Status changed')
+
+        assert DocumentActivityLog.objects.count() == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_buffer_keeps_committed_and_drops_rolled_back_transactions(case):
+    """With real commits, rows follow the outcome of the transaction they were logged in."""
+    doc = case.documents.first()
+    with activity_log_buffer():
+        log_activity(doc, 'status_change', 'Outside')
+        with transaction.atomic():
+            log_activity(doc, 'status_change', 'Committed')
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                log_activity(doc, 'status_change', 'Rolled back')
+                raise RuntimeError
+        assert DocumentActivityLog.objects.count() == 0
+
+    messages = set(DocumentActivityLog.objects.filter(document=doc).values_list('message', flat=True))
+    assert messages == {'Outside', 'Committed'}
+
+
+class TestActivityLogMiddleware:
+    """Requests buffer their activity logs."""
+
+    def test_chat_relay_logs_with_one_insert(self, advocate, case, monkeypatch):
+        """A chat about a case logs two rows per document (up to five) in one INSERT."""
+        monkeypatch.delenv('N8N_CHAT_WEBHOOK_URL', raising=False)
+        client = AsyncClient()
+        client.force_login(advocate)
+
+        async def post():
+            return await client.post(
+                '/api/chat/', {'message': 'Summarize the case', 'case_id': case.id}, content_type='application/json',
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = async_to_sync(post)()
+
+        assert response.status_code == 201
+        assert _activity_inserts(queries.captured_queries) == 1
+        assert DocumentActivityLog.objects.filter(event_type='chat_sent').count() == 5
+        assert DocumentActivityLog.objects.filter(event_type='chat_received').count() == 5
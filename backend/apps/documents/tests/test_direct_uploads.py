@@ -0,0 +1,185 @@
+"""Tests for direct-to-storage document upload endpoints."""
+import os
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import Client as TestClient
+
+from apps.cases.models import Case
+from apps.clients.models import Client
+from apps.documents.models import Document
+
+User = get_user_model()
+
+CONTENT = b'%PDF-1.4 ' + b'x' * 100
+
+
+@pytest.fixture
+def advocate_user(db):
+    """Create and return a test advocate user."""
+    return User.objects.create_user(
+        email='advocate@legalaid.test',
+        password='Test@123456',
+        full_name='Adv. Rajesh Kumar',
+        role='advocate',
+    )
+
+
+@pytest.fixture
+def authenticated_client(advocate_user):
+    """Return an authenticated test client."""
+    client = TestClient()
+    client.login(email='advocate@legalaid.test', password='Test@123456')
+    return client
+
+
+@pytest.fixture
+def sample_case(advocate_user):
+    """Create a sample case with a client."""
+    client = Client.objects.create(
+        advocate=advocate_user, full_name='Test Client', email='client@example.com',
+    )
+    return Case.objects.create(
+        advocate=advocate_user, client=client, title='Property Dispute', case_number='PD-2026-001',
+    )
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    """Point MEDIA_ROOT at a temp dir and use local storage."""
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.STORAGE_BACKEND = 'local'
+    return tmp_path
+
+
+def _request_upload(client, case, size=len(CONTENT), **extra):
+    payload = {
+        'case': case.id, 'filename': 'scan.pdf', 'mime_type': 'application/pdf', 'size': size, **extra,
+    }
+    return client.post('/api/documents/direct-uploads/', data=payload, content_type='application/json')
+
+
+def _put(url, body, content_type='application/pdf'):
+    return TestClient().put(url, data=body, content_type=content_type)
+
+
+def _confirm(client, upload_id):
+    return client.post(
+        '/api/documents/direct-uploads/confirm/', data={'upload_id': upload_id}, content_type='application/json',
+    )
+
+
+class TestDirectUpload:
+    """Tests for the request-URL / PUT / confirm flow."""
+
+    def test_upload_and_confirm_creates_document(self, authenticated_client, sample_case, advocate_user, media_root):
+        """Bytes PUT to the signed URL become a document on confirm."""
+        issued = _request_upload(authenticated_client, sample_case, name='Scan')
+        assert issued.status_code == 201
+        data = issued.json()
+        assert data['method'] == 'PUT'
+        assert data['storage_path'].startswith(f'{advocate_user.id}/{sample_case.id}/')
+
+        assert _put(data['upload_url'], CONTENT).status_code == 200
+
+        confirmed = _confirm(authenticated_client, data['upload_id'])
+        assert confirmed.status_code == 201
+        body = confirmed.json()
+        assert body['name'] == 'Scan'
+        assert body['file_size_bytes'] == len(CONTENT)
+        assert Document.objects.get(pk=body['id']).file_path == data['storage_path']
+
+    def test_size_mismatch_rejected_and_object_deleted(self, authenticated_client, sample_case, media_root):
+        """A stored object that differs from the declared size is refused and removed."""
+        data = _request_upload(authenticated_client, sample_case, size=len(CONTENT) + 1).json()
+        _put(data['upload_url'], CONTENT)
+
+        response = _confirm(authenticated_client, data['upload_id'])
+
+        assert response.status_code == 400
+        assert Document.objects.count() == 0
+        assert not os.path.exists(os.path.join(str(media_root), data['storage_path']))
+
+    def test_content_type_mismatch_rejected(self, authenticated_client, sample_case, media_root):
+        """The stored bytes must match the declared MIME type."""
+        data = _request_upload(authenticated_client, sample_case, size=len(CONTENT)).json()
+        _put(data['upload_url'], b'\x89PNG\r\n\x1a\n' + CONTENT[8:])
+
+        assert _confirm(authenticated_client, data['upload_id']).status_code == 400
+
+    def test_confirm_without_upload_returns_400(self, authenticated_client, sample_case, media_root):
+        """Confirming before the object exists is refused."""
+        data = _request_upload(authenticated_client, sample_case).json()
+
+        assert _confirm(authenticated_client, data['upload_id']).status_code == 400
+
+    def test_double_confirm_returns_409(self, authenticated_client, sample_case, media_root):
+        """An upload can only be confirmed once."""
+        data = _request_upload(authenticated_client, sample_case).json()
+        _put(data['upload_url'], CONTENT)
+        _confirm(authenticated_client, data['upload_id'])
+
+        assert _confirm(authenticated_client, data['upload_id']).status_code == 409
+        assert Document.objects.count() == 1
+
+    def test_concurrent_confirm_returns_409(self, authenticated_client, sample_case, media_root):
+        """A confirm that lands while another one is mid-flight does not create a second document."""
+        data = _request_upload(authenticated_client, sample_case).json()
+        _put(data['upload_url'], CONTENT)
+        first = _confirm(authenticated_client, data['upload_id']).json()
+        Document.objects.filter(pk=first['id']).update(file_path='elsewhere')  # pass the early check
+
+        def racing_stat(backend, path):
+            Document.objects.filter(pk=first['id']).update(file_path=path)  # the other confirm commits
+            return {'size': len(CONTENT), 'content_type': 'application/pdf'}
+
+        with mock.patch('utils.storage.LocalStorageBackend.stat', racing_stat):
+            response = _confirm(authenticated_client, data['upload_id'])
+
+        assert response.status_code == 409
+        assert Document.objects.count() == 1
+
+    def test_confirm_after_case_deleted_returns_404(self, authenticated_client, sample_case, media_root):
+        """A case deleted between issue and confirm is reported, not a server error."""
+        data = _request_upload(authenticated_client, sample_case).json()
+        _put(data['upload_url'], CONTENT)
+        sample_case.delete()
+
+        response = _confirm(authenticated_client, data['upload_id'])
+
+        assert response.status_code == 404
+        assert Document.objects.count() == 0
+
+    def test_other_user_cannot_confirm(self, authenticated_client, sample_case, media_root):
+        """The upload_id is bound to the advocate it was issued to."""
+        data = _request_upload(authenticated_client, sample_case).json()
+        _put(data['upload_url'], CONTENT)
+        User.objects.create_user(email='other@legalaid.test', password='Test@123456', full_name='Other')
+        other = TestClient()
+        other.login(email='other@legalaid.test', password='Test@123456')
+
+        assert _confirm(other, data['upload_id']).status_code == 400
+        assert _confirm(authenticated_client, 'tampered').status_code == 400
+
+    def test_local_put_rejects_bad_token_and_overwrite(self, authenticated_client, sample_case, media_root):
+        """The dev PUT endpoint needs a valid token and never overwrites."""
+        data = _request_upload(authenticated_client, sample_case).json()
+        assert _put('/api/documents/direct-uploads/local/bogus/', CONTENT).status_code == 403
+
+        _put(data['upload_url'], CONTENT)
+        assert _put(data['upload_url'], CONTENT).status_code == 409
+
+    def test_local_put_caps_body_size(self, authenticated_client, sample_case, media_root, settings):
+        """The dev PUT endpoint refuses bodies over DIRECT_UPLOAD_MAX_SIZE and keeps nothing."""
+        data = _request_upload(authenticated_client, sample_case).json()
+        settings.DIRECT_UPLOAD_MAX_SIZE = len(CONTENT) - 1
+
+        assert _put(data['upload_url'], CONTENT).status_code == 413
+        assert not os.path.exists(os.path.join(str(media_root), data['storage_path']))
+
+    def test_rejects_oversize(self, authenticated_client, sample_case, media_root, settings):
+        """The declared size is checked against DIRECT_UPLOAD_MAX_SIZE."""
+        settings.DIRECT_UPLOAD_MAX_SIZE = 10
+
+        assert _request_upload(authenticated_client, sample_case, size=11).status_code == 400
@@ -1,4 +1,6 @@
 """Tests for document CRUD and status transition endpoints."""
+import hashlib
+
 import pytest
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
@@ -91,6 +93,33 @@ class TestDocumentList:
         assert data['results'][0]['case_title'] == 'Property Dispute'
         assert data['results'][0]['client_name'] == 'Test Client'
 
+    def test_list_signs_urls_in_one_batch(self, authenticated_client, sample_document, monkeypatch):
+        """All artifact URLs on a page are signed with a single get_urls call."""
+        from utils.storage import LocalStorageBackend
+
+        Document.objects.filter(pk=sample_document.pk).update(
+            processed_html_path='advocate-1/case-1/processed/1_v1.html',
+            processed_report_path='advocate-1/case-1/processed/1_report.txt',
+        )
+        calls = []
+        original = LocalStorageBackend.get_urls
+
+        def spy(self, paths, request=None):
+            paths = list(paths)
+            calls.append(paths)
+            return original(self, paths, request=request)
+
+        monkeypatch.setattr(LocalStorageBackend, 'get_urls', spy)
+
+        response = authenticated_client.get('/api/documents/')
+
+        assert response.status_code == 200
+        assert len(calls) == 1
+        assert len(calls[0]) == 3
+        result = response.json()['results'][0]
+        assert result['processed_html_url'].endswith('/media/advocate-1/case-1/processed/1_v1.html')
+        assert result['extracted_pdf_url'] is None
+
     def test_list_unauthenticated(self, api_client, db):
         """Unauthenticated request gets 401."""
         response = api_client.get('/api/documents/')
@@ -120,6 +149,18 @@ class TestDocumentCreate:
         assert data['status'] == 'uploaded'
         assert data['file_type'] == 'pdf'
 
+    def test_create_stores_checksum_of_streamed_file(self, authenticated_client, sample_case, settings, tmp_path):
+        """The SHA-256 is computed from the chunks streamed to storage."""
+        settings.MEDIA_ROOT = str(tmp_path)
+        content = b'%PDF-1.4 ' + b'x' * (3 * 64 * 1024)
+        fake_pdf = SimpleUploadedFile('hashed.pdf', content, content_type='application/pdf')
+
+        response = authenticated_client.post('/api/documents/', data={'case': sample_case.id, 'file': fake_pdf})
+
+        document = Document.objects.get(pk=response.json()['id'])
+        assert document.checksum_sha256 == hashlib.sha256(content).hexdigest()
+        assert (tmp_path / document.file_path).read_bytes() == content
+
     def test_create_missing_case(self, authenticated_client):
         """Missing case returns 400."""
         fake_pdf = SimpleUploadedFile(
@@ -140,14 +181,15 @@ class TestDocumentStatusTransition:
     """Tests for PATCH /api/documents/:id/status/."""
 
     def test_valid_transition_uploaded_to_ready(self, authenticated_client, sample_document):
-        """Can transition from uploaded to ready_to_process."""
+        """ready_to_process queues OCR and returns straight away as in_progress."""
         response = authenticated_client.patch(
             f'/api/documents/{sample_document.id}/status/',
             data={'status': 'ready_to_process'},
             content_type='application/json',
         )
         assert response.status_code == 200
-        assert response.json()['status'] == 'ready_to_process'
+        assert response.json()['status'] == 'in_progress'
+        assert sample_document.ocr_jobs.get().status == 'queued'
 
     def test_valid_transition_ready_to_in_progress(self, authenticated_client, sample_document):
         """Can transition from ready_to_process to in_progress."""
@@ -229,3 +271,171 @@ class TestDocumentDownload:
         """Unauthenticated request gets 401."""
         response = api_client.get(f'/api/documents/{sample_document.id}/download/')
         assert response.status_code == 401
+
+
+class TestLazyArtifactURLs:
+    """Tests for ?artifact_urls=lazy and GET /api/documents/:id/artifact/:kind/."""
+
+    def test_lazy_list_makes_no_storage_calls(self, authenticated_client, sample_document, monkeypatch):
+        """Lazy mode returns resolver links without signing anything."""
+        from utils.storage import LocalStorageBackend
+
+        def fail(*args, **kwargs):
+            raise AssertionError('storage was called')
+
+        monkeypatch.setattr(LocalStorageBackend, 'get_urls', fail)
+        monkeypatch.setattr(LocalStorageBackend, 'get_url', fail)
+
+        response = authenticated_client.get('/api/documents/?artifact_urls=lazy')
+
+        result = response.json()['results'][0]
+        assert f'/api/documents/{sample_document.id}/artifact/file/?token=' in result['file_url']
+        assert result['processed_html_url'] is None
+
+    def test_setting_enables_lazy_mode(self, authenticated_client, sample_document, settings):
+        """DOCUMENT_ARTIFACT_URLS='lazy' applies without the query param."""
+        settings.DOCUMENT_ARTIFACT_URLS = 'lazy'
+
+        response = authenticated_client.get(f'/api/documents/{sample_document.id}/')
+
+        assert '/artifact/file/' in response.json()['file_url']
+
+    def test_local_backend_serves_file(self, authenticated_client, sample_document, settings, tmp_path):
+        """Local storage streams the file itself with private cache headers."""
+        settings.MEDIA_ROOT = str(tmp_path)
+        target = tmp_path / sample_document.file_path
+        target.parent.mkdir(parents=True)
+        target.write_bytes(b'\xff\xd8\xff image')
+
+        response = authenticated_client.get(f'/api/documents/{sample_document.id}/artifact/file/')
+
+        assert response.status_code == 200
+        assert b''.join(response.streaming_content) == b'\xff\xd8\xff image'
+        assert 'private' in response['Cache-Control']
+        assert 'doc-1.jpg' in response['Content-Disposition']
+
+    def test_remote_backend_redirects_to_signed_url(self, authenticated_client, sample_document, settings):
+        """Remote storage answers with a cacheable 302 to the signed URL."""
+        from unittest import mock
+
+        settings.ARTIFACT_REDIRECT_MAX_AGE = 120
+        backend = mock.Mock()
+        backend.get_url.return_value = 'https://proj.supabase.co/storage/v1/object/sign/documents/x?token=t'
+        with mock.patch('apps.documents.views.get_storage_backend', return_value=backend):
+            response = authenticated_client.get(f'/api/documents/{sample_document.id}/artifact/file/')
+
+        assert response.status_code == 302
+        assert response['Location'].endswith('token=t')
+        assert 'max-age=120' in response['Cache-Control']
+        backend.get_url.assert_called_once()
+
+    def test_missing_and_unknown_artifacts_404(self, authenticated_client, sample_document):
+        """Unset artifact paths and unknown kinds return 404."""
+        base = f'/api/documents/{sample_document.id}/artifact'
+        assert authenticated_client.get(f'{base}/processed_html/').status_code == 404
+        assert authenticated_client.get(f'{base}/secrets/').status_code == 404
+
+    def test_other_advocates_document_is_hidden(self, api_client, sample_document):
+        """Artifacts are scoped to the requesting advocate like the rest of the API."""
+        User.objects.create_user(email='other@legalaid.test', password='Test@123456', full_name='Other')
+        api_client.login(email='other@legalaid.test', password='Test@123456')
+
+        response = api_client.get(f'/api/documents/{sample_document.id}/artifact/file/')
+
+        assert response.status_code == 404
+
+    def test_lazy_link_works_without_auth_header(self, authenticated_client, sample_document, settings, tmp_path):
+        """The signed token in a lazy link is enough to fetch the artifact, as a browser would."""
+        settings.MEDIA_ROOT = str(tmp_path)
+        target = tmp_path / sample_document.file_path
+        target.parent.mkdir(parents=True)
+        target.write_bytes(b'\xff\xd8\xff image')
+        link = authenticated_client.get(f'/api/documents/{sample_document.id}/?artifact_urls=lazy').json()['file_url']
+
+        response = TestClient().get(link)
+
+        assert response.status_code == 200
+        assert b''.join(response.streaming_content) == b'\xff\xd8\xff image'
+
+    def test_token_is_bound_to_document_and_kind(self, api_client, sample_document, sample_case, advocate_user):
+        """A token for one artifact does not open another artifact or document."""
+        from apps.documents.serializers import artifact_token
+
+        other = Document.objects.create(
+            advocate=advocate_user, case=sample_case, name='other.jpg', file_path='advocate-1/case-1/doc-2.jpg',
+            file_type='image', file_size_bytes=10, mime_type='image/jpeg', status='uploaded',
+        )
+        token = artifact_token(sample_document.id, 'processed_html')
+
+        assert api_client.get(f'/api/documents/{sample_document.id}/artifact/file/?token={token}').status_code == 401
+        assert api_client.get(f'/api/documents/{other.id}/artifact/processed_html/?token={token}').status_code == 401
+
+    def test_expired_or_missing_token_needs_auth(self, api_client, sample_document, settings):
+        """Without a live token the endpoint falls back to normal authentication."""
+        from apps.documents.serializers import artifact_token
+
+        token = artifact_token(sample_document.id, 'file')
+        settings.ARTIFACT_LINK_MAX_AGE = -1
+        base = f'/api/documents/{sample_document.id}/artifact/file/'
+
+        assert api_client.get(f'{base}?token={token}').status_code == 401
+        assert api_client.get(base).status_code == 401
+
+
+class TestSparseFieldsets:
+    """Tests for ?fields=, ?omit= and ?view=summary on document reads."""
+
+    def test_fields_limits_output(self, authenticated_client, sample_document):
+        """Only the requested fields are rendered."""
+        response = authenticated_client.get('/api/documents/?fields=id,name,status')
+
+        assert set(response.json()['results'][0]) == {'id', 'name', 'status'}
+
+    def test_omit_drops_fields(self, authenticated_client, sample_document):
+        """Omitted fields are removed from the full representation."""
+        response = authenticated_client.get(f'/api/documents/{sample_document.id}/?omit=status_history,notes')
+
+        data = response.json()
+        assert 'status_history' not in data
+        assert 'notes' not in data
+        assert data['name'] == 'agreement_scan.jpg'
+
+    def test_unrequested_relations_are_not_loaded(
+        self, authenticated_client, sample_document, django_assert_max_num_queries,
+    ):
+        """Without case or history fields the list needs no join or prefetch."""
+        Document.objects.create(
+            advocate=sample_document.advocate, case=sample_document.case, name='second.pdf',
+            file_path='advocate-1/case-1/doc-2.pdf', file_type='pdf', file_size_bytes=1,
+            mime_type='application/pdf',
+        )
+
+        # session + user + count + page; no status_history prefetch
+        with django_assert_max_num_queries(4) as captured:
+            response = authenticated_client.get('/api/documents/?fields=id,name')
+
+        assert len(response.json()['results']) == 2
+        assert not any('documents_documentstatushistory' in q['sql'] for q in captured.captured_queries)
+        assert not any('JOIN' in q['sql'] for q in captured.captured_queries)
+
+    def test_summary_view(self, authenticated_client, sample_document):
+        """?view=summary renders the slim row without history or processed artifacts."""
+        response = authenticated_client.get('/api/documents/?view=summary')
+
+        row = response.json()['results'][0]
+        assert row['client_name'] == 'Test Client'
+        assert row['file_url'].endswith('/media/advocate-1/case-1/doc-1.jpg')
+        assert 'status_history' not in row
+        assert 'processed_html_url' not in row
+        assert 'file_path' not in row
+
+    def test_writes_ignore_fields(self, authenticated_client, sample_document):
+        """?fields= does not narrow validation or responses of writes."""
+        response = authenticated_client.patch(
+            f'/api/documents/{sample_document.id}/status/?fields=id',
+            {'status': 'ready_to_process'},
+            content_type='application/json',
+        )
+
+        assert response.status_code == 200
+        assert 'status_history' in response.json()
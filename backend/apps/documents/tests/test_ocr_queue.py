@@ -0,0 +1,153 @@
+"""Tests for the OCR dispatch queue and worker command."""
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.cases.models import Case
+from apps.clients.models import Client
+from apps.documents import ocr_queue
+from apps.documents.models import Document, OCRJob
+
+User = get_user_model()
+
+NOTIFY = 'apps.documents.ocr_queue.notify_n8n_ready_to_process'
+
+
+@pytest.fixture
+def document(db):
+    """Create a document that has just been queued for OCR."""
+    advocate = User.objects.create_user(
+        email='advocate@legalaid.test', password='Test@123456', full_name='Adv. Rajesh Kumar',
+    )
+    client = Client.objects.create(advocate=advocate, full_name='Test Client', email='client@example.com')
+    case = Case.objects.create(advocate=advocate, client=client, title='Property Dispute', case_number='PD-1')
+    return Document.objects.create(
+        advocate=advocate, case=case, name='scan.pdf', file_path='a/1/scan.pdf',
+        file_type='pdf', file_size_bytes=10, mime_type='application/pdf', status='in_progress',
+    )
+
+
+@pytest.fixture
+def n8n_configured(monkeypatch):
+    monkeypatch.setenv('N8N_OUTBOUND_WEBHOOK_URL', 'https://n8n.example.com/webhook/ocr')
+
+
+class TestOCRQueue:
+    """Tests for enqueue / claim / run."""
+
+    def test_enqueue_reuses_waiting_job(self, document):
+        """A second enqueue while the first job waits does not duplicate it."""
+        first = ocr_queue.enqueue_ocr(document, 'a@b.c')
+
+        assert ocr_queue.enqueue_ocr(document, 'a@b.c') == first
+        assert OCRJob.objects.count() == 1
+
+    def test_claim_leases_job_once(self, document):
+        """A claimed job is not handed to a second worker while its lease is live."""
+        job = ocr_queue.enqueue_ocr(document)
+
+        assert [j.id for j in ocr_queue.claim_jobs('w1', 5)] == [job.id]
+        assert ocr_queue.claim_jobs('w2', 5) == []
+        job.refresh_from_db()
+        assert (job.status, job.locked_by, job.attempts) == ('running', 'w1', 1)
+
+    def test_expired_lease_is_reclaimed(self, document):
+        """A job whose worker died becomes claimable after the visibility timeout."""
+        job = ocr_queue.enqueue_ocr(document)
+        ocr_queue.claim_jobs('w1', 1)
+        OCRJob.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+        reclaimed = ocr_queue.claim_jobs('w2', 1)
+
+        assert reclaimed[0].locked_by == 'w2'
+        assert reclaimed[0].attempts == 2
+
+    def test_global_running_limit(self, document, settings):
+        """No more than OCR_QUEUE_MAX_RUNNING jobs hold live leases."""
+        settings.OCR_QUEUE_MAX_RUNNING = 1
+        ocr_queue.enqueue_ocr(document)
+        other = Document.objects.create(
+            advocate=document.advocate, case=document.case, name='b.pdf', file_path='a/1/b.pdf',
+            file_type='pdf', file_size_bytes=1, mime_type='application/pdf', status='in_progress',
+        )
+        ocr_queue.enqueue_ocr(other)
+
+        assert len(ocr_queue.claim_jobs('w1', 5)) == 1
+        assert ocr_queue.claim_jobs('w2', 5) == []
+
+    def test_running_count_is_read_under_claim_lock(self, document, settings):
+        """A job leased by another worker while this one waits for the lock uses up the slot."""
+        settings.OCR_QUEUE_MAX_RUNNING = 1
+        job = ocr_queue.enqueue_ocr(document)
+        other = Document.objects.create(
+            advocate=document.advocate, case=document.case, name='b.pdf', file_path='a/1/b.pdf',
+            file_type='pdf', file_size_bytes=1, mime_type='application/pdf', status='in_progress',
+        )
+        ocr_queue.enqueue_ocr(other)
+
+        def other_worker_claims_first():
+            OCRJob.objects.filter(pk=job.pk).update(
+                status='running', locked_by='w1', locked_until=timezone.now() + timedelta(minutes=5),
+            )
+
+        with mock.patch.object(ocr_queue, '_lock_claims', side_effect=other_worker_claims_first):
+            assert ocr_queue.claim_jobs('w2', 5) == []
+
+    def test_run_marks_processed_when_files_returned(self, document, n8n_configured):
+        """Files in n8n's response move the document to processed."""
+        ocr_queue.enqueue_ocr(document)
+        job = ocr_queue.claim_jobs('w1', 1)[0]
+        with mock.patch(NOTIFY, return_value={'ok': True, 'files_stored': {'html': 'p.html'}}):
+            ocr_queue.run_job(job, 'w1')
+
+        document.refresh_from_db()
+        job.refresh_from_db()
+        assert document.status == 'processed'
+        assert job.status == 'succeeded'
+        assert document.status_history.filter(to_status='processed').exists()
+
+    def test_failure_retries_with_backoff_then_fails(self, document, n8n_configured, settings):
+        """Failed dispatches are requeued with backoff until attempts run out."""
+        settings.OCR_QUEUE_MAX_ATTEMPTS = 2
+        ocr_queue.enqueue_ocr(document)
+        with mock.patch(NOTIFY, return_value=None):
+            job = ocr_queue.claim_jobs('w1', 1)[0]
+            ocr_queue.run_job(job, 'w1')
+            job.refresh_from_db()
+            assert job.status == 'queued'
+            assert job.available_at > timezone.now()
+            assert ocr_queue.claim_jobs('w1', 1) == []
+
+            OCRJob.objects.filter(pk=job.pk).update(available_at=timezone.now())
+            job = ocr_queue.claim_jobs('w1', 1)[0]
+            ocr_queue.run_job(job, 'w1')
+
+        job.refresh_from_db()
+        assert job.status == 'failed'
+        assert job.attempts == 2
+
+    def test_skips_document_no_longer_in_progress(self, document, n8n_configured):
+        """A job for a document that moved on does not call n8n."""
+        ocr_queue.enqueue_ocr(document)
+        Document.objects.filter(pk=document.pk).update(status='processed')
+        job = ocr_queue.claim_jobs('w1', 1)[0]
+        with mock.patch(NOTIFY) as notify:
+            ocr_queue.run_job(job, 'w1')
+
+        notify.assert_not_called()
+        job.refresh_from_db()
+        assert job.status == 'succeeded'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_command_drains_queue(document, n8n_configured):
+    """run_ocr_worker --once runs every runnable job and exits."""
+    ocr_queue.enqueue_ocr(document)
+    with mock.patch(NOTIFY, return_value={'ok': True, 'files_stored': {}}):
+        call_command('run_ocr_worker', '--once', '--concurrency', '2')
+
+    assert OCRJob.objects.get().status == 'succeeded'
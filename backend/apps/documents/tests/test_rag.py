@@ -0,0 +1,133 @@
+"""Tests for the async finalize-to-RAG and generate-PDF endpoints."""
+from unittest import mock
+
+import httpx
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import Client as TestClient
+
+from apps.cases.models import Case
+from apps.clients.models import Client
+from apps.documents.models import Document, DocumentActivityLog
+from apps.webhooks.answer_cache import get_answer_cache
+from utils import webhook_client
+from utils.storage import LocalStorageBackend
+
+User = get_user_model()
+
+
+@pytest.fixture
+def backend(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    local = LocalStorageBackend()
+    with mock.patch('utils.storage.get_storage_backend', return_value=local):
+        yield local
+
+
+@pytest.fixture
+def document(db, backend):
+    user = User.objects.create_user(email='advocate@legalaid.test', password='Test@123456', full_name='Adv')
+    client = Client.objects.create(advocate=user, full_name='Asha Rao', email='asha@example.com')
+    case = Case.objects.create(advocate=user, client=client, title='Lease Dispute', case_number='LD-1')
+    doc = Document.objects.create(
+        advocate=user, case=case, name='lease.pdf', file_path=f'{user.id}/{case.id}/lease.pdf',
+        file_type='pdf', file_size_bytes=10, mime_type='application/pdf', status='processed',
+    )
+    doc.txt_v2_path = backend.upload_content(b'Final lease text', f'{user.id}/{case.id}/lease_v2.txt', 'text/plain')
+    doc.processed_html_path = backend.upload_content(
+        b'<h1>Lease</h1><p>Clause 4</p>', f'{user.id}/{case.id}/lease.html', 'text/html',
+    )
+    doc.save()
+    return doc
+
+
+@pytest.fixture
+def api_client(document):
+    api_client = TestClient()
+    api_client.login(email='advocate@legalaid.test', password='Test@123456')
+    return api_client
+
+
+@pytest.fixture
+def n8n(monkeypatch):
+    """Route the async HTTP client through a mock transport; set `reply` to the response to send."""
+    monkeypatch.setenv('N8N_RAG_WEBHOOK_URL', 'https://n8n.example.com/webhook/rag')
+    state = {'reply': httpx.Response(200, text='File uploaded successfully'), 'requests': []}
+
+    def handler(request):
+        request.read()
+        state['requests'].append(request)
+        return state['reply']
+
+    monkeypatch.setattr(
+        webhook_client, 'build_async_http_client', lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    webhook_client.reset_webhook_client()
+    yield state
+    webhook_client.reset_webhook_client()
+
+
+class TestFinalizeToRag:
+    """Tests for POST /api/v2/documents/<pk>/finalize-rag/."""
+
+    def test_streams_v2_text_to_n8n(self, api_client, document, n8n):
+        """The finalized text is sent as multipart with a Content-Length, and the reply is logged."""
+        response = api_client.post(f'/api/v2/documents/{document.pk}/finalize-rag/')
+
+        assert response.status_code == 200
+        assert response.json() == {'ok': True, 'version': 1, 'rag_response': 'File uploaded successfully'}
+        sent = n8n['requests'][0]
+        assert sent.headers['Content-Length'] == str(len(sent.content))
+        assert b'Final lease text' in sent.content
+        assert b'name="client_name"\r\n\r\nAsha Rao' in sent.content
+        assert set(DocumentActivityLog.objects.values_list('event_type', flat=True)) == {'rag_push', 'rag_response'}
+
+    def test_invalidates_cached_chat_answers_for_the_scope(self, api_client, document, n8n):
+        """Chat answers about the document's client and case are dropped once new content is indexed."""
+        answers = get_answer_cache()
+        scope = (document.case.client_id, document.case_id)
+        answers.set(document.advocate_id, 'Summarize the lease', *scope, 'Old summary')
+
+        api_client.post(f'/api/v2/documents/{document.pk}/finalize-rag/')
+
+        assert answers.get(document.advocate_id, 'Summarize the lease', *scope) is None
+
+    def test_n8n_error_returns_502(self, api_client, document, n8n, settings):
+        """A failing webhook is reported as a bad gateway."""
+        settings.WEBHOOK_RETRY_ATTEMPTS = 1
+        n8n['reply'] = httpx.Response(500)
+
+        response = api_client.post(f'/api/v2/documents/{document.pk}/finalize-rag/')
+
+        assert response.status_code == 502
+
+    def test_other_advocates_document_is_404(self, document, n8n):
+        """Documents are scoped to their advocate."""
+        User.objects.create_user(email='other@legalaid.test', password='Test@123456', full_name='Other')
+        other = TestClient()
+        other.login(email='other@legalaid.test', password='Test@123456')
+
+        assert other.post(f'/api/v2/documents/{document.pk}/finalize-rag/').status_code == 404
+        assert n8n['requests'] == []
+
+
+class TestGeneratePdf:
+    """Tests for POST /api/v2/documents/<pk>/generate-pdf/."""
+
+    def test_reads_local_html_and_finalizes(self, api_client, document, backend):
+        """Local storage is read directly (its URLs are relative) and the PDF is stored."""
+        response = api_client.post(f'/api/v2/documents/{document.pk}/generate-pdf/')
+
+        assert response.status_code == 200
+        document.refresh_from_db()
+        assert document.status == 'finalized'
+        assert b''.join(backend.read_chunks(document.extracted_pdf_path)).startswith(b'%PDF')
+
+    def test_downloads_signed_html_over_async_client(self, api_client, document, backend, n8n):
+        """Absolute (signed) URLs are fetched with the shared async HTTP client."""
+        n8n['reply'] = httpx.Response(200, content=b'<p>Signed copy</p>')
+        with mock.patch.object(backend, 'get_url', return_value='https://proj.supabase.co/sign/lease.html?token=t'):
+            response = api_client.post(f'/api/v2/documents/{document.pk}/generate-pdf/')
+
+        assert response.status_code == 200
+        assert str(n8n['requests'][0].url) == 'https://proj.supabase.co/sign/lease.html?token=t'
@@ -0,0 +1,169 @@
+"""Tests for resumable document upload endpoints."""
+import os
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import Client as TestClient
+
+from apps.cases.models import Case
+from apps.clients.models import Client
+from apps.documents.models import Document, UploadSession
+
+User = get_user_model()
+
+PART_TYPE = 'application/offset+octet-stream'
+
+
+@pytest.fixture
+def advocate_user(db):
+    """Create and return a test advocate user."""
+    return User.objects.create_user(
+        email='advocate@legalaid.test',
+        password='Test@123456',
+        full_name='Adv. Rajesh Kumar',
+        role='advocate',
+    )
+
+
+@pytest.fixture
+def authenticated_client(advocate_user):
+    """Return an authenticated test client."""
+    client = TestClient()
+    client.login(email='advocate@legalaid.test', password='Test@123456')
+    return client
+
+
+@pytest.fixture
+def sample_case(advocate_user):
+    """Create a sample case with a client."""
+    client = Client.objects.create(
+        advocate=advocate_user, full_name='Test Client', email='client@example.com',
+    )
+    return Case.objects.create(
+        advocate=advocate_user, client=client, title='Property Dispute', case_number='PD-2026-001',
+    )
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    """Point MEDIA_ROOT at a temp dir and use local storage."""
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.STORAGE_BACKEND = 'local'
+    settings.RESUMABLE_UPLOAD_CHUNK_SIZE = 4
+    return tmp_path
+
+
+def _init(client, case, size, **extra):
+    payload = {
+        'case': case.id, 'filename': 'scan.pdf', 'mime_type': 'application/pdf', 'size': size, **extra,
+    }
+    return client.post('/api/documents/uploads/', data=payload, content_type='application/json')
+
+
+def _patch(client, upload_id, offset, body):
+    return client.generic(
+        'PATCH', f'/api/documents/uploads/{upload_id}/', data=body,
+        content_type=PART_TYPE, HTTP_UPLOAD_OFFSET=str(offset),
+    )
+
+
+class TestResumableUpload:
+    """Tests for the init / part / complete upload protocol."""
+
+    def test_full_upload_creates_document(self, authenticated_client, sample_case, media_root, settings):
+        """Parts appended in order are assembled into one stored document."""
+        settings.RESUMABLE_UPLOAD_CHUNK_SIZE = 60
+        content = b'%PDF-1.4 ' + b'x' * 100
+        init = _init(authenticated_client, sample_case, len(content), name='Big Scan')
+        assert init.status_code == 201
+        assert init['Upload-Offset'] == '0'
+        upload_id = init.json()['id']
+
+        first = _patch(authenticated_client, upload_id, 0, content[:60])
+        assert first.status_code == 204
+        assert first['Upload-Offset'] == '60'
+
+        head = authenticated_client.head(f'/api/documents/uploads/{upload_id}/')
+        assert head['Upload-Offset'] == '60'
+
+        second = _patch(authenticated_client, upload_id, 60, content[60:])
+        assert second['Upload-Offset'] == str(len(content))
+
+        done = authenticated_client.post(f'/api/documents/uploads/{upload_id}/complete/')
+        assert done.status_code == 201
+        data = done.json()
+        assert data['name'] == 'Big Scan'
+        assert data['file_type'] == 'pdf'
+        assert data['file_size_bytes'] == len(content)
+
+        doc = Document.objects.get(pk=data['id'])
+        with open(os.path.join(str(media_root), doc.file_path), 'rb') as fh:
+            assert fh.read() == content
+        assert UploadSession.objects.get(pk=upload_id).status == 'completed'
+
+    def test_wrong_offset_returns_409(self, authenticated_client, sample_case, media_root):
+        """A part at the wrong offset is rejected with the current offset."""
+        upload_id = _init(authenticated_client, sample_case, 10).json()['id']
+        _patch(authenticated_client, upload_id, 0, b'abcd')
+
+        response = _patch(authenticated_client, upload_id, 0, b'abcd')
+
+        assert response.status_code == 409
+        assert response['Upload-Offset'] == '4'
+
+    def test_complete_before_all_bytes_returns_400(self, authenticated_client, sample_case, media_root):
+        """Completing an unfinished upload is refused."""
+        upload_id = _init(authenticated_client, sample_case, 10).json()['id']
+        _patch(authenticated_client, upload_id, 0, b'abcd')
+
+        response = authenticated_client.post(f'/api/documents/uploads/{upload_id}/complete/')
+
+        assert response.status_code == 400
+        assert Document.objects.count() == 0
+
+    def test_part_beyond_declared_size_rejected(self, authenticated_client, sample_case, media_root):
+        """Parts may not exceed the size declared at init."""
+        upload_id = _init(authenticated_client, sample_case, 4).json()['id']
+
+        response = _patch(authenticated_client, upload_id, 0, b'abcdef')
+
+        assert response.status_code == 400
+
+    def test_mis_sized_part_rejected(self, authenticated_client, sample_case, media_root):
+        """Only the last part may differ from chunk_size; nothing is stored otherwise."""
+        upload_id = _init(authenticated_client, sample_case, 10).json()['id']
+
+        short = _patch(authenticated_client, upload_id, 0, b'abc')
+        long = _patch(authenticated_client, upload_id, 0, b'abcdef')
+
+        assert short.status_code == long.status_code == 400
+        assert short['Upload-Offset'] == '0'
+        assert UploadSession.objects.get(pk=upload_id).offset == 0
+        assert _patch(authenticated_client, upload_id, 0, b'abcd').status_code == 204
+        assert _patch(authenticated_client, upload_id, 4, b'abcd').status_code == 204
+        assert _patch(authenticated_client, upload_id, 8, b'ab').status_code == 204
+
+    def test_abort_discards_parts(self, authenticated_client, sample_case, media_root):
+        """DELETE aborts the session and removes the part file."""
+        upload_id = _init(authenticated_client, sample_case, 10).json()['id']
+        _patch(authenticated_client, upload_id, 0, b'abcd')
+
+        response = authenticated_client.delete(f'/api/documents/uploads/{upload_id}/')
+
+        assert response.status_code == 204
+        assert UploadSession.objects.get(pk=upload_id).status == 'aborted'
+        assert os.listdir(os.path.join(str(media_root), '.uploads')) == []
+
+    def test_init_rejects_oversize_and_bad_type(self, authenticated_client, sample_case, media_root, settings):
+        """Init validates size cap and MIME type."""
+        settings.RESUMABLE_UPLOAD_MAX_SIZE = 100
+        assert _init(authenticated_client, sample_case, 101).status_code == 400
+        assert _init(authenticated_client, sample_case, 10, mime_type='text/plain').status_code == 400
+
+    def test_cannot_upload_into_other_advocates_case(self, authenticated_client, media_root):
+        """Init refuses cases owned by another advocate."""
+        other = User.objects.create_user(email='other@legalaid.test', password='x', full_name='Other')
+        client = Client.objects.create(advocate=other, full_name='C', email='c@example.com')
+        case = Case.objects.create(advocate=other, client=client, title='T', case_number='N')
+
+        assert _init(authenticated_client, case, 10).status_code == 400
@@ -1,11 +1,30 @@
 """Document app URLs."""
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import views, views_direct_upload, views_uploads
 
 router = DefaultRouter()
 router.register(r'documents', views.DocumentViewSet, basename='document')
 
 urlpatterns = [
+    # Upload flows — listed before the router so "uploads" is not read as a pk
+    path('documents/uploads/', views_uploads.create_upload_session, name='upload-session-create'),
+    path('documents/uploads/<uuid:upload_id>/', views_uploads.upload_session_detail, name='upload-session-detail'),
+    path(
+        'documents/uploads/<uuid:upload_id>/complete/',
+        views_uploads.complete_upload_session,
+        name='upload-session-complete',
+    ),
+    path('documents/direct-uploads/', views_direct_upload.create_direct_upload, name='direct-upload-create'),
+    path(
+        'documents/direct-uploads/confirm/',
+        views_direct_upload.confirm_direct_upload,
+        name='direct-upload-confirm',
+    ),
+    path(
+        'documents/direct-uploads/local/<str:token>/',
+        views_direct_upload.local_direct_upload,
+        name='direct-upload-local',
+    ),
     path('', include(router.urls)),
 ]
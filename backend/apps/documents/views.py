@@ -1,22 +1,37 @@
 """Document views for API."""
 import logging
+import os
 
+from django.conf import settings
+from django.db import transaction
+from django.http import FileResponse, HttpResponseRedirect
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from utils.storage import get_storage_backend
+from utils.pagination import OptInCursorPagination
+from utils.sparse_fields import requested_fields
+from utils.storage import LocalStorageBackend, get_storage_backend
+from apps.search.text_index import index_document_text
 
 from .models import Document, DocumentStatusHistory
-from .serializers import DocumentSerializer, DocumentCreateSerializer, DocumentStatusSerializer
-from apps.webhooks.outbound import notify_n8n_ready_to_process
+from .ocr_queue import enqueue_ocr
+from .serializers import (
+    ARTIFACT_PATH_FIELDS, artifact_token_grants, DocumentSerializer, DocumentCreateSerializer, DocumentStatusSerializer,
+    DocumentSummarySerializer,
+)
 
 logger = logging.getLogger(__name__)
 
+# Serializer fields read through the case / client join
+CASE_FIELDS = {'case_id', 'case_title', 'client_id', 'client_name'}
+
 
 class DocumentViewSet(viewsets.ModelViewSet):
     """ViewSet for Document CRUD operations."""
@@ -28,20 +43,37 @@ class DocumentViewSet(viewsets.ModelViewSet):
     search_fields = ['name']
     ordering_fields = ['name', 'created_at', 'status']
     ordering = ['-created_at']
+    pagination_class = OptInCursorPagination
 
     def get_queryset(self):
         """Return documents. Admin sees all; advocates see own."""
-        qs = Document.objects.select_related('case', 'case__client').prefetch_related(
-            'status_history', 'status_history__changed_by',
-        )
+        qs = Document.objects.all()
+        if self.action != 'artifact':
+            qs = self._with_related(qs)
         if self.request.user.role != 'admin':
             qs = qs.filter(advocate=self.request.user)
         return qs
 
+    def _with_related(self, qs):
+        """Join the case and prefetch history only if the response renders them."""
+        serializer_class = self.get_serializer_class()
+        if not issubclass(serializer_class, DocumentSerializer):
+            return qs.select_related('case', 'case__client').prefetch_related(
+                'status_history', 'status_history__changed_by',
+            )
+        fields = requested_fields(self.request, serializer_class.Meta.fields)
+        if fields & CASE_FIELDS:
+            qs = qs.select_related('case', 'case__client')
+        if 'status_history' in fields:
+            qs = qs.prefetch_related('status_history', 'status_history__changed_by')
+        return qs
+
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
         if self.action == 'create':
             return DocumentCreateSerializer
+        if self.action == 'list' and self.request.query_params.get('view') == 'summary':
+            return DocumentSummarySerializer
         return DocumentSerializer
 
     def get_serializer_context(self):
@@ -127,66 +159,22 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 document.save(update_fields=[
                     'processed_html_path', 'processed_json_path', 'processed_report_path', 'updated_at',
                 ])
+                index_document_text(document)
                 logger.info("Cleared processed paths for doc %s (retry from %s)", document.id, old_status)
 
-            logger.info(
-                "[DOC_N8N_SEND] doc_id=%s name='%s' file_path=%s case=%s client=%s",
-                document.id, document.name, document.file_path,
-                document.case.title, document.case.client.full_name if document.case.client else 'N/A',
-            )
-            result = notify_n8n_ready_to_process(
-                document_id=document.id,
-                document_name=document.name,
-                file_path=document.file_path,
-                case_title=document.case.title,
-                advocate_email=request.user.email,
-                client_name=document.case.client.full_name if document.case.client else '',
-                case_id=document.case_id,
-            )
-
-            logger.info(
-                "[DOC_N8N_RESULT] doc_id=%s result_type=%s keys=%s",
-                document.id,
-                type(result).__name__ if result else 'None',
-                list(result.keys()) if isinstance(result, dict) else 'N/A',
-            )
-
-            if result is not None:
-                files_stored = result.get('files_stored', {})
-                if files_stored:
-                    # Files came back in synchronous response — mark as processed
-                    document.refresh_from_db()
-                    document.status = 'processed'
-                    document.save(update_fields=['status', 'updated_at'])
-                    DocumentStatusHistory.objects.create(
-                        document=document,
-                        from_status='ready_to_process',
-                        to_status='processed',
-                        changed_by=None,
-                        notes=f'Processed by n8n OCR: {len(files_stored)} file(s) returned directly',
-                    )
-                else:
-                    # n8n responded 200 but no files extracted — mark in_progress, wait for callback
-                    document.status = 'in_progress'
-                    document.save(update_fields=['status', 'updated_at'])
-                    DocumentStatusHistory.objects.create(
-                        document=document,
-                        from_status='ready_to_process',
-                        to_status='in_progress',
-                        changed_by=None,
-                        notes='n8n acknowledged (200) but no files in response — waiting for async callback',
-                    )
-            else:
-                # Request failed (timeout, network error, etc.) — still mark in_progress
+            # Dispatch happens in run_ocr_worker; the document is in progress from here on
+            with transaction.atomic():
                 document.status = 'in_progress'
                 document.save(update_fields=['status', 'updated_at'])
+                job = enqueue_ocr(document, advocate_email=request.user.email)
                 DocumentStatusHistory.objects.create(
                     document=document,
                     from_status='ready_to_process',
                     to_status='in_progress',
                     changed_by=None,
-                    notes='n8n request failed or timed out — waiting for async callback',
+                    notes='Queued for n8n OCR processing',
                 )
+            logger.info("[DOC_N8N_QUEUED] doc_id=%s job=%s", document.id, job.id)
 
         doc = Document.objects.select_related('case', 'case__client').prefetch_related(
             'status_history', 'status_history__changed_by',
@@ -242,6 +230,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
             document.save(update_fields=[
                 'html_v2_path', 'txt_v2_path', 'corrections_log_path', 'updated_at',
             ])
+            index_document_text(document, txt_v2_file.chunks(), txt_v2_path)
 
             DocumentStatusHistory.objects.create(
                 document=document,
@@ -288,3 +277,44 @@ class DocumentViewSet(viewsets.ModelViewSet):
             'name': document.name,
             'mime_type': document.mime_type,
         })
+
+    @action(
+        detail=True, methods=['get'], url_path=r'artifact/(?P<kind>[a-z0-9_]+)', url_name='artifact',
+        permission_classes=[AllowAny],
+    )
+    def artifact(self, request, pk=None, kind=None):
+        """Resolve a lazy artifact link: redirect to a signed URL, or serve a local file.
+
+        Links carry a signed ?token= so browsers can follow them without an
+        Authorization header; without a valid token the usual auth and
+        advocate scoping apply.
+        """
+        path_field = ARTIFACT_PATH_FIELDS.get(kind)
+        if path_field is None:
+            return Response({'error': f'Unknown artifact: {kind}'}, status=status.HTTP_404_NOT_FOUND)
+        if artifact_token_grants(request.query_params.get('token'), pk, kind):
+            document = get_object_or_404(Document, pk=pk)
+        elif not request.user.is_authenticated:
+            self.permission_denied(request)
+        else:
+            document = self.get_object()
+        path = getattr(document, path_field)
+        if not path:
+            return Response({'error': 'File not available'}, status=status.HTTP_404_NOT_FOUND)
+
+        backend = get_storage_backend()
+        if isinstance(backend, LocalStorageBackend):
+            abs_path = os.path.join(settings.MEDIA_ROOT, path)
+            if not os.path.isfile(abs_path):
+                logger.warning("[DOC_ARTIFACT] FAILED doc_id=%s kind=%s file missing", document.id, kind)
+                return Response({'error': 'File not available'}, status=status.HTTP_404_NOT_FOUND)
+            response = FileResponse(open(abs_path, 'rb'), filename=os.path.basename(path))
+        else:
+            # Cached signed URLs keep at least SIGNED_URL_CACHE_MARGIN seconds of validity
+            url = backend.get_url(path, request=request)
+            if not url:
+                logger.warning("[DOC_ARTIFACT] FAILED doc_id=%s kind=%s could not sign", document.id, kind)
+                return Response({'error': 'File not available'}, status=status.HTTP_404_NOT_FOUND)
+            response = HttpResponseRedirect(url)
+        patch_cache_control(response, private=True, max_age=settings.ARTIFACT_REDIRECT_MAX_AGE)
+        return response
@@ -0,0 +1,225 @@
+"""Views for direct-to-storage document uploads.
+
+The browser uploads bytes straight to storage, so web workers only
+handle metadata:
+  - POST /api/documents/direct-uploads/          — issue a signed upload URL
+  - (client PUTs the file to the returned URL)
+  - POST /api/documents/direct-uploads/confirm/  — verify the object, create the Document
+
+The upload_id returned by the first call is a signed, time-limited token
+carrying the target path and declared metadata, so no server-side state
+is kept between the two calls.
+
+With local storage the signed URL points at a dev-only PUT endpoint that
+writes under MEDIA_ROOT, capped at DIRECT_UPLOAD_MAX_SIZE.
+"""
+import logging
+import os
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from rest_framework import status
+from rest_framework.decorators import (
+    api_view, authentication_classes, parser_classes, permission_classes,
+)
+from rest_framework.parsers import BaseParser
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from utils.storage import LocalStorageBackend, get_storage_backend
+
+from .models import Document
+from .serializers import DirectUploadConfirmSerializer, DirectUploadCreateSerializer
+from .views_uploads import READ_BUFFER_SIZE, create_uploaded_document, serialized_document_response
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_ID_SALT = 'apps.documents.direct-upload'
+UPLOAD_ID_MAX_AGE = 2 * 60 * 60  # Supabase signed upload URLs last 2 hours
+
+
+class _BodyTooLarge(Exception):
+    """Raised while streaming a local PUT body past DIRECT_UPLOAD_MAX_SIZE."""
+
+
+class RawBodyParser(BaseParser):
+    """Accept any content type without reading the body (the view streams it)."""
+
+    media_type = '*/*'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return {}
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_direct_upload(request: Request) -> Response:
+    """Issue a signed URL the client can upload the file to directly.
+
+    POST /api/documents/direct-uploads/
+    Body: { "case": 1, "filename": "scan.pdf", "mime_type": "application/pdf",
+            "size": 73400320, "name": "Scan", "notes": "" }
+    """
+    serializer = DirectUploadCreateSerializer(data=request.data, context={'request': request})
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+    case = data['case']
+    storage_path = f"{request.user.id}/{case.id}/{uuid.uuid4().hex[:12]}_{data['filename']}"
+
+    backend = get_storage_backend()
+    target = backend.get_upload_url(storage_path, data['mime_type'], request=request)
+    if not target:
+        return Response(
+            {'error': 'Failed to create upload URL.'},
+            status=status.HTTP_502_BAD_GATEWAY,
+        )
+
+    upload_id = signing.dumps({
+        'advocate': str(request.user.id),
+        'case': case.id,
+        'path': storage_path,
+        'name': data.get('name') or os.path.splitext(data['filename'])[0],
+        'mime_type': data['mime_type'],
+        'size': data['size'],
+        'notes': data.get('notes', ''),
+    }, salt=UPLOAD_ID_SALT)
+
+    logger.info(
+        "[DOC_DIRECT_UPLOAD] issued user=%s case_id=%s path=%s size=%d",
+        request.user.email, case.id, storage_path, data['size'],
+    )
+    return Response({
+        'upload_id': upload_id,
+        'upload_url': target['url'],
+        'method': target['method'],
+        'headers': target['headers'],
+        'storage_path': storage_path,
+        'expires_in': UPLOAD_ID_MAX_AGE,
+    }, status=status.HTTP_201_CREATED)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def confirm_direct_upload(request: Request) -> Response:
+    """Verify the uploaded object and create its Document.
+
+    POST /api/documents/direct-uploads/confirm/
+    Body: { "upload_id": "<from create_direct_upload>" }
+    """
+    serializer = DirectUploadConfirmSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    try:
+        intent = signing.loads(
+            serializer.validated_data['upload_id'], salt=UPLOAD_ID_SALT, max_age=UPLOAD_ID_MAX_AGE,
+        )
+    except signing.BadSignature:
+        return Response(
+            {'error': 'Invalid or expired upload_id.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if intent['advocate'] != str(request.user.id):
+        return Response(
+            {'error': 'Invalid or expired upload_id.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    path = intent['path']
+    if Document.objects.filter(file_path=path).exists():
+        return Response(
+            {'error': 'Upload already confirmed.'},
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    backend = get_storage_backend()
+    info = backend.stat(path)
+    if info is None:
+        return Response(
+            {'error': 'Uploaded file not found in storage.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    problem = None
+    if info['size'] != intent['size']:
+        problem = f"Size mismatch: declared {intent['size']} bytes, stored {info['size']} bytes."
+    elif info['content_type'] != intent['mime_type']:
+        problem = f"Type mismatch: declared {intent['mime_type']}, stored {info['content_type']}."
+    if problem:
+        logger.warning("[DOC_DIRECT_UPLOAD] rejected path=%s: %s", path, problem)
+        backend.delete(path)
+        return Response({'error': problem}, status=status.HTTP_400_BAD_REQUEST)
+
+    cases = Document._meta.get_field('case').related_model.objects.filter(pk=intent['case'])
+    if request.user.role != 'admin':
+        cases = cases.filter(advocate=request.user)
+    with transaction.atomic():
+        # Confirms of the same upload queue on the case row, so only one
+        # of them sees no Document for the path
+        case = cases.select_for_update().first()
+        if case is None:
+            return Response({'error': 'Case not found.'}, status=status.HTTP_404_NOT_FOUND)
+        if Document.objects.filter(file_path=path).exists():
+            return Response(
+                {'error': 'Upload already confirmed.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        doc = create_uploaded_document(
+            request.user, case, intent['name'], path,
+            intent['mime_type'], info['size'], intent['notes'],
+            history_note='Direct-to-storage upload confirmed',
+        )
+    logger.info("[DOC_DIRECT_UPLOAD] confirmed doc_id=%s path=%s size=%d", doc.id, path, info['size'])
+    return serialized_document_response(doc, request)
+
+
+@api_view(['PUT'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+@parser_classes([RawBodyParser])
+def local_direct_upload(request: Request, token: str) -> Response:
+    """Dev-only stand-in for a storage signed upload URL (local backend).
+
+    PUT /api/documents/direct-uploads/local/<token>/
+    The signed token authorizes writing exactly one path.
+    """
+    backend = get_storage_backend()
+    path = LocalStorageBackend.load_upload_token(token)
+    if not isinstance(backend, LocalStorageBackend) or not path:
+        return Response({'error': 'Invalid upload URL.'}, status=status.HTTP_403_FORBIDDEN)
+    if backend.stat(path) is not None:
+        return Response({'error': 'Object already exists.'}, status=status.HTTP_409_CONFLICT)
+
+    max_size = settings.DIRECT_UPLOAD_MAX_SIZE
+    try:
+        declared = int(request.headers.get('Content-Length') or 0)
+    except ValueError:
+        declared = 0
+    if declared > max_size:
+        return Response(
+            {'error': f'File exceeds {max_size} bytes.'},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+
+    stream = request.stream
+    chunks = iter(lambda: stream.read(READ_BUFFER_SIZE), b'') if stream else iter(())
+
+    def capped():
+        received = 0
+        for chunk in chunks:
+            received += len(chunk)
+            if received > max_size:
+                raise _BodyTooLarge
+            yield chunk
+
+    try:
+        backend.upload_content(capped(), path, content_type=request.content_type)
+    except _BodyTooLarge:
+        backend.delete(path)
+        logger.warning("[DOC_DIRECT_UPLOAD] local PUT over %d bytes rejected path=%s", max_size, path)
+        return Response(
+            {'error': f'File exceeds {max_size} bytes.'},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+    return Response({'Key': path})
@@ -11,7 +11,10 @@ import logging
 import os
 from typing import Optional
 
+import httpx
 import requests
+from asgiref.sync import sync_to_async
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
@@ -19,7 +22,14 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from .models import Document, DocumentActivityLog, DocumentStatusHistory, DocumentVersion
+from apps.search.text_index import index_document_text
+from apps.webhooks.answer_cache import get_answer_cache
+from utils.async_views import async_api_view
+from utils.multipart import MultipartEncoder, storage_part
+from utils.webhook_client import async_http_client, get_webhook_client
+
+from .activity import log_activity
+from .models import Document, DocumentStatusHistory, DocumentVersion
 from .serializers_review import DocumentVersionSerializer
 
 logger = logging.getLogger(__name__)
@@ -32,17 +42,8 @@ def _log_activity(
     detail: str = '',
     actor: str = 'system',
 ) -> None:
-    """Create a high-level activity log entry for user tracking."""
-    try:
-        DocumentActivityLog.objects.create(
-            document=doc,
-            event_type=event_type,
-            message=message,
-            detail=detail,
-            actor=actor,
-        )
-    except Exception:
-        logger.exception("Failed to create activity log for doc %s", doc.id)
+    """Create a high-level activity log entry for user tracking (buffered per request)."""
+    log_activity(doc, event_type, message, detail=detail, actor=actor)
 
 
 def _get_document_for_user(pk: int, user) -> Document:
@@ -88,17 +89,15 @@ def save_version(request: Request, pk: int) -> Response:
 
     # Store HTML in Supabase
     from utils.storage import get_storage_backend
-    from django.core.files.uploadedfile import SimpleUploadedFile
 
     prefix = os.path.splitext(doc.name)[0].replace(' ', '_')
     suffix = f'{prefix}_v{next_number}.html'
     relative_path = f"{doc.advocate_id}/{doc.case_id}/processed/{doc.id}_{suffix}"
 
     backend = get_storage_backend()
-    file_obj = SimpleUploadedFile(suffix, html_content.encode('utf-8'), 'text/html')
 
     try:
-        stored_path = backend.upload(file_obj, relative_path)
+        stored_path = backend.upload_content(html_content.encode('utf-8'), relative_path, 'text/html')
         logger.info("[DOC_SAVE_VER] doc_id=%s stored path=%s", doc.id, stored_path)
     except Exception:
         logger.exception("[DOC_SAVE_VER] FAILED doc_id=%s storage upload for v%d", doc.id, next_number)
@@ -139,56 +138,34 @@ def save_version(request: Request, pk: int) -> Response:
     )
 
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def generate_pdf(request: Request, pk: int) -> Response:
-    """Generate a PDF from the current HTML and finalize the document.
-
-    POST /api/v2/documents/<pk>/generate-pdf/
+async def _read_stored(backend, path: str) -> bytes:
+    """Fetch a stored file without blocking the event loop.
 
-    Takes the latest processed HTML, converts it to PDF using xhtml2pdf,
-    stores the PDF in Supabase, transitions document to 'finalized',
-    and returns the PDF URL.
+    Signed (absolute) URLs are downloaded with the async HTTP client;
+    local storage is read in a worker thread. Returns b'' when the file
+    cannot be fetched.
     """
-    doc = _get_document_for_user(pk, request.user)
-
-    if doc.status != 'processed':
-        return Response(
-            {'error': 'Document must be processed before generating PDF.'},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-
-    if not doc.processed_html_path:
-        return Response(
-            {'error': 'No processed HTML available to generate PDF from.'},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-
-    try:
-        # Download the latest HTML from storage
-        from utils.storage import get_storage_backend
-        import httpx as httpx_client
-
-        backend = get_storage_backend()
-        html_url = backend.get_url(doc.processed_html_path)
-
-        html_content = b''
-        if html_url:
-            with httpx_client.Client(timeout=30.0, follow_redirects=True) as client:
-                resp = client.get(html_url)
-            if resp.status_code == 200:
-                html_content = resp.content
-
-        if not html_content:
-            return Response(
-                {'error': 'Failed to download HTML content.'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
-
-        # Wrap in proper HTML document for xhtml2pdf
-        html_text = html_content.decode('utf-8', errors='replace')
-        if '<html' not in html_text.lower():
-            html_text = f"""<!DOCTYPE html>
+    url = await sync_to_async(backend.get_url, thread_sensitive=False)(path)
+    if url and url.startswith(('http://', 'https://')):
+        async with async_http_client() as http:
+            resp = await http.get(url, timeout=30.0, follow_redirects=True)
+        return resp.content if resp.status_code == 200 else b''
+
+    def read_all() -> bytes:
+        try:
+            return b''.join(backend.read_chunks(path))
+        except OSError:
+            return b''
+
+    return await sync_to_async(read_all, thread_sensitive=False)()
+
+
+def _store_pdf(doc: Document, html_content: bytes, user, backend) -> Response:
+    """Render HTML to PDF, store it and finalize the document (sync: CPU + ORM)."""
+    # Wrap in proper HTML document for xhtml2pdf
+    html_text = html_content.decode('utf-8', errors='replace')
+    if '<html' not in html_text.lower():
+        html_text = f"""<!DOCTYPE html>
 <html>
 <head>
 <meta charset="utf-8"/>
@@ -207,74 +184,112 @@ mark {{ background-color: #ffeb3b; padding: 1px 3px; }}
 </body>
 </html>"""
 
-        # Generate PDF using xhtml2pdf
-        import io
-        from xhtml2pdf import pisa
+    # Generate PDF using xhtml2pdf
+    import io
+    from xhtml2pdf import pisa
 
-        pdf_buffer = io.BytesIO()
-        pisa_status = pisa.CreatePDF(
-            io.StringIO(html_text),
-            dest=pdf_buffer,
-            encoding='utf-8',
+    pdf_buffer = io.BytesIO()
+    pisa_status = pisa.CreatePDF(
+        io.BytesIO(html_text.encode('utf-8')),  # html5lib rejects an encoding for text input
+        dest=pdf_buffer,
+        encoding='utf-8',
+    )
+
+    if pisa_status.err:
+        logger.error("xhtml2pdf error generating PDF for doc %s: %s", doc.pk, pisa_status.err)
+        return Response(
+            {'error': 'PDF generation failed.'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
-        if pisa_status.err:
-            logger.error("xhtml2pdf error generating PDF for doc %s: %s", pk, pisa_status.err)
-            return Response(
-                {'error': 'PDF generation failed.'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+    pdf_bytes = pdf_buffer.getvalue()
+    logger.info("Generated PDF for doc %s: %d bytes", doc.pk, len(pdf_bytes))
 
-        pdf_bytes = pdf_buffer.getvalue()
-        logger.info("Generated PDF for doc %s: %d bytes", pk, len(pdf_bytes))
+    # Store PDF in Supabase
+    prefix = os.path.splitext(doc.name)[0].replace(' ', '_')
+    pdf_filename = f'{prefix}_extracted.pdf'
+    relative_path = f"{doc.advocate_id}/{doc.case_id}/processed/{doc.id}_{pdf_filename}"
 
-        # Store PDF in Supabase
-        from django.core.files.uploadedfile import SimpleUploadedFile
+    stored_path = backend.upload_content(pdf_bytes, relative_path, 'application/pdf')
 
-        prefix = os.path.splitext(doc.name)[0].replace(' ', '_')
-        pdf_filename = f'{prefix}_extracted.pdf'
-        relative_path = f"{doc.advocate_id}/{doc.case_id}/processed/{doc.id}_{pdf_filename}"
+    # Update document: set extracted PDF path and transition to finalized
+    old_status = doc.status
+    doc.extracted_pdf_path = stored_path
+    doc.status = 'finalized'
+    doc.save(update_fields=['extracted_pdf_path', 'status', 'updated_at'])
 
-        file_obj = SimpleUploadedFile(pdf_filename, pdf_bytes, 'application/pdf')
-        stored_path = backend.upload(file_obj, relative_path)
+    # Log status history
+    DocumentStatusHistory.objects.create(
+        document=doc,
+        from_status=old_status,
+        to_status='finalized',
+        changed_by=user,
+        notes=f"PDF generated ({len(pdf_bytes)} bytes) and document finalized.",
+    )
 
-        # Update document: set extracted PDF path and transition to finalized
-        old_status = doc.status
-        doc.extracted_pdf_path = stored_path
-        doc.status = 'finalized'
-        doc.save(update_fields=['extracted_pdf_path', 'status', 'updated_at'])
+    logger.info(
+        "Document %s finalized: PDF stored at %s (%d bytes) by %s",
+        doc.id, stored_path, len(pdf_bytes), user.email,
+    )
 
-        # Log status history
-        DocumentStatusHistory.objects.create(
-            document=doc,
-            from_status=old_status,
-            to_status='finalized',
-            changed_by=request.user,
-            notes=f"PDF generated ({len(pdf_bytes)} bytes) and document finalized.",
-        )
+    _log_activity(
+        doc, 'pdf_generated',
+        f'PDF generated ({len(pdf_bytes):,} bytes) and document finalized',
+        detail=pdf_filename,
+        actor=user.email,
+    )
 
-        logger.info(
-            "Document %s finalized: PDF stored at %s (%d bytes) by %s",
-            doc.id, stored_path, len(pdf_bytes), request.user.email,
+    # Return the PDF URL
+    pdf_url = backend.get_url(stored_path)
+
+    return Response({
+        'ok': True,
+        'pdf_url': pdf_url,
+        'pdf_path': stored_path,
+        'pdf_size': len(pdf_bytes),
+        'status': 'finalized',
+    })
+
+
+@async_api_view(['POST'])
+async def generate_pdf(request: Request, pk: int) -> Response:
+    """Generate a PDF from the current HTML and finalize the document.
+
+    POST /api/v2/documents/<pk>/generate-pdf/
+
+    Takes the latest processed HTML, converts it to PDF using xhtml2pdf,
+    stores the PDF in Supabase, transitions document to 'finalized',
+    and returns the PDF URL. The HTML download is async; rendering and
+    storing run in a worker thread.
+    """
+    doc = await sync_to_async(_get_document_for_user)(pk, request.user)
+
+    if doc.status != 'processed':
+        return Response(
+            {'error': 'Document must be processed before generating PDF.'},
+            status=status.HTTP_400_BAD_REQUEST,
         )
 
-        _log_activity(
-            doc, 'pdf_generated',
-            f'PDF generated ({len(pdf_bytes):,} bytes) and document finalized',
-            detail=pdf_filename,
-            actor=request.user.email,
+    if not doc.processed_html_path:
+        return Response(
+            {'error': 'No processed HTML available to generate PDF from.'},
+            status=status.HTTP_400_BAD_REQUEST,
         )
 
-        # Return the PDF URL
-        pdf_url = backend.get_url(stored_path)
+    try:
+        # Download the latest HTML from storage
+        from utils.storage import get_storage_backend
 
-        return Response({
-            'ok': True,
-            'pdf_url': pdf_url,
-            'pdf_path': stored_path,
-            'pdf_size': len(pdf_bytes),
-            'status': 'finalized',
-        })
+        backend = get_storage_backend()
+        html_content = await _read_stored(backend, doc.processed_html_path)
+
+        if not html_content:
+            return Response(
+                {'error': 'Failed to download HTML content.'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        return await sync_to_async(_store_pdf)(doc, html_content, request.user, backend)
 
     except Exception as exc:
         logger.exception("Failed to generate PDF for document %s", pk)
@@ -284,18 +299,125 @@ mark {{ background-color: #ffeb3b; padding: 1px 3px; }}
         )
 
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def finalize_to_rag(request: Request, pk: int) -> Response:
+def _prepare_rag_push(doc: Document, user) -> dict:
+    """Build the RAG webhook request for a document (sync: ORM + storage stat).
+
+    Returns:
+        A dict with the multipart `body`, `headers` and details for logging.
+    """
+    # Get latest version info
+    latest = doc.versions.order_by('-version_number').first()
+    version_number = latest.version_number if latest else 1
+
+    # Use v2 TXT file if available (finalized by user), otherwise fall back to report.
+    # It is streamed from storage into the request body, never held whole.
+    txt_path = doc.txt_v2_path if doc.txt_v2_path else doc.processed_report_path
+    prefix = os.path.splitext(doc.name)[0].replace(' ', '_')
+    file_type = 'v2' if doc.txt_v2_path else 'report'
+
+    txt_part = None
+    if txt_path:
+        try:
+            txt_part = storage_part(
+                f'{prefix}_{file_type}', f'{prefix}_{file_type}.txt', txt_path, content_type='text/plain',
+            )
+        except Exception:
+            logger.exception("[DOC_RAG] Failed to read TXT for RAG finalization")
+
+    # Build history log
+    versions = doc.versions.order_by('version_number').all()
+    history_lines = [f"Document: {doc.name}", f"Total versions: {version_number}", "---"]
+    for v in versions:
+        history_lines.append(
+            f"v{v.version_number} — {v.created_at.strftime('%Y-%m-%d %H:%M')} "
+            f"by {v.created_by.email if v.created_by else 'system'}: {v.notes}"
+        )
+    history_log = '\n'.join(history_lines).encode('utf-8')
+
+    client_name = doc.case.client.full_name if doc.case and doc.case.client else ''
+    case_name = doc.case.title if doc.case else ''
+
+    secret = os.environ.get('N8N_WEBHOOK_SECRET', '')
+    headers = {}
+    if secret:
+        headers['X-Webhook-Secret'] = secret
+
+    form_data = {
+        'client_name': client_name,
+        'case_name': case_name,
+        'document_id': str(doc.id),
+        'version': str(version_number),
+    }
+
+    # Send v2 TXT file to Pinecone (finalized text after user edits)
+    files = [txt_part] if txt_part else []
+    body = MultipartEncoder(form_data, files)
+    headers.update(body.headers)
+
+    # Log RAG file upload details
+    file_details = ', '.join([f"{part.name}({part.size} bytes)" for part in files])
+    logger.info(
+        "[DOC_RAG] Sending RAG finalize for doc %s v%d (client_name=%s, case_name=%s, files=%s)",
+        doc.id, version_number, client_name, case_name, file_details,
+    )
+
+    # Record in status history for user visibility
+    DocumentStatusHistory.objects.create(
+        document=doc,
+        from_status=doc.status,
+        to_status=doc.status,
+        changed_by=user,
+        notes=f"RAG finalize: Uploading {len(files)} files to n8n ({file_details})",
+    )
+    return {
+        'body': body,
+        'headers': headers,
+        'version_number': version_number,
+        'file_count': len(files),
+        'file_details': file_details,
+        'history_log': history_log,
+        'client_name': client_name,
+        'case_name': case_name,
+    }
+
+
+def _record_rag_result(doc: Document, user, push: dict, status_code: int, text: str, rag_message: str) -> None:
+    """Record the RAG webhook's answer in history and the activity log (sync ORM)."""
+    # Record response in status history
+    DocumentStatusHistory.objects.create(
+        document=doc,
+        from_status=doc.status,
+        to_status=doc.status,
+        changed_by=user,
+        notes=f"RAG response: {status_code} — {text[:200]}",
+    )
+    _log_activity(
+        doc, 'rag_push',
+        f'Document pushed to RAG (v{push["version_number"]}, {push["file_count"]} files)',
+        detail=f'Files: {push["file_details"]}',
+        actor=user.email,
+    )
+    _log_activity(
+        doc, 'rag_response',
+        f'RAG response: {rag_message[:200]}',
+        actor='n8n',
+    )
+    # Cached chat answers for this client/case may be outdated by the new content
+    get_answer_cache().invalidate(doc.advocate_id, doc.case.client_id, doc.case_id)
+
+
+@async_api_view(['POST'])
+async def finalize_to_rag(request: Request, pk: int) -> Response:
     """Finalize document and push to RAG webhook for vector indexing.
 
     POST /api/v2/documents/<pk>/finalize-rag/
 
     Sends client_name, case_id, and the latest version HTML to the RAG webhook.
-    n8n inserts the content into the Pinecone vector DB.
+    n8n inserts the content into the Pinecone vector DB. The upload and the
+    wait for n8n are async; ORM work runs through sync_to_async.
     """
     try:
-        doc = _get_document_for_user(pk, request.user)
+        doc = await sync_to_async(_get_document_for_user)(pk, request.user)
 
         if doc.status != 'processed':
             return Response(
@@ -303,45 +425,6 @@ def finalize_to_rag(request: Request, pk: int) -> Response:
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Get latest version info
-        latest = doc.versions.order_by('-version_number').first()
-        version_number = latest.version_number if latest else 1
-
-        # Download the latest HTML from storage
-        from utils.storage import get_storage_backend
-        import httpx as httpx_client
-
-        backend = get_storage_backend()
-        
-        # Use v2 TXT file if available (finalized by user), otherwise fall back to report
-        txt_path = doc.txt_v2_path if doc.txt_v2_path else doc.processed_report_path
-        txt_url = backend.get_url(txt_path) if txt_path else None
-
-        txt_content = b''
-
-        if txt_url:
-            try:
-                with httpx_client.Client(timeout=30.0, follow_redirects=True) as client:
-                    resp = client.get(txt_url)
-                if resp.status_code == 200:
-                    txt_content = resp.content
-                    logger.info(
-                        "[DOC_RAG] doc_id=%s downloaded txt file: %s (%d bytes)",
-                        doc.id, 'v2.txt' if doc.txt_v2_path else 'report.txt', len(txt_content),
-                    )
-            except Exception:
-                logger.exception("[DOC_RAG] Failed to download TXT for RAG finalization")
-
-        # Build history log
-        versions = doc.versions.order_by('version_number').all()
-        history_lines = [f"Document: {doc.name}", f"Total versions: {version_number}", "---"]
-        for v in versions:
-            history_lines.append(
-                f"v{v.version_number} — {v.created_at.strftime('%Y-%m-%d %H:%M')} "
-                f"by {v.created_by.email if v.created_by else 'system'}: {v.notes}"
-            )
-        history_log = '\n'.join(history_lines).encode('utf-8')
-
         # Send to RAG webhook
         rag_url = os.environ.get('N8N_RAG_WEBHOOK_URL', '')
         if not rag_url:
@@ -350,48 +433,11 @@ def finalize_to_rag(request: Request, pk: int) -> Response:
                 status=status.HTTP_503_SERVICE_UNAVAILABLE,
             )
 
-        client_name = doc.case.client.full_name if doc.case and doc.case.client else ''
-        case_name = doc.case.title if doc.case else ''
-        prefix = os.path.splitext(doc.name)[0].replace(' ', '_')
-
-        secret = os.environ.get('N8N_WEBHOOK_SECRET', '')
-        headers = {}
-        if secret:
-            headers['X-Webhook-Secret'] = secret
-
-        files = {}
-        form_data = {
-            'client_name': client_name,
-            'case_name': case_name,
-            'document_id': str(doc.id),
-            'version': str(version_number),
-        }
-
-        # Send v2 TXT file to Pinecone (finalized text after user edits)
-        if txt_content:
-            file_type = 'v2' if doc.txt_v2_path else 'report'
-            files[f'{prefix}_{file_type}'] = (
-                f'{prefix}_{file_type}.txt', txt_content, 'text/plain',
-            )
-
-        # Log RAG file upload details
-        file_details = ', '.join([f"{k}({len(v[1])} bytes)" for k, v in files.items()])
-        logger.info(
-            "[DOC_RAG] Sending RAG finalize for doc %s v%d (client_name=%s, case_name=%s, files=%s)",
-            doc.id, version_number, client_name, case_name, file_details,
-        )
-        
-        # Record in status history for user visibility
-        DocumentStatusHistory.objects.create(
-            document=doc,
-            from_status=doc.status,
-            to_status=doc.status,
-            changed_by=request.user,
-            notes=f"RAG finalize: Uploading {len(files)} files to n8n ({file_details})",
-        )
+        push = await sync_to_async(_prepare_rag_push)(doc, request.user)
 
-        resp = requests.post(
-            rag_url, data=form_data, files=files, headers=headers, timeout=60,
+        # Re-indexing the same document version upserts the same vectors, so retries are safe
+        resp = await get_webhook_client().apost(
+            'rag', rag_url, idempotent=True, content=push['body'].async_body, headers=push['headers'], timeout=60,
         )
         resp.raise_for_status()
 
@@ -401,15 +447,6 @@ def finalize_to_rag(request: Request, pk: int) -> Response:
             "RAG finalize raw response: status=%s ct='%s' size=%d body='%s'",
             resp.status_code, ct, len(resp.content), resp.text[:300],
         )
-        
-        # Record response in status history
-        DocumentStatusHistory.objects.create(
-            document=doc,
-            from_status=doc.status,
-            to_status=doc.status,
-            changed_by=request.user,
-            notes=f"RAG response: {resp.status_code} — {resp.text[:200]}",
-        )
 
         if 'application/json' in ct:
             try:
@@ -434,25 +471,17 @@ def finalize_to_rag(request: Request, pk: int) -> Response:
 
         logger.info("RAG finalize result: %s", rag_message)
 
-        _log_activity(
-            doc, 'rag_push',
-            f'Document pushed to RAG (v{version_number}, {len(files)} files)',
-            detail=f'Files: {file_details}',
-            actor=request.user.email,
-        )
-        _log_activity(
-            doc, 'rag_response',
-            f'RAG response: {rag_message[:200]}',
-            actor='n8n',
-        )
+        await sync_to_async(_record_rag_result)(doc, request.user, push, resp.status_code, resp.text, rag_message)
 
         return Response({
             'ok': True,
-            'version': version_number,
+            'version': push['version_number'],
             'rag_response': rag_message,
         })
 
-    except requests.RequestException as exc:
+    except Http404:
+        raise
+    except (httpx.HTTPError, requests.RequestException) as exc:
         logger.error("RAG finalize failed for document %s: %s", pk, exc)
         return Response(
             {'error': f'RAG webhook failed: {str(exc)}'},
@@ -568,6 +597,7 @@ def upload_v2_files(request: Request, pk: int) -> Response:
         doc.txt_v2_path = txt_v2_path
         doc.corrections_log_path = corrections_log_path
         doc.save(update_fields=['html_v2_path', 'txt_v2_path', 'corrections_log_path', 'updated_at'])
+        index_document_text(doc, txt_v2_file.chunks(), txt_v2_path)
 
         # Log in status history
         DocumentStatusHistory.objects.create(
@@ -0,0 +1,296 @@
+"""Views for resumable (chunked) document uploads.
+
+A TUS-style protocol so large scans survive flaky connections:
+  - POST   /api/documents/uploads/                 — init, returns session + Location
+  - HEAD   /api/documents/uploads/<id>/            — current Upload-Offset
+  - GET    /api/documents/uploads/<id>/            — session state as JSON
+  - PATCH  /api/documents/uploads/<id>/            — append a part at Upload-Offset
+  - DELETE /api/documents/uploads/<id>/            — abort and discard parts
+  - POST   /api/documents/uploads/<id>/complete/   — create the Document
+
+Parts are streamed from the request body straight into the storage
+backend (local part file, or Supabase's TUS endpoint in production), so
+a worker never holds more than one read buffer of the upload.
+"""
+import logging
+import os
+from typing import Iterator
+
+from django.conf import settings
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from utils.storage import ResumableOffsetError, TUS_VERSION, get_storage_backend
+
+from .models import Document, DocumentStatusHistory, UploadSession
+from .serializers import (
+    ALLOWED_MIME_TYPES, DocumentSerializer, UploadSessionCreateSerializer, UploadSessionSerializer,
+)
+
+logger = logging.getLogger(__name__)
+
+PART_CONTENT_TYPE = 'application/offset+octet-stream'
+READ_BUFFER_SIZE = 64 * 1024
+
+
+def _offset_headers(session: UploadSession) -> dict:
+    """TUS-style headers describing the session's progress."""
+    return {
+        'Tus-Resumable': TUS_VERSION,
+        'Upload-Offset': str(session.offset),
+        'Upload-Length': str(session.total_size),
+        'Cache-Control': 'no-store',
+    }
+
+
+def _iter_body(stream, length: int) -> Iterator[bytes]:
+    """Yield exactly `length` bytes from the request stream in small buffers."""
+    remaining = length
+    while remaining > 0:
+        chunk = stream.read(min(READ_BUFFER_SIZE, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
+
+
+def create_uploaded_document(
+    advocate, case, name: str, file_path: str, mime_type: str, size: int, notes: str, history_note: str,
+) -> Document:
+    """Create the Document and its initial status history for a finished upload."""
+    doc = Document.objects.create(
+        case=case,
+        advocate=advocate,
+        name=name,
+        file_path=file_path,
+        file_type=ALLOWED_MIME_TYPES[mime_type],
+        file_size_bytes=size,
+        mime_type=mime_type,
+        notes=notes,
+    )
+    DocumentStatusHistory.objects.create(
+        document=doc,
+        from_status=None,
+        to_status='uploaded',
+        changed_by=advocate,
+        notes=history_note,
+    )
+    return doc
+
+
+def serialized_document_response(doc: Document, request: Request) -> Response:
+    """Return the full document representation with 201 Created."""
+    doc = Document.objects.select_related('case', 'case__client').prefetch_related(
+        'status_history', 'status_history__changed_by',
+    ).get(pk=doc.pk)
+    return Response(
+        DocumentSerializer(doc, context={'request': request}).data,
+        status=status.HTTP_201_CREATED,
+    )
+
+
+def _get_session(pk, user) -> UploadSession:
+    """Retrieve an upload session owned by the requesting user."""
+    return get_object_or_404(UploadSession, pk=pk, advocate=user)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_upload_session(request: Request) -> Response:
+    """Start a resumable upload.
+
+    POST /api/documents/uploads/
+    Body: { "case": 1, "filename": "scan.pdf", "mime_type": "application/pdf",
+            "size": 73400320, "name": "Scan", "notes": "" }
+    """
+    serializer = UploadSessionCreateSerializer(data=request.data, context={'request': request})
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+    case = data['case']
+    storage_path = f"{request.user.id}/{case.id}/{data['filename']}"
+
+    backend = get_storage_backend()
+    try:
+        token = backend.start_resumable(storage_path, data['mime_type'], data['size'])
+    except Exception:
+        logger.exception("[DOC_UPLOAD_INIT] FAILED user=%s path=%s", request.user.email, storage_path)
+        return Response(
+            {'error': 'Failed to start upload.'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+    session = UploadSession.objects.create(
+        advocate=request.user,
+        case=case,
+        name=data.get('name') or os.path.splitext(data['filename'])[0],
+        filename=data['filename'],
+        mime_type=data['mime_type'],
+        notes=data.get('notes', ''),
+        total_size=data['size'],
+        storage_path=storage_path,
+        upload_token=token,
+    )
+    logger.info(
+        "[DOC_UPLOAD_INIT] session=%s user=%s case_id=%s size=%d",
+        session.id, request.user.email, case.id, session.total_size,
+    )
+    headers = _offset_headers(session)
+    headers['Location'] = request.build_absolute_uri(f'/api/documents/uploads/{session.id}/')
+    return Response(
+        UploadSessionSerializer(session).data,
+        status=status.HTTP_201_CREATED,
+        headers=headers,
+    )
+
+
+@api_view(['GET', 'HEAD', 'PATCH', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def upload_session_detail(request: Request, upload_id) -> Response:
+    """Report progress (GET/HEAD), append a part (PATCH) or abort (DELETE)."""
+    session = _get_session(upload_id, request.user)
+
+    if request.method == 'HEAD':
+        return Response(headers=_offset_headers(session))
+    if request.method == 'GET':
+        return Response(UploadSessionSerializer(session).data, headers=_offset_headers(session))
+
+    if session.status != 'active':
+        return Response(
+            {'error': f'Upload is {session.status}.'},
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    backend = get_storage_backend()
+
+    if request.method == 'DELETE':
+        backend.abort_resumable(session.upload_token)
+        session.status = 'aborted'
+        session.save(update_fields=['status', 'updated_at'])
+        logger.info("[DOC_UPLOAD_ABORT] session=%s offset=%d", session.id, session.offset)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    return _append_part(request, session, backend)
+
+
+def _append_part(request: Request, session: UploadSession, backend) -> Response:
+    """Stream the PATCH body into storage at the client's Upload-Offset."""
+    if request.content_type != PART_CONTENT_TYPE:
+        return Response(
+            {'error': f'Content-Type must be {PART_CONTENT_TYPE}.'},
+            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        )
+    try:
+        offset = int(request.headers['Upload-Offset'])
+        length = int(request.headers.get('Content-Length') or 0)
+    except (KeyError, ValueError):
+        return Response(
+            {'error': 'Upload-Offset and Content-Length headers are required.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if offset != session.offset:
+        return Response(
+            {'error': f'Offset mismatch: upload is at {session.offset}.'},
+            status=status.HTTP_409_CONFLICT,
+            headers=_offset_headers(session),
+        )
+    if length <= 0 or length > settings.RESUMABLE_UPLOAD_MAX_PART_SIZE:
+        return Response(
+            {'error': f'Part size must be 1..{settings.RESUMABLE_UPLOAD_MAX_PART_SIZE} bytes.'},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+    if offset + length > session.total_size:
+        return Response(
+            {'error': 'Part extends beyond the declared upload size.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    # Supabase's TUS endpoint only accepts fixed-size parts before the last one
+    chunk_size = settings.RESUMABLE_UPLOAD_CHUNK_SIZE
+    if offset + length < session.total_size and length != chunk_size:
+        return Response(
+            {'error': f'Every part except the last must be exactly {chunk_size} bytes.'},
+            status=status.HTTP_400_BAD_REQUEST,
+            headers=_offset_headers(session),
+        )
+
+    try:
+        new_offset = backend.append_resumable(
+            session.upload_token, session.storage_path, offset,
+            _iter_body(request.stream, length),
+        )
+    except ResumableOffsetError as exc:
+        logger.warning("[DOC_UPLOAD_PART] session=%s %s", session.id, exc)
+        session.offset = exc.expected
+        UploadSession.objects.filter(pk=session.pk).update(offset=exc.expected)
+        return Response(
+            {'error': str(exc)},
+            status=status.HTTP_409_CONFLICT,
+            headers=_offset_headers(session),
+        )
+    except Exception:
+        logger.exception("[DOC_UPLOAD_PART] FAILED session=%s offset=%d", session.id, offset)
+        return Response(
+            {'error': 'Failed to store upload part.'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+    # Conditional update: a concurrent PATCH for the same offset loses
+    UploadSession.objects.filter(pk=session.pk, offset=offset).update(
+        offset=new_offset, updated_at=timezone.now(),
+    )
+    session.offset = new_offset
+    return Response(status=status.HTTP_204_NO_CONTENT, headers=_offset_headers(session))
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def complete_upload_session(request: Request, upload_id) -> Response:
+    """Assemble the upload and create its Document.
+
+    POST /api/documents/uploads/<id>/complete/
+    Returns the full document object, like POST /api/documents/.
+    """
+    session = _get_session(upload_id, request.user)
+    if session.status != 'active':
+        return Response(
+            {'error': f'Upload is {session.status}.'},
+            status=status.HTTP_409_CONFLICT,
+        )
+    if not session.is_complete:
+        return Response(
+            {'error': f'Upload incomplete: {session.offset} of {session.total_size} bytes received.'},
+            status=status.HTTP_400_BAD_REQUEST,
+            headers=_offset_headers(session),
+        )
+
+    backend = get_storage_backend()
+    try:
+        stored_path = backend.finish_resumable(session.upload_token, session.storage_path)
+    except Exception:
+        logger.exception("[DOC_UPLOAD_COMPLETE] FAILED session=%s", session.id)
+        return Response(
+            {'error': 'Failed to finalize upload.'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+    with transaction.atomic():
+        doc = create_uploaded_document(
+            request.user, session.case, session.name, stored_path,
+            session.mime_type, session.total_size, session.notes,
+            history_note='Resumable upload completed',
+        )
+        session.status = 'completed'
+        session.document = doc
+        session.save(update_fields=['status', 'document', 'updated_at'])
+
+    logger.info(
+        "[DOC_UPLOAD_COMPLETE] session=%s doc_id=%s file_path=%s size=%d",
+        session.id, doc.id, stored_path, session.total_size,
+    )
+    return serialized_document_response(doc, request)
@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class SearchConfig(AppConfig):
+    """Configuration for the search app."""
+
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.search"
+    verbose_name = "Search"
+
+    def ready(self) -> None:
+        from . import index, typeahead
+
+        index.connect_signals()
+        typeahead.connect_signals()
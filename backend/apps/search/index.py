@@ -0,0 +1,208 @@
+"""Full-text search index for clients, cases and documents.
+
+SearchEntry rows are written by post_save / post_delete receivers, so the
+index follows every ORM write; `manage.py rebuild_search_index` refills
+it after bulk imports or raw SQL. search() runs one ranked query against
+the backend for the current database:
+
+  - PostgreSQL: `search_vector @@ to_tsquery('simple', 'term:* & ...')`
+    ranked by ts_rank (titles weigh more than bodies). Rows whose title or
+    body contains the raw query (ILIKE, served by the pg_trgm indexes) are
+    included after the full-text hits, so partial emails and phone
+    numbers still match.
+  - SQLite: an FTS5 MATCH on prefix terms (`"term"*`), ranked by bm25;
+    when nothing matches, the icontains fallback below.
+  - Anything else, or SQLite without FTS5: icontains over SearchEntry.
+
+Every term is matched as a prefix, so results appear while a word is
+still being typed. Results are capped per entity type with ROW_NUMBER()
+so a single query serves all three groups.
+"""
+import logging
+import re
+from django.db import connection
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+
+from apps.cases.models import Case
+from apps.clients.models import Client
+from apps.documents.models import Document
+
+from .models import SearchEntry
+
+logger = logging.getLogger(__name__)
+
+MAX_TERMS = 8
+FTS_TABLE = 'search_searchentry_fts'
+
+_term = re.compile(r"\w+", re.UNICODE)
+_fts5_tables: dict[str, bool] = {}
+
+
+def entity_text(instance) -> tuple[str, str, str]:
+    """Return (entity_type, title, body) for a client, case or document."""
+    if isinstance(instance, Client):
+        return 'client', instance.full_name, ' '.join(filter(None, [instance.email, instance.phone]))
+    if isinstance(instance, Case):
+        return 'case', f'{instance.case_number} {instance.title}', instance.description or ''
+    return 'document', instance.name, instance.notes or ''
+
+
+INDEXED_FIELDS = {
+    Client: {'full_name', 'email', 'phone'},
+    Case: {'case_number', 'title', 'description'},
+    Document: {'name', 'notes'},
+}
+
+
+def index_object(instance) -> None:
+    """Create or refresh the SearchEntry for a client, case or document."""
+    entity_type, title, body = entity_text(instance)
+    SearchEntry.objects.update_or_create(
+        entity_type=entity_type,
+        object_id=instance.pk,
+        defaults={'advocate_id': instance.advocate_id, 'title': title[:600], 'body': body},
+    )
+
+
+def rebuild_index() -> int:
+    """Re-index every client, case and document. Returns the number of entries."""
+    SearchEntry.objects.all().delete()
+    total = 0
+    for model in INDEXED_FIELDS:
+        batch = []
+        for instance in model.objects.all().iterator(chunk_size=500):
+            entity_type, title, body = entity_text(instance)
+            batch.append(SearchEntry(
+                entity_type=entity_type, object_id=instance.pk, advocate_id=instance.advocate_id,
+                title=title[:600], body=body,
+            ))
+            if len(batch) >= 500:
+                SearchEntry.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        SearchEntry.objects.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+def _saved(sender, instance, update_fields=None, **kwargs) -> None:
+    if update_fields is not None and not INDEXED_FIELDS[sender] & set(update_fields):
+        return
+    index_object(instance)
+
+
+def _deleted(sender, instance, **kwargs) -> None:
+    entity_type, _, _ = entity_text(instance)
+    SearchEntry.objects.filter(entity_type=entity_type, object_id=instance.pk).delete()
+
+
+def connect_signals() -> None:
+    """Keep the index in step with ORM writes (called from SearchConfig.ready)."""
+    for model in INDEXED_FIELDS:
+        post_save.connect(_saved, sender=model, dispatch_uid=f'search-index-save-{model.__name__}')
+        post_delete.connect(_deleted, sender=model, dispatch_uid=f'search-index-delete-{model.__name__}')
+
+
+def _terms(query: str) -> list[str]:
+    return _term.findall(query.lower())[:MAX_TERMS]
+
+
+def _like_pattern(query: str) -> str:
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def _db_advocate_id(advocate_id):
+    """Convert an advocate id for raw SQL (SQLite stores UUIDs as hex text)."""
+    return SearchEntry._meta.get_field('advocate').get_db_prep_value(advocate_id, connection)
+
+
+def _has_fts5(table: str = FTS_TABLE) -> bool:
+    """Whether the migrations created an FTS5 table (SQLite built with FTS5)."""
+    if table not in _fts5_tables:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [table])
+            _fts5_tables[table] = cursor.fetchone() is not None
+    return _fts5_tables[table]
+
+
+def _postgres_hits(query: str, terms: list[str], advocate_id, limit: int) -> list[tuple[str, int]]:
+    scope = 'AND e.advocate_id = %s' if advocate_id is not None else ''
+    tsquery = ' & '.join(f'{term}:*' for term in terms) if terms else ''
+    pattern = _like_pattern(query)
+    sql = f"""
+        SELECT entity_type, object_id FROM (
+            SELECT e.entity_type, e.object_id, ROW_NUMBER() OVER (
+                PARTITION BY e.entity_type
+                ORDER BY (e.search_vector @@ q.query) DESC,
+                         ts_rank(e.search_vector, q.query) DESC,
+                         similarity(e.title, %s) DESC
+            ) AS n
+            FROM search_searchentry e, (SELECT to_tsquery('simple', %s) AS query) q
+            WHERE (e.search_vector @@ q.query OR e.title ILIKE %s OR e.body ILIKE %s) {scope}
+        ) ranked
+        WHERE n <= %s
+        ORDER BY entity_type, n
+    """
+    params = [query, tsquery, pattern, pattern]
+    params += [_db_advocate_id(advocate_id)] if advocate_id is not None else []
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*params, limit])
+        return cursor.fetchall()
+
+
+def _sqlite_hits(terms: list[str], advocate_id, limit: int) -> list[tuple[str, int]]:
+    scope = 'AND e.advocate_id = %s' if advocate_id is not None else ''
+    match = ' '.join(f'"{term}"*' for term in terms)
+    sql = f"""
+        SELECT entity_type, object_id FROM (
+            SELECT e.entity_type, e.object_id, ROW_NUMBER() OVER (
+                PARTITION BY e.entity_type ORDER BY bm25({FTS_TABLE}, 10.0, 1.0)
+            ) AS n
+            FROM {FTS_TABLE} JOIN search_searchentry e ON e.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH %s {scope}
+        ) WHERE n <= %s
+        ORDER BY entity_type, n
+    """
+    params = [match] + ([_db_advocate_id(advocate_id)] if advocate_id is not None else [])
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*params, limit])
+        return cursor.fetchall()
+
+
+def _fallback_hits(query: str, advocate_id, limit: int) -> list[tuple[str, int]]:
+    entries = SearchEntry.objects.filter(Q(title__icontains=query) | Q(body__icontains=query))
+    if advocate_id is not None:
+        entries = entries.filter(advocate_id=advocate_id)
+    hits: list[tuple[str, int]] = []
+    for entity_type, _ in SearchEntry.ENTITY_TYPES:
+        hits += entries.filter(entity_type=entity_type).values_list('entity_type', 'object_id')[:limit]
+    return hits
+
+
+def search(query: str, advocate_id=None, limit: int = 5) -> dict[str, list[int]]:
+    """Return matching object ids per entity type, best match first.
+
+    Args:
+        query: Raw user input.
+        advocate_id: Restrict to one advocate's data; None searches everything.
+        limit: Maximum ids per entity type.
+
+    Returns:
+        {'client': [...], 'case': [...], 'document': [...]}
+    """
+    terms = _terms(query)
+    vendor = connection.vendor
+    if vendor == 'postgresql':
+        hits = _postgres_hits(query, terms, advocate_id, limit)
+    elif vendor == 'sqlite' and terms and _has_fts5():
+        # FTS5 matches whole tokens only; fall back for mid-token input (phone digits)
+        hits = _sqlite_hits(terms, advocate_id, limit) or _fallback_hits(query, advocate_id, limit)
+    else:
+        hits = _fallback_hits(query, advocate_id, limit)
+
+    ids: dict[str, list[int]] = {entity_type: [] for entity_type, _ in SearchEntry.ENTITY_TYPES}
+    for entity_type, object_id in hits:
+        ids[entity_type].append(object_id)
+    return ids
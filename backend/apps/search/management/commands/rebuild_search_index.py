@@ -0,0 +1,26 @@
+"""Management command that rebuilds the global search index."""
+from django.core.management.base import BaseCommand
+
+from apps.search.index import rebuild_index
+from apps.search.text_index import rebuild_text_index
+from apps.search.typeahead import rebuild_typeahead
+
+
+class Command(BaseCommand):
+    help = 'Re-index every client, case and document for global search and typeahead.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--text',
+            action='store_true',
+            help='Also re-extract the processed text of every document from storage (slow).',
+        )
+
+    def handle(self, *args, **options):
+        total = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} search entries.'))
+        keys = rebuild_typeahead()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {keys} typeahead keys.'))
+        if options['text']:
+            indexed = rebuild_text_index()
+            self.stdout.write(self.style.SUCCESS(f'Indexed the text of {indexed} document(s).'))
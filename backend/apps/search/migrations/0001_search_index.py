@@ -0,0 +1,134 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:43
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+FTS_TABLE = 'search_searchentry_fts'
+
+SQLITE_FTS = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, body, content='search_searchentry', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER search_searchentry_ai AFTER INSERT ON search_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    f"""CREATE TRIGGER search_searchentry_ad AFTER DELETE ON search_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    END""",
+    f"""CREATE TRIGGER search_searchentry_au AFTER UPDATE ON search_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+]
+SQLITE_FTS_DROP = [
+    'DROP TRIGGER IF EXISTS search_searchentry_au',
+    'DROP TRIGGER IF EXISTS search_searchentry_ad',
+    'DROP TRIGGER IF EXISTS search_searchentry_ai',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+POSTGRES_FTS = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    """ALTER TABLE search_searchentry ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(body, '')), 'B')
+    ) STORED""",
+    'CREATE INDEX search_entry_vector_gin ON search_searchentry USING gin (search_vector)',
+    'CREATE INDEX search_entry_title_trgm ON search_searchentry USING gin (title gin_trgm_ops)',
+    'CREATE INDEX search_entry_body_trgm ON search_searchentry USING gin (body gin_trgm_ops)',
+]
+POSTGRES_FTS_DROP = [
+    'DROP INDEX IF EXISTS search_entry_body_trgm',
+    'DROP INDEX IF EXISTS search_entry_title_trgm',
+    'DROP INDEX IF EXISTS search_entry_vector_gin',
+    'ALTER TABLE search_searchentry DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_fulltext(apps, schema_editor):
+    """Add the database's full-text structures (see apps.search.models)."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FTS)
+    elif vendor == 'sqlite':
+        try:
+            _run(schema_editor, SQLITE_FTS)
+        except Exception:  # SQLite built without FTS5: search falls back to icontains
+            _run(schema_editor, SQLITE_FTS_DROP)
+
+
+def drop_fulltext(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FTS_DROP)
+    elif vendor == 'sqlite':
+        _run(schema_editor, SQLITE_FTS_DROP)
+
+
+def populate(apps, schema_editor):
+    """Index existing clients, cases and documents."""
+    SearchEntry = apps.get_model('search', 'SearchEntry')
+    sources = [
+        (
+            'client', apps.get_model('clients', 'Client'),
+            lambda c: (c.full_name, ' '.join(filter(None, [c.email, c.phone]))),
+        ),
+        ('case', apps.get_model('cases', 'Case'),
+         lambda c: (f'{c.case_number} {c.title}', c.description or '')),
+        ('document', apps.get_model('documents', 'Document'),
+         lambda d: (d.name, d.notes or '')),
+    ]
+    for entity_type, model, text in sources:
+        entries = []
+        for instance in model.objects.all().iterator(chunk_size=500):
+            title, body = text(instance)
+            entries.append(SearchEntry(
+                entity_type=entity_type, object_id=instance.pk, advocate_id=instance.advocate_id,
+                title=title[:600], body=body,
+            ))
+        SearchEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('cases', '0003_case_created_at_index'),
+        ('clients', '0002_client_created_at_index'),
+        ('documents', '0010_document_created_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_type', models.CharField(choices=[('client', 'Client'), ('case', 'Case'), ('document', 'Document')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('title', models.CharField(help_text='Primary text, ranked above the body', max_length=600)),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('advocate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Search entries',
+                'indexes': [models.Index(fields=['advocate', 'entity_type'], name='search_sear_advocat_afa966_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchentry',
+            constraint=models.UniqueConstraint(fields=('entity_type', 'object_id'), name='search_entry_unique_object'),
+        ),
+        migrations.RunPython(create_fulltext, drop_fulltext),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
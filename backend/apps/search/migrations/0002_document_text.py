@@ -0,0 +1,94 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+FTS_TABLE = 'search_documenttext_fts'
+
+SQLITE_FTS = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        text, content='search_documenttext', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER search_documenttext_ai AFTER INSERT ON search_documenttext BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+    f"""CREATE TRIGGER search_documenttext_ad AFTER DELETE ON search_documenttext BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text);
+    END""",
+    f"""CREATE TRIGGER search_documenttext_au AFTER UPDATE ON search_documenttext BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+]
+SQLITE_FTS_DROP = [
+    'DROP TRIGGER IF EXISTS search_documenttext_au',
+    'DROP TRIGGER IF EXISTS search_documenttext_ad',
+    'DROP TRIGGER IF EXISTS search_documenttext_ai',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+POSTGRES_FTS = [
+    """ALTER TABLE search_documenttext ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', text)) STORED""",
+    'CREATE INDEX search_text_vector_gin ON search_documenttext USING gin (search_vector)',
+]
+POSTGRES_FTS_DROP = [
+    'DROP INDEX IF EXISTS search_text_vector_gin',
+    'ALTER TABLE search_documenttext DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_fulltext(apps, schema_editor):
+    """Add the database's full-text structures (see apps.search.models)."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FTS)
+    elif vendor == 'sqlite':
+        try:
+            _run(schema_editor, SQLITE_FTS)
+        except Exception:  # SQLite built without FTS5: search falls back to icontains
+            _run(schema_editor, SQLITE_FTS_DROP)
+
+
+def drop_fulltext(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FTS_DROP)
+    elif vendor == 'sqlite':
+        _run(schema_editor, SQLITE_FTS_DROP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0010_document_created_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('search', '0001_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentText',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('v2', 'Finalized v2 TXT'), ('report', 'OCR report')], max_length=10)),
+                ('source_path', models.TextField(help_text='Storage path the text was extracted from')),
+                ('text', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('advocate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('document', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_text', to='documents.document')),
+            ],
+            options={
+                'verbose_name_plural': 'Document texts',
+            },
+        ),
+        migrations.RunPython(create_fulltext, drop_fulltext),
+    ]
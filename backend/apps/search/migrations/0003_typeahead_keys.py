@@ -0,0 +1,63 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate(apps, schema_editor):
+    """Index existing clients and cases (see apps.search.typeahead)."""
+    from apps.search.typeahead import keys_for
+
+    TypeaheadKey = apps.get_model('search', 'TypeaheadKey')
+    Client = apps.get_model('clients', 'Client')
+    Case = apps.get_model('cases', 'Case')
+    sources = [
+        ('client', Client.objects.filter(is_deleted=False), lambda c: ([c.full_name], c.full_name, '')),
+        ('case', Case.objects.all(), lambda c: ([c.case_number, c.title], c.title, c.case_number)),
+    ]
+    for entity_type, queryset, text in sources:
+        entries = []
+        for instance in queryset.iterator(chunk_size=500):
+            labels, label, detail = text(instance)
+            seen = set()
+            for source in labels:
+                for key, position in keys_for(source):
+                    if key not in seen:
+                        seen.add(key)
+                        entries.append(TypeaheadKey(
+                            advocate_id=instance.advocate_id, key=key, position=position,
+                            entity_type=entity_type, object_id=instance.pk,
+                            label=label[:255], detail=detail[:100],
+                        ))
+        TypeaheadKey.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('search', '0002_document_text'),
+        ('cases', '0003_case_created_at_index'),
+        ('clients', '0002_client_created_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TypeaheadKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='Normalized label from one of its words onwards', max_length=100)),
+                ('position', models.PositiveSmallIntegerField(help_text='Word offset of the key in the label; 0 is the start')),
+                ('entity_type', models.CharField(choices=[('client', 'Client'), ('case', 'Case')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('label', models.CharField(max_length=255)),
+                ('detail', models.CharField(blank=True, help_text='Secondary text (case number or title)', max_length=100)),
+                ('advocate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['advocate', 'key'], name='search_typeahead_prefix', opclasses=['uuid_ops', 'varchar_pattern_ops']), models.Index(fields=['key'], name='search_typeahead_key_prefix', opclasses=['varchar_pattern_ops']), models.Index(fields=['entity_type', 'object_id'], name='search_type_entity__3ed264_idx')],
+            },
+        ),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 09:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0003_typeahead_keys'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='typeaheadkey',
+            name='search_typeahead_prefix',
+        ),
+        migrations.RemoveIndex(
+            model_name='typeaheadkey',
+            name='search_typeahead_key_prefix',
+        ),
+        migrations.AddIndex(
+            model_name='typeaheadkey',
+            index=models.Index(fields=['advocate', 'key', 'position'], name='search_typeahead_prefix', opclasses=['uuid_ops', 'varchar_pattern_ops', 'int2_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='typeaheadkey',
+            index=models.Index(fields=['key', 'position'], name='search_typeahead_key_prefix', opclasses=['varchar_pattern_ops', 'int2_ops']),
+        ),
+    ]
@@ -0,0 +1,127 @@
+"""Search index models.
+
+One SearchEntry per client, case and document, holding the text that
+global search matches, and one DocumentText per document whose processed
+artifact (v2 TXT or OCR report) has been extracted. The database-specific
+full-text structures are created by the migrations and kept in sync by
+the database itself:
+
+  - PostgreSQL: a generated `search_vector` tsvector column with a GIN
+    index on both tables, plus pg_trgm GIN indexes on SearchEntry
+    title/body for substring fallback;
+  - SQLite: FTS5 external-content tables (`search_searchentry_fts`,
+    `search_documenttext_fts`) maintained by triggers.
+
+TypeaheadKey needs no full-text support: it is a plain sorted-key table
+served by B-tree range scans (see apps.search.typeahead).
+"""
+from django.conf import settings
+from django.db import models
+
+
+class SearchEntry(models.Model):
+    """Searchable text for one client, case or document."""
+
+    ENTITY_TYPES = [
+        ('client', 'Client'),
+        ('case', 'Case'),
+        ('document', 'Document'),
+    ]
+
+    entity_type = models.CharField(max_length=10, choices=ENTITY_TYPES)
+    object_id = models.BigIntegerField()
+    advocate = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    title = models.CharField(max_length=600, help_text='Primary text, ranked above the body')
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Search entries'
+        constraints = [
+            models.UniqueConstraint(fields=['entity_type', 'object_id'], name='search_entry_unique_object'),
+        ]
+        indexes = [
+            models.Index(fields=['advocate', 'entity_type']),
+        ]
+
+    def __str__(self) -> str:
+        return f"[{self.entity_type}] {self.title[:60]}"
+
+
+class DocumentText(models.Model):
+    """Extracted text of a document's processed artifact, for full-text search."""
+
+    SOURCES = [
+        ('v2', 'Finalized v2 TXT'),
+        ('report', 'OCR report'),
+    ]
+
+    document = models.OneToOneField(
+        'documents.Document',
+        on_delete=models.CASCADE,
+        related_name='search_text',
+    )
+    advocate = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    source = models.CharField(max_length=10, choices=SOURCES)
+    source_path = models.TextField(help_text='Storage path the text was extracted from')
+    text = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Document texts'
+
+    def __str__(self) -> str:
+        return f"[{self.source}] document {self.document_id}"
+
+
+class TypeaheadKey(models.Model):
+    """A prefix-searchable key for a client name, case number or case title.
+
+    Each label is stored once per word it can be found by: "Lease Dispute"
+    has the keys "lease dispute" and "dispute".
+    """
+
+    ENTITY_TYPES = [
+        ('client', 'Client'),
+        ('case', 'Case'),
+    ]
+
+    advocate = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    key = models.CharField(max_length=100, help_text='Normalized label from one of its words onwards')
+    position = models.PositiveSmallIntegerField(help_text='Word offset of the key in the label; 0 is the start')
+    entity_type = models.CharField(max_length=10, choices=ENTITY_TYPES)
+    object_id = models.BigIntegerField()
+    label = models.CharField(max_length=255)
+    detail = models.CharField(max_length=100, blank=True, help_text='Secondary text (case number or title)')
+
+    class Meta:
+        # Prefix scans: byte-ordered ranges on SQLite; LIKE 'prefix%' on
+        # PostgreSQL, which needs the pattern opclass (ignored elsewhere).
+        # position is included so the ORDER BY position sort reads it from
+        # the index instead of the table.
+        indexes = [
+            models.Index(
+                fields=['advocate', 'key', 'position'], name='search_typeahead_prefix',
+                opclasses=['uuid_ops', 'varchar_pattern_ops', 'int2_ops'],
+            ),
+            models.Index(
+                fields=['key', 'position'], name='search_typeahead_key_prefix',  # admin lookups across advocates
+                opclasses=['varchar_pattern_ops', 'int2_ops'],
+            ),
+            models.Index(fields=['entity_type', 'object_id']),
+        ]
+
+    def __str__(self) -> str:
+        return f"[{self.entity_type}] {self.key}"
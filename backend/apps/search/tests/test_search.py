@@ -0,0 +1,174 @@
+"""Tests for the global search index and endpoint."""
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from apps.cases.models import Case
+from apps.clients.models import Client
+from apps.documents.models import Document
+from apps.search.index import search
+from apps.search.models import SearchEntry
+
+User = get_user_model()
+
+
+@pytest.fixture
+def advocate(db):
+    return User.objects.create_user(email="advocate@test.com", password="TestPass123!", full_name="Advocate")
+
+
+@pytest.fixture
+def other_advocate(db):
+    return User.objects.create_user(email="other@test.com", password="TestPass123!", full_name="Other")
+
+
+@pytest.fixture
+def client_a(advocate):
+    return Client.objects.create(
+        advocate=advocate, full_name="Asha Rao", email="asha@example.com", phone="+919876543210",
+    )
+
+
+@pytest.fixture
+def case(advocate, client_a):
+    return Case.objects.create(
+        client=client_a, advocate=advocate, title="Lease Dispute", case_number="LD-2024-17",
+        description="Tenant disputes the landlord's eviction notice.",
+    )
+
+
+@pytest.fixture
+def api(advocate):
+    api = APIClient()
+    api.force_authenticate(user=advocate)
+    return api
+
+
+def _document(case, name, notes=""):
+    return Document.objects.create(
+        case=case, advocate=case.advocate, name=name, notes=notes, file_path=f"a/c/{name}",
+        file_type="pdf", file_size_bytes=1, mime_type="application/pdf",
+    )
+
+
+class TestSearchIndex:
+    """The index follows ORM writes."""
+
+    def test_entries_written_on_create(self, case):
+        _document(case, "lease.pdf", notes="Signed copy")
+
+        assert set(SearchEntry.objects.values_list("entity_type", "title")) == {
+            ("client", "Asha Rao"), ("case", "LD-2024-17 Lease Dispute"), ("document", "lease.pdf"),
+        }
+
+    def test_entry_updated_on_save(self, advocate, client_a):
+        client_a.full_name = "Asha Menon"
+        client_a.save()
+
+        assert search("menon", advocate.pk)["client"] == [client_a.pk]
+        assert search("rao", advocate.pk)["client"] == []
+
+    def test_entry_removed_on_delete(self, advocate, case):
+        document = _document(case, "lease.pdf")
+        document.delete()
+
+        assert not SearchEntry.objects.filter(entity_type="document").exists()
+        assert search("lease", advocate.pk)["document"] == []
+
+    def test_unindexed_field_updates_skip_the_index(self, case, django_assert_num_queries):
+        """Saves that only touch other columns (status, paths) cost no index writes."""
+        document = _document(case, "lease.pdf")
+        document.status = "processed"
+        with django_assert_num_queries(2):  # document UPDATE + advocate stats UPDATE
+            document.save(update_fields=["status"])
+
+    def test_rebuild_command_restores_entries(self, advocate, case, capsys):
+        SearchEntry.objects.all().delete()
+        _document(case, "lease.pdf")
+        Case.objects.filter(pk=case.pk).update(title="Tenancy Appeal")  # no signals
+
+        call_command("rebuild_search_index")
+
+        assert SearchEntry.objects.count() == 3
+        assert search("tenancy", advocate.pk)["case"] == [case.pk]
+        assert "Indexed 3 search entries" in capsys.readouterr().out
+
+
+class TestSearchQuery:
+    """Matching, ranking and scoping."""
+
+    def test_prefix_matching(self, advocate, case):
+        assert search("disp", advocate.pk)["case"] == [case.pk]
+        assert search("lease disp", advocate.pk)["case"] == [case.pk]
+
+    def test_all_terms_must_match(self, advocate, case):
+        assert search("lease appeal", advocate.pk)["case"] == []
+
+    def test_title_ranks_above_body(self, advocate, client_a, case):
+        in_body = Case.objects.create(
+            client=client_a, advocate=advocate, title="Deposit Claim", case_number="DC-1",
+            description="Related to the eviction of the tenant.",
+        )
+        in_title = Case.objects.create(
+            client=client_a, advocate=advocate, title="Eviction Appeal", case_number="EA-1",
+        )
+
+        assert search("eviction", advocate.pk)["case"][0] == in_title.pk
+        assert set(search("eviction", advocate.pk)["case"]) == {in_title.pk, in_body.pk, case.pk}
+
+    def test_email_and_phone_fragments(self, advocate, client_a):
+        assert search("asha@example", advocate.pk)["client"] == [client_a.pk]
+        assert search("98765", advocate.pk)["client"] == [client_a.pk]
+
+    def test_scoped_to_advocate(self, advocate, other_advocate, client_a):
+        Client.objects.create(advocate=other_advocate, full_name="Asha Iyer")
+
+        assert search("asha", advocate.pk)["client"] == [client_a.pk]
+        assert len(search("asha")["client"]) == 2
+
+    def test_limit_per_type(self, advocate, case):
+        for i in range(8):
+            _document(case, f"lease-{i}.pdf")
+
+        ids = search("lease", advocate.pk, limit=5)
+
+        assert len(ids["document"]) == 5
+        assert ids["case"] == [case.pk]
+
+
+class TestGlobalSearchView:
+    """Tests for GET /api/search/."""
+
+    def test_grouped_results(self, api, client_a, case):
+        document = _document(case, "lease.pdf")
+
+        response = api.get("/api/search/", {"q": "lease"})
+
+        assert response.status_code == 200
+        assert response.data["clients"] == []
+        assert response.data["cases"] == [{
+            "id": case.pk, "title": "Lease Dispute", "case_number": "LD-2024-17", "status": case.status,
+            "type": "case",
+        }]
+        assert [d["id"] for d in response.data["documents"]] == [document.pk]
+
+    def test_short_query_returns_nothing(self, api, client_a):
+        response = api.get("/api/search/", {"q": "a"})
+
+        assert response.data == {"clients": [], "cases": [], "documents": []}
+
+    def test_other_advocates_data_is_hidden(self, api, other_advocate):
+        Client.objects.create(advocate=other_advocate, full_name="Asha Iyer")
+
+        assert api.get("/api/search/", {"q": "asha"}).data["clients"] == []
+
+    def test_admin_searches_everyone(self, other_advocate, client_a):
+        admin = User.objects.create_user(
+            email="admin@test.com", password="TestPass123!", full_name="Admin", role="admin",
+        )
+        Client.objects.create(advocate=other_advocate, full_name="Asha Iyer")
+        api = APIClient()
+        api.force_authenticate(user=admin)
+
+        assert len(api.get("/api/search/", {"q": "asha"}).data["clients"]) == 2
@@ -0,0 +1,223 @@
+"""Tests for the processed-text search index."""
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from apps.cases.models import Case
+from apps.clients.models import Client
+from apps.documents.models import Document
+from apps.search.models import DocumentText
+from apps.search.text_index import _python_snippet, index_document_text, search_text, split_marks
+from utils.storage import LocalStorageBackend
+
+User = get_user_model()
+
+LEASE_TEXT = (
+    "This lease is made between the landlord and the tenant. "
+    "Clause 7: The tenant shall have quiet enjoyment of the premises without interruption. "
+    "Clause 8: Rent is payable monthly in advance."
+)
+
+
+@pytest.fixture
+def backend(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    local = LocalStorageBackend()
+    with mock.patch("utils.storage.get_storage_backend", return_value=local):
+        yield local
+
+
+@pytest.fixture
+def advocate(db):
+    return User.objects.create_user(email="advocate@test.com", password="TestPass123!", full_name="Advocate")
+
+
+@pytest.fixture
+def case(advocate):
+    client = Client.objects.create(advocate=advocate, full_name="Asha Rao")
+    return Case.objects.create(client=client, advocate=advocate, title="Lease Dispute", case_number="LD-1")
+
+
+@pytest.fixture
+def api(advocate):
+    api = APIClient()
+    api.force_authenticate(user=advocate)
+    return api
+
+
+def _document(case, name="lease.pdf", **fields):
+    return Document.objects.create(
+        case=case, advocate=case.advocate, name=name, file_path=f"a/c/{name}", file_type="pdf",
+        file_size_bytes=1, mime_type="application/pdf", **fields,
+    )
+
+
+def _with_text(backend, case, text, name="lease.pdf", field="txt_v2_path"):
+    document = _document(case, name)
+    setattr(document, field, backend.upload_content(text.encode("utf-8"), f"processed/{name}.txt", "text/plain"))
+    document.save()
+    index_document_text(document)
+    return document
+
+
+class TestIndexing:
+    """Extracting processed artifacts into DocumentText."""
+
+    def test_reads_artifact_from_storage(self, backend, case):
+        document = _with_text(backend, case, LEASE_TEXT, field="processed_report_path")
+
+        entry = DocumentText.objects.get(document=document)
+        assert (entry.source, entry.text, entry.advocate_id) == ("report", LEASE_TEXT, case.advocate_id)
+
+    def test_v2_text_takes_precedence_over_report(self, backend, case):
+        document = _with_text(backend, case, "OCR text with errrors", field="processed_report_path")
+        document.txt_v2_path = backend.upload_content(b"Corrected text", "processed/v2.txt", "text/plain")
+        document.save()
+
+        index_document_text(document, [b"New report"], document.processed_report_path)
+
+        entry = DocumentText.objects.get(document=document)
+        assert (entry.source, entry.text) == ("v2", "Corrected text")
+
+    def test_cleared_artifacts_remove_the_entry(self, backend, case):
+        document = _with_text(backend, case, LEASE_TEXT, field="processed_report_path")
+        document.processed_report_path = None
+        document.save()
+
+        assert index_document_text(document) is None
+        assert not DocumentText.objects.exists()
+
+    def test_truncates_long_text(self, backend, case, settings):
+        settings.SEARCH_DOCUMENT_TEXT_MAX_CHARS = 10
+
+        document = _with_text(backend, case, LEASE_TEXT)
+
+        assert DocumentText.objects.get(document=document).text == LEASE_TEXT[:10]
+
+    def test_storage_failure_is_logged_not_raised(self, backend, case):
+        document = _document(case, txt_v2_path="processed/missing.txt")
+
+        assert index_document_text(document) is None
+        assert not DocumentText.objects.exists()
+
+    def test_rebuild_command_reextracts_text(self, backend, case):
+        document = _with_text(backend, case, LEASE_TEXT)
+        DocumentText.objects.all().delete()
+
+        call_command("rebuild_search_index", "--text")
+
+        assert DocumentText.objects.get(document=document).text == LEASE_TEXT
+
+
+class TestSearchText:
+    """Matching, snippets and scoping."""
+
+    def test_snippet_highlights_match_the_terms(self, backend, case, advocate):
+        document = _with_text(backend, case, LEASE_TEXT)
+
+        [hit] = search_text("quiet enjoy", advocate.pk)
+
+        assert hit["document_id"] == document.pk
+        assert [hit["snippet"][start:end] for start, end in hit["highlights"]] == ["quiet", "enjoyment"]
+
+    def test_every_term_must_match(self, backend, case, advocate):
+        _with_text(backend, case, LEASE_TEXT)
+
+        assert search_text("quiet eviction", advocate.pk) == []
+
+    def test_scoped_to_advocate(self, backend, case, advocate):
+        _with_text(backend, case, LEASE_TEXT)
+        other = User.objects.create_user(email="other@test.com", password="TestPass123!", full_name="Other")
+
+        assert search_text("quiet", other.pk) == []
+        assert len(search_text("quiet")) == 1
+
+    def test_client_and_case_filters(self, backend, case, advocate):
+        document = _with_text(backend, case, LEASE_TEXT)
+        other_client = Client.objects.create(advocate=advocate, full_name="Ravi Kumar")
+        other_case = Case.objects.create(client=other_client, advocate=advocate, title="Loan", case_number="L-1")
+        _with_text(backend, other_case, LEASE_TEXT, name="loan.pdf")
+
+        assert [h["document_id"] for h in search_text("quiet", advocate.pk, client_id=case.client_id)] == [document.pk]
+        assert [h["document_id"] for h in search_text("quiet", advocate.pk, case_id=case.pk)] == [document.pk]
+
+    def test_split_marks_returns_offsets(self):
+        assert split_marks("the \x02quiet\x03 \x02enjoyment\x03 of") == ("the quiet enjoyment of", [[4, 9], [10, 19]])
+
+    def test_python_snippet_marks_prefix_matches(self):
+        snippet, highlights = split_marks(_python_snippet(LEASE_TEXT, ["enjoy"]))
+
+        assert [snippet[start:end] for start, end in highlights] == ["enjoyment"]
+        assert snippet.startswith("…") and snippet.endswith("…")
+
+
+class TestIndexingTriggers:
+    """Artifacts are indexed where they are stored."""
+
+    def test_upload_v2_files_indexes_uploaded_text(self, backend, case, api):
+        document = _document(case)
+
+        response = api.post(f"/api/v2/documents/{document.pk}/upload-v2-files/", {
+            "html_v2": SimpleUploadedFile("v2.html", b"<p>Lease</p>", content_type="text/html"),
+            "txt_v2": SimpleUploadedFile("v2.txt", LEASE_TEXT.encode(), content_type="text/plain"),
+            "corrections_log": SimpleUploadedFile("log.txt", b"none", content_type="text/plain"),
+        }, format="multipart")
+
+        assert response.status_code == 200
+        assert DocumentText.objects.get(document=document).text == LEASE_TEXT
+
+    def test_n8n_callback_indexes_report(self, backend, case, monkeypatch):
+        monkeypatch.delenv("N8N_WEBHOOK_SECRET", raising=False)
+        document = _document(case, status="in_progress")
+
+        response = APIClient().post("/api/webhooks/n8n/", {
+            "document_id": document.pk, "status": "processed", "report": LEASE_TEXT,
+        }, format="json")
+
+        assert response.status_code == 200
+        entry = DocumentText.objects.get(document=document)
+        assert (entry.source, entry.text) == ("report", LEASE_TEXT)
+
+
+class TestSearchViews:
+    """Tests for GET /api/search/ and GET /api/search/text/."""
+
+    def test_global_search_includes_text_matches(self, backend, case, api):
+        document = _with_text(backend, case, LEASE_TEXT)
+
+        [result] = api.get("/api/search/", {"q": "quiet enjoyment"}).data["documents"]
+
+        assert result["id"] == document.pk
+        assert result["type"] == "document"
+        assert "quiet enjoyment" in result["snippet"]
+        assert len(result["highlights"]) == 2
+
+    def test_name_matches_carry_no_snippet(self, backend, case, api):
+        _document(case, "quiet.pdf")
+
+        [result] = api.get("/api/search/", {"q": "quiet"}).data["documents"]
+
+        assert "snippet" not in result
+
+    def test_text_endpoint_filters_by_client(self, backend, case, api, advocate):
+        document = _with_text(backend, case, LEASE_TEXT)
+        other_client = Client.objects.create(advocate=advocate, full_name="Ravi Kumar")
+
+        response = api.get("/api/search/text/", {"q": "rent payable", "client_id": case.client_id})
+        empty = api.get("/api/search/text/", {"q": "rent payable", "client_id": other_client.pk})
+
+        assert response.status_code == 200
+        [result] = response.data["results"]
+        assert (result["id"], result["name"]) == (document.pk, "lease.pdf")
+        assert [result["snippet"][s:e] for s, e in result["highlights"]] == ["Rent", "payable"]
+        assert empty.data["results"] == []
+
+    def test_text_endpoint_rejects_bad_ids(self, api):
+        response = api.get("/api/search/text/", {"q": "rent", "client_id": "abc"})
+
+        assert response.status_code == 400
+        assert "error" in response.data
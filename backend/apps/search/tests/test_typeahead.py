@@ -0,0 +1,185 @@
+"""Tests for the typeahead prefix index and endpoint."""
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from rest_framework.test import APIClient
+
+from apps.cases.models import Case
+from apps.clients.models import Client
+from apps.search.models import TypeaheadKey
+from apps.search.typeahead import _lookup, keys_for, typeahead
+
+User = get_user_model()
+
+
+@pytest.fixture
+def advocate(db):
+    return User.objects.create_user(email="advocate@test.com", password="TestPass123!", full_name="Advocate")
+
+
+@pytest.fixture
+def client_a(advocate):
+    return Client.objects.create(advocate=advocate, full_name="Asha Rao")
+
+
+@pytest.fixture
+def case(advocate, client_a):
+    return Case.objects.create(client=client_a, advocate=advocate, title="Lease Dispute", case_number="LD-2024-17")
+
+
+@pytest.fixture
+def api(advocate):
+    api = APIClient()
+    api.force_authenticate(user=advocate)
+    return api
+
+
+def _labels(results):
+    return [(result["type"], result["label"]) for result in results]
+
+
+class TestKeys:
+    """Label normalization into sorted keys."""
+
+    def test_one_key_per_word(self):
+        assert keys_for("Lease Dispute") == [("lease dispute", 0), ("dispute", 1)]
+
+    def test_case_numbers_split_on_punctuation(self):
+        assert keys_for("LD-2024/17") == [("ld 2024 17", 0), ("2024 17", 1), ("17", 2)]
+
+    def test_accents_and_case_are_folded(self):
+        assert keys_for("José Müller")[0] == ("jose muller", 0)
+
+
+class TestTypeahead:
+    """Matching, ranking, scoping and index maintenance."""
+
+    def test_matches_any_word_prefix(self, advocate, client_a, case):
+        assert _labels(typeahead("as", advocate.pk)) == [("client", "Asha Rao")]
+        assert _labels(typeahead("disp", advocate.pk)) == [("case", "Lease Dispute")]
+        assert _labels(typeahead("lease di", advocate.pk)) == [("case", "Lease Dispute")]
+
+    def test_matches_case_number(self, advocate, case):
+        [result] = typeahead("ld-2024", advocate.pk)
+
+        assert result == {"type": "case", "id": case.pk, "label": "Lease Dispute", "detail": "LD-2024-17"}
+
+    def test_label_start_ranks_first(self, advocate, client_a):
+        Client.objects.create(advocate=advocate, full_name="Priya Rao")
+        Client.objects.create(advocate=advocate, full_name="Rao Krishnamurthy")
+        Client.objects.create(advocate=advocate, full_name="Rao Das")
+
+        labels = [result["label"] for result in typeahead("rao", advocate.pk)]
+
+        assert labels[:2] == ["Rao Das", "Rao Krishnamurthy"]
+        assert set(labels[2:]) == {"Asha Rao", "Priya Rao"}
+
+    def test_label_start_is_not_crowded_out_by_later_words(self, advocate):
+        Client.objects.bulk_create(
+            [Client(advocate=advocate, full_name=f"Priya{i:02d} Sharma") for i in range(40)]
+            + [Client(advocate=advocate, full_name="Sharma Traders")]
+        )
+        call_command("rebuild_search_index")  # bulk_create sends no signals
+
+        assert typeahead("sharma", advocate.pk)[0]["label"] == "Sharma Traders"
+
+    def test_scoped_to_advocate(self, advocate, client_a):
+        other = User.objects.create_user(email="other@test.com", password="TestPass123!", full_name="Other")
+        Client.objects.create(advocate=other, full_name="Asha Iyer")
+
+        assert _labels(typeahead("asha", advocate.pk)) == [("client", "Asha Rao")]
+        assert len(typeahead("asha")) == 2
+
+    def test_rename_soft_delete_and_delete(self, advocate, client_a, case):
+        client_a.full_name = "Asha Menon"
+        client_a.save()
+        assert _labels(typeahead("menon", advocate.pk)) == [("client", "Asha Menon")]
+        assert typeahead("rao", advocate.pk) == []
+
+        client_a.is_deleted = True
+        client_a.save(update_fields=["is_deleted"])
+        assert typeahead("asha", advocate.pk) == []
+
+        case.delete()
+        assert not TypeaheadKey.objects.filter(entity_type="case").exists()
+
+    def test_lookup_is_one_query(self, advocate, case, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            _lookup("lease", advocate.pk, 8)
+
+    def test_lookup_uses_the_prefix_index(self, advocate, case):
+        sql, params = TypeaheadKey.objects.filter(
+            advocate_id=advocate.pk, key__gte="lea", key__lt="lea\U0010ffff",
+        ).order_by("position", "key").values_list("object_id").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(str(row) for row in cursor.fetchall())
+
+        assert "search_typeahead_prefix" in plan
+
+    def test_results_are_cached(self, advocate, case, django_assert_num_queries):
+        typeahead("lease", advocate.pk)
+
+        with django_assert_num_queries(0):
+            assert _labels(typeahead("LEASE", advocate.pk)) == [("case", "Lease Dispute")]
+
+    def test_writes_retire_cached_results(self, advocate, client_a):
+        assert len(typeahead("asha", advocate.pk)) == 1
+
+        Client.objects.create(advocate=advocate, full_name="Asha Iyer")
+
+        assert len(typeahead("asha", advocate.pk)) == 2
+        assert len(typeahead("asha")) == 2
+
+    def test_cache_can_be_disabled(self, advocate, case, settings, django_assert_num_queries):
+        settings.TYPEAHEAD_CACHE_TTL = 0
+        typeahead("lease", advocate.pk)
+
+        with django_assert_num_queries(1):
+            typeahead("lease", advocate.pk)
+
+    def test_rebuild_command_restores_keys(self, advocate, client_a, case):
+        TypeaheadKey.objects.all().delete()
+        Case.objects.filter(pk=case.pk).update(title="Tenancy Appeal")  # no signals
+
+        call_command("rebuild_search_index")
+
+        assert _labels(typeahead("tenancy", advocate.pk)) == [("case", "Tenancy Appeal")]
+        assert _labels(typeahead("asha", advocate.pk)) == [("client", "Asha Rao")]
+
+
+class TestTypeaheadView:
+    """Tests for GET /api/search/typeahead/."""
+
+    def test_returns_suggestions(self, api, client_a, case):
+        response = api.get("/api/search/typeahead/", {"q": "le"})
+
+        assert response.status_code == 200
+        assert response.data == {"results": [
+            {"type": "case", "id": case.pk, "label": "Lease Dispute", "detail": "LD-2024-17"},
+        ]}
+
+    def test_empty_query_returns_nothing(self, api, client_a):
+        assert api.get("/api/search/typeahead/", {"q": " - "}).data == {"results": []}
+
+    def test_single_character_is_not_looked_up(self, api, client_a, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            assert typeahead("a", client_a.advocate_id) == []
+        assert api.get("/api/search/typeahead/", {"q": "a-"}).data == {"results": []}
+
+    def test_limit_is_clamped(self, api, advocate):
+        for i in range(25):
+            Client.objects.create(advocate=advocate, full_name=f"Client {i:02d}")
+
+        assert len(api.get("/api/search/typeahead/", {"q": "client", "limit": 3}).data["results"]) == 3
+        assert len(api.get("/api/search/typeahead/", {"q": "client", "limit": 100}).data["results"]) == 20
+
+    def test_bad_limit_is_rejected(self, api):
+        response = api.get("/api/search/typeahead/", {"q": "a", "limit": "x"})
+
+        assert response.status_code == 400
+        assert "error" in response.data
+
+    def test_requires_authentication(self, db):
+        assert APIClient().get("/api/search/typeahead/", {"q": "a"}).status_code in (401, 403)
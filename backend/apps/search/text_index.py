@@ -0,0 +1,263 @@
+"""Full-text index over the processed text of documents.
+
+When a processed artifact is stored (the v2 TXT from Save & Export, or the
+OCR report returned by n8n), index_document_text() reads it from storage
+and writes a DocumentText row; the database keeps its full-text index in
+step (see apps.search.models). The v2 TXT wins over the report, since it
+is the advocate-corrected version. A document whose artifacts are cleared
+(retry from processed) loses its row.
+
+search_text() returns the best-matching documents with a snippet and the
+character offsets of the matched terms within it:
+
+  - PostgreSQL: `search_vector @@ to_tsquery(...)` ranked by ts_rank,
+    snippets from ts_headline;
+  - SQLite: an FTS5 MATCH ranked by bm25, snippets from snippet();
+  - otherwise: icontains per term, snippets cut in Python.
+
+The database marks matches in the snippet with control characters; they
+are stripped out and turned into offsets here, so clients get plain text
+to escape and highlight as they see fit.
+
+Indexing is best-effort: a failure is logged and never breaks the upload
+or callback that triggered it. `manage.py rebuild_search_index --text`
+re-extracts every document.
+"""
+import logging
+import re
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from apps.documents.models import Document
+
+from .index import _db_advocate_id, _has_fts5, _terms
+from .models import DocumentText
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'search_documenttext_fts'
+MARK_START = '\x02'
+MARK_STOP = '\x03'
+SNIPPET_TOKENS = 24
+SNIPPET_CONTEXT_CHARS = 80
+HEADLINE_OPTIONS = (
+    f'StartSel={MARK_START}, StopSel={MARK_STOP}, MinWords=12, MaxWords=30, '
+    'MaxFragments=2, FragmentDelimiter=" … "'
+)
+
+_marks = re.compile(f'([{MARK_START}{MARK_STOP}])')
+
+
+def _artifact(document: Document) -> Optional[tuple[str, str]]:
+    """Return (source, storage path) of the text to index, preferring the v2 TXT."""
+    if document.txt_v2_path:
+        return 'v2', document.txt_v2_path
+    if document.processed_report_path:
+        return 'report', document.processed_report_path
+    return None
+
+
+def _read_text(chunks: Iterable[bytes]) -> str:
+    """Decode up to SEARCH_DOCUMENT_TEXT_MAX_CHARS characters from byte chunks."""
+    max_chars = settings.SEARCH_DOCUMENT_TEXT_MAX_CHARS
+    budget = max_chars * 4  # UTF-8 worst case
+    data = bytearray()
+    for chunk in chunks:
+        data += chunk[:budget - len(data)]
+        if len(data) >= budget:
+            break
+    text = bytes(data).decode('utf-8', errors='ignore')[:max_chars]
+    # The markers are reserved for snippets
+    return text.replace(MARK_START, ' ').replace(MARK_STOP, ' ')
+
+
+def index_document_text(
+    document: Document,
+    chunks: Optional[Iterable[bytes]] = None,
+    path: Optional[str] = None,
+) -> Optional[DocumentText]:
+    """Extract a document's processed text into the full-text index.
+
+    Args:
+        document: The document whose artifact paths were just saved.
+        chunks: Content the caller just stored at `path`, to save reading
+            it back. Ignored when another artifact is indexed instead
+            (a v2 TXT takes precedence over a new report).
+        path: Storage path of `chunks`.
+
+    Returns:
+        The saved DocumentText, or None if the document has no text
+        artifact or indexing failed.
+    """
+    artifact = _artifact(document)
+    try:
+        if artifact is None:
+            with transaction.atomic():
+                DocumentText.objects.filter(document=document).delete()
+            return None
+        source, artifact_path = artifact
+        if chunks is None or path != artifact_path:
+            from utils.storage import get_storage_backend
+            chunks = get_storage_backend().read_chunks(artifact_path)
+        text = _read_text(chunks)
+        with transaction.atomic():
+            entry, _ = DocumentText.objects.update_or_create(
+                document=document,
+                defaults={
+                    'advocate_id': document.advocate_id, 'source': source,
+                    'source_path': artifact_path, 'text': text,
+                },
+            )
+        logger.info("[SEARCH_TEXT] Indexed doc_id=%s source=%s chars=%d", document.id, source, len(text))
+        return entry
+    except Exception:
+        logger.exception("[SEARCH_TEXT] Failed to index text for doc_id=%s", document.id)
+        return None
+
+
+def split_marks(marked: str) -> tuple[str, list[list[int]]]:
+    """Strip match markers from a snippet.
+
+    Returns:
+        The plain snippet and [start, end) character offsets of each match.
+    """
+    plain: list[str] = []
+    highlights: list[list[int]] = []
+    position, start = 0, None
+    for part in _marks.split(marked):
+        if part == MARK_START:
+            start = position
+        elif part == MARK_STOP:
+            if start is not None and position > start:
+                highlights.append([start, position])
+            start = None
+        else:
+            plain.append(part)
+            position += len(part)
+    return ''.join(plain), highlights
+
+
+def _python_snippet(text: str, terms: list[str]) -> str:
+    """Cut a marked snippet around the first term match (fallback backend)."""
+    pattern = re.compile(r'\b(?:' + '|'.join(re.escape(term) for term in terms) + r')\w*', re.IGNORECASE)
+    first = pattern.search(text)
+    if first is None:
+        return text[:2 * SNIPPET_CONTEXT_CHARS]
+    start = max(0, first.start() - SNIPPET_CONTEXT_CHARS)
+    end = min(len(text), first.end() + SNIPPET_CONTEXT_CHARS)
+    window = pattern.sub(lambda m: f'{MARK_START}{m.group(0)}{MARK_STOP}', text[start:end])
+    return ('…' if start else '') + window + ('…' if end < len(text) else '')
+
+
+def _scope(advocate_id, client_id, case_id) -> tuple[str, list]:
+    """SQL conditions on the DocumentText alias `t` for the requested scope."""
+    clauses, params = [], []
+    if advocate_id is not None:
+        clauses.append('t.advocate_id = %s')
+        params.append(_db_advocate_id(advocate_id))
+    if client_id is not None or case_id is not None:
+        documents = Document.objects.all()
+        if client_id is not None:
+            documents = documents.filter(case__client_id=client_id)
+        if case_id is not None:
+            documents = documents.filter(case_id=case_id)
+        sql, subquery_params = documents.values('pk').query.sql_with_params()
+        clauses.append(f't.document_id IN ({sql})')
+        params.extend(subquery_params)
+    return ''.join(f' AND {clause}' for clause in clauses), params
+
+
+def _postgres_hits(terms, scope_sql, scope_params, limit) -> list[tuple[int, str]]:
+    tsquery = ' & '.join(f'{term}:*' for term in terms)
+    sql = f"""
+        SELECT t.document_id, ts_headline('simple', t.text, q.query, %s)
+        FROM (
+            SELECT t.id, ts_rank(t.search_vector, q.query) AS rank
+            FROM search_documenttext t, (SELECT to_tsquery('simple', %s) AS query) q
+            WHERE t.search_vector @@ q.query {scope_sql}
+            ORDER BY rank DESC
+            LIMIT %s
+        ) top
+        JOIN search_documenttext t ON t.id = top.id, (SELECT to_tsquery('simple', %s) AS query) q
+        ORDER BY top.rank DESC
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [HEADLINE_OPTIONS, tsquery, *scope_params, limit, tsquery])
+        return cursor.fetchall()
+
+
+def _sqlite_hits(terms, scope_sql, scope_params, limit) -> list[tuple[int, str]]:
+    match = ' '.join(f'"{term}"*' for term in terms)
+    sql = f"""
+        SELECT t.document_id, snippet({FTS_TABLE}, 0, %s, %s, '…', %s)
+        FROM {FTS_TABLE} JOIN search_documenttext t ON t.id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH %s {scope_sql}
+        ORDER BY bm25({FTS_TABLE})
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [MARK_START, MARK_STOP, SNIPPET_TOKENS, match, *scope_params, limit])
+        return cursor.fetchall()
+
+
+def _fallback_hits(terms, advocate_id, client_id, case_id, limit) -> list[tuple[int, str]]:
+    entries = DocumentText.objects.all()
+    for term in terms:
+        entries = entries.filter(text__icontains=term)
+    if advocate_id is not None:
+        entries = entries.filter(advocate_id=advocate_id)
+    if client_id is not None:
+        entries = entries.filter(document__case__client_id=client_id)
+    if case_id is not None:
+        entries = entries.filter(document__case_id=case_id)
+    rows = entries.order_by('-updated_at').values_list('document_id', 'text')[:limit]
+    return [(document_id, _python_snippet(text, terms)) for document_id, text in rows]
+
+
+def search_text(
+    query: str,
+    advocate_id=None,
+    limit: int = 10,
+    client_id: Optional[int] = None,
+    case_id: Optional[int] = None,
+) -> list[dict]:
+    """Find documents whose processed text matches every term of the query.
+
+    Args:
+        query: Raw user input; each word is matched as a prefix.
+        advocate_id: Restrict to one advocate's documents; None searches everything.
+        limit: Maximum number of documents.
+        client_id: Restrict to one client's documents.
+        case_id: Restrict to one case's documents.
+
+    Returns:
+        Best match first: [{'document_id', 'snippet', 'highlights'}], where
+        highlights are [start, end) offsets into the snippet.
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+    vendor = connection.vendor
+    if vendor == 'postgresql':
+        hits = _postgres_hits(terms, *_scope(advocate_id, client_id, case_id), limit)
+    elif vendor == 'sqlite' and _has_fts5(FTS_TABLE):
+        hits = _sqlite_hits(terms, *_scope(advocate_id, client_id, case_id), limit)
+    else:
+        hits = _fallback_hits(terms, advocate_id, client_id, case_id, limit)
+
+    results = []
+    for document_id, marked in hits:
+        snippet, highlights = split_marks(marked)
+        results.append({'document_id': document_id, 'snippet': snippet, 'highlights': highlights})
+    return results
+
+
+def rebuild_text_index() -> int:
+    """Re-extract the processed text of every document. Returns the number indexed."""
+    indexed = 0
+    for document in Document.objects.all().iterator(chunk_size=200):
+        if index_document_text(document) is not None:
+            indexed += 1
+    return indexed
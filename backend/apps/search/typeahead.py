@@ -0,0 +1,240 @@
+"""Prefix index and cache for the typeahead endpoint.
+
+Client names, case numbers and case titles are normalized (accents
+stripped, case-folded, punctuation dropped) and stored in TypeaheadKey
+once per word, from that word to the end of the label:
+
+    "Lease Dispute"  ->  "lease dispute" (position 0), "dispute" (1)
+    "LD-2024-17"     ->  "ld 2024 17" (0), "2024 17" (1), "17" (2)
+
+so a lookup is one range scan on the (advocate, key, position) index,
+wherever in the label the user starts typing. Matches at the start of a
+label rank first, then shorter labels. Candidates are read in position
+order, so a short prefix shared by many later words ("sharma" in every
+"Priya Sharma") cannot crowd out a label that starts with it. That order
+is a sort over every key in the range, so queries shorter than
+TYPEAHEAD_MIN_CHARS (after normalizing) return nothing: one character
+would range over a large share of the index on every first keystroke.
+
+Rows are rewritten by post_save / post_delete receivers (soft-deleted
+clients drop out); `manage.py rebuild_search_index` refills them.
+
+Results are cached per advocate and normalized query for
+TYPEAHEAD_CACHE_TTL seconds, which absorbs the repeated prefixes of
+typing and backspacing. Each advocate (and the admin-wide scope) has a
+generation token in every cache key; any write rotates it, so a new
+client shows up on the next keystroke.
+
+Settings:
+    TYPEAHEAD_CACHE_TTL     Seconds a result list is reused; 0 disables.
+    TYPEAHEAD_CACHE_ALIAS   Django cache alias.
+    TYPEAHEAD_SLOW_MS       Lookups slower than this are logged.
+    TYPEAHEAD_MIN_CHARS     Shortest normalized query that is looked up.
+"""
+import hashlib
+import logging
+import re
+import time
+import unicodedata
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+
+from apps.cases.models import Case
+from apps.clients.models import Client
+
+from .models import TypeaheadKey
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'typeahead'
+SYSTEM = 'all'
+KEY_LENGTH = 100
+MAX_WORDS = 8
+CANDIDATES_PER_RESULT = 4
+
+WATCHED_FIELDS = {
+    Client: {'full_name', 'is_deleted'},
+    Case: {'case_number', 'title'},
+}
+
+_word = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize(text: str) -> str:
+    """Reduce a label or query to its key form."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(_word.findall(stripped.casefold()))
+
+
+def keys_for(text: str) -> list[tuple[str, int]]:
+    """Return (key, position) for each word of a label, up to MAX_WORDS."""
+    words = normalize(text).split()[:MAX_WORDS]
+    return [(' '.join(words[i:])[:KEY_LENGTH], i) for i in range(len(words))]
+
+
+def _entries(instance) -> list[TypeaheadKey]:
+    if isinstance(instance, Client):
+        if instance.is_deleted:
+            return []
+        entity_type, sources, label, detail = 'client', [instance.full_name], instance.full_name, ''
+    else:
+        entity_type, label, detail = 'case', instance.title, instance.case_number
+        sources = [instance.case_number, instance.title]
+
+    entries, seen = [], set()
+    for text in sources:
+        for key, position in keys_for(text):
+            if key not in seen:
+                seen.add(key)
+                entries.append(TypeaheadKey(
+                    advocate_id=instance.advocate_id, key=key, position=position,
+                    entity_type=entity_type, object_id=instance.pk,
+                    label=label[:255], detail=detail[:100],
+                ))
+    return entries
+
+
+def _entity_type(instance) -> str:
+    return 'client' if isinstance(instance, Client) else 'case'
+
+
+def index_object(instance) -> None:
+    """Replace the typeahead keys of a client or case."""
+    with transaction.atomic():
+        TypeaheadKey.objects.filter(entity_type=_entity_type(instance), object_id=instance.pk).delete()
+        TypeaheadKey.objects.bulk_create(_entries(instance))
+    invalidate(instance.advocate_id)
+
+
+def rebuild_typeahead() -> int:
+    """Re-index every client and case. Returns the number of keys."""
+    total, advocates = 0, set()
+    with transaction.atomic():
+        advocates.update(TypeaheadKey.objects.values_list('advocate_id', flat=True).distinct())
+        TypeaheadKey.objects.all().delete()
+        for queryset in (Client.objects.filter(is_deleted=False), Case.objects.all()):
+            batch: list[TypeaheadKey] = []
+            for instance in queryset.iterator(chunk_size=500):
+                advocates.add(instance.advocate_id)
+                batch += _entries(instance)
+                if len(batch) >= 1000:
+                    TypeaheadKey.objects.bulk_create(batch)
+                    total += len(batch)
+                    batch = []
+            TypeaheadKey.objects.bulk_create(batch)
+            total += len(batch)
+        for advocate_id in advocates:
+            invalidate(advocate_id)
+    return total
+
+
+def _saved(sender, instance, update_fields=None, **kwargs) -> None:
+    if update_fields is not None and not WATCHED_FIELDS[sender] & set(update_fields):
+        return
+    index_object(instance)
+
+
+def _deleted(sender, instance, **kwargs) -> None:
+    TypeaheadKey.objects.filter(entity_type=_entity_type(instance), object_id=instance.pk).delete()
+    invalidate(instance.advocate_id)
+
+
+def connect_signals() -> None:
+    """Keep the keys in step with ORM writes (called from SearchConfig.ready)."""
+    for model in WATCHED_FIELDS:
+        post_save.connect(_saved, sender=model, dispatch_uid=f'typeahead-save-{model.__name__}')
+        post_delete.connect(_deleted, sender=model, dispatch_uid=f'typeahead-delete-{model.__name__}')
+
+
+def _cache():
+    return caches[settings.TYPEAHEAD_CACHE_ALIAS]
+
+
+def _generation_key(scope) -> str:
+    return f'{KEY_PREFIX}:gen:{scope}'
+
+
+def invalidate(advocate_id) -> None:
+    """Retire cached results for an advocate and for admin-wide lookups.
+
+    Runs now and again once the current transaction commits, so a lookup
+    that races the transaction cannot keep pre-commit results cached.
+    """
+    def rotate() -> None:
+        keys = [_generation_key(advocate_id), _generation_key(SYSTEM)]
+        _cache().set_many({key: uuid.uuid4().hex for key in keys}, None)
+
+    rotate()
+    transaction.on_commit(rotate)
+
+
+def _prefix_filter(prefix: str) -> Q:
+    if connection.vendor == 'postgresql':
+        # LIKE 'prefix%', served by the varchar_pattern_ops indexes
+        return Q(key__startswith=prefix)
+    # SQLite compares text byte-wise (BINARY collation), so this is a prefix range
+    return Q(key__gte=prefix, key__lt=prefix + '\U0010ffff')
+
+
+def _lookup(prefix: str, advocate_id, limit: int) -> list[dict]:
+    keys = TypeaheadKey.objects.filter(_prefix_filter(prefix))
+    if advocate_id is not None:
+        keys = keys.filter(advocate_id=advocate_id)
+    candidates = keys.order_by('position', 'key').values_list(
+        'entity_type', 'object_id', 'label', 'detail', 'position',
+    )
+    best: dict[tuple[str, int], tuple[int, str, str]] = {}
+    for entity_type, object_id, label, detail, position in candidates[:limit * CANDIDATES_PER_RESULT]:
+        current = best.get((entity_type, object_id))
+        if current is None or position < current[0]:
+            best[(entity_type, object_id)] = (position, label, detail)
+
+    ranked = sorted(best.items(), key=lambda item: (item[1][0], len(item[1][1]), item[1][1].casefold()))
+    return [
+        {'type': entity_type, 'id': object_id, 'label': label, 'detail': detail}
+        for (entity_type, object_id), (_, label, detail) in ranked[:limit]
+    ]
+
+
+def typeahead(query: str, advocate_id=None, limit: int = 8) -> list[dict]:
+    """Return clients and cases whose name, number or title has a word starting with the query.
+
+    Args:
+        query: Raw user input; shorter than TYPEAHEAD_MIN_CHARS once normalized returns [].
+        advocate_id: Restrict to one advocate's data; None searches everything.
+        limit: Maximum number of results.
+
+    Returns:
+        [{'type': 'client' | 'case', 'id', 'label', 'detail'}], best first.
+    """
+    prefix = normalize(query)[:KEY_LENGTH]
+    if len(prefix) < max(1, settings.TYPEAHEAD_MIN_CHARS):
+        return []
+    started = time.monotonic()
+    ttl = settings.TYPEAHEAD_CACHE_TTL
+    if ttl <= 0:
+        results = _lookup(prefix, advocate_id, limit)
+    else:
+        scope = SYSTEM if advocate_id is None else advocate_id
+        generation = _cache().get(_generation_key(scope))
+        if generation is None:
+            # A missing token (first lookup or evicted) must not revive older results
+            _cache().add(_generation_key(scope), uuid.uuid4().hex, None)
+            generation = _cache().get(_generation_key(scope))
+        digest = hashlib.sha256(prefix.encode('utf-8')).hexdigest()[:24]
+        key = f'{KEY_PREFIX}:{scope}:{generation}:{limit}:{digest}'
+        results = _cache().get(key)
+        if results is None:
+            results = _lookup(prefix, advocate_id, limit)
+            _cache().set(key, results, ttl)
+
+    elapsed_ms = (time.monotonic() - started) * 1000
+    if elapsed_ms > settings.TYPEAHEAD_SLOW_MS:
+        logger.warning("[TYPEAHEAD] Slow lookup advocate=%s chars=%d took %.1fms", advocate_id, len(prefix), elapsed_ms)
+    return results
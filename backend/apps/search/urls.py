@@ -5,4 +5,6 @@ from . import views
 
 urlpatterns = [
     path('search/', views.global_search, name='global-search'),
+    path('search/text/', views.document_text_search, name='document-text-search'),
+    path('search/typeahead/', views.typeahead_search, name='typeahead-search'),
 ]
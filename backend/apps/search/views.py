@@ -1,11 +1,16 @@
 """Global search endpoint.
 
 Searches across clients, cases, and documents with a single query.
-Results are grouped by entity type and ranked by relevance.
+Results are grouped by entity type and ranked by relevance (see
+apps.search.index for the full-text backends). Documents also match on
+their processed text (apps.search.text_index); those results carry a
+snippet and highlight offsets. The typeahead endpoint serves as-you-type
+suggestions from a prefix index (apps.search.typeahead).
 """
 import logging
+from typing import Optional
 
-from django.db.models import Q, Value, CharField
+from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
@@ -15,9 +20,53 @@ from apps.clients.models import Client
 from apps.cases.models import Case
 from apps.documents.models import Document
 
+from .index import search
+from .text_index import search_text
+from .typeahead import typeahead
+
 logger = logging.getLogger(__name__)
 
 MAX_RESULTS_PER_TYPE = 5
+TEXT_SEARCH_DEFAULT_LIMIT = 20
+TEXT_SEARCH_MAX_LIMIT = 50
+TYPEAHEAD_DEFAULT_LIMIT = 8
+TYPEAHEAD_MAX_LIMIT = 20
+
+RESULT_FIELDS = {
+    'client': (Client, ('id', 'full_name', 'email', 'phone')),
+    'case': (Case, ('id', 'title', 'case_number', 'status')),
+    'document': (Document, ('id', 'name', 'file_type', 'status')),
+}
+
+
+def _load(entity_type: str, ids: list[int], matches: Optional[dict[int, dict]] = None) -> list[dict]:
+    """Fetch result rows for ranked ids, keeping the ranking order.
+
+    Args:
+        entity_type: 'client', 'case' or 'document'.
+        ids: Ranked primary keys.
+        matches: Text-search hits by document id; their snippet and
+            highlights are added to the matching rows.
+    """
+    if not ids:
+        return []
+    model, fields = RESULT_FIELDS[entity_type]
+    rows = {row['id']: row for row in model.objects.filter(pk__in=ids).values(*fields)}
+    results = []
+    for pk in ids:
+        if pk in rows:
+            result = {**rows[pk], 'type': entity_type}
+            if matches and pk in matches:
+                result['snippet'] = matches[pk]['snippet']
+                result['highlights'] = matches[pk]['highlights']
+            results.append(result)
+    return results
+
+
+def _int_param(request: Request, name: str) -> Optional[int]:
+    """Parse an optional integer query parameter; raises ValueError if malformed."""
+    value = request.query_params.get(name)
+    return int(value) if value else None
 
 
 @api_view(['GET'])
@@ -35,49 +84,73 @@ def global_search(request: Request) -> Response:
     user = request.user
     is_admin = user.role == 'admin'
 
-    # Search clients
-    client_qs = Client.objects.filter(
-        Q(full_name__icontains=query)
-        | Q(email__icontains=query)
-        | Q(phone__icontains=query)
-    )
-    if not is_admin:
-        client_qs = client_qs.filter(advocate=user)
-    clients = list(
-        client_qs.values('id', 'full_name', 'email', 'phone')[:MAX_RESULTS_PER_TYPE]
-    )
-    for c in clients:
-        c['type'] = 'client'
-
-    # Search cases
-    case_qs = Case.objects.filter(
-        Q(title__icontains=query)
-        | Q(case_number__icontains=query)
-        | Q(description__icontains=query)
-    )
-    if not is_admin:
-        case_qs = case_qs.filter(advocate=user)
-    cases = list(
-        case_qs.values('id', 'title', 'case_number', 'status')[:MAX_RESULTS_PER_TYPE]
-    )
-    for c in cases:
-        c['type'] = 'case'
+    advocate_id = None if is_admin else user.pk
+    ids = search(query, advocate_id=advocate_id, limit=MAX_RESULTS_PER_TYPE)
 
-    # Search documents
-    doc_qs = Document.objects.filter(
-        Q(name__icontains=query)
-        | Q(notes__icontains=query)
-    )
-    if not is_admin:
-        doc_qs = doc_qs.filter(advocate=user)
-    documents = list(
-        doc_qs.values('id', 'name', 'file_type', 'status')[:MAX_RESULTS_PER_TYPE]
-    )
-    for d in documents:
-        d['type'] = 'document'
+    # Name/notes matches first, then documents matching only on their text
+    matches = {hit['document_id']: hit for hit in search_text(query, advocate_id, MAX_RESULTS_PER_TYPE)}
+    document_ids = ids['document'] + [pk for pk in matches if pk not in ids['document']]
 
     return Response({
-        'clients': clients,
-        'cases': cases,
-        'documents': documents,
+        'clients': _load('client', ids['client']),
+        'cases': _load('case', ids['case']),
+        'documents': _load('document', document_ids[:MAX_RESULTS_PER_TYPE], matches),
     })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def document_text_search(request: Request) -> Response:
+    """Search the processed text of documents.
+
+    GET /api/search/text/?q=<query>&client_id=&case_id=&limit=
+    Returns { results: [{ id, name, file_type, status, type, snippet, highlights }] },
+    best match first; highlights are [start, end) offsets into the snippet.
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query or len(query) < 2:
+        return Response({'results': []})
+
+    try:
+        client_id = _int_param(request, 'client_id')
+        case_id = _int_param(request, 'case_id')
+        limit = _int_param(request, 'limit') or TEXT_SEARCH_DEFAULT_LIMIT
+    except ValueError:
+        return Response(
+            {'error': 'client_id, case_id and limit must be integers'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    user = request.user
+    hits = search_text(
+        query,
+        advocate_id=None if user.role == 'admin' else user.pk,
+        limit=max(1, min(limit, TEXT_SEARCH_MAX_LIMIT)),
+        client_id=client_id,
+        case_id=case_id,
+    )
+    matches = {hit['document_id']: hit for hit in hits}
+    return Response({'results': _load('document', list(matches), matches)})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def typeahead_search(request: Request) -> Response:
+    """Suggest clients and cases as the user types.
+
+    GET /api/search/typeahead/?q=<prefix>&limit=
+    Returns { results: [{ type, id, label, detail }] }: clients by name,
+    cases by number or title, matching any word that starts with the query.
+    """
+    try:
+        limit = _int_param(request, 'limit') or TYPEAHEAD_DEFAULT_LIMIT
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    user = request.user
+    results = typeahead(
+        request.query_params.get('q', ''),
+        advocate_id=None if user.role == 'admin' else user.pk,
+        limit=max(1, min(limit, TYPEAHEAD_MAX_LIMIT)),
+    )
+    return Response({'results': results})
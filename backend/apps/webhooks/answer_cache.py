@@ -0,0 +1,194 @@
+"""Answer cache for the chat relay.
+
+Advocates often ask the same question about the same client or case. The
+RAG answer only changes when new content is indexed for that scope, so
+replies from n8n are cached per advocate and scope (client_id, case_id)
+and reused for near-identical questions. Scopes are keyed on ids, not
+names, so two clients or cases with the same name never share answers.
+
+Matching:
+  - messages are normalized (Unicode NFKC, case-folded, punctuation
+    dropped, whitespace collapsed); an identical normalized message hits;
+  - otherwise the closest cached message by Jaccard similarity of
+    character shingles hits if it reaches CHAT_ANSWER_CACHE_SIMILARITY;
+  - numbers and negations must match exactly, so "is clause 4 void" never
+    answers "is clause 5 void" or "is clause 4 not void".
+
+Only the opening message of a conversation is cached or answered from the
+cache: follow-ups ("and the second one?") depend on n8n's conversation
+memory, not just on their text.
+
+A cache hit never reaches n8n, so n8n's memory for that conversation
+lacks the opening turn. The served reply is saved with
+served_from_cache=True, and every follow-up in that conversation carries
+the opening question and the exact answer the advocate saw as `history`
+in the n8n payload. No extra LLM call is made, and n8n answers from the
+same text the advocate is looking at.
+
+Invalidation: each scope has a generation token in the cache, part of
+every bucket key. finalize_to_rag() calls invalidate() with the pushed
+document's client and case ids, which rotates the tokens for that client, that case and
+the advocate's unscoped questions, so their entries are never read again
+and expire with CHAT_ANSWER_CACHE_TTL.
+
+Settings:
+    CHAT_ANSWER_CACHE_TTL          Seconds an answer is reused; 0 disables.
+    CHAT_ANSWER_CACHE_SIMILARITY   Minimum shingle similarity for a hit.
+    CHAT_ANSWER_CACHE_MAX_ENTRIES  Answers kept per advocate and scope.
+    CHAT_ANSWER_CACHE_ALIAS        Django cache alias.
+"""
+import logging
+import re
+import time
+import unicodedata
+import uuid
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'chat-answers'
+SHINGLE_SIZE = 3
+NEGATIONS = frozenset({'no', 'not', 'never', 'without', 'cannot', 'nor', 'none'})
+
+_punctuation = re.compile(r"[^\w\s]+")
+_whitespace = re.compile(r"\s+")
+
+
+class CachedAnswer(NamedTuple):
+    """One cached question and its reply."""
+
+    normalized: str
+    shingles: frozenset
+    guards: frozenset
+    answer: str
+    stored_at: float
+
+
+def normalize(message: str) -> str:
+    """Reduce a message to the form used for matching."""
+    text = unicodedata.normalize('NFKC', message).casefold().replace("n't", ' not')
+    text = _punctuation.sub(' ', text)
+    return _whitespace.sub(' ', text).strip()
+
+
+def shingles(normalized: str) -> frozenset:
+    """Character shingles of a normalized message."""
+    if len(normalized) <= SHINGLE_SIZE:
+        return frozenset({normalized})
+    return frozenset(normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1))
+
+
+def guards(normalized: str) -> frozenset:
+    """Tokens that must match exactly for two messages to share an answer."""
+    return frozenset(
+        token for token in normalized.split()
+        if token in NEGATIONS or any(char.isdigit() for char in token)
+    )
+
+
+def similarity(a: frozenset, b: frozenset) -> float:
+    """Jaccard similarity of two shingle sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class AnswerCache:
+    """Scoped, similarity-matched cache of chat replies."""
+
+    def __init__(self) -> None:
+        self.ttl = settings.CHAT_ANSWER_CACHE_TTL
+        self.threshold = settings.CHAT_ANSWER_CACHE_SIMILARITY
+        self.max_entries = settings.CHAT_ANSWER_CACHE_MAX_ENTRIES
+        self.cache = caches[settings.CHAT_ANSWER_CACHE_ALIAS]
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _generation_keys(self, advocate_id, client_id: Optional[int], case_id: Optional[int]) -> list[str]:
+        """Generation tokens an entry in this scope depends on."""
+        keys = []
+        if client_id is not None:
+            keys.append(f'{KEY_PREFIX}:gen:{advocate_id}:client:{client_id}')
+        if case_id is not None:
+            keys.append(f'{KEY_PREFIX}:gen:{advocate_id}:case:{case_id}')
+        return keys or [f'{KEY_PREFIX}:gen:{advocate_id}']
+
+    def _bucket_key(self, advocate_id, client_id: Optional[int], case_id: Optional[int]) -> str:
+        keys = self._generation_keys(advocate_id, client_id, case_id)
+        tokens = self.cache.get_many(keys)
+        for key in keys:
+            if key not in tokens:
+                # A missing token (new scope or evicted) must not revive older entries
+                self.cache.add(key, uuid.uuid4().hex, None)
+                tokens[key] = self.cache.get(key)
+        generation = '.'.join(str(tokens[key]) for key in keys)
+        return f'{KEY_PREFIX}:{advocate_id}:{client_id}:{case_id}:{generation}'
+
+    def get(self, advocate_id, message: str, client_id: Optional[int], case_id: Optional[int]) -> Optional[str]:
+        """Return a cached answer for the message in this scope, or None."""
+        if not self.enabled:
+            return None
+        normalized = normalize(message)
+        if not normalized:
+            return None
+        entries = self.cache.get(self._bucket_key(advocate_id, client_id, case_id)) or []
+        oldest = time.time() - self.ttl
+        wanted_shingles, wanted_guards = shingles(normalized), guards(normalized)
+
+        best, best_score = None, 0.0
+        for entry in entries:
+            if entry.stored_at < oldest or entry.guards != wanted_guards:
+                continue
+            score = 1.0 if entry.normalized == normalized else similarity(entry.shingles, wanted_shingles)
+            if score > best_score:
+                best, best_score = entry, score
+        if best is None or best_score < self.threshold:
+            return None
+        logger.info(
+            "[CHAT_CACHE] Hit for advocate=%s client_id=%s case_id=%s similarity=%.2f",
+            advocate_id, client_id, case_id, best_score,
+        )
+        return best.answer
+
+    def set(
+        self, advocate_id, message: str, client_id: Optional[int], case_id: Optional[int], answer: str,
+    ) -> None:
+        """Store an answer for the message in this scope."""
+        if not self.enabled:
+            return
+        normalized = normalize(message)
+        if not normalized:
+            return
+        key = self._bucket_key(advocate_id, client_id, case_id)
+        oldest = time.time() - self.ttl
+        entries = [
+            entry for entry in self.cache.get(key) or []
+            if entry.normalized != normalized and entry.stored_at >= oldest
+        ]
+        entries.append(CachedAnswer(normalized, shingles(normalized), guards(normalized), answer, time.time()))
+        self.cache.set(key, entries[-self.max_entries:], self.ttl)
+
+    def invalidate(self, advocate_id, client_id: Optional[int], case_id: Optional[int]) -> None:
+        """Drop answers that new content for this scope may change.
+
+        Covers the client's and the case's questions and the advocate's
+        unscoped ones; other clients and cases keep their answers.
+        """
+        keys = [f'{KEY_PREFIX}:gen:{advocate_id}']
+        keys += self._generation_keys(advocate_id, client_id, None) if client_id is not None else []
+        keys += self._generation_keys(advocate_id, None, case_id) if case_id is not None else []
+        self.cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
+        logger.info(
+            "[CHAT_CACHE] Invalidated advocate=%s client_id=%s case_id=%s",
+            advocate_id, client_id, case_id,
+        )
+
+
+def get_answer_cache() -> AnswerCache:
+    """Return an AnswerCache for the current settings."""
+    return AnswerCache()
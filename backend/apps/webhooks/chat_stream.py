@@ -0,0 +1,151 @@
+"""Streaming chat relay (Server-Sent Events).
+
+POST /api/chat/stream/ takes the same body as POST /api/chat/ but answers
+with `text/event-stream` and forwards the reply from n8n as it is
+generated, instead of holding a worker until the whole answer is ready:
+
+    event: start    data: {"conversation_id": "...", "user_message": {...}}
+    event: token    data: {"content": "partial text"}      (repeated)
+    event: done     data: {"assistant_message": {...}}
+
+The view is async (utils.async_views): under ASGI the wait on n8n holds
+no thread, only an open socket on the worker's event loop. ORM work
+(authentication, saving messages, activity logs) runs through
+sync_to_async.
+
+n8n streams when its Webhook node uses "Respond: Streaming", sending
+newline-delimited JSON chunks ({"type": "item", "content": "..."}). A
+workflow that responds in one piece is parsed like the blocking relay and
+sent as a single token, so both workflow styles work.
+
+The assistant ChatMessage is saved once the stream completes. If the
+client disconnects first, the partial answer is discarded. Opening
+questions found in the answer cache (apps.webhooks.answer_cache) are sent
+as a single token without calling n8n.
+"""
+import json
+import logging
+from typing import AsyncIterator
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework.request import Request
+
+from utils.async_views import async_api_view
+from utils.webhook_client import CircuitOpenError, get_webhook_client
+
+from .chat_views import (
+    FALLBACK_REPLY,
+    ChatRequestSerializer,
+    _chat_webhook_request,
+    _cached_answer,
+    _close_chat,
+    _open_chat,
+    _parse_n8n_reply,
+    _remember_answer,
+)
+
+logger = logging.getLogger(__name__)
+
+N8N_CHUNK_TYPES = {'begin', 'item', 'end', 'error'}
+
+
+def _sse(event: str, data: dict) -> bytes:
+    """Encode one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode()
+
+
+async def _stream_from_n8n(chat: dict) -> AsyncIterator[str]:
+    """Yield reply text from n8n as it arrives; yields nothing if n8n is unavailable."""
+    webhook = _chat_webhook_request(
+        chat['message'], chat['user'].email, str(chat['conversation_id']), chat['client_name'], chat['case_name'],
+        chat['history'],
+    )
+    if webhook is None:
+        return
+    webhook_url, payload, headers = webhook
+
+    async with get_webhook_client().stream(
+        'chat', webhook_url, json=payload, headers=headers, timeout=settings.CHAT_STREAM_READ_TIMEOUT,
+    ) as resp:
+        if resp.status_code >= 400:
+            logger.error("[CHAT_STREAM] n8n returned %s", resp.status_code)
+            return
+        content_type = resp.headers.get('Content-Type', '')
+        streamed = False
+        unstreamed = []
+        async for line in resp.aiter_lines():
+            if not line.strip():
+                continue
+            try:
+                chunk = json.loads(line)
+            except ValueError:
+                chunk = None
+            if isinstance(chunk, dict) and chunk.get('type') in N8N_CHUNK_TYPES:
+                streamed = True
+                if chunk['type'] == 'item' and chunk.get('content'):
+                    yield chunk['content']
+                elif chunk['type'] == 'error':
+                    logger.error("[CHAT_STREAM] n8n stream error: %s", chunk.get('content'))
+            else:
+                unstreamed.append(line)
+        if unstreamed and not streamed:
+            # Workflow answered in one piece rather than streaming
+            yield _parse_n8n_reply(content_type, "\n".join(unstreamed))
+
+
+async def _event_stream(chat: dict) -> AsyncIterator[bytes]:
+    """Produce the SSE body and save the reply once it is complete."""
+    yield _sse('start', {'conversation_id': chat['conversation_id'], 'user_message': chat['user_message']})
+
+    parts: list[str] = []
+    cached = await sync_to_async(_cached_answer)(chat)
+    if cached is not None:
+        logger.info("[CHAT_STREAM] Served from cache: conversation=%s", chat['conversation_id'])
+        parts.append(cached)
+        yield _sse('token', {'content': cached})
+    else:
+        try:
+            async for text in _stream_from_n8n(chat):
+                parts.append(text)
+                yield _sse('token', {'content': text})
+        except (httpx.HTTPError, CircuitOpenError):
+            logger.exception("[CHAT_STREAM] Failed to stream chat from n8n")
+        else:  # a partial answer from a failed stream is saved but never cached
+            if parts:
+                await sync_to_async(_remember_answer)(chat, "".join(parts))
+
+    ai_response = "".join(parts)
+    if not ai_response:
+        ai_response = FALLBACK_REPLY
+        logger.warning(
+            "[CHAT_STREAM] No reply for conversation %s — using fallback response", chat['conversation_id'],
+        )
+        yield _sse('token', {'content': ai_response})
+    else:
+        logger.info(
+            "[CHAT_STREAM] Stream complete: conversation=%s response_len=%d",
+            chat['conversation_id'], len(ai_response),
+        )
+
+    assistant_message = await sync_to_async(_close_chat)(chat, ai_response)
+    yield _sse('done', {'assistant_message': assistant_message})
+
+
+@async_api_view(['POST'])
+async def chat_stream(request: Request) -> HttpResponse:
+    """Relay a chat message to n8n and stream the reply as Server-Sent Events.
+
+    POST /api/chat/stream/
+    Body: same as POST /api/chat/.
+    """
+    serializer = ChatRequestSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    chat = await sync_to_async(_open_chat)(request.user, serializer.validated_data)
+
+    response = StreamingHttpResponse(_event_stream(chat), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # let nginx-style proxies flush each event
+    return response
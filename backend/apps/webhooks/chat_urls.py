@@ -7,9 +7,11 @@ All endpoints are registered under /api/chat/.
 """
 from django.urls import path
 
-from . import chat_views
+from . import chat_stream, chat_views
 
 urlpatterns = [
     path('', chat_views.chat_relay, name='chat-relay'),
+    path('stream/', chat_stream.chat_stream, name='chat-stream'),
     path('history/', chat_views.chat_history, name='chat-history'),
+    path('conversations/', chat_views.chat_conversations, name='chat-conversations'),
 ]
@@ -3,19 +3,31 @@
 Relays chat messages to the n8n RAG workflow and persists
 conversation history for the frontend.
 """
+import base64
+import binascii
+import json
 import logging
 import os
 import uuid
+from datetime import datetime
 from typing import Optional
 
-import requests
+import httpx
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max, Min, OuterRef, Q, Subquery
+from django.db.models.functions import Substr
 from rest_framework import serializers, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from apps.documents.models import Document, DocumentActivityLog
+from apps.documents.activity import activity_log_buffer, log_activity
+from apps.documents.models import Document
+from utils.async_views import async_api_view
+from utils.webhook_client import CircuitOpenError, get_webhook_client
+
+from .answer_cache import get_answer_cache
 from .models import ChatMessage
 
 logger = logging.getLogger(__name__)
@@ -70,20 +82,28 @@ def _resolve_case_name(case_id: int, advocate) -> Optional[str]:
         return None
 
 
-def _relay_to_n8n(
+PROCESSING_REPLY = "I'm processing your request. Please try again in a moment."
+FALLBACK_REPLY = (
+    "I'm being set up and will be fully operational soon. "
+    "In the meantime, you can review your documents and cases directly."
+)
+
+
+def _chat_webhook_request(
     message: str,
     advocate_email: str,
     conversation_id: str,
     client_name: Optional[str] = None,
     case_name: Optional[str] = None,
-) -> Optional[str]:
-    """Forward the chat message to n8n.
+    history: Optional[list[dict]] = None,
+) -> Optional[tuple[str, dict, dict]]:
+    """Build the (url, payload, headers) for a chat call, or None if unconfigured.
 
     Always uses N8N_CHAT_WEBHOOK_URL for chat conversations.
-    Includes client_name and case_name in the payload for RAG context.
+    Includes client_name and case_name in the payload for RAG context, and
+    `history` ([{'role', 'content'}]) for earlier turns n8n has not seen
+    (an opening answer served from the answer cache).
     N8N_RAG_WEBHOOK_URL is reserved for document indexing only.
-
-    Returns the AI response text, or None if the webhook is unavailable.
     """
     webhook_url = os.environ.get('N8N_CHAT_WEBHOOK_URL', '')
 
@@ -108,14 +128,80 @@ def _relay_to_n8n(
         payload['client_name'] = client_name
     if case_name:
         payload['case_name'] = case_name
+    if history:
+        payload['history'] = history
 
     logger.info(
         "[CHAT_N8N] Sending chat to n8n: client_name=%s case_name=%s message_len=%d",
         client_name, case_name, len(message),
     )
+    return webhook_url, payload, headers
+
+
+def _parse_n8n_reply(content_type: str, body: str) -> str:
+    """Extract the reply text from a complete (non-streamed) n8n chat response."""
+    # Handle empty body — n8n acknowledged but hasn't responded yet
+    if not body or len(body.strip()) == 0:
+        logger.warning("n8n returned empty body for chat — likely async processing")
+        return PROCESSING_REPLY
+
+    # n8n "First Incoming Item" sends the item's JSON directly
+    if 'application/json' in content_type:
+        try:
+            data = json.loads(body)
+
+            # Empty JSON object/array
+            if data in (None, {}, [], [{}]):
+                logger.warning("n8n returned empty JSON for chat: %s", data)
+                return PROCESSING_REPLY
+
+            # n8n may wrap in array: [ { "json": { ... }, "binary": { ... } } ]
+            if isinstance(data, list) and data:
+                data = data[0]
+
+            # n8n may nest under "json" key: { "json": { "output": "..." } }
+            if isinstance(data, dict):
+                inner = data.get('json', data)
+                if isinstance(inner, dict):
+                    result = (
+                        inner.get('response') or inner.get('message')
+                        or inner.get('answer') or inner.get('output')
+                        or inner.get('text') or inner.get('reply')
+                    )
+                    return result or str(inner)
+                elif isinstance(inner, str):
+                    return inner
+
+            # Fallback: stringify
+            return str(data)[:2000]
+        except Exception:
+            return body[:2000]
+
+    # Plain text response
+    return body.strip()[:2000] or PROCESSING_REPLY
+
+
+async def _relay_to_n8n(
+    message: str,
+    advocate_email: str,
+    conversation_id: str,
+    client_name: Optional[str] = None,
+    case_name: Optional[str] = None,
+    history: Optional[list[dict]] = None,
+) -> Optional[str]:
+    """Forward the chat message to n8n.
+
+    Returns the AI response text, or None if the webhook is unavailable.
+    """
+    webhook = _chat_webhook_request(message, advocate_email, conversation_id, client_name, case_name, history)
+    if webhook is None:
+        return None
+    webhook_url, payload, headers = webhook
 
     try:
-        resp = requests.post(webhook_url, json=payload, headers=headers, timeout=120)
+        resp = await get_webhook_client().apost(
+            'chat', webhook_url, idempotent=True, json=payload, headers=headers, timeout=120,
+        )
         resp.raise_for_status()
 
         ct = resp.headers.get('Content-Type', '')
@@ -123,75 +209,76 @@ def _relay_to_n8n(
             "n8n chat response: status=%s ct='%s' size=%d body='%s'",
             resp.status_code, ct, len(resp.content), resp.text[:300],
         )
+        return _parse_n8n_reply(ct, resp.text)
 
-        # Handle empty body — n8n acknowledged but hasn't responded yet
-        if not resp.content or len(resp.content.strip()) == 0:
-            logger.warning("n8n returned empty body for chat — likely async processing")
-            return "I'm processing your request. Please try again in a moment."
-
-        # n8n "First Incoming Item" sends the item's JSON directly
-        if 'application/json' in ct:
-            try:
-                data = resp.json()
-
-                # Empty JSON object/array
-                if data in (None, {}, [], [{}]):
-                    logger.warning("n8n returned empty JSON for chat: %s", data)
-                    return "I'm processing your request. Please try again in a moment."
-
-                # n8n may wrap in array: [ { "json": { ... }, "binary": { ... } } ]
-                if isinstance(data, list) and data:
-                    data = data[0]
-
-                # n8n may nest under "json" key: { "json": { "output": "..." } }
-                if isinstance(data, dict):
-                    inner = data.get('json', data)
-                    if isinstance(inner, dict):
-                        result = (
-                            inner.get('response') or inner.get('message')
-                            or inner.get('answer') or inner.get('output')
-                            or inner.get('text') or inner.get('reply')
-                        )
-                        return result or str(inner)
-                    elif isinstance(inner, str):
-                        return inner
-
-                # Fallback: stringify
-                return str(data)[:2000]
-            except Exception:
-                return resp.text[:2000]
-        else:
-            # Plain text response
-            return resp.text.strip()[:2000] or "I'm processing your request. Please try again in a moment."
-
-    except requests.RequestException:
+    except (httpx.HTTPError, CircuitOpenError):
         logger.exception("Failed to relay chat message to n8n")
         return None
 
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def chat_relay(request: Request) -> Response:
-    """Relay a chat message to the n8n RAG workflow and return the response.
+def _log_chat_activity(
+    advocate, case_id: Optional[int], message: str, ai_response: str,
+    client_name: Optional[str], case_name: Optional[str],
+) -> None:
+    """Log a chat exchange to the case's documents for activity tracking.
 
-    POST /api/chat/
-    {
-      "message": "What are the key terms in this agreement?",
-      "conversation_id": "uuid" (optional — auto-generated if omitted),
-      "client_id": 123 (optional — scopes RAG to a client namespace)
-    }
+    All rows are written in one bulk_create, also when called from the SSE
+    stream after the request's own buffer has closed.
     """
-    serializer = ChatRequestSerializer(data=request.data)
-    serializer.is_valid(raise_exception=True)
+    if not case_id:
+        return
+    doc_ids = Document.objects.filter(case_id=case_id, advocate=advocate).values_list('id', flat=True)[:5]
+    with activity_log_buffer():
+        for doc_id in doc_ids:
+            log_activity(
+                doc_id, 'chat_sent',
+                f'Chat: {message[:100]}{"..." if len(message) > 100 else ""}',
+                detail=f'Client: {client_name or "—"}, Case: {case_name or "—"}',
+                actor=advocate.email,
+            )
+            log_activity(
+                doc_id, 'chat_received',
+                f'LIA: {ai_response[:100]}{"..." if len(ai_response) > 100 else ""}',
+                actor='LIA',
+            )
+
+
+def _open_chat(user, data: dict) -> dict:
+    """Persist the user message and resolve RAG scope names (sync ORM work).
+
+    Args:
+        user: The advocate sending the message.
+        data: ChatRequestSerializer.validated_data.
 
-    message = serializer.validated_data['message']
-    conversation_id = serializer.validated_data.get('conversation_id') or uuid.uuid4()
-    client_id = serializer.validated_data.get('client_id')
-    case_id = serializer.validated_data.get('case_id')
+    Returns:
+        The chat context passed to _relay_to_n8n / _close_chat.
+    """
+    message = data['message']
+    conversation_id = data.get('conversation_id')
+    client_id = data.get('client_id')
+    case_id = data.get('case_id')
+
+    # Only a conversation's opening question can be answered from the answer cache
+    first_turn = conversation_id is None or not ChatMessage.objects.filter(
+        advocate=user, conversation_id=conversation_id,
+    ).exists()
+    # An opening turn served from the cache never reached n8n's memory: send it
+    # along with every follow-up as history
+    history = None
+    if not first_turn:
+        turns = ChatMessage.objects.filter(advocate=user, conversation_id=conversation_id)
+        cached_reply = turns.filter(served_from_cache=True).values_list('content', flat=True).first()
+        if cached_reply is not None:
+            opening = turns.filter(role='user').values_list('content', flat=True).first()
+            history = [
+                {'role': 'user', 'content': opening},
+                {'role': 'assistant', 'content': cached_reply},
+            ]
+    conversation_id = conversation_id or uuid.uuid4()
 
     # Persist the user message
     user_msg = ChatMessage.objects.create(
-        advocate=request.user,
+        advocate=user,
         conversation_id=conversation_id,
         role='user',
         content=message,
@@ -199,80 +286,160 @@ def chat_relay(request: Request) -> Response:
     )
     logger.info(
         "Chat message created: conversation=%s user=%s client_id=%s message_len=%d",
-        conversation_id, request.user.email, client_id, len(message),
+        conversation_id, user.email, client_id, len(message),
     )
 
     # Resolve client name and case name for RAG scoping
-    client_name = None
-    case_name = None
-    if client_id:
-        client_name = _resolve_client_name(client_id, request.user)
-    if case_id:
-        case_name = _resolve_case_name(case_id, request.user)
+    client_name = _resolve_client_name(client_id, user) if client_id else None
+    case_name = _resolve_case_name(case_id, user) if case_id else None
 
     # Log chat routing
     logger.info(
         "[CHAT_ROUTE] Routing chat to N8N_CHAT_WEBHOOK_URL: client_name=%s case_name=%s",
         client_name, case_name,
     )
+    return {
+        'user': user,
+        'message': message,
+        'conversation_id': conversation_id,
+        'client_id': client_id,
+        'case_id': case_id,
+        'client_name': client_name,
+        'case_name': case_name,
+        'first_turn': first_turn,
+        'from_cache': False,
+        'history': history,
+        'user_message': ChatMessageSerializer(user_msg).data,
+    }
+
+
+def _cached_answer(chat: dict) -> Optional[str]:
+    """Return a cached reply to the chat's opening question, if there is one.
+
+    A hit is recorded in chat['from_cache'] so _close_chat can flag the reply.
+    """
+    if not chat['first_turn']:
+        return None
+    answer = get_answer_cache().get(chat['user'].id, chat['message'], chat['client_id'], chat['case_id'])
+    chat['from_cache'] = answer is not None
+    return answer
+
+
+def _remember_answer(chat: dict, ai_response: str) -> None:
+    """Cache a reply from n8n to the chat's opening question."""
+    if chat['first_turn'] and ai_response != PROCESSING_REPLY:
+        get_answer_cache().set(
+            chat['user'].id, chat['message'], chat['client_id'], chat['case_id'], ai_response,
+        )
+
+
+def _close_chat(chat: dict, ai_response: str) -> dict:
+    """Persist the assistant reply and activity logs (sync ORM work)."""
+    assistant_msg = ChatMessage.objects.create(
+        advocate=chat['user'],
+        conversation_id=chat['conversation_id'],
+        role='assistant',
+        content=ai_response,
+        client_id=chat['client_id'],
+        served_from_cache=chat['from_cache'],
+    )
 
-    # Relay to n8n chat webhook (always uses N8N_CHAT_WEBHOOK_URL)
-    ai_response = _relay_to_n8n(
-        message=message,
-        advocate_email=request.user.email,
-        conversation_id=str(conversation_id),
-        client_name=client_name,
-        case_name=case_name,
+    # Log chat interactions to relevant documents for activity tracking
+    _log_chat_activity(
+        chat['user'], chat['case_id'], chat['message'], ai_response, chat['client_name'], chat['case_name'],
     )
+    return ChatMessageSerializer(assistant_msg).data
 
-    if ai_response is None:
-        ai_response = (
-            "I'm being set up and will be fully operational soon. "
-            "In the meantime, you can review your documents and cases directly."
+
+@async_api_view(['POST'])
+async def chat_relay(request: Request) -> Response:
+    """Relay a chat message to the n8n RAG workflow and return the response.
+
+    POST /api/chat/
+    {
+      "message": "What are the key terms in this agreement?",
+      "conversation_id": "uuid" (optional — auto-generated if omitted),
+      "client_id": 123 (optional — scopes RAG to a client namespace)
+    }
+
+    Async: the wait on n8n (up to 120s) holds no worker thread under ASGI.
+    Opening questions already answered for the same scope are served from
+    the answer cache without calling n8n; follow-ups then carry that turn
+    to n8n as history (see answer_cache).
+    """
+    serializer = ChatRequestSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    chat = await sync_to_async(_open_chat)(request.user, serializer.validated_data)
+
+    ai_response = await sync_to_async(_cached_answer)(chat)
+    if ai_response is not None:
+        logger.info("Chat response served from cache: conversation=%s", chat['conversation_id'])
+    else:
+        # Relay to n8n chat webhook (always uses N8N_CHAT_WEBHOOK_URL)
+        ai_response = await _relay_to_n8n(
+            message=chat['message'],
+            advocate_email=request.user.email,
+            conversation_id=str(chat['conversation_id']),
+            client_name=chat['client_name'],
+            case_name=chat['case_name'],
+            history=chat['history'],
         )
+        if ai_response is not None:
+            await sync_to_async(_remember_answer)(chat, ai_response)
+
+    if ai_response is None:
+        ai_response = FALLBACK_REPLY
         logger.warning(
             "Chat webhook returned None for conversation %s — using fallback response",
-            conversation_id,
+            chat['conversation_id'],
         )
     else:
         logger.info(
             "Chat response received: conversation=%s response_len=%d",
-            conversation_id, len(ai_response),
+            chat['conversation_id'], len(ai_response),
         )
 
-    # Persist the AI response
-    assistant_msg = ChatMessage.objects.create(
-        advocate=request.user,
-        conversation_id=conversation_id,
-        role='assistant',
-        content=ai_response,
-        client_id=client_id,
-    )
-
-    # Log chat interactions to relevant documents for activity tracking
-    if case_id:
-        docs = Document.objects.filter(case_id=case_id, advocate=request.user)
-        for doc in docs[:5]:
-            DocumentActivityLog.objects.create(
-                document=doc,
-                event_type='chat_sent',
-                message=f'Chat: {message[:100]}{"..." if len(message) > 100 else ""}',
-                detail=f'Client: {client_name or "—"}, Case: {case_name or "—"}',
-                actor=request.user.email,
-            )
-            DocumentActivityLog.objects.create(
-                document=doc,
-                event_type='chat_received',
-                message=f'LIA: {ai_response[:100]}{"..." if len(ai_response) > 100 else ""}',
-                actor='LIA',
-            )
+    assistant_message = await sync_to_async(_close_chat)(chat, ai_response)
 
     return Response({
-        'user_message': ChatMessageSerializer(user_msg).data,
-        'assistant_message': ChatMessageSerializer(assistant_msg).data,
+        'user_message': chat['user_message'],
+        'assistant_message': assistant_message,
     }, status=status.HTTP_201_CREATED)
 
 
+def _limit(request: Request, default: int = 50, maximum: int = 200) -> int:
+    """Read ?limit=, clamped to 1..maximum."""
+    try:
+        return max(1, min(int(request.query_params.get('limit', default)), maximum))
+    except ValueError:
+        return default
+
+
+def _encode_cursor(created_at, key) -> str:
+    """Encode a (timestamp, tie-breaker) position as an opaque URL-safe token."""
+    raw = f"{created_at.isoformat()}|{key}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode_cursor(token: str) -> Optional[tuple]:
+    """Decode a cursor from _encode_cursor, or None if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        created_at, key = raw.split('|')
+        return datetime.fromisoformat(created_at), key
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return None
+
+
+def _page_url(request: Request, **params) -> str:
+    """Return the current URL with the given query params replaced."""
+    query = request.query_params.copy()
+    for key, value in params.items():
+        query[key] = value
+    return request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def chat_history(request: Request) -> Response:
@@ -281,17 +448,95 @@ def chat_history(request: Request) -> Response:
     GET /api/chat/history/
     Query params:
       - conversation_id: filter to a specific conversation
-      - limit: max messages to return (default 50)
+      - limit: max messages to return (default 50, max 200)
+      - pagination=cursor: return {previous, results}, where `previous`
+        links to the page of older messages (null at the start)
+      - cursor: position from a `previous` link
+
+    Pages seek on (advocate, conversation_id, created_at) instead of
+    counting or offsetting, so the oldest page is as fast as the newest.
     """
     qs = ChatMessage.objects.filter(advocate=request.user)
 
     conversation_id = request.query_params.get('conversation_id')
     if conversation_id:
-        qs = qs.filter(conversation_id=conversation_id)
-
-    limit = min(int(request.query_params.get('limit', 50)), 200)
-    messages = qs.order_by('-created_at')[:limit]
+        try:
+            qs = qs.filter(conversation_id=uuid.UUID(conversation_id))
+        except ValueError:
+            return Response({'error': 'Invalid conversation_id'}, status=status.HTTP_400_BAD_REQUEST)
+
+    token = request.query_params.get('cursor')
+    if token:
+        position = _decode_cursor(token)
+        if position is None:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        created_at, pk = position
+        if not pk.isdigit():
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=int(pk)))
+
+    limit = _limit(request)
+    messages = list(qs.order_by('-created_at', '-id')[:limit + 1])
+    has_older = len(messages) > limit
+    messages = messages[:limit]
 
     # Return in chronological order
-    serializer = ChatMessageSerializer(reversed(list(messages)), many=True)
-    return Response(serializer.data)
+    serializer = ChatMessageSerializer(reversed(messages), many=True)
+    if request.query_params.get('pagination') != 'cursor' and not token:
+        return Response(serializer.data)
+    previous = None
+    if has_older:
+        oldest = messages[-1]
+        previous = _page_url(request, cursor=_encode_cursor(oldest.created_at, oldest.pk))
+    return Response({'previous': previous, 'results': serializer.data})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def chat_conversations(request: Request) -> Response:
+    """List the current user's conversations, most recently active first.
+
+    GET /api/chat/conversations/
+    Query params:
+      - limit: max conversations to return (default 50, max 200)
+      - cursor: position from a `next` link
+
+    Each row has the message count, first/last message timestamps and a
+    preview of the last message. All of it comes from one grouped query on
+    the (advocate, conversation_id, created_at) index; the last message is
+    a correlated subquery per group.
+    """
+    own = ChatMessage.objects.filter(advocate=request.user)
+    last = own.filter(conversation_id=OuterRef('conversation_id')).order_by('-created_at', '-id')
+    qs = (
+        own.values('conversation_id')
+        .annotate(
+            message_count=Count('id'),
+            started_at=Min('created_at'),
+            last_message_at=Max('created_at'),
+            last_message=Subquery(last.annotate(preview=Substr('content', 1, 200)).values('preview')[:1]),
+            last_role=Subquery(last.values('role')[:1]),
+            client_id=Subquery(last.values('client_id')[:1]),
+        )
+        .order_by('-last_message_at', '-conversation_id')
+    )
+
+    token = request.query_params.get('cursor')
+    if token:
+        position = _decode_cursor(token)
+        try:
+            last_at, conversation_id = position[0], uuid.UUID(position[1])
+        except (TypeError, ValueError):
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        qs = qs.filter(
+            Q(last_message_at__lt=last_at) | Q(last_message_at=last_at, conversation_id__lt=conversation_id),
+        )
+
+    limit = _limit(request)
+    rows = list(qs[:limit + 1])
+    next_url = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        oldest = rows[-1]
+        next_url = _page_url(request, cursor=_encode_cursor(oldest['last_message_at'], oldest['conversation_id']))
+    return Response({'next': next_url, 'results': rows})
@@ -13,7 +13,6 @@ import time
 from typing import Optional
 
 import httpx
-from django.core.files.uploadedfile import SimpleUploadedFile
 
 logger = logging.getLogger(__name__)
 
@@ -62,10 +61,9 @@ def _store_file(content: bytes, content_type: str, document, suffix: str) -> Opt
     from utils.storage import get_storage_backend
 
     relative_path = f"{document.advocate_id}/{document.case_id}/processed/{document.id}_{suffix}"
-    file_obj = SimpleUploadedFile(suffix, content, content_type=content_type)
     backend = get_storage_backend()
     try:
-        return backend.upload(file_obj, relative_path)
+        return backend.upload_content(content, relative_path, content_type=content_type)
     except Exception:
         logger.exception("Failed to upload %s to storage for document %s", suffix, document.id)
         return None
@@ -131,6 +129,8 @@ def _poll_and_process(document_id: int) -> None:
         document.processed_report_path = paths.get('output_report', '')
         document.status = 'processed'
         document.save()
+        from apps.search.text_index import index_document_text
+        index_document_text(document, [downloaded['output_report']], document.processed_report_path)
 
         DocumentStatusHistory.objects.create(
             document=document,
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 09:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webhooks', '0001_chatmessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatmessage',
+            name='served_from_cache',
+            field=models.BooleanField(default=False, help_text='Reply came from the answer cache; follow-ups send it to n8n as history.'),
+        ),
+    ]
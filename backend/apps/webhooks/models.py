@@ -35,6 +35,10 @@ class ChatMessage(models.Model):
         blank=True,
         help_text='Optional client context for RAG namespace scoping.',
     )
+    served_from_cache = models.BooleanField(
+        default=False,
+        help_text='Reply came from the answer cache; follow-ups send it to n8n as history.',
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -3,6 +3,12 @@
 OCR Flow: POST client_name, case_id, orig_doc to n8n webhook.
 n8n returns prefix_report.txt and prefix_v1.html directly in the response.
 We store these files in Supabase and mark the document as processed.
+
+N8N_OCR_DISPATCH_MODE selects how the original reaches n8n:
+  - 'multipart' (default): download it and POST it as the orig_doc file part.
+  - 'signed_url': POST JSON with a short-lived signed URL plus size, MIME
+    type and SHA-256 checksum; n8n downloads the file from storage itself.
+    Falls back to multipart when the backend cannot give an absolute URL.
 """
 import json
 import logging
@@ -11,37 +17,37 @@ from typing import Optional
 
 import httpx
 import requests
-from django.core.files.uploadedfile import SimpleUploadedFile
+from django.conf import settings
 
-logger = logging.getLogger(__name__)
+from utils.multipart import FilePart, MultipartEncoder, storage_part
+from utils.webhook_client import get_webhook_client
 
+logger = logging.getLogger(__name__)
 
-def _download_from_supabase(file_path: str) -> Optional[tuple[bytes, str]]:
-    """Download a file from Supabase Storage via signed URL.
 
-    Returns:
-        Tuple of (content_bytes, filename) or None on failure.
-    """
-    from utils.storage import get_storage_backend
+ORIG_DOC_MIME_TYPES = {
+    'pdf': 'application/pdf',
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+}
 
-    backend = get_storage_backend()
-    signed_url = backend.get_url(file_path)
-    if not signed_url:
-        logger.error('Could not generate signed URL for %s', file_path)
-        return None
 
+def _original_part(file_path: str) -> Optional[FilePart]:
+    """Return the original as a streamed `orig_doc` part, or None if unavailable."""
+    filename = file_path.rsplit('/', 1)[-1]
+    ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
     try:
-        with httpx.Client(timeout=30.0, follow_redirects=True) as client:
-            resp = client.get(signed_url)
-        if resp.status_code != 200:
-            logger.error('Supabase download failed (%s): %s', resp.status_code, resp.text[:200])
-            return None
-        filename = file_path.rsplit('/', 1)[-1] if '/' in file_path else file_path
-        logger.info('Downloaded %s from Supabase (%d bytes)', filename, len(resp.content))
-        return resp.content, filename
+        part = storage_part(
+            'orig_doc', filename, file_path,
+            content_type=ORIG_DOC_MIME_TYPES.get(ext, 'application/octet-stream'),
+        )
     except Exception:
-        logger.exception('Failed to download file from Supabase: %s', file_path)
+        logger.exception('Failed to stat original in storage: %s', file_path)
         return None
+    if part is None:
+        logger.error('Original not found in storage: %s', file_path)
+    return part
 
 
 def _store_processed_file(
@@ -54,10 +60,9 @@ def _store_processed_file(
     from utils.storage import get_storage_backend
 
     relative_path = f"{document.advocate_id}/{document.case_id}/processed/{document.id}_{suffix}"
-    file_obj = SimpleUploadedFile(suffix, content, content_type=content_type)
     backend = get_storage_backend()
     try:
-        return backend.upload(file_obj, relative_path)
+        return backend.upload_content(content, relative_path, content_type=content_type)
     except Exception:
         logger.exception("Failed to upload %s to storage for document %s", suffix, document.id)
         return None
@@ -265,6 +270,36 @@ def _extract_response_files(response: requests.Response, prefix: str) -> dict[st
     return files
 
 
+def _signed_url_payload(document) -> Optional[dict]:
+    """Build the signed-URL fields for n8n, or None if they can't be produced.
+
+    The checksum recorded at upload time is passed along when there is one.
+    Uploads that bypass the server (resumable, direct-to-storage) have none,
+    and the field is left out rather than reading the whole object back
+    from storage to hash it.
+    """
+    from utils.storage import get_storage_backend
+
+    backend = get_storage_backend()
+    expires_in = settings.N8N_SIGNED_URL_EXPIRY
+    file_url = backend.get_url(document.file_path, expires_in=expires_in)
+    if not file_url or not file_url.startswith(('http://', 'https://')):
+        logger.warning(
+            'No absolute signed URL for %s (got %r); falling back to multipart', document.file_path, file_url,
+        )
+        return None
+    payload = {
+        'file_url': file_url,
+        'file_url_expires_in': expires_in,
+        'file_name': document.file_path.rsplit('/', 1)[-1],
+        'file_size': document.file_size_bytes,
+        'mime_type': document.mime_type,
+    }
+    if document.checksum_sha256:
+        payload['checksum_sha256'] = document.checksum_sha256
+    return payload
+
+
 def notify_n8n_ready_to_process(
     document_id: int,
     document_name: str,
@@ -277,7 +312,8 @@ def notify_n8n_ready_to_process(
     """Send document to n8n OCR webhook and handle returned files.
 
     Flow:
-    1. POST client_name, case_id, and orig_doc to n8n OCR webhook
+    1. POST client_name, case_id, and orig_doc (or a signed URL to it,
+       see N8N_OCR_DISPATCH_MODE) to n8n OCR webhook
     2. n8n processes and returns prefix_report.txt + prefix_v1.html
     3. Store returned files in Supabase
     4. Update document with processed file paths
@@ -301,7 +337,7 @@ def notify_n8n_ready_to_process(
         logger.info('N8N_OUTBOUND_WEBHOOK_URL not configured; skipping outbound webhook.')
         return None
 
-    file_data = _download_from_supabase(file_path)
+    from apps.documents.models import Document, DocumentActivityLog, DocumentStatusHistory
 
     # Build prefix from document name (for n8n file naming)
     prefix = os.path.splitext(document_name)[0].replace(' ', '_')
@@ -321,36 +357,48 @@ def notify_n8n_ready_to_process(
         headers['X-Webhook-Secret'] = secret
 
     try:
-        if file_data:
-            content, filename = file_data
-            ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
-            mime = {
-                'pdf': 'application/pdf',
-                'png': 'image/png',
-                'jpg': 'image/jpeg',
-                'jpeg': 'image/jpeg',
-            }.get(ext, 'application/octet-stream')
-            files = {'orig_doc': (filename, content, mime)}
+        signed = None
+        if settings.N8N_OCR_DISPATCH_MODE == 'signed_url':
+            signed = _signed_url_payload(Document.objects.get(id=document_id))
+        orig_doc = None
+        if not signed:
+            orig_doc = _original_part(file_path)
+
+        if signed:
+            logger.info(
+                'Sending OCR request to n8n for doc %s by signed URL (client=%s, case=%s, %d bytes)',
+                document_id, client_name, case_id, signed['file_size'],
+            )
+            DocumentActivityLog.objects.create(
+                document_id=document_id,
+                event_type='processing_started',
+                message=f"Document link sent to n8n OCR pipeline ({signed['file_size']:,} bytes)",
+                detail=f'Client: {client_name}, Case: {case_title}',
+                actor=advocate_email,
+            )
+            headers['Content-Type'] = 'application/json'
+            response = get_webhook_client().post(
+                'ocr', url, json={**form_data, **signed, 'dispatch_mode': 'signed_url'}, headers=headers, timeout=120,
+            )
+        elif orig_doc:
             logger.info(
                 'Sending OCR request to n8n for doc %s (client=%s, case=%s, file=%s, %d bytes)',
-                document_id, client_name, case_id, filename, len(content),
+                document_id, client_name, case_id, orig_doc.filename, orig_doc.size,
             )
-            try:
-                doc_obj = Document.objects.get(id=document_id)
-                DocumentActivityLog.objects.create(
-                    document=doc_obj,
-                    event_type='processing_started',
-                    message=f'Document sent to n8n OCR pipeline ({len(content):,} bytes)',
-                    detail=f'Client: {client_name}, Case: {case_title}',
-                    actor=advocate_email,
-                )
-            except Exception:
-                pass
-            response = requests.post(url, data=form_data, files=files, headers=headers, timeout=120)
+            DocumentActivityLog.objects.create(
+                document_id=document_id,
+                event_type='processing_started',
+                message=f'Document sent to n8n OCR pipeline ({orig_doc.size:,} bytes)',
+                detail=f'Client: {client_name}, Case: {case_title}',
+                actor=advocate_email,
+            )
+            body = MultipartEncoder(form_data, [orig_doc])
+            headers['Content-Type'] = body.content_type
+            response = get_webhook_client().post('ocr', url, data=body, headers=headers, timeout=120)
         else:
             logger.warning('No file downloaded, sending metadata only for document %s', document_id)
             headers['Content-Type'] = 'application/json'
-            response = requests.post(url, json=form_data, headers=headers, timeout=120)
+            response = get_webhook_client().post('ocr', url, json=form_data, headers=headers, timeout=120)
 
         logger.info('n8n OCR response: status=%s content-type=%s size=%d',
                      response.status_code,
@@ -359,7 +407,6 @@ def notify_n8n_ready_to_process(
         response.raise_for_status()
 
         # Extract returned files from the response
-        from apps.documents.models import Document, DocumentActivityLog, DocumentStatusHistory
         document = Document.objects.get(id=document_id)
 
         returned_files = _extract_response_files(response, prefix)
@@ -385,6 +432,9 @@ def notify_n8n_ready_to_process(
         if result['files_stored']:
             document.save(update_fields=['processed_html_path', 'processed_report_path', 'updated_at'])
             logger.info('Stored %d processed files for document %s', len(result['files_stored']), document_id)
+            if 'report' in result['files_stored']:
+                from apps.search.text_index import index_document_text
+                index_document_text(document, [returned_files['report.txt']], result['files_stored']['report'])
 
         return result
 
@@ -0,0 +1,88 @@
+"""Tests for the chat answer cache."""
+import uuid
+
+import pytest
+
+from apps.webhooks.answer_cache import AnswerCache, normalize
+
+ADVOCATE = uuid.UUID('00000000-0000-0000-0000-000000000001')
+ASHA, RAVI = 1, 2  # client ids
+LEASE, WILL = 10, 20  # case ids
+
+
+@pytest.fixture
+def answers(settings):
+    settings.CHAT_ANSWER_CACHE_TTL = 60
+    settings.CHAT_ANSWER_CACHE_SIMILARITY = 0.85
+    settings.CHAT_ANSWER_CACHE_MAX_ENTRIES = 3
+    return AnswerCache()
+
+
+class TestAnswerCache:
+    """Tests for matching, scoping and invalidation."""
+
+    def test_normalized_and_near_identical_questions_hit(self, answers):
+        """Case, punctuation and small wording changes still match."""
+        answers.set(ADVOCATE, 'What is the notice period in the lease?', ASHA, LEASE, 'Two months.')
+
+        scope = (ASHA, LEASE)
+        assert answers.get(ADVOCATE, 'what is the NOTICE period in the lease', *scope) == 'Two months.'
+        assert answers.get(ADVOCATE, 'What is the notice period in this lease?', *scope) == 'Two months.'
+        assert answers.get(ADVOCATE, 'Who signed the lease?', ASHA, LEASE) is None
+
+    def test_numbers_and_negations_must_match(self, answers):
+        """Similar questions about a different clause, or negated, do not share an answer."""
+        answers.set(ADVOCATE, 'Is clause 4 enforceable?', ASHA, None, 'Yes.')
+
+        assert answers.get(ADVOCATE, 'Is clause 5 enforceable?', ASHA, None) is None
+        assert answers.get(ADVOCATE, "Isn't clause 4 enforceable?", ASHA, None) is None
+        assert normalize("Isn't it?") == 'is not it'
+
+    def test_scopes_are_separate(self, answers):
+        """Answers are per advocate, client and case."""
+        answers.set(ADVOCATE, 'Summarize the facts', ASHA, LEASE, 'Facts A.')
+
+        assert answers.get(ADVOCATE, 'Summarize the facts', ASHA, WILL) is None
+        assert answers.get(ADVOCATE, 'Summarize the facts', RAVI, LEASE) is None
+        assert answers.get(uuid.uuid4(), 'Summarize the facts', ASHA, LEASE) is None
+
+    def test_same_name_does_not_share_answers(self, answers):
+        """Scopes are ids: another client called Asha Rao has its own answers and invalidation."""
+        other_asha = 3
+        answers.set(ADVOCATE, 'Summarize the facts', ASHA, None, 'Facts A.')
+        answers.set(ADVOCATE, 'Summarize the facts', other_asha, None, 'Facts B.')
+
+        answers.invalidate(ADVOCATE, ASHA, None)
+
+        assert answers.get(ADVOCATE, 'Summarize the facts', ASHA, None) is None
+        assert answers.get(ADVOCATE, 'Summarize the facts', other_asha, None) == 'Facts B.'
+
+    def test_invalidate_drops_only_the_affected_scopes(self, answers):
+        """New content for a case clears its client, case and unscoped answers, not other clients."""
+        answers.set(ADVOCATE, 'Summarize the facts', ASHA, LEASE, 'Case answer')
+        answers.set(ADVOCATE, 'Summarize the facts', ASHA, None, 'Client answer')
+        answers.set(ADVOCATE, 'Summarize the facts', None, None, 'Unscoped answer')
+        answers.set(ADVOCATE, 'Summarize the facts', RAVI, WILL, 'Other answer')
+
+        answers.invalidate(ADVOCATE, ASHA, LEASE)
+
+        assert answers.get(ADVOCATE, 'Summarize the facts', ASHA, LEASE) is None
+        assert answers.get(ADVOCATE, 'Summarize the facts', ASHA, None) is None
+        assert answers.get(ADVOCATE, 'Summarize the facts', None, None) is None
+        assert answers.get(ADVOCATE, 'Summarize the facts', RAVI, WILL) == 'Other answer'
+
+    def test_keeps_the_newest_entries(self, answers):
+        """Each scope holds at most CHAT_ANSWER_CACHE_MAX_ENTRIES answers."""
+        for n in range(1, 5):
+            answers.set(ADVOCATE, f'Question number {n}', None, None, f'Answer {n}')
+
+        assert answers.get(ADVOCATE, 'Question number 1', None, None) is None
+        assert answers.get(ADVOCATE, 'Question number 4', None, None) == 'Answer 4'
+
+    def test_disabled_with_zero_ttl(self, answers, settings):
+        """CHAT_ANSWER_CACHE_TTL=0 turns the cache off."""
+        settings.CHAT_ANSWER_CACHE_TTL = 0
+        disabled = AnswerCache()
+        disabled.set(ADVOCATE, 'Summarize the facts', None, None, 'Answer')
+
+        assert disabled.get(ADVOCATE, 'Summarize the facts', None, None) is None
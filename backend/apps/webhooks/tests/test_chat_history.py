@@ -0,0 +1,116 @@
+"""Tests for chat history paging and the conversations summary."""
+import uuid
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.webhooks.models import ChatMessage
+
+User = get_user_model()
+
+FIRST = uuid.UUID('00000000-0000-0000-0000-000000000001')
+SECOND = uuid.UUID('00000000-0000-0000-0000-000000000002')
+
+
+@pytest.fixture
+def advocate(db):
+    return User.objects.create_user(email='advocate@legalaid.test', password='Test@123456', full_name='Adv')
+
+
+@pytest.fixture
+def api(advocate):
+    client = APIClient()
+    client.force_authenticate(user=advocate)
+    return client
+
+
+def _message(advocate, conversation_id, content, minutes_ago, role='user', client_id=None):
+    msg = ChatMessage.objects.create(
+        advocate=advocate, conversation_id=conversation_id, role=role, content=content, client_id=client_id,
+    )
+    ChatMessage.objects.filter(pk=msg.pk).update(created_at=timezone.now() - timedelta(minutes=minutes_ago))
+    return msg
+
+
+class TestChatHistory:
+    """Tests for GET /api/chat/history/."""
+
+    def test_plain_request_returns_list(self, api, advocate):
+        """Without the opt-in the response is still a chronological list."""
+        _message(advocate, FIRST, 'one', 2)
+        _message(advocate, FIRST, 'two', 1)
+
+        response = api.get('/api/chat/history/')
+
+        assert [m['content'] for m in response.json()] == ['one', 'two']
+
+    def test_cursor_pages_backwards(self, api, advocate):
+        """`previous` links walk older pages until the start of the conversation."""
+        for i in range(5):
+            _message(advocate, FIRST, f'm{i}', 10 - i)
+        _message(advocate, SECOND, 'elsewhere', 0)
+
+        pages = []
+        url = f'/api/chat/history/?conversation_id={FIRST}&limit=2&pagination=cursor'
+        while url:
+            body = api.get(url).json()
+            pages.append([m['content'] for m in body['results']])
+            url = body['previous']
+
+        assert pages == [['m3', 'm4'], ['m1', 'm2'], ['m0']]
+
+    def test_same_timestamp_is_not_skipped(self, api, advocate):
+        """Messages sharing a timestamp are split across pages by id."""
+        at = timezone.now()
+        for content in ('a', 'b', 'c'):
+            msg = ChatMessage.objects.create(advocate=advocate, conversation_id=FIRST, role='user', content=content)
+            ChatMessage.objects.filter(pk=msg.pk).update(created_at=at)
+
+        first = api.get('/api/chat/history/?limit=2&pagination=cursor').json()
+        second = api.get(first['previous']).json()
+
+        assert [m['content'] for m in first['results'] + second['results']] == ['b', 'c', 'a']
+
+    def test_invalid_cursor_returns_400(self, api):
+        """A malformed cursor is rejected."""
+        response = api.get('/api/chat/history/?cursor=not-a-cursor')
+
+        assert response.status_code == 400
+
+
+class TestChatConversations:
+    """Tests for GET /api/chat/conversations/."""
+
+    def test_summaries_in_one_query(self, api, advocate, django_assert_num_queries):
+        """Each conversation has its count, timestamps and last message, newest first."""
+        _message(advocate, FIRST, 'hello', 30)
+        _message(advocate, FIRST, 'answer', 29, role='assistant', client_id=7)
+        _message(advocate, SECOND, 'later', 5)
+        other = User.objects.create_user(email='other@legalaid.test', password='x', full_name='Other')
+        _message(other, FIRST, 'not mine', 0)
+
+        with django_assert_num_queries(1):
+            response = api.get('/api/chat/conversations/')
+
+        rows = response.json()['results']
+        assert [row['conversation_id'] for row in rows] == [str(SECOND), str(FIRST)]
+        assert rows[1]['message_count'] == 2
+        assert rows[1]['last_message'] == 'answer'
+        assert rows[1]['last_role'] == 'assistant'
+        assert rows[1]['client_id'] == 7
+        assert rows[1]['started_at'] < rows[1]['last_message_at']
+
+    def test_next_link_pages_older_conversations(self, api, advocate):
+        """`next` continues after the last conversation on the page."""
+        _message(advocate, FIRST, 'old', 10)
+        _message(advocate, SECOND, 'new', 1)
+
+        first = api.get('/api/chat/conversations/?limit=1').json()
+        second = api.get(first['next']).json()
+
+        assert first['results'][0]['conversation_id'] == str(SECOND)
+        assert second['results'][0]['conversation_id'] == str(FIRST)
+        assert second['next'] is None
@@ -0,0 +1,226 @@
+"""Tests for the async chat relays: POST /api/chat/ and the SSE stream."""
+import json
+
+import httpx
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient
+
+from apps.webhooks.models import ChatMessage
+from utils import webhook_client
+
+User = get_user_model()
+
+
+@pytest.fixture
+def client(db):
+    advocate = User.objects.create_user(email='advocate@legalaid.test', password='Test@123456', full_name='Adv')
+    client = AsyncClient()
+    client.force_login(advocate)
+    return client
+
+
+@pytest.fixture
+def n8n(monkeypatch):
+    """Point the chat webhook at a mock transport; set `reply` to the response to send."""
+    monkeypatch.setenv('N8N_CHAT_WEBHOOK_URL', 'https://n8n.example.com/webhook/chat')
+    state = {'reply': httpx.Response(200, text=''), 'payloads': []}
+
+    def handler(request):
+        state['payload'] = json.loads(request.content)
+        state['payloads'].append(state['payload'])
+        return state['reply']
+
+    monkeypatch.setattr(
+        webhook_client, 'build_async_http_client', lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    webhook_client.reset_webhook_client()
+    yield state
+    webhook_client.reset_webhook_client()
+
+
+def _stream(client, body: dict):
+    """POST to the stream endpoint and return (response, [(event, data), ...])."""
+    async def run():
+        response = await client.post('/api/chat/stream/', body, content_type='application/json')
+        if not response.streaming:
+            return response, []
+        raw = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        events = []
+        for block in filter(None, raw.split('\n\n')):
+            event, data = block.split('\n')
+            events.append((event.removeprefix('event: '), json.loads(data.removeprefix('data: '))))
+        return response, events
+
+    return async_to_sync(run)()
+
+
+class TestChatStream:
+    """Tests for POST /api/chat/stream/."""
+
+    def test_forwards_n8n_chunks_then_saves_reply(self, client, n8n):
+        """Streamed n8n items become token events; the full reply is saved at the end."""
+        lines = [
+            {'type': 'begin'},
+            {'type': 'item', 'content': 'Clause 4 '},
+            {'type': 'item', 'content': 'covers rent.'},
+            {'type': 'end'},
+        ]
+        n8n['reply'] = httpx.Response(200, text='\n'.join(json.dumps(line) for line in lines))
+
+        response, events = _stream(client, {'message': 'What is clause 4?'})
+
+        assert response['Content-Type'] == 'text/event-stream'
+        assert [name for name, _ in events] == ['start', 'token', 'token', 'done']
+        assert events[1][1] == {'content': 'Clause 4 '}
+        assert events[3][1]['assistant_message']['content'] == 'Clause 4 covers rent.'
+        assert n8n['payload']['message'] == 'What is clause 4?'
+        assert list(ChatMessage.objects.values_list('role', 'content')) == [
+            ('user', 'What is clause 4?'), ('assistant', 'Clause 4 covers rent.'),
+        ]
+
+    def test_non_streaming_workflow_sent_as_one_token(self, client, n8n):
+        """A one-piece JSON answer is parsed like the blocking relay."""
+        n8n['reply'] = httpx.Response(200, json={'output': 'Full answer.'})
+
+        _, events = _stream(client, {'message': 'Hi'})
+
+        assert events[1] == ('token', {'content': 'Full answer.'})
+        assert ChatMessage.objects.get(role='assistant').content == 'Full answer.'
+
+    def test_n8n_error_uses_fallback(self, client, n8n):
+        """A failing webhook still completes the stream with the fallback reply."""
+        n8n['reply'] = httpx.Response(503)
+
+        _, events = _stream(client, {'message': 'Hi'})
+
+        assert events[-1][0] == 'done'
+        assert 'operational soon' in events[-1][1]['assistant_message']['content']
+
+    def test_conversation_id_is_kept(self, client, n8n):
+        """Messages join the conversation given in the request."""
+        conversation_id = '00000000-0000-0000-0000-0000000000aa'
+        n8n['reply'] = httpx.Response(200, text='ok')
+
+        _, events = _stream(client, {'message': 'Hi', 'conversation_id': conversation_id})
+
+        assert events[0][1]['conversation_id'] == conversation_id
+        assert ChatMessage.objects.filter(conversation_id=conversation_id).count() == 2
+
+    def test_requires_authentication(self, db):
+        """Anonymous requests get 401 without calling n8n."""
+        response, _ = _stream(AsyncClient(), {'message': 'Hi'})
+
+        assert response.status_code == 401
+
+    def test_invalid_body_returns_400(self, client, n8n):
+        """The request body is validated like POST /api/chat/."""
+        response, _ = _stream(client, {'message': ''})
+
+        assert response.status_code == 400
+        assert ChatMessage.objects.count() == 0
+
+
+class TestChatRelay:
+    """Tests for the async POST /api/chat/."""
+
+    def _post(self, client, body):
+        async def run():
+            return await client.post('/api/chat/', body, content_type='application/json')
+
+        return async_to_sync(run)()
+
+    def test_relays_through_async_client(self, client, n8n):
+        """The reply from n8n is returned and both messages are saved."""
+        n8n['reply'] = httpx.Response(200, json={'output': 'Clause 4 covers rent.'})
+
+        response = self._post(client, {'message': 'What is clause 4?'})
+
+        assert response.status_code == 201
+        assert response.json()['assistant_message']['content'] == 'Clause 4 covers rent.'
+        assert n8n['payload']['message'] == 'What is clause 4?'
+        assert ChatMessage.objects.count() == 2
+
+    def test_n8n_error_uses_fallback(self, client, n8n):
+        """A failing webhook still answers 201 with the fallback reply."""
+        n8n['reply'] = httpx.Response(500)
+
+        response = self._post(client, {'message': 'Hi'})
+
+        assert response.status_code == 201
+        assert 'operational soon' in response.json()['assistant_message']['content']
+
+    def test_requires_authentication(self, db):
+        """Anonymous requests get 401."""
+        assert self._post(AsyncClient(), {'message': 'Hi'}).status_code == 401
+
+    def test_repeated_opening_question_is_answered_from_cache(self, client, n8n):
+        """A near-identical opening question skips n8n; follow-ups are always relayed."""
+        n8n['reply'] = httpx.Response(200, json={'output': 'Two months.'})
+        first = self._post(client, {'message': 'What is the notice period?'})
+        n8n.pop('payload')
+
+        again = self._post(client, {'message': 'what is the notice period'})
+
+        assert again.json()['assistant_message']['content'] == 'Two months.'
+        assert 'payload' not in n8n
+        assert ChatMessage.objects.filter(role='assistant').count() == 2
+
+        conversation_id = first.json()['user_message']['conversation_id']
+        self._post(client, {'message': 'What is the notice period?', 'conversation_id': conversation_id})
+        assert n8n['payload']['message'] == 'What is the notice period?'
+
+    def test_follow_ups_to_cached_answer_carry_it_as_history(self, client, n8n):
+        """n8n never saw a cache-served opening turn, so follow-ups send it along; nothing is re-asked."""
+        n8n['reply'] = httpx.Response(200, json={'output': 'Two months.'})
+        self._post(client, {'message': 'What is the notice period?'})
+        cached = self._post(client, {'message': 'What is the notice period?'}).json()
+        conversation_id = cached['user_message']['conversation_id']
+        assert ChatMessage.objects.get(pk=cached['assistant_message']['id']).served_from_cache
+        n8n['payloads'].clear()
+
+        self._post(client, {'message': 'Can it be waived?', 'conversation_id': conversation_id})
+        self._post(client, {'message': 'By whom?', 'conversation_id': conversation_id})
+
+        history = [
+            {'role': 'user', 'content': 'What is the notice period?'},
+            {'role': 'assistant', 'content': 'Two months.'},
+        ]
+        assert [(p['message'], p['history']) for p in n8n['payloads']] == [
+            ('Can it be waived?', history), ('By whom?', history),
+        ]
+
+    def test_relayed_conversation_sends_no_history(self, client, n8n):
+        """Follow-ups to an answer n8n produced itself rely on n8n's memory."""
+        n8n['reply'] = httpx.Response(200, json={'output': 'Two months.'})
+        first = self._post(client, {'message': 'What is the notice period?'}).json()
+        conversation_id = first['user_message']['conversation_id']
+
+        self._post(client, {'message': 'Can it be waived?', 'conversation_id': conversation_id})
+
+        assert 'history' not in n8n['payload']
+
+    def test_stream_follow_up_carries_cached_history(self, client, n8n):
+        """The SSE stream sends the cache-served turn as history too."""
+        n8n['reply'] = httpx.Response(200, json={'output': 'Two months.'})
+        self._post(client, {'message': 'What is the notice period?'})
+        cached = self._post(client, {'message': 'What is the notice period?'}).json()
+        n8n['payloads'].clear()
+
+        _stream(client, {'message': 'Can it be waived?', 'conversation_id': cached['user_message']['conversation_id']})
+
+        [payload] = n8n['payloads']
+        assert payload['message'] == 'Can it be waived?'
+        assert payload['history'][1] == {'role': 'assistant', 'content': 'Two months.'}
+
+    def test_stream_uses_the_cache(self, client, n8n):
+        """The SSE stream shares the answer cache with the blocking relay."""
+        n8n['reply'] = httpx.Response(200, json={'output': 'Two months.'})
+        self._post(client, {'message': 'What is the notice period?'})
+        n8n.pop('payload')
+
+        _, events = _stream(client, {'message': 'What is the notice period?'})
+
+        assert events[1] == ('token', {'content': 'Two months.'})
+        assert 'payload' not in n8n
@@ -0,0 +1,106 @@
+"""Tests for the outbound n8n OCR dispatch."""
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from apps.cases.models import Case
+from apps.clients.models import Client
+from apps.documents.models import Document
+from apps.webhooks.outbound import notify_n8n_ready_to_process
+
+User = get_user_model()
+
+CONTENT = b"%PDF-1.4 original scan"
+
+
+@pytest.fixture
+def document(db):
+    user = User.objects.create_user(
+        email="advocate@test.com", password="TestPass123!", full_name="Test Advocate",
+    )
+    client = Client.objects.create(advocate=user, full_name="Client", email="c@test.com")
+    case = Case.objects.create(client=client, advocate=user, title="Case", case_number="C-001")
+    return Document.objects.create(
+        case=case, advocate=user, name="scan.pdf", file_path=f"{user.id}/{case.id}/scan.pdf",
+        file_type="pdf", file_size_bytes=len(CONTENT), mime_type="application/pdf",
+        status="in_progress",
+    )
+
+
+@pytest.fixture
+def n8n(monkeypatch, settings):
+    monkeypatch.setenv("N8N_OUTBOUND_WEBHOOK_URL", "https://n8n.example.com/webhook/ocr")
+    settings.N8N_OCR_DISPATCH_MODE = "signed_url"
+    response = mock.Mock(status_code=200, headers={"Content-Type": "application/json"}, content=b"{}")
+    response.json.return_value = {}
+    client = mock.Mock()
+    client.post.return_value = response
+    with mock.patch("apps.webhooks.outbound.get_webhook_client", return_value=client):
+        yield client.post
+
+
+def _dispatch(document):
+    return notify_n8n_ready_to_process(
+        document_id=document.id, document_name=document.name, file_path=document.file_path,
+        case_title="Case", advocate_email="advocate@test.com", client_name="Client", case_id=document.case_id,
+    )
+
+
+class TestSignedURLDispatch:
+    """Tests for N8N_OCR_DISPATCH_MODE='signed_url'."""
+
+    def test_sends_signed_url_and_metadata(self, document, n8n):
+        """n8n gets a short-lived URL, size and MIME type instead of bytes."""
+        backend = mock.Mock()
+        backend.get_url.return_value = "https://proj.supabase.co/storage/v1/object/sign/documents/x?token=t"
+        with mock.patch("utils.storage.get_storage_backend", return_value=backend), \
+                mock.patch("apps.webhooks.outbound._original_part") as original:
+            assert _dispatch(document) == {"ok": True, "files_stored": {}}
+
+        original.assert_not_called()
+        backend.get_url.assert_called_once_with(document.file_path, expires_in=900)
+        payload = n8n.call_args.kwargs["json"]
+        assert "files" not in n8n.call_args.kwargs
+        assert payload["file_url"].endswith("token=t")
+        assert payload["file_size"] == len(CONTENT)
+        assert payload["mime_type"] == "application/pdf"
+
+    def test_missing_checksum_is_omitted_not_computed(self, document, n8n):
+        """Resumable and direct uploads have no checksum; storage is not read to make one."""
+        backend = mock.Mock()
+        backend.get_url.return_value = "https://proj.supabase.co/signed"
+        with mock.patch("utils.storage.get_storage_backend", return_value=backend):
+            _dispatch(document)
+
+        backend.read_chunks.assert_not_called()
+        assert "checksum_sha256" not in n8n.call_args.kwargs["json"]
+        document.refresh_from_db()
+        assert document.checksum_sha256 == ""
+
+    def test_stored_checksum_is_sent(self, document, n8n):
+        """A checksum recorded at upload time is passed to n8n."""
+        Document.objects.filter(pk=document.pk).update(checksum_sha256="ab" * 32)
+        backend = mock.Mock()
+        backend.get_url.return_value = "https://proj.supabase.co/signed"
+        with mock.patch("utils.storage.get_storage_backend", return_value=backend):
+            _dispatch(document)
+
+        backend.read_chunks.assert_not_called()
+        assert n8n.call_args.kwargs["json"]["checksum_sha256"] == "ab" * 32
+
+    def test_falls_back_to_multipart_without_absolute_url(self, document, n8n):
+        """Local storage URLs are not reachable by n8n, so the file is streamed as before."""
+        backend = mock.Mock()
+        backend.get_url.return_value = f"/media/{document.file_path}"
+        backend.stat.return_value = {"size": len(CONTENT), "content_type": "application/pdf"}
+        backend.read_chunks.side_effect = lambda path: iter([CONTENT[:4], CONTENT[4:]])
+        with mock.patch("utils.storage.get_storage_backend", return_value=backend):
+            _dispatch(document)
+
+        body = n8n.call_args.kwargs["data"]
+        payload = b"".join(body)
+        assert len(payload) == len(body)
+        assert n8n.call_args.kwargs["headers"]["Content-Type"] == body.content_type
+        assert b'name="orig_doc"; filename="scan.pdf"' in payload
+        assert CONTENT in payload
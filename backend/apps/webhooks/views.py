@@ -13,14 +13,16 @@ import os
 from typing import Optional
 
 import httpx
-from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework import status
 from rest_framework.decorators import api_view, parser_classes, permission_classes
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
-from apps.documents.models import Document, DocumentActivityLog, DocumentStatusHistory
+from apps.documents.activity import log_activity
+from apps.documents.models import Document, DocumentStatusHistory
+from apps.search.text_index import index_document_text
+from utils.storage import Content
 
 logger = logging.getLogger(__name__)
 
@@ -43,12 +45,18 @@ def _store_processed_file(
     suffix: str,
 ) -> Optional[str]:
     """Upload a processed output file to storage and return the path."""
+    content_type = getattr(file_obj, 'content_type', None) or 'application/octet-stream'
+    return _store_bytes(file_obj.chunks(), content_type, document, suffix)
+
+
+def _store_bytes(content: Content, content_type: str, document: Document, suffix: str) -> Optional[str]:
+    """Store bytes (or an iterable of byte chunks) as a processed file and return the path."""
     from utils.storage import get_storage_backend
 
     relative_path = f"{document.advocate_id}/{document.case_id}/processed/{document.id}_{suffix}"
     backend = get_storage_backend()
     try:
-        stored_path = backend.upload(file_obj, relative_path)
+        stored_path = backend.upload_content(content, relative_path, content_type=content_type)
         logger.info("Stored processed file: %s (%s)", suffix, stored_path)
         return stored_path
     except Exception:
@@ -56,12 +64,6 @@ def _store_processed_file(
         return None
 
 
-def _store_bytes(content: bytes, content_type: str, document: Document, suffix: str) -> Optional[str]:
-    """Store raw bytes as a processed file."""
-    file_obj = SimpleUploadedFile(suffix, content, content_type=content_type)
-    return _store_processed_file(file_obj, document, suffix)
-
-
 def _modify_v1_html_for_webapp(html_content: str) -> str:
     """Modify v1 HTML to use postMessage instead of downloads for webapp integration.
 
@@ -169,6 +171,7 @@ def n8n_webhook_view(request):
         )
 
     stored_count = 0
+    previous_report_path = document.processed_report_path
     prefix = os.path.splitext(document.name)[0].replace(' ', '_')
 
     # --- Strategy 1: Multipart file uploads (any field name) ---
@@ -188,12 +191,7 @@ def n8n_webhook_view(request):
             file_obj.seek(0)
             html_content = file_obj.read().decode('utf-8')
             modified_html = _modify_v1_html_for_webapp(html_content)
-            modified_file = SimpleUploadedFile(
-                f'{prefix}_v1.html',
-                modified_html.encode('utf-8'),
-                content_type='text/html',
-            )
-            path = _store_processed_file(modified_file, document, f'{prefix}_v1.html')
+            path = _store_bytes(modified_html.encode('utf-8'), 'text/html', document, f'{prefix}_v1.html')
             if path:
                 document.processed_html_path = path
                 stored_count += 1
@@ -281,6 +279,8 @@ def n8n_webhook_view(request):
     old_status = document.status
     document.status = new_status
     document.save()
+    if document.processed_report_path != previous_report_path:
+        index_document_text(document)
 
     DocumentStatusHistory.objects.create(
         document=document,
@@ -290,27 +290,20 @@ def n8n_webhook_view(request):
         notes=f'n8n callback: {stored_count} file(s) stored',
     )
 
-    # Activity logs for user-facing tracking
+    # Activity logs for user-facing tracking (written together when the request ends)
     if document.processed_html_path:
-        DocumentActivityLog.objects.create(
-            document=document,
-            event_type='v1_html_received',
-            message='V1 HTML received from n8n OCR pipeline',
-            detail=document.processed_html_path.split('/')[-1],
-            actor='n8n',
+        log_activity(
+            document, 'v1_html_received', 'V1 HTML received from n8n OCR pipeline',
+            detail=document.processed_html_path.split('/')[-1], actor='n8n',
         )
     if document.processed_report_path:
-        DocumentActivityLog.objects.create(
-            document=document,
-            event_type='v1_html_received',
-            message='Validation report received from n8n',
-            detail=document.processed_report_path.split('/')[-1],
-            actor='n8n',
+        log_activity(
+            document, 'v1_html_received', 'Validation report received from n8n',
+            detail=document.processed_report_path.split('/')[-1], actor='n8n',
         )
-    DocumentActivityLog.objects.create(
-        document=document,
-        event_type='processing_complete',
-        message=f'Processing complete — {stored_count} file(s) received, status: {new_status}',
+    log_activity(
+        document, 'processing_complete',
+        f'Processing complete — {stored_count} file(s) received, status: {new_status}',
         actor='n8n',
     )
 
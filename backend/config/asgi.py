@@ -3,6 +3,23 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from utils.webhook_client import close_async_http_client, open_async_http_client
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+
+async def application(scope, receive, send):
+    """Django's ASGI app, plus lifespan events that own the pooled async HTTP client."""
+    if scope["type"] != "lifespan":
+        return await django_application(scope, receive, send)
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await open_async_http_client()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await close_async_http_client()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
@@ -3,6 +3,7 @@ import os
 from pathlib import Path
 
 import environ
+from corsheaders.defaults import default_headers
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -48,6 +49,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "apps.documents.activity.ActivityLogMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -84,6 +86,12 @@ else:
         },
     }
 
+# Cache — per-process memory by default. Point CACHE_URL at a shared cache
+# (e.g. redis:// or dbcache://) so invalidations reach every worker.
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -103,9 +111,31 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
-# File upload limits
+# File upload limits. Uploads above FILE_UPLOAD_MAX_MEMORY_SIZE are spooled
+# to a temp file and streamed to storage in chunks instead of held in RAM.
 DATA_UPLOAD_MAX_MEMORY_SIZE = 20 * 1024 * 1024  # 20MB
-FILE_UPLOAD_MAX_MEMORY_SIZE = 20 * 1024 * 1024  # 20MB
+FILE_UPLOAD_MAX_MEMORY_SIZE = env.int("FILE_UPLOAD_MAX_MEMORY_SIZE", default=2 * 1024 * 1024)  # 2MB
+
+# Resumable uploads (/api/documents/uploads/). Supabase's TUS endpoint
+# requires every part except the last to be exactly 6MB.
+RESUMABLE_UPLOAD_MAX_SIZE = env.int("RESUMABLE_UPLOAD_MAX_SIZE", default=200 * 1024 * 1024)  # 200MB
+RESUMABLE_UPLOAD_CHUNK_SIZE = 6 * 1024 * 1024  # 6MB
+RESUMABLE_UPLOAD_MAX_PART_SIZE = 8 * 1024 * 1024  # 8MB
+
+# Direct-to-storage uploads (/api/documents/direct-uploads/)
+DIRECT_UPLOAD_MAX_SIZE = env.int("DIRECT_UPLOAD_MAX_SIZE", default=200 * 1024 * 1024)  # 200MB
+
+# OCR dispatch queue (python manage.py run_ocr_worker)
+OCR_QUEUE_CONCURRENCY = env.int("OCR_QUEUE_CONCURRENCY", default=2)  # jobs per worker process
+OCR_QUEUE_MAX_RUNNING = env.int("OCR_QUEUE_MAX_RUNNING", default=4)  # jobs across all workers
+OCR_QUEUE_VISIBILITY_TIMEOUT = env.int("OCR_QUEUE_VISIBILITY_TIMEOUT", default=300)  # seconds
+OCR_QUEUE_MAX_ATTEMPTS = env.int("OCR_QUEUE_MAX_ATTEMPTS", default=3)
+OCR_QUEUE_RETRY_DELAY = env.int("OCR_QUEUE_RETRY_DELAY", default=30)  # seconds, doubled per attempt
+OCR_QUEUE_POLL_INTERVAL = env.float("OCR_QUEUE_POLL_INTERVAL", default=2.0)  # seconds
+
+# Browsers must be allowed to send and read the TUS-style upload headers
+CORS_ALLOW_HEADERS = (*default_headers, "upload-offset", "upload-length", "tus-resumable")
+CORS_EXPOSE_HEADERS = ["Location", "Upload-Offset", "Upload-Length", "Tus-Resumable"]
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -132,11 +162,91 @@ REST_FRAMEWORK = {
 # Storage backend: 'local' (dev) or 'supabase' (prod)
 STORAGE_BACKEND = env("STORAGE_BACKEND", default="local")
 
+# Supabase Storage HTTP client (shared keep-alive pool per process)
+STORAGE_HTTP_MAX_CONNECTIONS = env.int("STORAGE_HTTP_MAX_CONNECTIONS", default=20)
+STORAGE_HTTP_MAX_KEEPALIVE = env.int("STORAGE_HTTP_MAX_KEEPALIVE", default=10)
+STORAGE_HTTP_KEEPALIVE_EXPIRY = env.float("STORAGE_HTTP_KEEPALIVE_EXPIRY", default=30.0)
+STORAGE_HTTP2 = env.bool("STORAGE_HTTP2", default=True)
+STORAGE_UPLOAD_TIMEOUT = env.float("STORAGE_UPLOAD_TIMEOUT", default=30.0)
+STORAGE_SIGN_TIMEOUT = env.float("STORAGE_SIGN_TIMEOUT", default=10.0)
+STORAGE_DELETE_TIMEOUT = env.float("STORAGE_DELETE_TIMEOUT", default=10.0)
+
+# Signed URL cache: evict this many seconds before the URL expires.
+# Leave the alias empty for a per-process in-memory cache.
+SIGNED_URL_CACHE_MARGIN = env.int("SIGNED_URL_CACHE_MARGIN", default=300)
+SIGNED_URL_CACHE_ALIAS = env("SIGNED_URL_CACHE_ALIAS", default="")
+
+# Document artifact URLs in API responses: 'signed' embeds a signed URL per
+# artifact; 'lazy' returns /api/documents/<id>/artifact/<kind>/ links that are
+# signed only when followed. Clients can override with ?artifact_urls=.
+DOCUMENT_ARTIFACT_URLS = env("DOCUMENT_ARTIFACT_URLS", default="signed")
+# Browser cache lifetime of artifact redirects; keep below SIGNED_URL_CACHE_MARGIN
+# so a cached redirect never points at an expired signed URL
+ARTIFACT_REDIRECT_MAX_AGE = env.int("ARTIFACT_REDIRECT_MAX_AGE", default=240)  # seconds
+# Lifetime of the signed token in lazy artifact links; clients re-read the
+# document to get fresh links once it lapses
+ARTIFACT_LINK_MAX_AGE = env.int("ARTIFACT_LINK_MAX_AGE", default=3600)  # seconds
+
 # Supabase
 SUPABASE_URL = env("SUPABASE_URL", default="")
 SUPABASE_SERVICE_ROLE_KEY = env("SUPABASE_SERVICE_ROLE_KEY", default="")
 SUPABASE_JWT_SECRET = env("SUPABASE_JWT_SECRET", default="")
 
+# JWT verification caches (utils.supabase_auth)
+JWKS_CACHE_TTL = env.int("JWKS_CACHE_TTL", default=600)  # seconds
+JWKS_MIN_REFRESH_INTERVAL = env.int("JWKS_MIN_REFRESH_INTERVAL", default=30)  # unknown-kid refetch limit
+JWT_PAYLOAD_CACHE_SIZE = env.int("JWT_PAYLOAD_CACHE_SIZE", default=1024)
+JWT_PAYLOAD_CACHE_MAX_AGE = env.int("JWT_PAYLOAD_CACHE_MAX_AGE", default=300)  # seconds
+# Authenticated Profile lookups are cached by user id for this long, only when
+# PROFILE_CACHE_ALIAS is shared between workers (not locmem); every Profile
+# save invalidates it. With a per-process cache profiles are not cached
+PROFILE_CACHE_TTL = env.int("PROFILE_CACHE_TTL", default=30)  # seconds, 0 disables
+PROFILE_CACHE_ALIAS = env("PROFILE_CACHE_ALIAS", default="default")
+
+# Dashboard stats snapshots (apps.accounts.stats) — dropped on every relevant
+# write; the TTL only bounds staleness for writes that bypass signals
+DASHBOARD_STATS_CACHE_TTL = env.int("DASHBOARD_STATS_CACHE_TTL", default=300)  # seconds, 0 disables
+DASHBOARD_STATS_CACHE_ALIAS = env("DASHBOARD_STATS_CACHE_ALIAS", default="default")
+
+# Processed document text indexed for search (apps.search.text_index); longer
+# artifacts are truncated
+SEARCH_DOCUMENT_TEXT_MAX_CHARS = env.int("SEARCH_DOCUMENT_TEXT_MAX_CHARS", default=500_000)
+# Typeahead (apps.search.typeahead): results per advocate and prefix are reused
+# briefly; writes to clients/cases retire them at once
+TYPEAHEAD_CACHE_TTL = env.int("TYPEAHEAD_CACHE_TTL", default=30)  # seconds, 0 disables
+TYPEAHEAD_CACHE_ALIAS = env("TYPEAHEAD_CACHE_ALIAS", default="default")
+TYPEAHEAD_SLOW_MS = env.float("TYPEAHEAD_SLOW_MS", default=20.0)  # lookups slower than this are logged
+# Shorter queries return no suggestions instead of sorting a huge share of the prefix index
+TYPEAHEAD_MIN_CHARS = env.int("TYPEAHEAD_MIN_CHARS", default=2)
+
 # n8n
 N8N_WEBHOOK_URL = env("N8N_WEBHOOK_URL", default="")
 N8N_WEBHOOK_SECRET = env("N8N_WEBHOOK_SECRET", default="")
+# How OCR dispatch hands the original to n8n: "multipart" (file bytes) or
+# "signed_url" (short-lived storage URL + size/MIME/checksum)
+N8N_OCR_DISPATCH_MODE = env("N8N_OCR_DISPATCH_MODE", default="multipart")
+N8N_SIGNED_URL_EXPIRY = env.int("N8N_SIGNED_URL_EXPIRY", default=900)  # seconds
+
+# Outbound webhook client (utils.webhook_client): retries for idempotent calls
+# (connect failures and 502/503/504 only, never read timeouts), per-webhook
+# circuit breakers
+WEBHOOK_CONNECT_TIMEOUT = env.float("WEBHOOK_CONNECT_TIMEOUT", default=5.0)
+WEBHOOK_RETRY_ATTEMPTS = env.int("WEBHOOK_RETRY_ATTEMPTS", default=3)
+WEBHOOK_RETRY_BACKOFF = env.float("WEBHOOK_RETRY_BACKOFF", default=0.5)  # seconds, doubled per attempt
+WEBHOOK_RETRY_MAX_BACKOFF = env.float("WEBHOOK_RETRY_MAX_BACKOFF", default=8.0)
+WEBHOOK_BREAKER_FAILURE_THRESHOLD = env.int("WEBHOOK_BREAKER_FAILURE_THRESHOLD", default=5)
+WEBHOOK_BREAKER_RESET_TIMEOUT = env.float("WEBHOOK_BREAKER_RESET_TIMEOUT", default=30.0)
+# Async views' pooled httpx client (one per ASGI worker; per call elsewhere)
+WEBHOOK_ASYNC_MAX_CONNECTIONS = env.int("WEBHOOK_ASYNC_MAX_CONNECTIONS", default=100)
+WEBHOOK_ASYNC_MAX_KEEPALIVE = env.int("WEBHOOK_ASYNC_MAX_KEEPALIVE", default=20)
+
+# Streaming chat (POST /api/chat/stream/): max seconds n8n may go without sending a chunk
+CHAT_STREAM_READ_TIMEOUT = env.float("CHAT_STREAM_READ_TIMEOUT", default=120.0)
+
+# Chat answer cache (apps.webhooks.answer_cache): opening questions matching an
+# earlier one for the same client/case reuse its answer until RAG content for
+# that scope is re-indexed
+CHAT_ANSWER_CACHE_TTL = env.int("CHAT_ANSWER_CACHE_TTL", default=6 * 60 * 60)  # seconds, 0 disables
+CHAT_ANSWER_CACHE_SIMILARITY = env.float("CHAT_ANSWER_CACHE_SIMILARITY", default=0.85)
+CHAT_ANSWER_CACHE_MAX_ENTRIES = env.int("CHAT_ANSWER_CACHE_MAX_ENTRIES", default=100)  # per advocate + scope
+CHAT_ANSWER_CACHE_ALIAS = env("CHAT_ANSWER_CACHE_ALIAS", default="default")
@@ -3,9 +3,13 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
+from utils.storage import get_storage_backend
+from utils.webhook_client import get_webhook_client
+
 
 @api_view(["GET"])
 def health_check(request) -> Response:
@@ -13,9 +17,27 @@ def health_check(request) -> Response:
     return Response({"status": "ok"})
 
 
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def storage_health(request) -> Response:
+    """Storage backend connection pool stats (admin only)."""
+    backend = get_storage_backend()
+    stats = backend.pool_stats() if hasattr(backend, "pool_stats") else {}
+    return Response({"backend": type(backend).__name__, "pool": stats})
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def webhook_health(request) -> Response:
+    """Outbound webhook retry/circuit breaker metrics for this process (admin only)."""
+    return Response({"webhooks": get_webhook_client().metrics()})
+
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/health/", health_check, name="health-check"),
+    path("api/health/storage/", storage_health, name="storage-health"),
+    path("api/health/webhooks/", webhook_health, name="webhook-health"),
     path("api/", include("apps.accounts.urls")),
     path("api/", include("apps.clients.urls")),
     path("api/", include("apps.cases.urls")),
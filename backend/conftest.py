@@ -47,6 +47,20 @@ def _make_supabase_jwt(
     return jwt.encode(payload, secret, algorithm="HS256")
 
 
+@pytest.fixture(autouse=True)
+def _clear_auth_caches():
+    """Keep cached tokens and profiles from leaking between tests."""
+    from django.core.cache import cache
+
+    from utils.supabase_auth import token_cache
+
+    token_cache.clear()
+    cache.clear()
+    yield
+    token_cache.clear()
+    cache.clear()
+
+
 @pytest.fixture
 def jwt_secret(settings):
     """Set and return the test JWT secret in Django settings."""
@@ -0,0 +1,106 @@
+"""Async function views with DRF authentication, permissions and rendering.
+
+DRF's @api_view only produces sync views, so a view that spends most of
+its time waiting on n8n or Supabase would hold a worker thread for the
+whole wait. @async_api_view gives an `async def` handler the same
+request handling as @api_view:
+
+  - authentication (DEFAULT_AUTHENTICATION_CLASSES, incl. session CSRF),
+    permission checks and method checks run in a thread before the
+    handler, since they may touch the database;
+  - the handler receives a DRF Request (request.user, request.data);
+  - a returned DRF Response is rendered as JSON, and APIExceptions /
+    Http404 are turned into responses by DRF's exception handler.
+
+Inside the handler, ORM calls must go through sync_to_async; outbound
+HTTP should use the async WebhookClient methods or
+async_http_client(). Under WSGI the view still works (Django runs it
+in a per-request event loop), but only ASGI frees the thread.
+
+Usage:
+    from utils.async_views import async_api_view
+
+    @async_api_view(['POST'])
+    async def chat_relay(request):
+        resp = await get_webhook_client().apost('chat', url, json=payload)
+        ...
+"""
+import functools
+from typing import Awaitable, Callable, Iterable, Sequence
+
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponse
+from rest_framework import exceptions
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.permissions import BasePermission, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+
+def _authorize(
+    drf_request: Request, methods: Sequence[str], permission_classes: Iterable[type[BasePermission]],
+) -> None:
+    """Authenticate and check permissions (sync; may query the database)."""
+    if drf_request.method not in methods:
+        raise exceptions.MethodNotAllowed(drf_request.method)
+    drf_request.user  # noqa: B018 — runs authentication now, in this thread
+    for permission_class in permission_classes:
+        if not permission_class().has_permission(drf_request, None):
+            if drf_request.successful_authenticator is None:
+                raise exceptions.NotAuthenticated()
+            raise exceptions.PermissionDenied()
+
+
+def _finalize(response: HttpResponse, drf_request: Request) -> HttpResponse:
+    """Attach a JSON renderer to DRF Responses; Django renders them after the view."""
+    if isinstance(response, Response):
+        response.accepted_renderer = JSONRenderer()
+        response.accepted_media_type = JSONRenderer.media_type
+        response.renderer_context = {'request': drf_request, 'response': response}
+    return response
+
+
+def async_api_view(
+    methods: Sequence[str], permission_classes: Iterable[type[BasePermission]] = (IsAuthenticated,),
+) -> Callable:
+    """Turn an `async def handler(request, ...)` into an async Django view.
+
+    Args:
+        methods: Allowed HTTP methods.
+        permission_classes: DRF permissions checked after authentication.
+    """
+    methods = [method.upper() for method in methods]
+
+    def decorator(handler: Callable[..., Awaitable[HttpResponse]]) -> Callable:
+        @functools.wraps(handler)
+        async def view(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            drf_request = Request(
+                request,
+                parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES],
+                authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+                negotiator=DefaultContentNegotiation(),
+            )
+            try:
+                await sync_to_async(_authorize)(drf_request, methods, permission_classes)
+                response = await handler(drf_request, *args, **kwargs)
+            except Exception as exc:
+                response = exception_handler(exc, {'request': drf_request, 'args': args, 'kwargs': kwargs})
+                if response is None:
+                    raise
+                if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                    header = drf_request.authenticators[0].authenticate_header(drf_request)
+                    if header:
+                        response['WWW-Authenticate'] = header
+                    else:
+                        response.status_code = 403
+            return _finalize(response, drf_request)
+
+        # Django 4.2's csrf_exempt wraps views in a sync function, so mark it
+        # directly. SessionAuthentication enforces CSRF itself, as in DRF views.
+        view.csrf_exempt = True
+        return view
+
+    return decorator
@@ -0,0 +1,161 @@
+"""Streaming multipart/form-data bodies for outbound webhook calls.
+
+`requests.post(files=...)` needs every file as bytes and copies them again
+while encoding. MultipartEncoder instead yields the body part by part,
+pulling file content from storage chunk by chunk, and knows its total
+length up front so requests sends a Content-Length instead of chunked
+encoding. Memory per request stays at one chunk regardless of file size.
+
+The encoder can be iterated more than once (each pass re-opens its
+sources), so a retried request sends the same body again. For
+httpx.AsyncClient, send `body.async_body` instead: storage reads then run
+in a worker thread so they never block the event loop.
+
+Usage:
+    from utils.multipart import MultipartEncoder, bytes_part, storage_part
+
+    part = storage_part('orig_doc', 'scan.pdf', document.file_path)
+    body = MultipartEncoder({'document_id': '12'}, [part])
+    requests.post(url, data=body, headers={**headers, 'Content-Type': body.content_type})
+    await client.post(url, content=body.async_body, headers={**headers, **body.headers})
+"""
+import uuid
+from typing import AsyncIterator, Callable, Iterable, Iterator, NamedTuple, Optional
+
+from asgiref.sync import sync_to_async
+
+CRLF = b"\r\n"
+
+
+class FilePart(NamedTuple):
+    """A file field whose content is produced on demand."""
+
+    name: str
+    filename: str
+    content_type: str
+    size: int
+    open_chunks: Callable[[], Iterable[bytes]]
+
+
+def bytes_part(name: str, filename: str, data: bytes, content_type: str) -> FilePart:
+    """Build a FilePart from bytes already in memory (small generated files)."""
+    return FilePart(name, filename, content_type, len(data), lambda: [data])
+
+
+def storage_part(
+    name: str, filename: str, path: str, backend=None, content_type: Optional[str] = None,
+) -> Optional[FilePart]:
+    """Build a FilePart that streams a stored file, or None if it is missing."""
+    if backend is None:
+        from utils.storage import get_storage_backend
+
+        backend = get_storage_backend()
+    info = backend.stat(path)
+    if info is None:
+        return None
+    return FilePart(
+        name,
+        filename,
+        content_type or info["content_type"] or "application/octet-stream",
+        info["size"],
+        lambda: backend.read_chunks(path),
+    )
+
+
+def _quote(value: str) -> str:
+    """Escape a header parameter the way browsers do for form-data names."""
+    return value.replace("\r", "%0D").replace("\n", "%0A").replace('"', "%22")
+
+
+class MultipartEncoder:
+    """Iterable multipart/form-data body with a precomputed length."""
+
+    def __init__(
+        self,
+        fields: dict[str, str],
+        files: Iterable[FilePart],
+        boundary: Optional[str] = None,
+    ) -> None:
+        """Prepare part headers and total length.
+
+        Args:
+            fields: Plain form fields.
+            files: File parts, streamed in order after the fields.
+            boundary: Multipart boundary; random if not given.
+        """
+        self.boundary = boundary or uuid.uuid4().hex
+        self.files = list(files)
+        self._fields = [
+            (self._part_header(name) + str(value).encode("utf-8") + CRLF) for name, value in fields.items()
+        ]
+        self._file_headers = [
+            self._part_header(part.name, part.filename, part.content_type) for part in self.files
+        ]
+        self._closing = b"--" + self.boundary.encode("ascii") + b"--" + CRLF
+        self.length = (
+            sum(len(field) for field in self._fields)
+            + sum(len(header) + part.size + len(CRLF) for header, part in zip(self._file_headers, self.files))
+            + len(self._closing)
+        )
+
+    @property
+    def content_type(self) -> str:
+        """Content-Type header value, including the boundary."""
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def _part_header(self, name: str, filename: Optional[str] = None, content_type: Optional[str] = None) -> bytes:
+        disposition = f'form-data; name="{_quote(name)}"'
+        if filename is not None:
+            disposition += f'; filename="{_quote(filename)}"'
+        lines = [f"--{self.boundary}", f"Content-Disposition: {disposition}"]
+        if content_type:
+            lines.append(f"Content-Type: {content_type}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8")
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """Content-Type and Content-Length, for clients that would otherwise chunk an iterable body."""
+        return {"Content-Type": self.content_type, "Content-Length": str(self.length)}
+
+    @property
+    def async_body(self) -> "AsyncMultipartBody":
+        """The same body as an async iterable, for httpx.AsyncClient."""
+        return AsyncMultipartBody(self)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._fields
+        for header, part in zip(self._file_headers, self.files):
+            yield header
+            sent = 0
+            for chunk in part.open_chunks():
+                if chunk:
+                    sent += len(chunk)
+                    yield chunk
+            if sent != part.size:
+                # Content-Length is already on the wire; fail rather than send a corrupt body
+                raise ValueError(f"{part.filename}: expected {part.size} bytes, read {sent}")
+            yield CRLF
+        yield self._closing
+
+
+class AsyncMultipartBody:
+    """Async, re-iterable view of a MultipartEncoder.
+
+    httpx treats anything with __iter__ as a sync body, so the async form
+    is a separate object.
+    """
+
+    def __init__(self, encoder: MultipartEncoder) -> None:
+        self.encoder = encoder
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        chunks = iter(self.encoder)
+        done = object()
+        while True:
+            chunk = await sync_to_async(next, thread_sensitive=False)(chunks, done)
+            if chunk is done:
+                return
+            yield chunk
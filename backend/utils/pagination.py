@@ -1,11 +1,30 @@
 """Custom pagination classes for Legal Aid App.
 
+StandardPagination is page-number based: every page runs a COUNT(*) and
+an OFFSET scan, which gets slower the deeper the page. Viewsets that list
+large tables use OptInCursorPagination instead, which keeps page numbers
+by default but switches to keyset (cursor) pagination for requests with
+`?pagination=cursor`. Cursor pages seek on `created_at` through the
+`(advocate, -created_at)` / `(-created_at)` indexes, so every page costs
+the same, and skip the COUNT(*) unless `?count=true` is passed.
+
 Usage:
     REST_FRAMEWORK = {
         "DEFAULT_PAGINATION_CLASS": "utils.pagination.StandardPagination",
     }
+
+    class DocumentViewSet(ModelViewSet):
+        pagination_class = OptInCursorPagination
+
+    GET /api/documents/?pagination=cursor            -> {next, previous, results}
+    GET /api/documents/?pagination=cursor&count=true -> {count, next, previous, results}
 """
-from rest_framework.pagination import PageNumberPagination
+from typing import Optional
+
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+TRUE_VALUES = {"1", "true", "yes"}
 
 
 class StandardPagination(PageNumberPagination):
@@ -14,3 +33,49 @@ class StandardPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+class StandardCursorPagination(CursorPagination):
+    """Keyset pagination on -created_at; the total count is opt-in."""
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = "-created_at"
+    count_query_param = "count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return one page, counting the full result set only on request."""
+        self.total: Optional[int] = None
+        if request.query_params.get(self.count_query_param, "").lower() in TRUE_VALUES:
+            self.total = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data) -> Response:
+        """Return next/previous cursor links, plus `count` when it was asked for."""
+        body = {"next": self.get_next_link(), "previous": self.get_previous_link(), "results": data}
+        if self.total is not None:
+            body = {"count": self.total, **body}
+        return Response(body)
+
+
+class OptInCursorPagination(StandardPagination):
+    """Page numbers by default; keyset cursors with ?pagination=cursor."""
+
+    mode_query_param = "pagination"
+    cursor_class = StandardCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Delegate to the cursor paginator when the request opts in."""
+        self.cursor = None
+        params = request.query_params
+        if params.get(self.mode_query_param) == "cursor" or self.cursor_class.cursor_query_param in params:
+            self.cursor = self.cursor_class()
+            return self.cursor.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data) -> Response:
+        """Return the response for whichever mode paginated the request."""
+        if self.cursor is not None:
+            return self.cursor.get_paginated_response(data)
+        return super().get_paginated_response(data)
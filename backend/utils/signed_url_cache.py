@@ -0,0 +1,146 @@
+"""TTL cache for signed storage URLs.
+
+Signed URLs stay valid for SIGNED_URL_EXPIRY seconds, so re-signing the
+same path on every request is wasted work. Entries are kept for the
+expiry minus a safety margin, so a cached URL always has at least
+`margin` seconds of validity left when it is handed out.
+
+Entries live in process memory by default. Set SIGNED_URL_CACHE_ALIAS to
+a configured Django cache alias to share them between workers.
+
+Usage:
+    from utils.signed_url_cache import SignedURLCache
+
+    cache = SignedURLCache(expiry=3600, margin=300)
+    url = cache.get(path)
+    cache.set(path, url)
+    cache.invalidate(path)
+"""
+import hashlib
+import logging
+import threading
+import time
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "signed-url:"
+
+
+class SignedURLCache:
+    """Expiry-aware cache of storage path -> signed URL."""
+
+    def __init__(
+        self,
+        expiry: int,
+        margin: int = 300,
+        cache_alias: str = "",
+        max_entries: int = 10000,
+    ) -> None:
+        """Configure the cache.
+
+        Args:
+            expiry: Lifetime of the signed URLs in seconds.
+            margin: Seconds before expiry at which entries are evicted.
+            cache_alias: Django cache alias to use instead of process memory.
+            max_entries: Upper bound on in-memory entries.
+        """
+        self.ttl = max(expiry - margin, 0)
+        self.cache_alias = cache_alias
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether entries live long enough to be worth caching."""
+        return self.ttl > 0
+
+    def _django_cache(self):
+        from django.core.cache import caches
+
+        return caches[self.cache_alias]
+
+    @staticmethod
+    def _key(path: str) -> str:
+        """Build a backend-safe cache key (memcached rejects long/odd keys)."""
+        return KEY_PREFIX + hashlib.sha1(path.encode("utf-8")).hexdigest()
+
+    def get(self, path: str) -> Optional[str]:
+        """Return the cached URL for path, or None on miss/expiry."""
+        return self.get_many([path]).get(path)
+
+    def get_many(self, paths: Iterable[str]) -> dict[str, str]:
+        """Return cached URLs for the given paths; misses are omitted."""
+        paths = [path for path in paths if path]
+        if not self.enabled or not paths:
+            return {}
+        if self.cache_alias:
+            keys = {self._key(path): path for path in paths}
+            found = self._django_cache().get_many(list(keys))
+            return {keys[key]: url for key, url in found.items()}
+
+        now = time.monotonic()
+        hits: dict[str, str] = {}
+        with self._lock:
+            for path in paths:
+                entry = self._entries.get(path)
+                if entry is None:
+                    continue
+                url, expires_at = entry
+                if expires_at <= now:
+                    del self._entries[path]
+                    continue
+                hits[path] = url
+        return hits
+
+    def set(self, path: str, url: str) -> None:
+        """Cache a freshly signed URL for path."""
+        self.set_many({path: url})
+
+    def set_many(self, urls: dict[str, Optional[str]]) -> None:
+        """Cache freshly signed URLs; None values (failed signs) are skipped."""
+        urls = {path: url for path, url in urls.items() if path and url}
+        if not self.enabled or not urls:
+            return
+        if self.cache_alias:
+            self._django_cache().set_many(
+                {self._key(path): url for path, url in urls.items()}, timeout=self.ttl,
+            )
+            return
+
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            if len(self._entries) + len(urls) > self.max_entries:
+                self._prune(time.monotonic())
+            for path, url in urls.items():
+                self._entries[path] = (url, expires_at)
+
+    def invalidate(self, path: str) -> None:
+        """Drop any cached URL for path (after upload or delete)."""
+        if not path:
+            return
+        if self.cache_alias:
+            self._django_cache().delete(self._key(path))
+            return
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def clear(self) -> None:
+        """Drop all in-memory entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def _prune(self, now: float) -> None:
+        """Evict expired entries, then the oldest ones if still over the limit.
+
+        Caller must hold the lock.
+        """
+        for path in [p for p, (_, exp) in self._entries.items() if exp <= now]:
+            del self._entries[path]
+        overflow = len(self._entries) - self.max_entries // 2
+        if overflow > 0:
+            oldest = sorted(self._entries.items(), key=lambda item: item[1][1])[:overflow]
+            for path, _ in oldest:
+                del self._entries[path]
+            logger.info("Signed URL cache full; evicted %d oldest entries", overflow)
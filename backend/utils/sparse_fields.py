@@ -0,0 +1,70 @@
+"""Sparse fieldsets for read endpoints: ?fields= and ?omit=.
+
+`?fields=id,name,status` keeps only the listed fields; `?omit=status_history`
+drops fields from the full representation. Both take comma-separated
+top-level field names; unknown names are ignored. They only apply to GET
+and HEAD, so writes are always validated against the full serializer.
+
+Views can call requested_fields() with the serializer's field names to skip
+joins and prefetches for fields that will not be rendered.
+
+Usage:
+    from utils.sparse_fields import SparseFieldsetMixin, requested_fields
+
+    class DocumentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+        ...
+
+    fields = requested_fields(request, DocumentSerializer.Meta.fields)
+    if 'status_history' in fields:
+        qs = qs.prefetch_related('status_history')
+"""
+from typing import Iterable, Optional
+
+from rest_framework.request import Request
+from rest_framework.serializers import ListSerializer
+
+READ_METHODS = ("GET", "HEAD")
+
+
+def _param_names(request: Request, param: str) -> Optional[set[str]]:
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def requested_fields(request: Optional[Request], field_names: Iterable[str]) -> set[str]:
+    """Return the subset of field_names the request asks to render.
+
+    Args:
+        request: The current request, or None outside a request.
+        field_names: All fields the serializer can render.
+
+    Returns:
+        field_names narrowed by ?fields= and ?omit= (unchanged for writes).
+    """
+    names = set(field_names)
+    if request is None or request.method not in READ_METHODS:
+        return names
+    only = _param_names(request, "fields")
+    if only is not None:
+        names &= only
+    omit = _param_names(request, "omit")
+    if omit:
+        names -= omit
+    return names
+
+
+class SparseFieldsetMixin:
+    """Serializer mixin that renders only the fields the request asked for."""
+
+    def get_fields(self):
+        """Drop fields excluded by ?fields= / ?omit= on the current request."""
+        fields = super().get_fields()
+        parent = getattr(self, "parent", None)
+        if isinstance(parent, ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            return fields  # nested serializers render in full
+        keep = requested_fields(self.context.get("request"), fields)
+        return {name: field for name, field in fields.items() if name in keep}
@@ -8,41 +8,178 @@ Usage:
 
     backend = get_storage_backend()
     path = backend.upload(file, relative_path)
+    path = backend.upload_content(html.encode(), relative_path, "text/html")
     url = backend.get_url(path, request=request)
+    url = backend.get_url(path, expires_in=900)  # short-lived, bypasses the cache
+    urls = backend.get_urls([path, other_path], request=request)
+    for chunk in backend.read_chunks(path):
+        ...
     backend.delete(path)
+
+Direct-to-storage uploads (client sends bytes straight to storage):
+    target = backend.get_upload_url(relative_path, content_type, request=request)
+    info = backend.stat(relative_path)  # {"size": ..., "content_type": ...}
+
+Resumable (chunked) uploads:
+    token = backend.start_resumable(relative_path, content_type, size)
+    offset = backend.append_resumable(token, relative_path, offset, chunks)
+    path = backend.finish_resumable(token, relative_path)
 """
+import base64
 import logging
+import mimetypes
 import os
+import threading
+import uuid
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Iterable, Iterator, Optional, Union
 
 from django.conf import settings
 from django.core.files.uploadedfile import UploadedFile
 
+from utils.signed_url_cache import SignedURLCache
+
 logger = logging.getLogger(__name__)
 
+Content = Union[bytes, Iterable[bytes]]
+
+TUS_VERSION = "1.0.0"
+
+READ_CHUNK_SIZE = 64 * 1024
+
+# Leading bytes of the file types we accept, for backends without metadata
+MAGIC_NUMBERS = {
+    b"%PDF": "application/pdf",
+    b"\x89PNG\r\n\x1a\n": "image/png",
+    b"\xff\xd8\xff": "image/jpeg",
+}
+
+
+def iter_content(content: Content) -> Iterator[bytes]:
+    """Yield content as chunks, whether given as bytes or an iterable of bytes."""
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        yield bytes(content)
+        return
+    for chunk in content:
+        if chunk:
+            yield chunk
+
+
+class ResumableOffsetError(Exception):
+    """Raised when a resumable upload part does not start at the current offset."""
+
+    def __init__(self, expected: int, got: int) -> None:
+        super().__init__(f"Upload offset mismatch: expected {expected}, got {got}")
+        self.expected = expected
+        self.got = got
+
 
 class StorageBackend(ABC):
     """Abstract base class for storage backends."""
 
-    @abstractmethod
     def upload(self, file: UploadedFile, relative_path: str) -> str:
-        """Upload a file and return the storage path."""
+        """Upload a file and return the storage path.
+
+        Streams file.chunks() so the whole upload is never held in memory.
+        """
+        return self.upload_content(
+            file.chunks(),
+            relative_path,
+            content_type=getattr(file, "content_type", None) or "application/octet-stream",
+            size=getattr(file, "size", None),
+        )
+
+    @abstractmethod
+    def upload_content(
+        self,
+        content: Content,
+        relative_path: str,
+        content_type: str = "application/octet-stream",
+        size: Optional[int] = None,
+    ) -> str:
+        """Upload bytes or an iterable of byte chunks and return the storage path."""
 
     @abstractmethod
-    def get_url(self, path: str, request: Optional[object] = None) -> Optional[str]:
-        """Return a URL for the stored file."""
+    def get_url(
+        self, path: str, request: Optional[object] = None, expires_in: Optional[int] = None,
+    ) -> Optional[str]:
+        """Return a URL for the stored file.
+
+        `expires_in` requests a URL valid for that many seconds instead of
+        the backend default, where the backend signs its URLs.
+        """
+
+    def get_urls(
+        self, paths: Iterable[str], request: Optional[object] = None,
+    ) -> dict[str, Optional[str]]:
+        """Return a mapping of path -> URL for many stored files at once.
+
+        Empty paths are skipped. Backends that can sign in bulk should
+        override this; the default falls back to one get_url() per path.
+        """
+        return {path: self.get_url(path, request=request) for path in set(paths) if path}
 
     @abstractmethod
     def delete(self, path: str) -> bool:
         """Delete a file. Return True if successful."""
 
+    def get_upload_url(
+        self, relative_path: str, content_type: str, request: Optional[object] = None,
+    ) -> Optional[dict]:
+        """Return {"url", "method", "headers"} for a client to upload directly to storage."""
+        raise NotImplementedError(f"{type(self).__name__} does not support direct uploads")
+
+    def stat(self, path: str) -> Optional[dict]:
+        """Return {"size", "content_type"} for a stored object, or None if missing."""
+        raise NotImplementedError(f"{type(self).__name__} does not support stat")
+
+    def read_chunks(self, path: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+        """Yield a stored file's bytes chunk by chunk without loading it whole."""
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming reads")
+
+    def start_resumable(self, relative_path: str, content_type: str, size: int) -> str:
+        """Begin a resumable upload and return an opaque upload token."""
+        raise NotImplementedError(f"{type(self).__name__} does not support resumable uploads")
+
+    def append_resumable(
+        self, token: str, relative_path: str, offset: int, content: Content,
+    ) -> int:
+        """Append a part at `offset` and return the new offset.
+
+        Raises ResumableOffsetError if `offset` is not the current end of the upload.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support resumable uploads")
+
+    def finish_resumable(self, token: str, relative_path: str) -> str:
+        """Finalize a completed resumable upload and return the storage path."""
+        raise NotImplementedError(f"{type(self).__name__} does not support resumable uploads")
+
+    def abort_resumable(self, token: str) -> None:
+        """Discard a resumable upload and any parts received so far."""
+        raise NotImplementedError(f"{type(self).__name__} does not support resumable uploads")
+
 
 class LocalStorageBackend(StorageBackend):
     """Store files on the local filesystem under MEDIA_ROOT."""
 
-    def upload(self, file: UploadedFile, relative_path: str) -> str:
-        """Save file to local disk and return the relative path."""
+    def upload_content(
+        self,
+        content: Content,
+        relative_path: str,
+        content_type: str = "application/octet-stream",
+        size: Optional[int] = None,
+    ) -> str:
+        """Write content to local disk chunk by chunk and return the relative path."""
+        abs_path = self._unique_abs_path(relative_path)
+        with open(abs_path, "wb+") as dest:
+            for chunk in iter_content(content):
+                dest.write(chunk)
+
+        return os.path.relpath(abs_path, settings.MEDIA_ROOT)
+
+    @staticmethod
+    def _unique_abs_path(relative_path: str) -> str:
+        """Create the target directory and return a non-clashing absolute path."""
         abs_dir = os.path.join(settings.MEDIA_ROOT, os.path.dirname(relative_path))
         os.makedirs(abs_dir, exist_ok=True)
 
@@ -52,21 +189,101 @@ class LocalStorageBackend(StorageBackend):
         while os.path.exists(abs_path):
             abs_path = f"{base}_{counter}{ext}"
             counter += 1
-
-        with open(abs_path, "wb+") as dest:
-            for chunk in file.chunks():
+        return abs_path
+
+    @staticmethod
+    def _part_path(token: str) -> str:
+        """Return the temp file holding a resumable upload's received bytes."""
+        return os.path.join(settings.MEDIA_ROOT, ".uploads", f"{uuid.UUID(token).hex}.part")
+
+    def start_resumable(self, relative_path: str, content_type: str, size: int) -> str:
+        """Create an empty part file and return its token."""
+        token = uuid.uuid4().hex
+        part_path = self._part_path(token)
+        os.makedirs(os.path.dirname(part_path), exist_ok=True)
+        open(part_path, "wb").close()
+        return token
+
+    def append_resumable(
+        self, token: str, relative_path: str, offset: int, content: Content,
+    ) -> int:
+        """Append a part to the part file, which must currently be `offset` bytes long."""
+        part_path = self._part_path(token)
+        with open(part_path, "ab") as dest:
+            current = dest.tell()
+            if current != offset:
+                raise ResumableOffsetError(expected=current, got=offset)
+            for chunk in iter_content(content):
                 dest.write(chunk)
+            return dest.tell()
 
+    def finish_resumable(self, token: str, relative_path: str) -> str:
+        """Move the assembled part file to its final location."""
+        abs_path = self._unique_abs_path(relative_path)
+        os.replace(self._part_path(token), abs_path)
         return os.path.relpath(abs_path, settings.MEDIA_ROOT)
 
-    def get_url(self, path: str, request: Optional[object] = None) -> Optional[str]:
-        """Return a full URL using the request's build_absolute_uri."""
+    def abort_resumable(self, token: str) -> None:
+        """Remove the part file."""
+        try:
+            os.remove(self._part_path(token))
+        except FileNotFoundError:
+            pass
+
+    def get_url(
+        self, path: str, request: Optional[object] = None, expires_in: Optional[int] = None,
+    ) -> Optional[str]:
+        """Return a full URL using the request's build_absolute_uri (never expires)."""
         if not path:
             return None
         if request and hasattr(request, "build_absolute_uri"):
             return request.build_absolute_uri(f"/media/{path}")
         return f"/media/{path}"
 
+    UPLOAD_TOKEN_SALT = "utils.storage.local-direct-upload"
+    UPLOAD_TOKEN_MAX_AGE = 2 * 60 * 60
+
+    def get_upload_url(
+        self, relative_path: str, content_type: str, request: Optional[object] = None,
+    ) -> Optional[dict]:
+        """Return a signed URL to the dev-only PUT endpoint that writes under MEDIA_ROOT."""
+        from django.core import signing
+        from django.urls import reverse
+
+        token = signing.dumps({"path": relative_path}, salt=self.UPLOAD_TOKEN_SALT)
+        url = reverse("direct-upload-local", args=[token])
+        if request and hasattr(request, "build_absolute_uri"):
+            url = request.build_absolute_uri(url)
+        return {"url": url, "method": "PUT", "headers": {"Content-Type": content_type}}
+
+    @classmethod
+    def load_upload_token(cls, token: str) -> Optional[str]:
+        """Return the path a local upload token grants, or None if invalid/expired."""
+        from django.core import signing
+
+        try:
+            return signing.loads(token, salt=cls.UPLOAD_TOKEN_SALT, max_age=cls.UPLOAD_TOKEN_MAX_AGE)["path"]
+        except (signing.BadSignature, KeyError, TypeError):
+            return None
+
+    def stat(self, path: str) -> Optional[dict]:
+        """Return size and sniffed content type of a local file."""
+        abs_path = os.path.join(settings.MEDIA_ROOT, path)
+        if not path or not os.path.isfile(abs_path):
+            return None
+        with open(abs_path, "rb") as fh:
+            head = fh.read(16)
+        content_type = next(
+            (mime for magic, mime in MAGIC_NUMBERS.items() if head.startswith(magic)),
+            mimetypes.guess_type(abs_path)[0] or "application/octet-stream",
+        )
+        return {"size": os.path.getsize(abs_path), "content_type": content_type}
+
+    def read_chunks(self, path: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+        """Yield a local file in chunks."""
+        with open(os.path.join(settings.MEDIA_ROOT, path), "rb") as fh:
+            yield from iter(lambda: fh.read(chunk_size), b"")
+
     def delete(self, path: str) -> bool:
         """Delete a file from local disk."""
         abs_path = os.path.join(settings.MEDIA_ROOT, path)
@@ -83,89 +300,356 @@ class SupabaseStorageBackend(StorageBackend):
     """Store files in Supabase Storage.
 
     Requires SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY to be configured.
+
+    All operations share one keep-alive httpx.Client (created lazily, so
+    each gunicorn worker builds its own after fork). httpx clients are
+    thread-safe, so a single instance can serve every worker thread.
+
+    Signed URLs are cached per path (see utils.signed_url_cache) until a
+    safety margin before they expire; upload() and delete() invalidate.
     """
 
     BUCKET = "documents"
     SIGNED_URL_EXPIRY = 3600
 
     def __init__(self) -> None:
-        """Initialize Supabase storage headers."""
+        """Initialize Supabase storage headers and pool configuration."""
         self._headers = {
             "apikey": settings.SUPABASE_SERVICE_ROLE_KEY,
             "Authorization": f"Bearer {settings.SUPABASE_SERVICE_ROLE_KEY}",
         }
         self._base = f"{settings.SUPABASE_URL}/storage/v1"
-
-    def upload(self, file: UploadedFile, relative_path: str) -> str:
-        """Upload file to Supabase Storage and return the storage path."""
+        self.upload_timeout = getattr(settings, "STORAGE_UPLOAD_TIMEOUT", 30.0)
+        self.sign_timeout = getattr(settings, "STORAGE_SIGN_TIMEOUT", 10.0)
+        self.delete_timeout = getattr(settings, "STORAGE_DELETE_TIMEOUT", 10.0)
+        self._client = None
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "errors": 0}
+        self.url_cache = SignedURLCache(
+            expiry=self.SIGNED_URL_EXPIRY,
+            margin=getattr(settings, "SIGNED_URL_CACHE_MARGIN", 300),
+            cache_alias=getattr(settings, "SIGNED_URL_CACHE_ALIAS", ""),
+        )
+
+    @property
+    def client(self):
+        """Return the shared httpx.Client, creating it on first use."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._build_client()
+        return self._client
+
+    def _build_client(self):
+        """Create a pooled httpx.Client using the STORAGE_HTTP_* settings."""
         import httpx
 
-        content = file.read()
+        limits = httpx.Limits(
+            max_connections=getattr(settings, "STORAGE_HTTP_MAX_CONNECTIONS", 20),
+            max_keepalive_connections=getattr(settings, "STORAGE_HTTP_MAX_KEEPALIVE", 10),
+            keepalive_expiry=getattr(settings, "STORAGE_HTTP_KEEPALIVE_EXPIRY", 30.0),
+        )
+        http2 = getattr(settings, "STORAGE_HTTP2", True)
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.info("h2 not installed; Supabase storage client falling back to HTTP/1.1")
+                http2 = False
+        return httpx.Client(
+            headers=self._headers,
+            limits=limits,
+            http2=http2,
+            timeout=self.sign_timeout,
+        )
+
+    def _request(self, method: str, url: str, timeout: float, **kwargs):
+        """Send a request on the shared client and record pool stats."""
+        with self._lock:
+            self._stats["requests"] += 1
+        try:
+            return self.client.request(method, url, timeout=timeout, **kwargs)
+        except Exception:
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+
+    def pool_stats(self) -> dict:
+        """Return request counters and connection pool state for monitoring."""
+        with self._lock:
+            stats = dict(self._stats)
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        stats.update({
+            "client_open": self._client is not None and not self._client.is_closed,
+            "connections": len(connections),
+            "idle_connections": sum(1 for conn in connections if conn.is_idle()),
+            "max_connections": getattr(settings, "STORAGE_HTTP_MAX_CONNECTIONS", 20),
+            "max_keepalive_connections": getattr(settings, "STORAGE_HTTP_MAX_KEEPALIVE", 10),
+        })
+        return stats
+
+    def close(self) -> None:
+        """Close the shared client and its pooled connections."""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def upload_content(
+        self,
+        content: Content,
+        relative_path: str,
+        content_type: str = "application/octet-stream",
+        size: Optional[int] = None,
+    ) -> str:
+        """Stream content to Supabase Storage and return the storage path.
+
+        Iterables are sent as the request body chunk by chunk; when size is
+        known it is sent as Content-Length, otherwise the body is chunked.
+        """
         url = f"{self._base}/object/{self.BUCKET}/{relative_path}"
         headers = {
-            **self._headers,
-            "Content-Type": file.content_type or "application/octet-stream",
+            "Content-Type": content_type or "application/octet-stream",
             "x-upsert": "true",
         }
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            body = bytes(content)
+            sent = len(body)
+        else:
+            if size is not None:
+                headers["Content-Length"] = str(size)
+            sent = 0
 
-        with httpx.Client(timeout=30.0) as client:
-            response = client.post(url, content=content, headers=headers)
+            def body_chunks() -> Iterator[bytes]:
+                nonlocal sent
+                for chunk in iter_content(content):
+                    sent += len(chunk)
+                    yield chunk
+
+            body = body_chunks()
+
+        response = self._request("POST", url, self.upload_timeout, content=body, headers=headers)
 
         if response.status_code not in (200, 201):
             logger.error(f"Supabase upload failed ({response.status_code}): {response.text}")
             raise Exception(f"Storage upload failed: {response.status_code} - {response.text}")
 
-        logger.info(f"Uploaded {relative_path} ({len(content)} bytes)")
+        self.url_cache.invalidate(relative_path)
+        logger.info(f"Uploaded {relative_path} ({sent} bytes)")
         return relative_path
 
-    def get_url(self, path: str, request: Optional[object] = None) -> Optional[str]:
-        """Return a signed URL for the file in Supabase Storage."""
-        import httpx
+    def get_upload_url(
+        self, relative_path: str, content_type: str, request: Optional[object] = None,
+    ) -> Optional[dict]:
+        """Create a signed upload URL (valid for 2 hours) for a client-side PUT."""
+        try:
+            url = f"{self._base}/object/upload/sign/{self.BUCKET}/{relative_path}"
+            response = self._request("POST", url, self.sign_timeout)
+            if response.status_code != 200:
+                logger.error(f"Signed upload URL failed ({response.status_code}): {response.text}")
+                return None
+            signed_url = self._absolute_signed_url(response.json().get("url"))
+        except Exception:
+            logger.exception("Failed to create signed upload URL for: %s", relative_path)
+            return None
+        return {
+            "url": signed_url,
+            "method": "PUT",
+            "headers": {"Content-Type": content_type, "x-upsert": "false"},
+        }
 
+    def stat(self, path: str) -> Optional[dict]:
+        """Return size and content type of an object via HEAD, or None if missing."""
         if not path:
             return None
+        try:
+            response = self._request("HEAD", f"{self._base}/object/{self.BUCKET}/{path}", self.sign_timeout)
+        except Exception:
+            logger.exception("Failed to stat Supabase object: %s", path)
+            return None
+        if response.status_code != 200:
+            return None
+        return {
+            "size": int(response.headers.get("Content-Length", 0)),
+            "content_type": response.headers.get("Content-Type", "").split(";")[0].strip(),
+        }
+
+    def read_chunks(self, path: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+        """Stream an object from Supabase Storage on the shared client."""
+        url = f"{self._base}/object/{self.BUCKET}/{path}"
+        with self._lock:
+            self._stats["requests"] += 1
+        with self.client.stream("GET", url, timeout=self.upload_timeout) as response:
+            if response.status_code != 200:
+                response.read()
+                raise Exception(f"Storage download failed: {response.status_code} - {response.text}")
+            yield from response.iter_bytes(chunk_size)
+
+    def start_resumable(self, relative_path: str, content_type: str, size: int) -> str:
+        """Create a TUS upload on Supabase's resumable endpoint and return its URL.
+
+        Supabase requires every part except the last to be exactly 6MB.
+        """
+        metadata = {
+            "bucketName": self.BUCKET,
+            "objectName": relative_path,
+            "contentType": content_type or "application/octet-stream",
+        }
+        headers = {
+            "Tus-Resumable": TUS_VERSION,
+            "Upload-Length": str(size),
+            "Upload-Metadata": ",".join(
+                f"{key} {base64.b64encode(value.encode()).decode()}" for key, value in metadata.items()
+            ),
+            "x-upsert": "true",
+        }
+        response = self._request("POST", f"{self._base}/upload/resumable", self.sign_timeout, headers=headers)
+        if response.status_code != 201 or not response.headers.get("Location"):
+            logger.error(f"Supabase resumable init failed ({response.status_code}): {response.text}")
+            raise Exception(f"Resumable upload init failed: {response.status_code} - {response.text}")
+        return response.headers["Location"]
+
+    def append_resumable(
+        self, token: str, relative_path: str, offset: int, content: Content,
+    ) -> int:
+        """PATCH a part to the TUS upload URL and return Supabase's new offset."""
+        headers = {
+            "Tus-Resumable": TUS_VERSION,
+            "Upload-Offset": str(offset),
+            "Content-Type": "application/offset+octet-stream",
+        }
+        response = self._request(
+            "PATCH", token, self.upload_timeout, content=iter_content(content), headers=headers,
+        )
+        if response.status_code == 409:
+            head = self._request("HEAD", token, self.sign_timeout, headers={"Tus-Resumable": TUS_VERSION})
+            raise ResumableOffsetError(expected=int(head.headers.get("Upload-Offset", 0)), got=offset)
+        if response.status_code not in (200, 204):
+            logger.error(f"Supabase resumable PATCH failed ({response.status_code}): {response.text}")
+            raise Exception(f"Resumable upload failed: {response.status_code} - {response.text}")
+        return int(response.headers["Upload-Offset"])
+
+    def finish_resumable(self, token: str, relative_path: str) -> str:
+        """Supabase commits the object once the final part lands; drop stale URLs."""
+        self.url_cache.invalidate(relative_path)
+        return relative_path
+
+    def abort_resumable(self, token: str) -> None:
+        """Terminate the TUS upload so Supabase discards received parts."""
+        try:
+            self._request("DELETE", token, self.delete_timeout, headers={"Tus-Resumable": TUS_VERSION})
+        except Exception:
+            logger.exception("Failed to abort resumable upload: %s", token)
+
+    def get_url(
+        self, path: str, request: Optional[object] = None, expires_in: Optional[int] = None,
+    ) -> Optional[str]:
+        """Return a signed URL for the file in Supabase Storage.
+
+        URLs with a custom `expires_in` are signed fresh and not cached.
+        """
+        if not path:
+            return None
+        use_cache = expires_in is None
+        cached = self.url_cache.get(path) if use_cache else None
+        if cached:
+            return cached
         try:
             url = f"{self._base}/object/sign/{self.BUCKET}/{path}"
-            with httpx.Client(timeout=10.0) as client:
-                response = client.post(
-                    url,
-                    json={"expiresIn": self.SIGNED_URL_EXPIRY},
-                    headers={**self._headers, "Content-Type": "application/json"},
-                )
+            response = self._request(
+                "POST", url, self.sign_timeout, json={"expiresIn": expires_in or self.SIGNED_URL_EXPIRY},
+            )
             if response.status_code != 200:
                 logger.error(f"Signed URL failed ({response.status_code}): {response.text}")
                 return None
             data = response.json()
-            signed_url = data.get("signedURL") or data.get("signedUrl")
-            if signed_url and signed_url.startswith("/"):
-                signed_url = f"{settings.SUPABASE_URL}/storage/v1{signed_url}"
+            signed_url = self._absolute_signed_url(data.get("signedURL") or data.get("signedUrl"))
+            if signed_url and use_cache:
+                self.url_cache.set(path, signed_url)
             return signed_url
         except Exception:
             logger.exception("Failed to create signed URL for: %s", path)
             return None
 
+    def get_urls(
+        self, paths: Iterable[str], request: Optional[object] = None,
+    ) -> dict[str, Optional[str]]:
+        """Return signed URLs for many files using one bulk sign request.
+
+        Uses POST /object/sign/{bucket} with a "paths" list for paths not
+        already in the URL cache. Paths that Supabase cannot sign map to None.
+        """
+        requested = {path for path in paths if path}
+        cached = self.url_cache.get_many(requested)
+        unique_paths = sorted(requested - cached.keys())
+        urls: dict[str, Optional[str]] = {path: None for path in unique_paths}
+        urls.update(cached)
+        if not unique_paths:
+            return urls
+        try:
+            url = f"{self._base}/object/sign/{self.BUCKET}"
+            response = self._request(
+                "POST", url, self.sign_timeout,
+                json={"expiresIn": self.SIGNED_URL_EXPIRY, "paths": unique_paths},
+            )
+            if response.status_code != 200:
+                logger.error(f"Bulk signed URL failed ({response.status_code}): {response.text}")
+                return urls
+            for item in response.json():
+                path = item.get("path")
+                if path not in urls:
+                    continue
+                if item.get("error"):
+                    logger.warning("Signed URL failed for %s: %s", path, item["error"])
+                    continue
+                urls[path] = self._absolute_signed_url(item.get("signedURL") or item.get("signedUrl"))
+            self.url_cache.set_many({path: urls[path] for path in unique_paths})
+        except Exception:
+            logger.exception("Failed to create signed URLs for %d paths", len(unique_paths))
+        return urls
+
+    @staticmethod
+    def _absolute_signed_url(signed_url: Optional[str]) -> Optional[str]:
+        """Prefix a relative signed URL with the Supabase storage base."""
+        if signed_url and signed_url.startswith("/"):
+            return f"{settings.SUPABASE_URL}/storage/v1{signed_url}"
+        return signed_url
+
     def delete(self, path: str) -> bool:
         """Delete a file from Supabase Storage."""
-        import httpx
-
+        self.url_cache.invalidate(path)
         try:
             url = f"{self._base}/object/{self.BUCKET}"
-            with httpx.Client(timeout=10.0) as client:
-                response = client.request(
-                    "DELETE",
-                    url,
-                    json={"prefixes": [path]},
-                    headers={**self._headers, "Content-Type": "application/json"},
-                )
+            response = self._request("DELETE", url, self.delete_timeout, json={"prefixes": [path]})
             return response.status_code in (200, 204)
         except Exception:
             logger.exception("Failed to delete from Supabase Storage: %s", path)
             return False
 
 
+_backends: dict[tuple, StorageBackend] = {}
+_backends_lock = threading.Lock()
+
+
 def get_storage_backend() -> StorageBackend:
-    """Return the configured storage backend instance."""
+    """Return the process-wide instance of the configured storage backend.
+
+    Instances are cached per configuration so the Supabase backend's
+    connection pool is reused across requests and threads.
+    """
     backend = getattr(settings, "STORAGE_BACKEND", "local")
     if backend == "supabase":
-        return SupabaseStorageBackend()
-    return LocalStorageBackend()
+        key = ("supabase", settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+        factory = SupabaseStorageBackend
+    else:
+        key = ("local",)
+        factory = LocalStorageBackend
+
+    instance = _backends.get(key)
+    if instance is None:
+        with _backends_lock:
+            instance = _backends.get(key)
+            if instance is None:
+                instance = _backends[key] = factory()
+    return instance
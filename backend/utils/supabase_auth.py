@@ -3,6 +3,22 @@
 Verifies Supabase-issued JWTs and maps them to local Profile objects.
 Falls back gracefully when SUPABASE_JWT_SECRET is not configured (dev mode).
 
+Verification is cached per process so a request normally costs a dict
+lookup rather than a JWKS fetch:
+  - JWKSCache keeps the ES256 signing keys for JWKS_CACHE_TTL seconds and
+    refetches early when a token names an unknown `kid` (key rotation),
+    at most once per JWKS_MIN_REFRESH_INTERVAL.
+  - VerifiedTokenCache is an LRU of verified payloads keyed by a hash of
+    the token, each entry kept until the token's `exp` (capped at
+    JWT_PAYLOAD_CACHE_MAX_AGE seconds).
+  - The Profile for a `sub` is kept in the PROFILE_CACHE_ALIAS cache for
+    PROFILE_CACHE_TTL seconds, only when that cache is shared between
+    workers (Redis, Memcached, database, file). Every Profile save or
+    delete drops the entry, so edits, role changes and deactivation apply
+    at once in every worker. With a per-process cache (locmem, the
+    default) the profile is read from the database on each request, since
+    an invalidation could not reach the other workers.
+
 Usage:
     # In settings
     REST_FRAMEWORK = {
@@ -12,14 +28,21 @@ Usage:
         ],
     }
 """
+import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional, Tuple
 from uuid import UUID
 
+import httpx
 import jwt
-from jwt import PyJWKClient
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.request import Request
@@ -29,6 +52,189 @@ logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
+class JWKSCache:
+    """Thread-safe cache of the signing keys published at a JWKS URL."""
+
+    def __init__(self, url: str, ttl: float = 600, min_refresh_interval: float = 30) -> None:
+        """Configure the cache.
+
+        Args:
+            url: JWKS endpoint.
+            ttl: Seconds before the key set is refetched.
+            min_refresh_interval: Minimum seconds between fetches triggered by unknown kids.
+        """
+        self.url = url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def get_signing_key(self, kid: Optional[str]) -> jwt.PyJWK:
+        """Return the key for `kid`, refetching on expiry or an unknown kid."""
+        with self._lock:
+            now = time.monotonic()
+            stale = self._fetched_at is None or now - self._fetched_at >= self.ttl
+            unknown = kid not in self._keys
+            may_refresh = self._fetched_at is None or now - self._fetched_at >= self.min_refresh_interval
+            if stale or (unknown and may_refresh):
+                self._refresh()
+            try:
+                return self._keys[kid]
+            except KeyError:
+                raise jwt.InvalidTokenError(f'Unable to find a signing key that matches: "{kid}"')
+
+    def _refresh(self) -> None:
+        """Fetch the key set. Caller must hold the lock."""
+        try:
+            response = httpx.get(self.url, timeout=10.0)
+            response.raise_for_status()
+            jwk_set = jwt.PyJWKSet.from_dict(response.json())
+        except Exception as exc:
+            if self._keys:
+                # Keep serving the keys we have rather than failing every request
+                logger.warning("JWKS refresh from %s failed; keeping cached keys: %s", self.url, exc)
+                self._fetched_at = time.monotonic()
+                return
+            raise jwt.InvalidTokenError(f"Unable to fetch JWKS: {exc}")
+        self._keys = {key.key_id: key for key in jwk_set.keys}
+        self._fetched_at = time.monotonic()
+        logger.info("Fetched %d signing key(s) from %s", len(self._keys), self.url)
+
+
+class VerifiedTokenCache:
+    """LRU of verified JWT payloads, each valid until the token expires."""
+
+    def __init__(self, max_entries: int = 1024, max_age: float = 300) -> None:
+        """Configure the cache.
+
+        Args:
+            max_entries: Upper bound on cached tokens.
+            max_age: Longest an entry is trusted, even if `exp` is later.
+        """
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str, key_material: str) -> str:
+        """Hash the token with the verification key so a key change misses."""
+        return hashlib.sha256(f"{key_material}\0{token}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached payload, or None on miss/expiry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            payload, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def set(self, key: str, payload: dict) -> None:
+        """Cache a verified payload until min(exp, now + max_age)."""
+        expires_at = min(float(payload.get("exp", 0)), time.time() + self.max_age)
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            self._entries[key] = (payload, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+_jwks_caches: dict[str, JWKSCache] = {}
+_jwks_lock = threading.Lock()
+token_cache = VerifiedTokenCache(
+    max_entries=getattr(settings, "JWT_PAYLOAD_CACHE_SIZE", 1024),
+    max_age=getattr(settings, "JWT_PAYLOAD_CACHE_MAX_AGE", 300),
+)
+
+
+def _profile_cache_key(user_id) -> str:
+    return f"auth-profile:{user_id}"
+
+
+# Caches that live inside one process: an invalidation would miss other workers
+PER_PROCESS_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def _profile_cache():
+    """Return the shared profile cache, or None when profiles must not be cached."""
+    if getattr(settings, "PROFILE_CACHE_TTL", 0) <= 0:
+        return None
+    alias = getattr(settings, "PROFILE_CACHE_ALIAS", "default")
+    if settings.CACHES[alias]["BACKEND"] in PER_PROCESS_CACHE_BACKENDS:
+        return None
+    return caches[alias]
+
+
+def get_cached_profile(user_id: UUID) -> Optional[User]:
+    """Return the Profile for user_id from the shared cache, or load and cache it."""
+    cache = _profile_cache()
+    if cache is None:
+        return User.objects.filter(id=user_id).first()
+    key = _profile_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.filter(id=user_id).first()
+        if user is not None:
+            cache.set(key, user, settings.PROFILE_CACHE_TTL)
+    return user
+
+
+def invalidate_cached_profile(user_id) -> None:
+    """Drop a cached Profile after it changes.
+
+    Runs now and again once the current transaction commits, so a request
+    that races the write cannot re-cache the old row.
+    """
+    cache = _profile_cache()
+    if cache is None:
+        return
+    key = _profile_cache_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def _profile_changed(sender, instance, **kwargs) -> None:
+    invalidate_cached_profile(instance.pk)
+
+
+def connect_profile_cache_signals() -> None:
+    """Invalidate on every Profile save or delete (called from AccountsConfig.ready).
+
+    QuerySet.update() sends no signal; rows changed that way stay cached for
+    up to PROFILE_CACHE_TTL.
+    """
+    post_save.connect(_profile_changed, sender=User, dispatch_uid="profile-cache-save")
+    post_delete.connect(_profile_changed, sender=User, dispatch_uid="profile-cache-delete")
+
+
+def get_jwks_cache(url: str) -> JWKSCache:
+    """Return the process-wide JWKS cache for a URL."""
+    with _jwks_lock:
+        if url not in _jwks_caches:
+            _jwks_caches[url] = JWKSCache(
+                url,
+                ttl=getattr(settings, "JWKS_CACHE_TTL", 600),
+                min_refresh_interval=getattr(settings, "JWKS_MIN_REFRESH_INTERVAL", 30),
+            )
+        return _jwks_caches[url]
+
+
 class SupabaseJWTAuthentication(BaseAuthentication):
     """Authenticate requests using Supabase-issued JWT tokens.
 
@@ -65,7 +271,8 @@ class SupabaseJWTAuthentication(BaseAuthentication):
         """Decode and validate the JWT token.
 
         Supports both HS256 (legacy Supabase) and ES256 (new Supabase projects).
-        ES256 tokens are verified via the JWKS endpoint; HS256 uses the secret directly.
+        ES256 tokens are verified via the cached JWKS keys; HS256 uses the secret directly.
+        Verified payloads are cached until the token expires.
         """
         try:
             header = jwt.get_unverified_header(token)
@@ -73,17 +280,20 @@ class SupabaseJWTAuthentication(BaseAuthentication):
             raise AuthenticationFailed("Invalid token.")
 
         alg = header.get("alg", "HS256")
+        supabase_url = getattr(settings, "SUPABASE_URL", "")
+        jwks_url = f"{supabase_url}/auth/v1/.well-known/jwks.json"
+        cache_key = token_cache.key(token, jwks_url if alg == "ES256" else f"{alg}:{secret}")
+        cached = token_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
             if alg == "ES256":
-                supabase_url = getattr(settings, "SUPABASE_URL", "")
                 if not supabase_url:
                     raise AuthenticationFailed(
                         "SUPABASE_URL required for ES256 token verification."
                     )
-                jwks_url = f"{supabase_url}/auth/v1/.well-known/jwks.json"
-                jwks_client = PyJWKClient(jwks_url)
-                signing_key = jwks_client.get_signing_key_from_jwt(token)
+                signing_key = get_jwks_cache(jwks_url).get_signing_key(header.get("kid"))
                 payload = jwt.decode(
                     token,
                     signing_key.key,
@@ -110,6 +320,7 @@ class SupabaseJWTAuthentication(BaseAuthentication):
         if not sub:
             raise AuthenticationFailed("Token missing 'sub' claim.")
 
+        token_cache.set(cache_key, payload)
         return payload
 
     @staticmethod
@@ -120,9 +331,8 @@ class SupabaseJWTAuthentication(BaseAuthentication):
         except (ValueError, KeyError):
             raise AuthenticationFailed("Invalid 'sub' claim in token.")
 
-        try:
-            user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
+        user = get_cached_profile(user_id)
+        if user is None:
             email = payload.get("email", "")
             if not email:
                 raise AuthenticationFailed(
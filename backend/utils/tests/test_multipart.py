@@ -0,0 +1,86 @@
+"""Tests for the streaming multipart encoder."""
+import pytest
+import requests
+from asgiref.sync import async_to_sync
+from urllib3 import encode_multipart_formdata
+
+from utils.multipart import MultipartEncoder, bytes_part, storage_part
+from utils.storage import LocalStorageBackend
+
+
+@pytest.fixture
+def local_backend(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return LocalStorageBackend()
+
+
+class TestMultipartEncoder:
+    """Tests for MultipartEncoder."""
+
+    def test_body_matches_standard_encoding(self):
+        """The streamed body is byte-identical to urllib3's buffered encoding."""
+        body = MultipartEncoder(
+            {"client_name": "Asha", "case_id": "7"},
+            [bytes_part("orig_doc", "scan.pdf", b"%PDF-1.4 data", "application/pdf")],
+            boundary="b0undary",
+        )
+        expected, content_type = encode_multipart_formdata(
+            [
+                ("client_name", "Asha"),
+                ("case_id", "7"),
+                ("orig_doc", ("scan.pdf", b"%PDF-1.4 data", "application/pdf")),
+            ],
+            boundary="b0undary",
+        )
+
+        assert b"".join(body) == expected
+        assert len(body) == len(expected)
+        assert body.content_type == content_type
+
+    def test_streams_from_storage_and_can_be_replayed(self, local_backend):
+        """Storage parts are read chunk by chunk on every pass over the body."""
+        path = local_backend.upload_content(b"x" * 200_000, "u/c/report.txt", "text/plain")
+        part = storage_part("report", "report.txt", path, backend=local_backend, content_type="text/plain")
+        body = MultipartEncoder({"document_id": "1"}, [part])
+
+        chunks = list(body)
+        assert max(len(chunk) for chunk in chunks) <= 64 * 1024
+        assert b"".join(chunks) == b"".join(body)
+        assert len(b"".join(chunks)) == len(body)
+
+    def test_requests_sends_content_length(self):
+        """requests uses the precomputed length instead of chunked encoding."""
+        body = MultipartEncoder({"a": "1"}, [bytes_part("f", "f.txt", b"hello", "text/plain")])
+
+        prepared = requests.Request(
+            "POST", "https://n8n.example.com/hook", data=body, headers={"Content-Type": body.content_type},
+        ).prepare()
+
+        assert prepared.headers["Content-Length"] == str(len(body))
+        assert "Transfer-Encoding" not in prepared.headers
+        assert prepared.body is body
+
+    def test_async_body_matches_sync_body(self, local_backend):
+        """async_body yields the same bytes on every pass, for httpx.AsyncClient."""
+        path = local_backend.upload_content(b"y" * 100_000, "u/c/v2.txt", "text/plain")
+        part = storage_part("v2", "v2.txt", path, backend=local_backend, content_type="text/plain")
+        body = MultipartEncoder({"document_id": "1"}, [part])
+
+        async def collect(stream):
+            return b"".join([chunk async for chunk in stream])
+
+        stream = body.async_body
+        assert async_to_sync(collect)(stream) == b"".join(body)
+        assert async_to_sync(collect)(stream) == b"".join(body)
+        assert body.headers == {"Content-Type": body.content_type, "Content-Length": str(len(body))}
+
+    def test_missing_storage_file_gives_no_part(self, local_backend):
+        """storage_part returns None when the object does not exist."""
+        assert storage_part("f", "f.txt", "u/c/missing.txt", backend=local_backend) is None
+
+    def test_short_source_raises(self):
+        """A source shorter than its declared size aborts instead of sending a bad body."""
+        part = bytes_part("f", "f.txt", b"hello", "text/plain")._replace(size=10)
+
+        with pytest.raises(ValueError):
+            b"".join(MultipartEncoder({}, [part]))
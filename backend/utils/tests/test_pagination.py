@@ -0,0 +1,69 @@
+"""Tests for opt-in keyset pagination."""
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.clients.models import Client
+
+User = get_user_model()
+
+
+@pytest.fixture
+def advocate_client(db):
+    """Return an API client for an advocate with five clients, newest first C4..C0."""
+    advocate = User.objects.create_user(email="adv@legalaid.test", password="Test@123456", full_name="Adv")
+    now = timezone.now()
+    for i in range(5):
+        client = Client.objects.create(advocate=advocate, full_name=f"C{i}")
+        Client.objects.filter(pk=client.pk).update(created_at=now - timedelta(minutes=5 - i))
+    api = APIClient()
+    api.force_authenticate(user=advocate)
+    return api
+
+
+def _names(response) -> list[str]:
+    return [row["full_name"] for row in response.json()["results"]]
+
+
+class TestOptInCursorPagination:
+    """Tests for ?pagination=cursor on list endpoints."""
+
+    def test_page_numbers_by_default(self, advocate_client):
+        """Without the opt-in the response keeps count and page links."""
+        response = advocate_client.get("/api/clients/?page_size=2")
+
+        assert response.json()["count"] == 5
+        assert "page=2" in response.json()["next"]
+
+    def test_cursor_walks_all_rows_without_count(self, advocate_client, django_assert_max_num_queries):
+        """Cursor pages follow -created_at and never run COUNT(*) or OFFSET."""
+        seen = []
+        url = "/api/clients/?pagination=cursor&page_size=2"
+        while url:
+            with django_assert_max_num_queries(10) as captured:
+                response = advocate_client.get(url)
+            page_sql = captured.captured_queries[0]["sql"]
+            assert "COUNT(" not in page_sql
+            assert "OFFSET" not in page_sql
+            body = response.json()
+            assert "count" not in body
+            seen += _names(response)
+            url = body["next"]
+
+        assert seen == ["C4", "C3", "C2", "C1", "C0"]
+
+    def test_previous_link_goes_back(self, advocate_client):
+        """The previous cursor returns the page before."""
+        first = advocate_client.get("/api/clients/?pagination=cursor&page_size=2").json()
+        second = advocate_client.get(first["next"]).json()
+
+        assert _names(advocate_client.get(second["previous"])) == ["C4", "C3"]
+
+    def test_count_is_opt_in(self, advocate_client):
+        """?count=true adds the total to a cursor page."""
+        response = advocate_client.get("/api/clients/?pagination=cursor&count=true&page_size=2")
+
+        assert response.json()["count"] == 5
@@ -0,0 +1,75 @@
+"""Tests for the signed URL TTL cache."""
+from unittest import mock
+
+import pytest
+
+from utils.signed_url_cache import SignedURLCache
+
+
+class TestSignedURLCache:
+    """Tests for the in-memory SignedURLCache."""
+
+    def test_get_returns_cached_url(self):
+        """A stored URL is returned until it nears expiry."""
+        cache = SignedURLCache(expiry=3600, margin=300)
+        cache.set("u/c/a.pdf", "https://signed/a")
+
+        assert cache.get("u/c/a.pdf") == "https://signed/a"
+        assert cache.get("u/c/other.pdf") is None
+
+    def test_entry_evicted_at_safety_margin(self):
+        """Entries expire `margin` seconds before the signed URL does."""
+        cache = SignedURLCache(expiry=3600, margin=300)
+        with mock.patch("utils.signed_url_cache.time.monotonic", return_value=1000.0):
+            cache.set("u/c/a.pdf", "https://signed/a")
+        with mock.patch("utils.signed_url_cache.time.monotonic", return_value=1000.0 + 3299):
+            assert cache.get("u/c/a.pdf") == "https://signed/a"
+        with mock.patch("utils.signed_url_cache.time.monotonic", return_value=1000.0 + 3300):
+            assert cache.get("u/c/a.pdf") is None
+
+    def test_invalidate_and_skip_failed_signs(self):
+        """invalidate drops an entry; None URLs are never cached."""
+        cache = SignedURLCache(expiry=3600, margin=300)
+        cache.set_many({"a": "https://signed/a", "b": None})
+
+        assert cache.get_many(["a", "b"]) == {"a": "https://signed/a"}
+        cache.invalidate("a")
+        assert cache.get("a") is None
+
+    def test_margin_at_least_expiry_disables_cache(self):
+        """No entries are kept if the margin consumes the whole lifetime."""
+        cache = SignedURLCache(expiry=60, margin=60)
+        cache.set("a", "https://signed/a")
+        assert cache.get("a") is None
+
+    def test_prunes_when_full(self):
+        """The oldest entries are evicted once max_entries is reached."""
+        cache = SignedURLCache(expiry=3600, margin=300, max_entries=4)
+        for idx in range(6):
+            cache.set(f"p{idx}", f"https://signed/{idx}")
+
+        assert len(cache._entries) <= 4
+        assert cache.get("p5") == "https://signed/5"
+
+
+class TestSignedURLCacheDjangoBackend:
+    """Tests for SignedURLCache backed by a Django cache alias."""
+
+    @pytest.fixture
+    def cache(self, settings):
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "signed-urls": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "signed-url-tests",
+            },
+        }
+        return SignedURLCache(expiry=3600, margin=300, cache_alias="signed-urls")
+
+    def test_round_trip_and_invalidate(self, cache):
+        """Entries are shared through the Django cache and can be invalidated."""
+        cache.set_many({"u/c/a.pdf": "https://signed/a"})
+
+        assert cache.get_many(["u/c/a.pdf", "u/c/b.pdf"]) == {"u/c/a.pdf": "https://signed/a"}
+        cache.invalidate("u/c/a.pdf")
+        assert cache.get("u/c/a.pdf") is None
@@ -1,11 +1,12 @@
 """Tests for storage backend abstraction."""
 import os
+from unittest import mock
 
 import pytest
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import RequestFactory
 
-from utils.storage import LocalStorageBackend, get_storage_backend
+from utils.storage import LocalStorageBackend, SupabaseStorageBackend, get_storage_backend
 
 
 @pytest.mark.django_db
@@ -38,6 +39,19 @@ class TestLocalStorageBackend:
         assert os.path.exists(os.path.join(str(tmp_path), path1))
         assert os.path.exists(os.path.join(str(tmp_path), path2))
 
+    def test_upload_content_accepts_bytes_and_iterables(self, settings, tmp_path):
+        """upload_content writes raw bytes or chunk iterables to disk."""
+        settings.MEDIA_ROOT = str(tmp_path)
+        backend = LocalStorageBackend()
+
+        path1 = backend.upload_content(b"<html></html>", "u/c/a.html", "text/html")
+        path2 = backend.upload_content(iter([b"part1-", b"", b"part2"]), "u/c/b.txt", "text/plain")
+
+        with open(os.path.join(str(tmp_path), path1), "rb") as fh:
+            assert fh.read() == b"<html></html>"
+        with open(os.path.join(str(tmp_path), path2), "rb") as fh:
+            assert fh.read() == b"part1-part2"
+
     def test_get_url_with_request(self, settings, tmp_path):
         """get_url returns absolute URI when request is provided."""
         settings.MEDIA_ROOT = str(tmp_path)
@@ -65,6 +79,14 @@ class TestLocalStorageBackend:
         assert backend.get_url("") is None
         assert backend.get_url(None) is None
 
+    def test_get_urls_skips_empty_paths(self):
+        """get_urls returns one URL per unique non-empty path."""
+        backend = LocalStorageBackend()
+
+        urls = backend.get_urls(["a/b.pdf", "", None, "a/b.pdf", "c/d.html"])
+
+        assert urls == {"a/b.pdf": "/media/a/b.pdf", "c/d.html": "/media/c/d.html"}
+
     def test_delete_existing_file(self, settings, tmp_path):
         """delete removes the file and returns True."""
         settings.MEDIA_ROOT = str(tmp_path)
@@ -102,3 +124,159 @@ class TestGetStorageBackend:
         settings.STORAGE_BACKEND = "local"
         backend = get_storage_backend()
         assert isinstance(backend, LocalStorageBackend)
+
+    def test_supabase_backend_is_shared(self, settings):
+        """Repeated calls return the same Supabase backend (and pool)."""
+        settings.STORAGE_BACKEND = "supabase"
+        settings.SUPABASE_URL = "https://shared.supabase.co"
+        settings.SUPABASE_SERVICE_ROLE_KEY = "service-key"
+
+        assert get_storage_backend() is get_storage_backend()
+        assert isinstance(get_storage_backend(), SupabaseStorageBackend)
+
+
+class TestSupabaseStorageBackend:
+    """Tests for SupabaseStorageBackend bulk signing."""
+
+    @pytest.fixture
+    def backend(self, settings):
+        settings.SUPABASE_URL = "https://proj.supabase.co"
+        settings.SUPABASE_SERVICE_ROLE_KEY = "service-key"
+        return SupabaseStorageBackend()
+
+    def test_get_urls_uses_single_bulk_request(self, backend):
+        """get_urls signs all paths with one POST to the bulk endpoint."""
+        response = mock.Mock(status_code=200)
+        response.json.return_value = [
+            {"path": "u/c/a.pdf", "signedURL": "/object/sign/documents/u/c/a.pdf?token=1", "error": None},
+            {"path": "u/c/b.html", "signedURL": None, "error": "Either the object does not exist"},
+        ]
+        with mock.patch("httpx.Client") as client_cls:
+            client = client_cls.return_value
+            client.request.return_value = response
+
+            urls = backend.get_urls(["u/c/a.pdf", "u/c/b.html", ""])
+
+        client.request.assert_called_once()
+        method, url = client.request.call_args.args
+        assert (method, url) == ("POST", "https://proj.supabase.co/storage/v1/object/sign/documents")
+        assert client.request.call_args.kwargs["json"]["paths"] == ["u/c/a.pdf", "u/c/b.html"]
+        assert urls == {
+            "u/c/a.pdf": "https://proj.supabase.co/storage/v1/object/sign/documents/u/c/a.pdf?token=1",
+            "u/c/b.html": None,
+        }
+
+    def test_operations_share_one_pooled_client(self, backend):
+        """upload, get_url and delete reuse the same httpx.Client."""
+        ok = mock.Mock(status_code=200)
+        ok.json.return_value = {"signedURL": "/object/sign/documents/a.pdf?token=1"}
+        with mock.patch("httpx.Client") as client_cls:
+            client_cls.return_value.request.return_value = ok
+            file = SimpleUploadedFile("a.pdf", b"%PDF", content_type="application/pdf")
+
+            backend.upload(file, "u/c/a.pdf")
+            backend.get_url("u/c/a.pdf")
+            backend.delete("u/c/a.pdf")
+
+        client_cls.assert_called_once()
+        assert client_cls.call_args.kwargs["limits"].max_connections == 20
+        timeouts = [call.kwargs["timeout"] for call in client_cls.return_value.request.call_args_list]
+        assert timeouts == [backend.upload_timeout, backend.sign_timeout, backend.delete_timeout]
+        assert backend.pool_stats()["requests"] == 3
+
+    def test_upload_streams_file_chunks(self, backend):
+        """upload sends file.chunks() as the body instead of reading it whole."""
+        file = mock.Mock(content_type="application/pdf", size=10)
+        file.read.side_effect = AssertionError("file.read() must not be used")
+        file.chunks.return_value = iter([b"x" * 4, b"x" * 6])
+        ok = mock.Mock(status_code=200)
+        with mock.patch("httpx.Client") as client_cls:
+            client = client_cls.return_value
+            client.request.return_value = ok
+
+            backend.upload(file, "u/c/big.pdf")
+
+            kwargs = client.request.call_args.kwargs
+            assert kwargs["headers"]["Content-Length"] == "10"
+            assert b"".join(kwargs["content"]) == b"x" * 10
+
+    def test_signed_urls_cached_until_upload(self, backend):
+        """get_url/get_urls reuse cached URLs; upload invalidates the path."""
+        signed = mock.Mock(status_code=200)
+        signed.json.return_value = {"signedURL": "/object/sign/documents/u/c/a.pdf?token=1"}
+        with mock.patch("httpx.Client") as client_cls:
+            client = client_cls.return_value
+            client.request.return_value = signed
+
+            first = backend.get_url("u/c/a.pdf")
+            assert backend.get_url("u/c/a.pdf") == first
+            assert backend.get_urls(["u/c/a.pdf"]) == {"u/c/a.pdf": first}
+            assert client.request.call_count == 1
+
+            backend.upload(SimpleUploadedFile("a.pdf", b"%PDF"), "u/c/a.pdf")
+            backend.get_url("u/c/a.pdf")
+
+        assert client.request.call_count == 3
+
+    def test_resumable_upload_uses_tus_endpoint(self, backend):
+        """start/append_resumable speak TUS to Supabase's resumable endpoint."""
+        created = mock.Mock(status_code=201, headers={"Location": "https://proj.supabase.co/upload/resumable/abc"})
+        patched = mock.Mock(status_code=204, headers={"Upload-Offset": "4"})
+        with mock.patch("httpx.Client") as client_cls:
+            client = client_cls.return_value
+            client.request.side_effect = [created, patched]
+
+            token = backend.start_resumable("u/c/scan.pdf", "application/pdf", 10)
+            offset = backend.append_resumable(token, "u/c/scan.pdf", 0, b"abcd")
+
+        init_call, patch_call = client.request.call_args_list
+        assert init_call.args == ("POST", "https://proj.supabase.co/storage/v1/upload/resumable")
+        assert init_call.kwargs["headers"]["Upload-Length"] == "10"
+        assert patch_call.args == ("PATCH", token)
+        assert patch_call.kwargs["headers"]["Upload-Offset"] == "0"
+        assert offset == 4
+
+    def test_get_urls_empty_makes_no_request(self, backend):
+        """get_urls with no usable paths does not call Supabase."""
+        with mock.patch("httpx.Client") as client_cls:
+            assert backend.get_urls(["", None]) == {}
+        client_cls.assert_not_called()
+
+    def test_direct_upload_url_and_stat(self, backend):
+        """get_upload_url signs an upload path; stat reads size/type via HEAD."""
+        signed = mock.Mock(status_code=200)
+        signed.json.return_value = {"url": "/object/upload/sign/documents/u/c/a.pdf?token=t"}
+        head = mock.Mock(status_code=200, headers={"Content-Length": "42", "Content-Type": "application/pdf"})
+        with mock.patch("httpx.Client") as client_cls:
+            client = client_cls.return_value
+            client.request.side_effect = [signed, head]
+
+            target = backend.get_upload_url("u/c/a.pdf", "application/pdf")
+            info = backend.stat("u/c/a.pdf")
+
+        sign_call, head_call = client.request.call_args_list
+        assert sign_call.args == ("POST", "https://proj.supabase.co/storage/v1/object/upload/sign/documents/u/c/a.pdf")
+        assert head_call.args == ("HEAD", "https://proj.supabase.co/storage/v1/object/documents/u/c/a.pdf")
+        assert target["url"] == "https://proj.supabase.co/storage/v1/object/upload/sign/documents/u/c/a.pdf?token=t"
+        assert target["method"] == "PUT"
+        assert info == {"size": 42, "content_type": "application/pdf"}
+
+    def test_custom_expiry_bypasses_cache_and_read_chunks_streams(self, backend):
+        """get_url(expires_in=...) signs fresh; read_chunks streams the object."""
+        ok = mock.Mock(status_code=200)
+        ok.json.return_value = {"signedURL": "/object/sign/documents/a.pdf?token=short"}
+        streamed = mock.MagicMock(status_code=200)
+        streamed.iter_bytes.return_value = iter([b"%PDF", b"-1.4"])
+        with mock.patch("httpx.Client") as client_cls:
+            client = client_cls.return_value
+            client.request.return_value = ok
+            client.stream.return_value.__enter__.return_value = streamed
+
+            backend.get_url("a.pdf", expires_in=900)
+            backend.get_url("a.pdf", expires_in=900)
+            chunks = list(backend.read_chunks("a.pdf"))
+
+        assert client.request.call_count == 2
+        assert client.request.call_args.kwargs["json"] == {"expiresIn": 900}
+        assert client.stream.call_args.args == ("GET", "https://proj.supabase.co/storage/v1/object/documents/a.pdf")
+        assert chunks == [b"%PDF", b"-1.4"]
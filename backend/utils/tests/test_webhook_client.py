@@ -0,0 +1,241 @@
+"""Tests for the outbound webhook client."""
+from unittest import mock
+
+import httpx
+import pytest
+import requests
+from asgiref.sync import async_to_sync
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+from utils import webhook_client as webhook_client_module
+from utils.webhook_client import CircuitBreaker, CircuitOpenError, WebhookClient, async_http_client
+
+
+@pytest.fixture
+def client(settings):
+    settings.WEBHOOK_RETRY_ATTEMPTS = 3
+    settings.WEBHOOK_RETRY_BACKOFF = 0.01
+    settings.WEBHOOK_BREAKER_FAILURE_THRESHOLD = 3
+    settings.WEBHOOK_BREAKER_RESET_TIMEOUT = 30.0
+    webhook_client = WebhookClient()
+    with mock.patch("utils.webhook_client.time.sleep"):
+        yield webhook_client
+
+
+def _response(status_code):
+    return mock.Mock(status_code=status_code)
+
+
+def _refused():
+    """The ConnectionError requests raises when the connect itself fails."""
+    reason = NewConnectionError(None, "Connection refused")
+    return requests.ConnectionError(MaxRetryError(None, "https://n8n/chat", reason))
+
+
+class TestWebhookClient:
+    """Tests for retries, breakers and metrics."""
+
+    def test_idempotent_call_retries_until_success(self, client):
+        """Connection errors and 503s are retried for idempotent calls."""
+        with mock.patch.object(client.session, "post", side_effect=[
+            _refused(), _response(503), _response(200),
+        ]) as post:
+            response = client.post("chat", "https://n8n/chat", idempotent=True, json={})
+
+        assert response.status_code == 200
+        assert post.call_count == 3
+        assert post.call_args.kwargs["timeout"] == (5.0, None)
+        metrics = client.metrics()["chat"]
+        assert (metrics["retries"], metrics["failures"], metrics["successes"]) == (2, 2, 1)
+        assert metrics["state"] == "closed"
+
+    def test_non_idempotent_call_is_not_retried(self, client):
+        """A failed non-idempotent call raises after one attempt."""
+        with mock.patch.object(client.session, "post", side_effect=requests.Timeout("slow")) as post:
+            with pytest.raises(requests.Timeout):
+                client.post("ocr", "https://n8n/ocr", json={})
+
+        assert post.call_count == 1
+
+    @pytest.mark.parametrize("error", [
+        requests.ReadTimeout("slow"),
+        requests.ConnectionError(ProtocolError("Connection aborted.", ConnectionResetError())),
+    ])
+    def test_failures_after_sending_are_not_retried(self, client, error):
+        """n8n may still be handling a request whose reply timed out or was cut off."""
+        with mock.patch.object(client.session, "post", side_effect=error) as post:
+            with pytest.raises(type(error)):
+                client.post("chat", "https://n8n/chat", idempotent=True, json={})
+
+        assert post.call_count == 1
+        assert client.metrics()["chat"]["failures"] == 1
+
+    def test_rate_limit_is_not_retried(self, client):
+        """Only gateway errors are retried; a 429 is returned to the caller."""
+        with mock.patch.object(client.session, "post", return_value=_response(429)) as post:
+            assert client.post("chat", "https://n8n/chat", idempotent=True).status_code == 429
+
+        assert post.call_count == 1
+
+    def test_client_errors_do_not_retry_or_trip_breaker(self, client):
+        """4xx responses are returned as-is and count as n8n being up."""
+        with mock.patch.object(client.session, "post", return_value=_response(400)) as post:
+            assert client.post("rag", "https://n8n/rag", idempotent=True).status_code == 400
+
+        assert post.call_count == 1
+        assert client.breaker("rag").state == CircuitBreaker.CLOSED
+
+    def test_open_breaker_fails_fast(self, client):
+        """Once open, calls raise CircuitOpenError without touching the network."""
+        with mock.patch.object(client.session, "post", side_effect=_refused()) as post:
+            with pytest.raises(requests.ConnectionError):
+                client.post("chat", "https://n8n/chat", idempotent=True)
+            with pytest.raises(CircuitOpenError):
+                client.post("chat", "https://n8n/chat", idempotent=True)
+
+        assert post.call_count == 3
+        assert client.metrics()["chat"]["short_circuited"] == 1
+        assert client.metrics()["chat"]["state"] == "open"
+
+    def test_breakers_are_per_webhook(self, client):
+        """An open chat breaker does not block the RAG webhook."""
+        client.breaker("chat").record_failure()
+        client.breaker("chat").record_failure()
+        client.breaker("chat").record_failure()
+        with mock.patch.object(client.session, "post", return_value=_response(200)):
+            assert client.post("rag", "https://n8n/rag").status_code == 200
+
+    def test_async_post_retries_until_success(self, client):
+        """apost applies the same retry policy on the shared async client."""
+        replies = [httpx.ConnectError("down"), httpx.Response(503), httpx.Response(200)]
+
+        def handler(request):
+            reply = replies.pop(0)
+            if isinstance(reply, Exception):
+                raise reply
+            return reply
+
+        with mock.patch(
+            "utils.webhook_client.build_async_http_client",
+            side_effect=lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        ), mock.patch("utils.webhook_client.asyncio.sleep", new=mock.AsyncMock()):
+            response = async_to_sync(client.apost)("rag", "https://n8n/rag", idempotent=True, json={})
+
+        assert response.status_code == 200
+        metrics = client.metrics()["rag"]
+        assert (metrics["retries"], metrics["failures"], metrics["successes"]) == (2, 2, 1)
+
+    def test_async_read_timeout_is_not_retried(self, client):
+        """apost never resends a request whose reply timed out."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise httpx.ReadTimeout("slow", request=request)
+
+        with mock.patch(
+            "utils.webhook_client.build_async_http_client",
+            side_effect=lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        ):
+            with pytest.raises(httpx.ReadTimeout):
+                async_to_sync(client.apost)("chat", "https://n8n/chat", idempotent=True, json={})
+
+        assert len(calls) == 1
+
+    def test_stream_failures_trip_breaker(self, client):
+        """Streaming calls count toward the breaker and are not retried."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise httpx.ConnectError("down")
+
+        async def stream_once():
+            async with client.stream("chat", "https://n8n/chat", json={}):
+                pass
+
+        with mock.patch(
+            "utils.webhook_client.build_async_http_client",
+            side_effect=lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        ):
+            for _ in range(3):
+                with pytest.raises(httpx.ConnectError):
+                    async_to_sync(stream_once)()
+            with pytest.raises(CircuitOpenError):
+                async_to_sync(stream_once)()
+
+        assert len(calls) == 3
+        assert client.metrics()["chat"]["state"] == "open"
+
+
+class TestAsyncHttpClient:
+    """Tests for the async client's lifetime."""
+
+    def test_client_is_closed_after_each_call_outside_asgi(self):
+        """Without a lifespan-opened pool, each block gets its own client and closes it."""
+        async def use():
+            async with async_http_client() as http:
+                return http
+
+        first, second = async_to_sync(use)(), async_to_sync(use)()
+
+        assert first is not second
+        assert first.is_closed and second.is_closed
+
+    def test_asgi_lifespan_owns_the_pooled_client(self):
+        """config.asgi opens one pooled client at startup and closes it at shutdown."""
+        from config.asgi import application
+
+        sent = []
+
+        async def serve():
+            messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+            seen = []
+
+            async def receive():
+                message = next(messages)
+                if message["type"] == "lifespan.shutdown":
+                    for _ in range(2):
+                        async with async_http_client() as http:
+                            seen.append(http)
+                return message
+
+            async def send(message):
+                sent.append(message["type"])
+
+            await application({"type": "lifespan"}, receive, send)
+            return seen
+
+        seen = async_to_sync(serve)()
+
+        assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+        assert seen[0] is seen[1]
+        assert seen[0].is_closed
+        assert webhook_client_module._pooled_async_client is None
+
+
+class TestCircuitBreaker:
+    """Tests for the half-open probe."""
+
+    def test_half_open_allows_one_probe(self):
+        """After the reset timeout one probe goes through; success closes the breaker."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        with mock.patch("utils.webhook_client.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+            assert not breaker.allow()
+        with mock.patch("utils.webhook_client.time.monotonic", return_value=111.0):
+            assert breaker.allow()
+            assert not breaker.allow()
+            breaker.record_success()
+            assert breaker.allow()
+
+    def test_failed_probe_reopens(self):
+        """A failed probe re-opens the breaker for another reset timeout."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        with mock.patch("utils.webhook_client.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        with mock.patch("utils.webhook_client.time.monotonic", return_value=111.0):
+            assert breaker.allow()
+            breaker.record_failure()
+            assert not breaker.allow()
+        assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,416 @@
+"""Shared outbound client for n8n webhooks: retries and circuit breakers.
+
+Every webhook call goes through one pooled requests.Session. Calls marked
+idempotent are retried, with jittered exponential backoff, only when n8n
+cannot have acted on them: the connection was never established (connect
+error or connect timeout) or a gateway answered 502/503/504. Read timeouts
+and connections dropped mid-response are never retried, since n8n may
+still be running the first attempt. Each webhook (by name) has
+its own circuit breaker: after WEBHOOK_BREAKER_FAILURE_THRESHOLD failed
+attempts in a row it opens and calls fail fast with CircuitOpenError
+instead of waiting out their timeout. After WEBHOOK_BREAKER_RESET_TIMEOUT
+seconds one probe request is let through (half-open); its outcome closes
+or re-opens the breaker.
+
+Breaker state and metrics are per process (each gunicorn worker and OCR
+worker tracks its own).
+
+Async views use `WebhookClient.apost()` and `WebhookClient.stream()`,
+which go through the same breakers and metrics on an httpx.AsyncClient.
+Under ASGI that client is pooled per worker: config.asgi opens it at
+lifespan startup and closes it at shutdown. Elsewhere (WSGI, runserver,
+tests), async_to_sync runs each call on a fresh event loop, so a client is
+opened per call and closed after it. Streams are never retried: the caller
+may already have forwarded part of the body.
+
+Usage:
+    from utils.webhook_client import get_webhook_client
+
+    resp = get_webhook_client().post('chat', url, idempotent=True, json=payload, timeout=120)
+    resp.raise_for_status()
+
+    resp = await get_webhook_client().apost('chat', url, idempotent=True, json=payload, timeout=120)
+
+    async with get_webhook_client().stream('chat', url, json=payload, timeout=120) as resp:
+        async for line in resp.aiter_lines():
+            ...
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import httpx
+import requests
+from django.conf import settings
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {502, 503, 504}
+
+
+def _connect_failed(error: Exception) -> bool:
+    """Return whether a request failed before it reached the webhook.
+
+    requests raises ConnectionError both for refused connects and for
+    connections dropped after the body was sent; only the former wraps a
+    urllib3 NewConnectionError.
+    """
+    if isinstance(error, (requests.ConnectTimeout, httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        return True
+    if isinstance(error, requests.ConnectionError) and error.args:
+        reason = error.args[0]
+        if isinstance(reason, MaxRetryError):
+            reason = reason.reason
+        return isinstance(reason, NewConnectionError)
+    return False
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling a webhook whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        """Configure the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker.
+            reset_timeout: Seconds to stay open before allowing a probe.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return whether a call may go ahead now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Close the breaker and reset the failure count."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failure; open the breaker at the threshold or on a failed probe."""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+class WebhookClient:
+    """Pooled HTTP client with per-webhook retries, breakers and metrics."""
+
+    def __init__(self) -> None:
+        """Read retry and breaker configuration from settings."""
+        self.max_attempts = max(getattr(settings, 'WEBHOOK_RETRY_ATTEMPTS', 3), 1)
+        self.backoff = getattr(settings, 'WEBHOOK_RETRY_BACKOFF', 0.5)
+        self.max_backoff = getattr(settings, 'WEBHOOK_RETRY_MAX_BACKOFF', 8.0)
+        self.connect_timeout = getattr(settings, 'WEBHOOK_CONNECT_TIMEOUT', 5.0)
+        self.failure_threshold = getattr(settings, 'WEBHOOK_BREAKER_FAILURE_THRESHOLD', 5)
+        self.reset_timeout = getattr(settings, 'WEBHOOK_BREAKER_RESET_TIMEOUT', 30.0)
+        self.session = requests.Session()
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._metrics: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        """Return the circuit breaker for a webhook, creating it on first use."""
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._metrics[name] = {
+                    'calls': 0, 'attempts': 0, 'successes': 0, 'failures': 0,
+                    'retries': 0, 'short_circuited': 0, 'latency_total_ms': 0.0,
+                }
+            return self._breakers[name]
+
+    def _count(self, name: str, **increments) -> None:
+        with self._lock:
+            for key, value in increments.items():
+                self._metrics[name][key] += value
+
+    def post(
+        self,
+        name: str,
+        url: str,
+        idempotent: bool = False,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """POST to a webhook through its breaker, retrying idempotent calls.
+
+        Args:
+            name: Webhook name for the breaker and metrics ('ocr', 'chat', 'rag').
+            url: Webhook URL.
+            idempotent: Whether the call is safe to send more than once.
+            timeout: Read timeout in seconds; connects use WEBHOOK_CONNECT_TIMEOUT.
+            **kwargs: Passed to requests (json, data, headers, ...).
+
+        Returns:
+            The last response; callers still check its status.
+
+        Raises:
+            CircuitOpenError: The breaker is open.
+            requests.RequestException: The final attempt failed.
+        """
+        breaker = self.breaker(name)
+        self._count(name, calls=1)
+        attempts = self.max_attempts if idempotent else 1
+        for attempt in range(1, attempts + 1):
+            self._allow(name, breaker)
+            started = time.monotonic()
+            error: Optional[requests.RequestException] = None
+            response = None
+            try:
+                response = self.session.post(url, timeout=(self.connect_timeout, timeout), **kwargs)
+            except requests.RequestException as exc:
+                error = exc
+            delay = self._settle(name, breaker, attempt, attempts, started, error, response)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+            time.sleep(delay)
+
+    async def apost(
+        self,
+        name: str,
+        url: str,
+        idempotent: bool = False,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Async post(): same breakers, retries and metrics, on an httpx.AsyncClient.
+
+        Args:
+            name: Webhook name for the breaker and metrics ('ocr', 'chat', 'rag').
+            url: Webhook URL.
+            idempotent: Whether the call is safe to send more than once.
+            timeout: Read timeout in seconds; connects use WEBHOOK_CONNECT_TIMEOUT.
+            **kwargs: Passed to httpx (json, content, headers, ...). A streamed
+                `content` must be re-iterable for retries.
+
+        Returns:
+            The last response; callers still check its status.
+
+        Raises:
+            CircuitOpenError: The breaker is open.
+            httpx.HTTPError: The final attempt failed.
+        """
+        breaker = self.breaker(name)
+        self._count(name, calls=1)
+        attempts = self.max_attempts if idempotent else 1
+        for attempt in range(1, attempts + 1):
+            self._allow(name, breaker)
+            started = time.monotonic()
+            error: Optional[httpx.HTTPError] = None
+            response = None
+            try:
+                async with async_http_client() as http:
+                    response = await http.post(
+                        url, timeout=httpx.Timeout(timeout, connect=self.connect_timeout), **kwargs,
+                    )
+            except httpx.TransportError as exc:
+                error = exc
+            delay = self._settle(name, breaker, attempt, attempts, started, error, response)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+            await asyncio.sleep(delay)
+
+    def _allow(self, name: str, breaker: CircuitBreaker) -> None:
+        """Raise CircuitOpenError if the breaker rejects the next attempt."""
+        if not breaker.allow():
+            self._count(name, short_circuited=1)
+            logger.warning("[WEBHOOK] %s circuit open; failing fast", name)
+            raise CircuitOpenError(f'{name} webhook circuit is open')
+
+    def _settle(self, name, breaker, attempt, attempts, started, error, response) -> Optional[float]:
+        """Record one attempt's outcome.
+
+        Returns:
+            Seconds to wait before retrying, or None when the call is over
+            (success, non-retryable failure, or attempts exhausted).
+        """
+        elapsed_ms = (time.monotonic() - started) * 1000
+        self._count(name, attempts=1, latency_total_ms=elapsed_ms)
+
+        failed = error is not None or response.status_code >= 500 or response.status_code == 429
+        if not failed:
+            breaker.record_success()
+            self._count(name, successes=1)
+            return None
+
+        breaker.record_failure()
+        self._count(name, failures=1)
+        if error is not None:
+            retryable = _connect_failed(error)
+        else:
+            retryable = response.status_code in RETRYABLE_STATUS
+        if attempt == attempts or not retryable:
+            return None
+
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+        logger.warning(
+            "[WEBHOOK] %s attempt %d/%d failed (%s); retrying in %.2fs",
+            name, attempt, attempts, error or response.status_code, delay,
+        )
+        self._count(name, retries=1)
+        return delay
+
+    @asynccontextmanager
+    async def stream(
+        self, name: str, url: str, timeout: Optional[float] = None, **kwargs,
+    ) -> AsyncIterator[httpx.Response]:
+        """Open a streaming POST to a webhook through its breaker.
+
+        Args:
+            name: Webhook name for the breaker and metrics.
+            url: Webhook URL.
+            timeout: Max seconds between received chunks; connects use WEBHOOK_CONNECT_TIMEOUT.
+            **kwargs: Passed to httpx (json, content, headers, ...).
+
+        Yields:
+            The response, with the body not yet read.
+
+        Raises:
+            CircuitOpenError: The breaker is open.
+            httpx.HTTPError: The request failed before a response arrived.
+        """
+        breaker = self.breaker(name)
+        self._count(name, calls=1)
+        self._allow(name, breaker)
+
+        started = time.monotonic()
+        async with async_http_client() as http:
+            request = http.stream(
+                'POST', url, timeout=httpx.Timeout(timeout, connect=self.connect_timeout), **kwargs,
+            )
+            try:
+                async with request as response:
+                    self._count(name, attempts=1, latency_total_ms=(time.monotonic() - started) * 1000)
+                    if response.status_code >= 500 or response.status_code == 429:
+                        breaker.record_failure()
+                        self._count(name, failures=1)
+                    else:
+                        breaker.record_success()
+                        self._count(name, successes=1)
+                    yield response
+            except httpx.TransportError:
+                # Connect/read failures and timeouts, before or during the body
+                breaker.record_failure()
+                self._count(name, failures=1)
+                raise
+
+    def metrics(self) -> dict:
+        """Return per-webhook counters and breaker state for monitoring."""
+        with self._lock:
+            snapshot = {}
+            for name, counters in self._metrics.items():
+                breaker = self._breakers[name]
+                attempts = counters['attempts']
+                snapshot[name] = {
+                    **counters,
+                    'avg_latency_ms': round(counters['latency_total_ms'] / attempts, 1) if attempts else None,
+                    'state': breaker.state,
+                    'consecutive_failures': breaker.failures,
+                }
+            return snapshot
+
+
+_client: Optional[WebhookClient] = None
+_client_lock = threading.Lock()
+
+
+def get_webhook_client() -> WebhookClient:
+    """Return the process-wide webhook client."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = WebhookClient()
+    return _client
+
+
+def build_async_http_client() -> httpx.AsyncClient:
+    """Return a new httpx.AsyncClient with the configured pool limits."""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=getattr(settings, 'WEBHOOK_ASYNC_MAX_CONNECTIONS', 100),
+            max_keepalive_connections=getattr(settings, 'WEBHOOK_ASYNC_MAX_KEEPALIVE', 20),
+        ),
+    )
+
+
+# (event loop, client) opened at ASGI lifespan startup; None outside ASGI
+_pooled_async_client: Optional[tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = None
+
+
+async def open_async_http_client() -> None:
+    """Open the pooled client for the running loop (ASGI lifespan startup)."""
+    global _pooled_async_client
+    await close_async_http_client()
+    _pooled_async_client = (asyncio.get_running_loop(), build_async_http_client())
+
+
+async def close_async_http_client() -> None:
+    """Close the pooled client, if any (ASGI lifespan shutdown)."""
+    global _pooled_async_client
+    pooled, _pooled_async_client = _pooled_async_client, None
+    if pooled is not None:
+        await pooled[1].aclose()
+
+
+@asynccontextmanager
+async def async_http_client() -> AsyncIterator[httpx.AsyncClient]:
+    """Yield an httpx.AsyncClient usable on the running event loop.
+
+    Under ASGI this is the worker's pooled client, left open. Otherwise each
+    call may be on a fresh loop that the pool cannot outlive, so a client is
+    opened for the block and closed after it.
+    """
+    pooled = _pooled_async_client
+    if pooled is not None and pooled[0] is asyncio.get_running_loop():
+        yield pooled[1]
+        return
+    async with build_async_http_client() as client:
+        yield client
+
+
+def reset_webhook_client() -> None:
+    """Drop the shared client (tests, or after settings change)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.session.close()
+        _client = None